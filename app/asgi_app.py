@@ -0,0 +1,608 @@
+#!/usr/bin/env python
+"""ASGI (Quart) backend for MedGraph serving the same routes as app/flask_app.py.
+
+Run with an ASGI server, e.g.:
+
+    hypercorn app.asgi_app:app --bind 0.0.0.0:8502 --workers 2
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import json
+from types import GeneratorType
+from quart import Quart, Response, request, jsonify, render_template
+from app import async_db as db
+from app.bulk_ingest import (bulk_create_persons, bulk_create_diseases,
+                             bulk_create_relationships, bulk_add_vitals,
+                             parse_ndjson, DEFAULT_BATCH_SIZE)
+from app.schema import ensure_schema
+from app.cache import cache_stats
+from app.query_metrics import query_metrics, app_metrics
+from app.search import search_stats, DEFAULT_SEARCH_LIMIT
+from app.autocomplete import warm_autocomplete, autocomplete_stats
+from app.comorbidity import comorbidity, warm_comorbidity, DEFAULT_TOP_K
+from app.similarity import similarity, warm_similarity
+from app.stats import dashboard_stats, Reconciler
+from app.vitals_store import get_vitals_store, timeseries_enabled, DEFAULT_RANGE_LIMIT
+from app.medical_features import RECENT_VITALS_LIMIT
+from app.visualizations import load_stats_rows
+from app.overview_graph import PhaseTimer, serialize_graph
+from app.person_graph import serialize_person_graph, etag_matches
+from app.main import (resolve_fields, project_fields, PERSON_FIELDS, DISEASE_FIELDS,
+                      DEFAULT_PAGE_SIZE)
+
+app = Quart(__name__, static_folder='../frontend/static', template_folder='../frontend')
+
+
+@app.before_serving
+async def startup():
+    # Create constraints and indexes on startup; every statement is idempotent
+    if os.getenv('SCHEMA_BOOTSTRAP', 'True') == 'True':
+        schema_ok, schema_message = await asyncio.to_thread(ensure_schema)
+        print(schema_message)
+
+    if os.getenv('AUTOCOMPLETE_ENABLED', 'True') == 'True':
+        persons, diseases = await asyncio.gather(db.get_all_persons(), db.get_all_diseases())
+        persons_indexed, diseases_indexed = warm_autocomplete(persons, diseases)
+        print(f"Autocomplete index warmed with {persons_indexed} persons and {diseases_indexed} diseases")
+
+    if os.getenv('COMORBIDITY_ENABLED', 'True') == 'True':
+        diseases_loaded, patients_loaded = warm_comorbidity(await db.get_active_diagnoses())
+        print(f"Comorbidity matrix loaded for {diseases_loaded} diseases and {patients_loaded} patients")
+
+    if os.getenv('SIMILARITY_ENABLED', 'True') == 'True':
+        patients_loaded, features_loaded = warm_similarity(await db.get_similarity_rows())
+        print(f"Similarity index loaded for {patients_loaded} patients and {features_loaded} features")
+
+    if os.getenv('STATS_ENABLED', 'True') == 'True':
+        # The reconciler runs on its own thread with the synchronous driver
+        try:
+            await asyncio.to_thread(dashboard_stats.reconcile, load_stats_rows)
+        except Exception as e:
+            print(f"Error loading dashboard stats: {str(e)}")
+        app.stats_reconciler = Reconciler(dashboard_stats, load_stats_rows,
+                                          float(os.getenv('STATS_RECONCILE_SECONDS', '300'))).start()
+
+
+@app.after_serving
+async def shutdown():
+    if getattr(app, 'stats_reconciler', None) is not None:
+        app.stats_reconciler.stop()
+    await db.close_async_driver()
+
+
+@app.after_request
+async def add_cors_headers(response):
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
+    response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
+    return response
+
+
+@app.route('/')
+async def index():
+    return await render_template('hospital.html')
+
+@app.route('/simple')
+async def simple_interface():
+    return await render_template('index.html')
+
+@app.route('/doctor')
+async def doctor_portal():
+    return await render_template('doctor.html')
+
+async def list_response(get_all, get_page, stream, allowed_fields):
+    """Serve a list endpoint as a full list, a keyset page or an NDJSON stream."""
+    fields = request.args.get('fields')
+    fields = fields.split(',') if fields else None
+    after = request.args.get('after')
+    try:
+        if request.args.get('format') == 'ndjson':
+            rows = stream(after=after, fields=fields)
+
+            async def lines():
+                async for row in rows:
+                    yield json.dumps(row) + '\n'
+
+            return Response(lines(), mimetype='application/x-ndjson')
+        if 'limit' in request.args or after is not None:
+            limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+            return jsonify(await get_page(limit=limit, after=after, fields=fields))
+        return jsonify(project_fields(await get_all(), resolve_fields(fields, allowed_fields)))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/persons', methods=['GET', 'POST'])
+async def handle_persons():
+    if request.method == 'GET':
+        return await list_response(db.get_all_persons, db.get_persons_page,
+                                   db.stream_persons, PERSON_FIELDS)
+
+    data = await request.get_json()
+    name = data.get('name')
+    age = data.get('age')
+
+    if not name or not age:
+        return jsonify({'success': False, 'message': 'Name and age are required'}), 400
+
+    success, message = await db.create_person(name, int(age))
+    return jsonify({'success': success, 'message': message})
+
+@app.route('/api/diseases', methods=['GET', 'POST'])
+async def handle_diseases():
+    if request.method == 'GET':
+        return await list_response(db.get_all_diseases, db.get_diseases_page,
+                                   db.stream_diseases, DISEASE_FIELDS)
+
+    data = await request.get_json()
+    name = data.get('name')
+    description = data.get('description')
+
+    if not name or not description:
+        return jsonify({'success': False, 'message': 'Name and description are required'}), 400
+
+    success, message = await db.create_disease(name, description)
+    return jsonify({'success': success, 'message': message})
+
+@app.route('/api/relationships', methods=['POST'])
+async def create_relationship_endpoint():
+    data = await request.get_json()
+    person_name = data.get('person_name')
+    disease_name = data.get('disease_name')
+
+    if not person_name or not disease_name:
+        return jsonify({'success': False, 'message': 'Person name and disease name are required'}), 400
+
+    success, message = await db.create_relationship(person_name, disease_name)
+    return jsonify({'success': success, 'message': message})
+
+@app.route('/api/persons/<name>/diseases', methods=['GET'])
+async def get_person_diseases(name):
+    return jsonify(await db.fetch_person_diseases(name))
+
+@app.route('/api/persons/search', methods=['GET'])
+async def search_patients_endpoint():
+    return await search_response(db.search_patients)
+
+@app.route('/api/diseases/search', methods=['GET'])
+async def search_diseases_endpoint():
+    return await search_response(db.search_diseases)
+
+async def search_response(search):
+    search_term = request.args.get('q', '')
+    if len(search_term) < 2:
+        return jsonify([])
+
+    try:
+        results = await search(search_term,
+                               mode=request.args.get('mode', 'ranked'),
+                               limit=request.args.get('limit', DEFAULT_SEARCH_LIMIT, type=int))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(results)
+
+@app.route('/api/persons/<name>/details', methods=['GET'])
+async def get_patient_details_endpoint(name):
+    details = await db.get_patient_details(name)
+    if details is None:
+        return jsonify({'error': 'Patient not found'}), 404
+    return jsonify(details)
+
+@app.route('/api/relationships', methods=['DELETE'])
+async def delete_relationship_endpoint():
+    data = await request.get_json()
+    person_name = data.get('person_name')
+    disease_name = data.get('disease_name')
+
+    if not person_name or not disease_name:
+        return jsonify({'success': False, 'message': 'Person name and disease name are required'}), 400
+
+    success, message = await db.delete_relationship(person_name, disease_name)
+    return jsonify({'success': success, 'message': message})
+
+@app.route('/api/diagnosis', methods=['POST'])
+async def create_diagnosis_endpoint():
+    data = await request.get_json()
+    patient_name = data.get('patient_name')
+    disease_name = data.get('disease_name')
+    doctor_name = data.get('doctor_name')
+    notes = data.get('notes', '')
+    severity = data.get('severity', 'moderate')
+
+    if not all([patient_name, disease_name, doctor_name]):
+        return jsonify({'success': False, 'message': 'Patient name, disease name, and doctor name are required'}), 400
+
+    success, message = await db.create_diagnosis(patient_name, disease_name, doctor_name, notes, severity)
+    return jsonify({'success': success, 'message': message})
+
+def vitals_response(name):
+    """Latest readings, a time range (start/end) or rollups (resolution) from the vitals store."""
+    if not timeseries_enabled():
+        return jsonify({'error': 'Vitals queries need VITALS_BACKEND=timeseries'}), 400
+
+    store = get_vitals_store()
+    start = request.args.get('start')
+    end = request.args.get('end')
+    resolution = request.args.get('resolution')
+    try:
+        if resolution:
+            return jsonify(store.rollup(name, resolution, start, end,
+                                        limit=request.args.get('limit', DEFAULT_RANGE_LIMIT, type=int)))
+        if start or end:
+            return jsonify(store.range(name, start, end,
+                                       limit=request.args.get('limit', DEFAULT_RANGE_LIMIT, type=int)))
+        return jsonify(store.latest(name, request.args.get('limit', RECENT_VITALS_LIMIT, type=int)))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/patients/<name>/vitals', methods=['GET', 'POST'])
+async def add_vitals_endpoint(name):
+    if request.method == 'GET':
+        return vitals_response(name)
+
+    data = await request.get_json()
+
+    success, message = await db.add_vitals(
+        name,
+        data.get('blood_pressure'),
+        data.get('heart_rate'),
+        data.get('temperature'),
+        data.get('weight'),
+        data.get('height'),
+        data.get('notes', '')
+    )
+
+    return jsonify({'success': success, 'message': message})
+
+@app.route('/api/patients/<name>/timeline', methods=['GET'])
+async def patient_timeline_endpoint(name):
+    types = request.args.get('types')
+    try:
+        page = await db.get_patient_timeline(name,
+                                             types=types.split(',') if types else None,
+                                             since=request.args.get('since'),
+                                             until=request.args.get('until'),
+                                             limit=request.args.get('limit', type=int),
+                                             cursor=request.args.get('cursor'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if page is None:
+        return jsonify({'error': 'Could not load timeline'}), 500
+    return jsonify(page)
+
+@app.route('/api/patients/<name>/prescription', methods=['POST'])
+async def add_prescription_endpoint(name):
+    data = await request.get_json()
+
+    success, message = await db.add_prescription(
+        name,
+        data.get('medication'),
+        data.get('dosage'),
+        data.get('frequency'),
+        data.get('doctor_name'),
+        data.get('duration', ''),
+        data.get('notes', '')
+    )
+
+    return jsonify({'success': success, 'message': message})
+
+@app.route('/api/patients/<name>/medical-record', methods=['GET'])
+async def get_medical_record_endpoint(name):
+    sections = request.args.get('sections')
+    try:
+        record = await db.get_patient_medical_record(
+            name,
+            sections=sections.split(',') if sections else None,
+            prescriptions_offset=request.args.get('prescriptions_offset', 0, type=int),
+            prescriptions_limit=request.args.get('prescriptions_limit', type=int),
+            history_offset=request.args.get('history_offset', 0, type=int),
+            history_limit=request.args.get('history_limit', type=int)
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if record is None:
+        return jsonify({'error': 'Patient not found'}), 404
+    return jsonify(record)
+
+@app.route('/api/diagnosis/search', methods=['GET'])
+async def search_by_diagnosis_endpoint():
+    disease_name = request.args.get('disease')
+    if not disease_name:
+        return jsonify([])
+
+    return jsonify(await db.search_by_diagnosis(disease_name))
+
+@app.route('/api/diagnosis/status', methods=['PUT'])
+async def update_diagnosis_status_endpoint():
+    data = await request.get_json()
+    patient_name = data.get('patient_name')
+    disease_name = data.get('disease_name')
+    status = data.get('status')
+    notes = data.get('notes', '')
+
+    if not all([patient_name, disease_name, status]):
+        return jsonify({'success': False, 'message': 'Missing required fields'}), 400
+
+    success, message = await db.update_diagnosis_status(patient_name, disease_name, status, notes)
+    return jsonify({'success': success, 'message': message})
+
+@app.route('/api/graph/<name>', methods=['GET'])
+async def get_graph_data(name):
+    timer = PhaseTimer()
+    try:
+        graph = await db.get_person_graph(name, depth=request.args.get('depth'),
+                                          limits=request.args.get('limits'), timer=timer)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return person_graph_response(graph, timer)
+
+def person_graph_response(graph, timer):
+    if graph is None:
+        return jsonify({'error': 'Could not build graph'}), 500
+    if not graph['edges']:
+        return jsonify({'error': 'No data to visualize.'}), 404
+    body, etag, server_timing = serialize_person_graph(graph, timer)
+    # no-cache: clients keep the body but revalidate it with If-None-Match every time
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache', 'Server-Timing': server_timing}
+    if etag_matches(request.headers.get('If-None-Match'), etag):
+        return Response('', status=304, headers=headers)
+    return Response(body, mimetype='application/json', headers=headers)
+
+def graph_response(graph, timer):
+    if graph is None:
+        return jsonify({'error': 'Could not build overview graph'}), 500
+    body, server_timing = serialize_graph(graph, timer)
+    return Response(body, mimetype='application/json', headers={'Server-Timing': server_timing})
+
+@app.route('/api/overview/graph', methods=['GET'])
+async def overview_graph_endpoint():
+    timer = PhaseTimer()
+    try:
+        graph = await db.get_overview_graph(level=request.args.get('level', 'disease'),
+                                            status=request.args.get('status', 'active'),
+                                            max_nodes=request.args.get('max_nodes', type=int),
+                                            max_edges=request.args.get('max_edges', type=int),
+                                            timer=timer)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return graph_response(graph, timer)
+
+@app.route('/api/overview/cluster', methods=['GET'])
+async def overview_cluster_endpoint():
+    disease = request.args.get('disease')
+    if not disease:
+        return jsonify({'error': 'disease is required'}), 400
+
+    timer = PhaseTimer()
+    try:
+        graph = await db.expand_overview_cluster(
+            disease, severity=request.args.get('severity'),
+            status=request.args.get('status', 'active'),
+            after=request.args.get('after'),
+            max_nodes=request.args.get('max_nodes', type=int),
+            timer=timer)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return graph_response(graph, timer)
+
+@app.route('/api/diseases/<name>/comorbidities', methods=['GET'])
+async def comorbidities_endpoint(name):
+    return comorbidity_response(comorbidity.top_comorbidities, name)
+
+@app.route('/api/diseases/<name>/comorbidity-network', methods=['GET'])
+async def comorbidity_network_endpoint(name):
+    return comorbidity_response(comorbidity.disease_network, name)
+
+def comorbidity_response(query, name):
+    if not comorbidity.ready:
+        return jsonify({'error': 'Comorbidity index is not loaded'}), 503
+    try:
+        result = query(name,
+                       k=request.args.get('k', DEFAULT_TOP_K, type=int),
+                       by=request.args.get('by', 'count'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if result is None:
+        return jsonify({'error': 'No active diagnoses for this disease'}), 404
+    return jsonify(result)
+
+@app.route('/api/patients/<name>/similar', methods=['GET'])
+async def similar_patients_endpoint(name):
+    return similarity_response(similarity.similar_patients, name)
+
+@app.route('/api/patients/<name>/similar-network', methods=['GET'])
+async def similar_network_endpoint(name):
+    return similarity_response(similarity.similarity_network, name,
+                               depth=request.args.get('depth', 1, type=int))
+
+def similarity_response(query, name, **params):
+    if not similarity.ready:
+        return jsonify({'error': 'Similarity index is not loaded'}), 503
+    try:
+        result = query(name,
+                       k=request.args.get('k', DEFAULT_TOP_K, type=int),
+                       metric=request.args.get('metric', 'cosine'),
+                       **params)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if result is None:
+        return jsonify({'error': 'No diagnoses or prescriptions for this patient'}), 404
+    return jsonify(result)
+
+# Id-based routes: resolve the id to the node's name, then serve the name-based view
+async def by_id(label, node_id, view):
+    name = await db.resolve_name(label, node_id)
+    if name is None:
+        return jsonify({'error': f'{label} not found'}), 404
+    return await view(name)
+
+@app.route('/api/v2/persons/<person_id>', methods=['GET'])
+async def person_by_id_endpoint(person_id):
+    return await by_id('Person', person_id, get_patient_details_endpoint)
+
+@app.route('/api/v2/persons/<person_id>/diseases', methods=['GET'])
+async def person_diseases_by_id_endpoint(person_id):
+    return await by_id('Person', person_id, get_person_diseases)
+
+@app.route('/api/v2/patients/<person_id>/medical-record', methods=['GET'])
+async def medical_record_by_id_endpoint(person_id):
+    return await by_id('Person', person_id, get_medical_record_endpoint)
+
+@app.route('/api/v2/patients/<person_id>/timeline', methods=['GET'])
+async def timeline_by_id_endpoint(person_id):
+    return await by_id('Person', person_id, patient_timeline_endpoint)
+
+@app.route('/api/v2/patients/<person_id>/vitals', methods=['GET', 'POST'])
+async def vitals_by_id_endpoint(person_id):
+    return await by_id('Person', person_id, add_vitals_endpoint)
+
+@app.route('/api/v2/graph/<person_id>', methods=['GET'])
+async def graph_by_id_endpoint(person_id):
+    return await by_id('Person', person_id, get_graph_data)
+
+@app.route('/api/v2/diseases/<disease_id>/comorbidities', methods=['GET'])
+async def comorbidities_by_id_endpoint(disease_id):
+    return await by_id('Disease', disease_id, comorbidities_endpoint)
+
+@app.route('/api/v2/patients/<person_id>/similar', methods=['GET'])
+async def similar_patients_by_id_endpoint(person_id):
+    return await by_id('Person', person_id, similar_patients_endpoint)
+
+@app.route('/api/v2/persons/ids', methods=['GET'])
+async def person_ids_endpoint():
+    return await ids_response('Person')
+
+@app.route('/api/v2/diseases/ids', methods=['GET'])
+async def disease_ids_endpoint():
+    return await ids_response('Disease')
+
+async def ids_response(label):
+    try:
+        ids = await db.resolve_ids(label, request.args.getlist('name'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(ids)
+
+@app.route('/api/stats', methods=['GET'])
+async def stats_status_endpoint():
+    return jsonify(dashboard_stats.status())
+
+@app.route('/api/stats/diseases', methods=['GET'])
+async def disease_stats_endpoint():
+    return jsonify(await db.get_disease_distribution())
+
+@app.route('/api/stats/severity', methods=['GET'])
+async def severity_stats_endpoint():
+    return jsonify(await db.get_severity_distribution())
+
+@app.route('/api/stats/status', methods=['GET'])
+async def status_stats_endpoint():
+    if not dashboard_stats.ready:
+        return jsonify({'error': 'Statistics are not loaded'}), 503
+    return jsonify(dashboard_stats.status_counts())
+
+@app.route('/api/stats/doctors', methods=['GET'])
+async def doctors_stats_endpoint():
+    if not dashboard_stats.ready:
+        return jsonify({'error': 'Statistics are not loaded'}), 503
+    return jsonify(dashboard_stats.doctors())
+
+@app.route('/api/stats/doctors/<name>', methods=['GET'])
+async def doctor_stats_endpoint(name):
+    return jsonify(await db.get_doctor_performance_stats(name))
+
+@app.route('/api/stats/reconcile', methods=['POST'])
+async def reconcile_stats_endpoint():
+    try:
+        drift = await asyncio.to_thread(dashboard_stats.reconcile, load_stats_rows)
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'Error reconciling stats: {str(e)}'}), 500
+    return jsonify({'success': True, 'drift': drift, **dashboard_stats.status()})
+
+BULK_INGESTERS = {
+    'persons': bulk_create_persons,
+    'diseases': bulk_create_diseases,
+    'relationships': bulk_create_relationships,
+    'vitals': bulk_add_vitals,
+}
+
+@app.route('/api/bulk/<kind>', methods=['POST'])
+async def bulk_ingest_endpoint(kind):
+    ingest = BULK_INGESTERS.get(kind)
+    if ingest is None:
+        return jsonify({'success': False, 'message': f"Unknown bulk type '{kind}'"}), 404
+
+    if request.mimetype == 'application/x-ndjson':
+        body = await request.get_data()
+        data = {'records': parse_ndjson(body.splitlines()),
+                'batch_size': request.args.get('batch_size', DEFAULT_BATCH_SIZE),
+                'include_results': request.args.get('include_results', 'true') == 'true'}
+    else:
+        data = await request.get_json()
+    if isinstance(data, list):
+        data = {'records': data}
+    if not isinstance(data, dict) or not isinstance(data.get('records'), (list, GeneratorType)):
+        return jsonify({'success': False, 'message': 'A list of records is required'}), 400
+
+    # Bulk loads use the synchronous driver; keep them off the event loop
+    try:
+        batch_size = int(data.get('batch_size', DEFAULT_BATCH_SIZE))
+        report = await asyncio.to_thread(ingest, data['records'], batch_size=batch_size)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    result = report.to_dict(include_results=data.get('include_results', True))
+    result['success'] = report.counts['failed'] == 0
+    return jsonify(result)
+
+@app.route('/api/cache/stats', methods=['GET'])
+async def cache_stats_endpoint():
+    return jsonify(cache_stats())
+
+@app.route('/api/db/stats', methods=['GET'])
+async def db_stats_endpoint():
+    return jsonify(db.driver_manager.pool_stats())
+
+@app.route('/api/queries/stats', methods=['GET'])
+async def query_stats_endpoint():
+    return jsonify(query_metrics.to_dict(limit=request.args.get('limit', 20, type=int)))
+
+# Query metrics are per process and shared by the async and the thread-run sync code
+@app.route('/metrics', methods=['GET'])
+async def metrics_endpoint():
+    body = query_metrics.prometheus() + app_metrics(db.driver_manager.pool_stats(), cache_stats())
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
+# Liveness: the process is serving requests. Readiness: Neo4j is reachable too.
+@app.route('/health/live', methods=['GET'])
+async def liveness_endpoint():
+    return jsonify({'status': 'alive'})
+
+@app.route('/health/ready', methods=['GET'])
+async def readiness_endpoint():
+    ready, details = await db.driver_manager.check_ready()
+    return jsonify({'status': 'ready' if ready else 'unavailable', 'neo4j': details}), (200 if ready else 503)
+
+@app.route('/api/search/stats', methods=['GET'])
+async def search_stats_endpoint():
+    return jsonify(search_stats())
+
+@app.route('/api/autocomplete/stats', methods=['GET'])
+async def autocomplete_stats_endpoint():
+    return jsonify(autocomplete_stats())
+
+@app.route('/api/comorbidity/stats', methods=['GET'])
+async def comorbidity_stats_endpoint():
+    return jsonify(comorbidity.stats())
+
+@app.route('/api/similarity/stats', methods=['GET'])
+async def similarity_stats_endpoint():
+    return jsonify(similarity.stats())
+
+if __name__ == '__main__':
+    app.run(debug=os.getenv('DEBUG', 'False') == 'True',
+            host=os.getenv('APP_HOST', '0.0.0.0'),
+            port=int(os.getenv('APP_PORT', '8502')))
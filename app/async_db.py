@@ -0,0 +1,640 @@
+#!/usr/bin/env python
+"""Async Neo4j data-access layer mirroring app.main, app.medical_features and app.visualizations.
+
+Every function here has the same name, arguments and return shape as its
+synchronous counterpart but awaits an AsyncDriver, so the ASGI app can serve
+many requests per worker and run independent queries with asyncio.gather.
+"""
+
+import asyncio
+from neo4j.exceptions import ClientError
+from dotenv import load_dotenv
+from app import events
+from app.db import AsyncDriverManager
+from app.cache import (cache, MISSING, PERSONS_KEY, DISEASES_KEY, patient_key,
+                       person_diseases_key, id_key, name_key)
+from app.main import (PERSON_FIELDS, DISEASE_FIELDS, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE,
+                      resolve_fields, page_from_rows, autocomplete, relationship_result)
+from app.queries import (PERSON_DISEASES_QUERY, ALL_PERSONS_QUERY, ALL_DISEASES_QUERY,
+                         build_list_query, FULLTEXT_SEARCH_QUERY, CONTAINS_SEARCH_QUERY,
+                         SEARCH_TARGETS, build_medical_record_query,
+                         ACTIVE_PATIENTS_WITH_DISEASE_QUERY, OVERVIEW_QUERY,
+                         DISEASE_DISTRIBUTION_QUERY, SEVERITY_DISTRIBUTION_QUERY,
+                         DOCTOR_STATS_QUERIES, DISEASE_NETWORK_QUERY)
+from app.autocomplete import person_index, disease_index
+from app.writes import (CREATE_PERSON_QUERY, CREATE_DISEASE_QUERY, CREATE_RELATIONSHIP_QUERY,
+                        DELETE_RELATIONSHIP_QUERY, CREATE_DIAGNOSIS_QUERY, ADD_HISTORY_QUERY,
+                        ADD_PRESCRIPTION_QUERY, ADD_VITALS_QUERY, UPDATE_DIAGNOSIS_STATUS_QUERY,
+                        written)
+from app.ids import (new_id, check_label, resolve_names_params, ID_BY_NAME_QUERY,
+                     NAME_BY_ID_QUERY, IDS_BY_NAMES_QUERY)
+from app.search import (build_fulltext_query, async_cached_search, search_key,
+                        DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT)
+from app.medical_features import (calculate_bmi, medical_record_params,
+                                  medical_record_from_result)
+from app.visualizations import (build_overview_network, build_disease_distribution,
+                                build_severity_distribution, build_doctor_stats,
+                                build_disease_network)
+from app.overview_graph import (OVERVIEW_CLUSTERS_QUERY, OVERVIEW_LINKS_QUERY,
+                                OVERVIEW_CLUSTER_PATIENTS_QUERY, PhaseTimer,
+                                overview_limits, status_param, check_level,
+                                summarize_clusters, select_clusters, build_overview_graph,
+                                build_cluster_expansion)
+from app.person_graph import (GRAPH_PATIENTS_QUERY, GRAPH_DISEASES_QUERY, graph_params,
+                              PersonGraph)
+from app.comorbidity import ACTIVE_DIAGNOSES_QUERY
+from app.similarity import SIMILARITY_DIAGNOSES_QUERY, SIMILARITY_PRESCRIPTIONS_QUERY
+from app.stats import dashboard_stats
+from app.model import now, vital_properties
+from app.timeline import (TIMELINE_STREAM_QUERIES, timeline_params, stream_params,
+                          neo4j_stream_types, record_stream, store_vitals_stream,
+                          merge_streams, build_timeline_page)
+from app.vitals_store import get_vitals_store, timeseries_enabled
+
+load_dotenv()
+
+# Same pool settings as app.main's driver; the AsyncDriver is created on first use
+driver_manager = AsyncDriverManager.from_env()
+
+
+def get_async_driver():
+    """Return the shared AsyncDriver, creating it on first use."""
+    return driver_manager.driver
+
+
+async def close_async_driver():
+    await driver_manager.close()
+
+
+async def _fetch(query, **params):
+    """Run one read query in its own session and return all rows as dicts.
+
+    Sessions are not safe for concurrent use, so each gathered query gets its own.
+    """
+    async with driver_manager.read_session() as session:
+        result = await session.run(query, params)
+        return await result.data()
+
+
+async def _fetch_one(query, **params):
+    rows = await _fetch(query, **params)
+    return rows[0] if rows else None
+
+
+async def _rows(tx, query, params):
+    result = await tx.run(query, params)
+    return await result.data()
+
+
+async def _write(query, **params):
+    """Run a write query in a managed transaction, retried on transient errors; returns the rows."""
+    return await driver_manager.execute_write(_rows, query, params)
+
+
+async def _cached(key, loader):
+    """Async equivalent of app.cache.get_or_load."""
+    value = cache.get(key)
+    if value is not MISSING:
+        return value
+    generation = cache.generation(key)
+    value = await loader()
+    if value is not None:
+        cache.set(key, value, generation)
+    return value
+
+
+# --- app.main -----------------------------------------------------------------
+
+async def create_person(name, age):
+    """Creates a Person node in Neo4j."""
+    try:
+        person_id = new_id()
+        rows = await _write(CREATE_PERSON_QUERY, id=person_id, name=name, age=age)
+        if not rows[0]["created"]:
+            return False, f"Person '{name}' already exists"
+
+        events.emit(events.PERSON_CREATED, name=name, age=age, id=person_id)
+        return True, f"Successfully created person '{name}'"
+    except Exception as e:
+        return False, f"Error creating person: {str(e)}"
+
+
+async def create_disease(name, description):
+    """Creates a Disease node in Neo4j."""
+    try:
+        disease_id = new_id()
+        rows = await _write(CREATE_DISEASE_QUERY, id=disease_id, name=name, description=description)
+        if not rows[0]["created"]:
+            return False, f"Disease '{name}' already exists"
+
+        events.emit(events.DISEASE_CREATED, name=name, description=description, id=disease_id)
+        return True, f"Successfully created disease '{name}'"
+    except Exception as e:
+        return False, f"Error creating disease: {str(e)}"
+
+
+async def create_relationship(person_name, disease_name):
+    """Creates a relationship between Person and Disease in Neo4j."""
+    try:
+        rows = await _write(CREATE_RELATIONSHIP_QUERY, id=new_id(),
+                            person_name=person_name, disease_name=disease_name)
+        success, message = relationship_result(rows[0], person_name, disease_name)
+        if success:
+            events.emit(events.RELATIONSHIP_CREATED, person_name=person_name, disease_name=disease_name)
+        return success, message
+    except Exception as e:
+        return False, f"Error creating relationship: {str(e)}"
+
+
+async def fetch_person_diseases(name):
+    """Fetch diseases related to a person."""
+    async def load():
+        rows = await _fetch(PERSON_DISEASES_QUERY, name=name)
+        return [{"d.id": row["id"], "d.name": row["name"], "d.description": row["description"]}
+                for row in rows]
+
+    try:
+        return await _cached(person_diseases_key(name), load)
+    except Exception as e:
+        print(f"Error fetching diseases: {str(e)}")
+        return []
+
+
+async def get_all_persons():
+    """Get all persons in the database."""
+    try:
+        return await _cached(PERSONS_KEY, lambda: _fetch(ALL_PERSONS_QUERY))
+    except Exception as e:
+        print(f"Error fetching persons: {str(e)}")
+        return []
+
+
+async def get_all_diseases():
+    """Get all diseases in the database."""
+    try:
+        return await _cached(DISEASES_KEY, lambda: _fetch(ALL_DISEASES_QUERY))
+    except Exception as e:
+        print(f"Error fetching diseases: {str(e)}")
+        return []
+
+
+async def _get_page(label, allowed, limit, after, fields):
+    fields = resolve_fields(fields, allowed)
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    try:
+        rows = await _fetch(build_list_query(label, fields, limit), after=after or "", limit=limit + 1)
+        return page_from_rows(rows, limit, fields)
+    except Exception as e:
+        print(f"Error fetching {label} page: {str(e)}")
+        return {"items": [], "next_cursor": None}
+
+
+def _stream(label, allowed, after, fields):
+    fields = resolve_fields(fields, allowed)
+
+    async def generate():
+        try:
+            async with driver_manager.read_session() as session:
+                result = await session.run(build_list_query(label, fields), after=after or "")
+                async for record in result:
+                    yield {field: record[field] for field in fields}
+        except Exception as e:
+            print(f"Error streaming {label} nodes: {str(e)}")
+
+    return generate()
+
+
+async def get_persons_page(limit=DEFAULT_PAGE_SIZE, after=None, fields=None):
+    """Get one page of persons ordered by name, starting after the `after` cursor."""
+    return await _get_page("Person", PERSON_FIELDS, limit, after, fields)
+
+
+async def get_diseases_page(limit=DEFAULT_PAGE_SIZE, after=None, fields=None):
+    """Get one page of diseases ordered by name, starting after the `after` cursor."""
+    return await _get_page("Disease", DISEASE_FIELDS, limit, after, fields)
+
+
+def stream_persons(after=None, fields=None):
+    """Async-iterate persons ordered by name directly from the result cursor."""
+    return _stream("Person", PERSON_FIELDS, after, fields)
+
+
+def stream_diseases(after=None, fields=None):
+    """Async-iterate diseases ordered by name directly from the result cursor."""
+    return _stream("Disease", DISEASE_FIELDS, after, fields)
+
+
+async def _fulltext_search(kind, search_term, query, mode, limit):
+    label, index, field = SEARCH_TARGETS[kind]
+    limit = max(1, min(int(limit), MAX_SEARCH_LIMIT))
+
+    async def load():
+        try:
+            return await _fetch(FULLTEXT_SEARCH_QUERY.format(field=field),
+                                index=index, query=query, limit=limit)
+        except ClientError as e:
+            print(f"Full-text search unavailable, falling back to CONTAINS: {str(e)}")
+            return await _fetch(CONTAINS_SEARCH_QUERY.format(label=label, field=field),
+                                search_term=search_term, limit=limit)
+
+    return await async_cached_search(search_key(kind, search_term, mode, limit), load)
+
+
+async def search_patients(search_term, mode="ranked", limit=DEFAULT_SEARCH_LIMIT):
+    """Search patients by name, best matches first."""
+    query = build_fulltext_query(search_term, mode)
+    if query is None:
+        return []
+    results = autocomplete(person_index, search_term, mode, limit)
+    if results is not None:
+        return results
+    try:
+        return await _fulltext_search("patients", search_term, query, mode, limit)
+    except Exception as e:
+        print(f"Error searching patients: {str(e)}")
+        return []
+
+
+async def search_diseases(search_term, mode="ranked", limit=DEFAULT_SEARCH_LIMIT):
+    """Search diseases by name and description using the full-text index."""
+    query = build_fulltext_query(search_term, mode)
+    if query is None:
+        return []
+    # Ranked search also matches descriptions, which the name-only index cannot answer
+    if mode == "prefix":
+        results = autocomplete(disease_index, search_term, mode, limit)
+        if results is not None:
+            return results
+    try:
+        return await _fulltext_search("diseases", search_term, query, mode, limit)
+    except Exception as e:
+        print(f"Error searching diseases: {str(e)}")
+        return []
+
+
+async def get_patient_details(name):
+    """Get detailed patient information including all diseases."""
+    async def load():
+        patient = await _fetch_one("""
+            MATCH (p:Person {name: $name})
+            RETURN p.id AS id, p.name AS name, p.age AS age,
+                   COLLECT {
+                       MATCH (p)-[:HAS_DISEASE]->(d:Disease)
+                       WITH d ORDER BY d.name
+                       RETURN {id: d.id, name: d.name, description: d.description}
+                   } AS diseases
+        """, name=name)
+        return patient
+
+    try:
+        return await _cached(patient_key(name), load)
+    except Exception as e:
+        print(f"Error fetching patient details: {str(e)}")
+        return None
+
+
+async def _lookup(query, **params):
+    row = await _fetch_one(query, **params)
+    return next(iter(row.values())) if row else None
+
+
+async def resolve_id(label, name):
+    """The id of the Person or Disease called name, or None; cached."""
+    check_label(label)
+    try:
+        return await _cached(id_key(label, name),
+                             lambda: _lookup(ID_BY_NAME_QUERY.format(label=label), name=name))
+    except Exception as e:
+        print(f"Error resolving {label} id: {str(e)}")
+        return None
+
+
+async def resolve_name(label, node_id):
+    """The name of the Person or Disease with node_id, or None; cached."""
+    check_label(label)
+    try:
+        return await _cached(name_key(label, node_id),
+                             lambda: _lookup(NAME_BY_ID_QUERY.format(label=label), id=node_id))
+    except Exception as e:
+        print(f"Error resolving {label} name: {str(e)}")
+        return None
+
+
+async def resolve_ids(label, names):
+    """{name: id} for the names that exist; uncached names are resolved in one query."""
+    check_label(label)
+    names = resolve_names_params(names)
+    ids = {}
+    try:
+        for name in names:
+            node_id = cache.get(id_key(label, name))
+            if node_id is not MISSING:
+                ids[name] = node_id
+        missing = [name for name in names if name not in ids]
+        if missing:
+            for row in await _fetch(IDS_BY_NAMES_QUERY.format(label=label), names=missing):
+                if row["id"] is not None:
+                    ids[row["name"]] = row["id"]
+                    cache.set(id_key(label, row["name"]), row["id"])
+    except Exception as e:
+        print(f"Error resolving {label} ids: {str(e)}")
+    return ids
+
+
+async def delete_relationship(person_name, disease_name):
+    """Delete a relationship between person and disease."""
+    try:
+        rows = await _write(DELETE_RELATIONSHIP_QUERY, person_name=person_name,
+                            disease_name=disease_name)
+        if not written(rows):
+            return False, f"No relationship exists between '{person_name}' and '{disease_name}'"
+
+        events.emit(events.RELATIONSHIP_DELETED, person_name=person_name, disease_name=disease_name)
+        return True, f"Successfully removed relationship between '{person_name}' and '{disease_name}'"
+    except Exception as e:
+        return False, f"Error deleting relationship: {str(e)}"
+
+
+# --- app.medical_features -------------------------------------------------------
+
+async def create_diagnosis(patient_name, disease_name, doctor_name, notes="", severity="moderate"):
+    """Create a diagnosis record with additional medical information."""
+    try:
+        rows = await _write(CREATE_DIAGNOSIS_QUERY, id=new_id(), patient_name=patient_name,
+                            disease_name=disease_name, doctor_name=doctor_name, date=now(),
+                            notes=notes, severity=severity)
+        if not written(rows):
+            return False, "Patient or disease not found"
+
+        events.emit(events.DIAGNOSIS_CREATED, patient_name=patient_name,
+                    disease_name=disease_name, doctor_name=doctor_name, severity=severity)
+        return True, "Diagnosis created successfully"
+    except Exception as e:
+        return False, f"Error creating diagnosis: {str(e)}"
+
+
+async def add_medical_history(patient_name, condition, date_diagnosed, resolved=False, notes=""):
+    """Add medical history entry for a patient."""
+    try:
+        rows = await _write(ADD_HISTORY_QUERY, id=new_id(), patient_name=patient_name,
+                            condition=condition, date_diagnosed=date_diagnosed, resolved=resolved,
+                            notes=notes, created_at=now())
+        if not written(rows):
+            return False, "Patient not found"
+
+        events.emit(events.HISTORY_ADDED, patient_name=patient_name, condition=condition)
+        return True, "Medical history added successfully"
+    except Exception as e:
+        return False, f"Error adding medical history: {str(e)}"
+
+
+async def add_prescription(patient_name, medication, dosage, frequency, doctor_name, duration="", notes=""):
+    """Add prescription for a patient."""
+    try:
+        rows = await _write(ADD_PRESCRIPTION_QUERY, id=new_id(), patient_name=patient_name,
+                            medication=medication, dosage=dosage, frequency=frequency,
+                            doctor_name=doctor_name, duration=duration, notes=notes,
+                            prescribed_date=now())
+        if not written(rows):
+            return False, "Patient not found"
+
+        events.emit(events.PRESCRIPTION_ADDED, patient_name=patient_name,
+                    medication=medication, doctor_name=doctor_name)
+        return True, "Prescription added successfully"
+    except Exception as e:
+        return False, f"Error adding prescription: {str(e)}"
+
+
+async def add_vitals(patient_name, blood_pressure, heart_rate, temperature, weight, height, notes=""):
+    """Record patient vital signs."""
+    try:
+        vitals = vital_properties(blood_pressure, heart_rate, temperature, weight, height)
+        vitals["bmi"] = calculate_bmi(vitals["height"], vitals["weight"])
+        if timeseries_enabled():
+            if not await _fetch_one("MATCH (p:Person {name: $name}) RETURN p.name AS name",
+                                    name=patient_name):
+                return False, "Patient not found"
+            # SQLite appends are sub-millisecond; no need to leave the event loop
+            get_vitals_store().add(patient_name, dict(vitals, notes=notes))
+            events.emit(events.VITALS_ADDED, patient_name=patient_name)
+            return True, "Vital signs recorded successfully"
+
+        rows = await _write(ADD_VITALS_QUERY, id=new_id(), patient_name=patient_name, notes=notes,
+                            recorded_at=now(), **vitals)
+        if not written(rows):
+            return False, "Patient not found"
+
+        events.emit(events.VITALS_ADDED, patient_name=patient_name)
+        return True, "Vital signs recorded successfully"
+    except Exception as e:
+        return False, f"Error recording vital signs: {str(e)}"
+
+
+async def get_patient_medical_record(patient_name, sections=None,
+                                     prescriptions_offset=0, prescriptions_limit=None,
+                                     history_offset=0, history_limit=None):
+    """Get a patient's medical record in a single query."""
+    sections, stored_sections, params = medical_record_params(
+        patient_name, sections, prescriptions_offset, prescriptions_limit,
+        history_offset, history_limit)
+
+    try:
+        result = await _fetch_one(build_medical_record_query(stored_sections), **params)
+        if not result:
+            return None
+        return medical_record_from_result(result, sections, params)
+    except Exception as e:
+        print(f"Error fetching medical record: {str(e)}")
+        return None
+
+
+async def search_by_diagnosis(disease_name):
+    """Find all patients diagnosed with a specific disease."""
+    try:
+        return await _fetch(ACTIVE_PATIENTS_WITH_DISEASE_QUERY, disease_name=disease_name)
+    except Exception as e:
+        print(f"Error searching by diagnosis: {str(e)}")
+        return []
+
+
+async def update_diagnosis_status(patient_name, disease_name, status, notes=""):
+    """Update the status of a diagnosis (active, resolved, chronic)."""
+    try:
+        rows = await _write(UPDATE_DIAGNOSIS_STATUS_QUERY, patient_name=patient_name,
+                            disease_name=disease_name, status=status, notes=notes,
+                            updated_at=now())
+
+        if rows:
+            events.emit(events.DIAGNOSIS_UPDATED, patient_name=patient_name,
+                        disease_name=disease_name, status=status, previous=rows)
+            return True, f"Diagnosis status updated to {status}"
+        return False, "Diagnosis not found"
+    except Exception as e:
+        return False, f"Error updating diagnosis: {str(e)}"
+
+
+# --- app.visualizations ---------------------------------------------------------
+
+async def get_hospital_overview_graph():
+    """Generate hospital-wide visualization of all patients and diseases."""
+    try:
+        return build_overview_network(await _fetch(OVERVIEW_QUERY))
+    except Exception as e:
+        print(f"Error creating hospital overview graph: {str(e)}")
+        return None
+
+
+async def get_overview_graph(level="disease", status="active", max_nodes=None, max_edges=None,
+                             timer=None):
+    """Aggregated hospital overview as vis.js JSON (see app.overview_graph)."""
+    max_nodes, max_edges = overview_limits(max_nodes, max_edges)
+    status = status_param(status)
+    check_level(level)
+    timer = timer or PhaseTimer()
+    try:
+        with timer.phase("query"):
+            rows = await _fetch(OVERVIEW_CLUSTERS_QUERY, status=status)
+        with timer.phase("build"):
+            summary = summarize_clusters(rows)
+            selected = select_clusters(summary, level, max_nodes)
+        with timer.phase("query"):
+            links = await _fetch(OVERVIEW_LINKS_QUERY, status=status, limit=max_edges,
+                                 diseases=[disease for disease, _, _ in selected])
+        with timer.phase("build"):
+            return build_overview_graph(selected, links, level, max_edges, len(summary))
+    except Exception as e:
+        print(f"Error creating overview graph: {str(e)}")
+        return None
+
+
+async def expand_overview_cluster(disease, severity=None, status="active", after=None,
+                                  max_nodes=None, timer=None):
+    """Patients in one disease (or disease/severity) cluster, one bounded page at a time."""
+    max_nodes, _ = overview_limits(max_nodes)
+    status = status_param(status)
+    timer = timer or PhaseTimer()
+    try:
+        with timer.phase("query"):
+            rows = await _fetch(OVERVIEW_CLUSTER_PATIENTS_QUERY, disease=disease,
+                                severity=severity, status=status, after=after,
+                                limit=max_nodes + 1)
+        with timer.phase("build"):
+            return build_cluster_expansion(disease, severity, rows, max_nodes)
+    except Exception as e:
+        print(f"Error expanding overview cluster: {str(e)}")
+        return None
+
+
+async def get_person_graph(name, depth=None, limits=None, timer=None):
+    """A person's disease graph to depth hops as vis.js JSON (see app.person_graph)."""
+    depth, limits = graph_params(depth, limits)
+    timer = timer or PhaseTimer()
+    try:
+        graph = PersonGraph(name, depth, limits)
+        with timer.phase("query"):
+            rows = await fetch_person_diseases(name)
+        with timer.phase("build"):
+            diseases = graph.add_diseases({"name": row["d.name"], "description": row["d.description"]}
+                                          for row in rows)
+        if depth > 1 and diseases:
+            with timer.phase("query"):
+                rows = await _fetch(GRAPH_PATIENTS_QUERY, diseases=diseases, exclude=[name],
+                                    limit=limits[1] + 1)
+            with timer.phase("build"):
+                patients = graph.add_patients(rows)
+            if depth > 2 and patients:
+                with timer.phase("query"):
+                    rows = await _fetch(GRAPH_DISEASES_QUERY, patients=patients,
+                                        limit=limits[2] + 1)
+                with timer.phase("build"):
+                    graph.add_patient_diseases(rows)
+        return graph.to_dict()
+    except Exception as e:
+        print(f"Error creating person graph: {str(e)}")
+        return None
+
+
+async def get_active_diagnoses():
+    """(patient, disease) rows of every active diagnosis, for warming app.comorbidity."""
+    try:
+        return await _fetch(ACTIVE_DIAGNOSES_QUERY)
+    except Exception as e:
+        print(f"Error loading active diagnoses: {str(e)}")
+        return []
+
+
+async def get_similarity_rows():
+    """(diagnoses, prescriptions) rows for warming app.similarity."""
+    try:
+        return (await _fetch(SIMILARITY_DIAGNOSES_QUERY),
+                await _fetch(SIMILARITY_PRESCRIPTIONS_QUERY))
+    except Exception as e:
+        print(f"Error loading similarity rows: {str(e)}")
+        return [], []
+
+
+async def get_disease_distribution():
+    """Get disease distribution statistics."""
+    if dashboard_stats.ready:
+        return build_disease_distribution(dashboard_stats.disease_rows())
+    try:
+        return build_disease_distribution(await _fetch(DISEASE_DISTRIBUTION_QUERY))
+    except Exception as e:
+        print(f"Error getting disease distribution: {str(e)}")
+        return {"labels": [], "values": [], "colors": []}
+
+
+async def get_severity_distribution():
+    """Get severity distribution of active diagnoses."""
+    if dashboard_stats.ready:
+        return build_severity_distribution(dashboard_stats.severity_rows())
+    try:
+        return build_severity_distribution(await _fetch(SEVERITY_DISTRIBUTION_QUERY))
+    except Exception as e:
+        print(f"Error getting severity distribution: {str(e)}")
+        return {"labels": [], "values": [], "colors": []}
+
+
+async def get_patient_timeline(patient_name, types=None, since=None, until=None, limit=None,
+                               cursor=None):
+    """Get one page of a patient's medical timeline, fetching the streams concurrently."""
+    types, since, until, limit, position = timeline_params(types, since, until, limit, cursor)
+    try:
+        stream_types = neo4j_stream_types(types)
+        results = await asyncio.gather(*[
+            _fetch(TIMELINE_STREAM_QUERIES[event_type], name=patient_name, since=since,
+                   until=until, limit=limit + 1, **stream_params(event_type, position))
+            for event_type in stream_types])
+        streams = [record_stream(rows) for rows in results]
+        if "vitals" in types and timeseries_enabled():
+            streams.append(store_vitals_stream(get_vitals_store(), patient_name, since, until,
+                                               position, batch=limit + 1))
+        timeline, next_cursor = merge_streams(streams, limit)
+        return build_timeline_page(patient_name, timeline, next_cursor, types, since, until, limit)
+    except Exception as e:
+        print(f"Error getting patient timeline: {str(e)}")
+        return None
+
+
+async def get_doctor_performance_stats(doctor_name):
+    """Get performance statistics for a doctor, running the four queries concurrently."""
+    if dashboard_stats.ready:
+        return build_doctor_stats(**dashboard_stats.doctor_rows(doctor_name))
+    try:
+        keys = list(DOCTOR_STATS_QUERIES)
+        results = await asyncio.gather(*[
+            _fetch(DOCTOR_STATS_QUERIES[key], doctor=doctor_name) for key in keys])
+        return build_doctor_stats(**dict(zip(keys, results)))
+    except Exception as e:
+        print(f"Error getting doctor stats: {str(e)}")
+        return {}
+
+
+async def get_disease_network(disease_name):
+    """Get network visualization for a specific disease."""
+    try:
+        return build_disease_network(disease_name,
+                                     await _fetch(DISEASE_NETWORK_QUERY, disease=disease_name))
+    except Exception as e:
+        print(f"Error creating disease network: {str(e)}")
+        return None
@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+"""In-memory autocomplete index over Person and Disease names.
+
+Each name is indexed under every word-start suffix ("Mary Jane Smith" ->
+"mary jane smith", "jane smith", "smith"). Whole names and the other
+suffixes are kept in two sorted lists, so a type-ahead query is a bisect plus
+a short forward scan of each with no database round trip, and full-name
+matches are found however many names merely contain the word.
+The indexes are warmed at startup and kept current from create events; like
+the memory cache, each worker process holds its own copy.
+"""
+
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from app import events
+
+FULL_NAME_SCORE = 2.0
+WORD_SCORE = 1.0
+# The two key lists: whole names, and the suffixes starting at a later word
+FULL, WORD = 0, 1
+# Added keys are buffered and merged in sorted batches of at least this many,
+# or on the next search; fewer than INSERT_IN_PLACE are inserted one at a time
+MERGE_BATCH = 4096
+INSERT_IN_PLACE = 8
+
+
+def normalize(text):
+    return " ".join(text.lower().split())
+
+
+class AutocompleteIndex:
+    """Sorted word-start suffixes with parallel arrays of owning names."""
+
+    def __init__(self, field):
+        self.field = field
+        self.ready = False
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        # Indexed by FULL and WORD: sorted keys and the owner id of each key
+        self._keys = [[], []]
+        self._owners = [array("I"), array("I")]
+        # (key, owner) pairs added since the last merge
+        self._pending = [[], []]
+        self._names = []
+        self._values = []
+        self._node_ids = []
+        self._ids = {}
+
+    @staticmethod
+    def suffixes(name):
+        words = normalize(name).split()
+        return [" ".join(words[i:]) for i in range(len(words))]
+
+    def load(self, records):
+        """Replace the index contents with records ({id, name, <field>} dicts)."""
+        with self._lock:
+            self._clear()
+            pairs = [[], []]
+            for record in records:
+                owner = self._register(record)
+                if owner is not None:
+                    self._add_pairs(pairs, record["name"], owner)
+            for run in (FULL, WORD):
+                pairs[run].sort()
+                self._keys[run] = [key for key, _ in pairs[run]]
+                self._owners[run] = array("I", (owner for _, owner in pairs[run]))
+            self.ready = True
+
+    def add(self, name, value=None, node_id=None):
+        """Add one name (or update its value); its keys are merged in with the next batch.
+
+        Adds before the first load are dropped, since load replaces the contents.
+        """
+        with self._lock:
+            if not self.ready:
+                return
+            if name in self._ids:
+                self._values[self._ids[name]] = value
+                return
+            owner = self._register({"id": node_id, "name": name, self.field: value})
+            self._add_pairs(self._pending, name, owner)
+            # Batches grow with the index, so each key is copied O(1) times amortised
+            if self._pending_count() >= max(MERGE_BATCH, self._key_count() // 4):
+                self._merge()
+
+    def _pending_count(self):
+        return len(self._pending[FULL]) + len(self._pending[WORD])
+
+    def _key_count(self):
+        return len(self._keys[FULL]) + len(self._keys[WORD])
+
+    def _merge(self):
+        """Merge the pending keys into the sorted lists in one pass; holds the lock."""
+        for run in (FULL, WORD):
+            pending = self._pending[run]
+            if not pending:
+                continue
+            pending.sort()
+            keys, owners = self._keys[run], self._owners[run]
+            if len(pending) < INSERT_IN_PLACE:
+                for key, owner in pending:
+                    position = bisect_left(keys, key)
+                    keys.insert(position, key)
+                    owners.insert(position, owner)
+            else:
+                # Two sorted runs: the sort merges them in linear time
+                pairs = list(zip(keys, owners))
+                pairs.extend(pending)
+                pairs.sort()
+                self._keys[run] = [key for key, _ in pairs]
+                self._owners[run] = array("I", (owner for _, owner in pairs))
+            self._pending[run] = []
+
+    def _register(self, record):
+        name = record.get("name")
+        if not name or name in self._ids:
+            return None
+        owner = len(self._names)
+        self._ids[name] = owner
+        self._names.append(name)
+        self._values.append(record.get(self.field))
+        self._node_ids.append(record.get("id"))
+        return owner
+
+    def _add_pairs(self, pairs, name, owner):
+        """Append name's (key, owner) pairs to pairs[FULL] and pairs[WORD]."""
+        full, *words = self.suffixes(name)
+        pairs[FULL].append((full, owner))
+        pairs[WORD].extend((key, owner) for key in words)
+
+    def search(self, term, limit=20):
+        """Names with a word starting with term, full-name prefix matches first."""
+        query = normalize(term)
+        if not query:
+            return []
+        with self._lock:
+            self._merge()
+            matches = {}
+            # Full names first, so names that merely contain the word fill
+            # only the places left over
+            for run, score in ((FULL, FULL_NAME_SCORE), (WORD, WORD_SCORE)):
+                keys, owners = self._keys[run], self._owners[run]
+                position = bisect_left(keys, query)
+                while (position < len(keys) and len(matches) < limit
+                       and keys[position].startswith(query)):
+                    matches.setdefault(owners[position], score)
+                    position += 1
+            results = [{"id": self._node_ids[owner], "name": self._names[owner],
+                        self.field: self._values[owner], "score": score}
+                       for owner, score in matches.items()]
+        results.sort(key=lambda result: (-result["score"], result["name"]))
+        return results[:limit]
+
+    def __len__(self):
+        return len(self._names)
+
+    def memory_report(self):
+        """Approximate bytes held by the index structures, including the strings."""
+        with self._lock:
+            keys = sum(sys.getsizeof(run) + sum(sys.getsizeof(key) for key in run)
+                       for run in self._keys)
+            owners = sum(sys.getsizeof(run) for run in self._owners)
+            names = (sys.getsizeof(self._names) + sys.getsizeof(self._ids)
+                     + sum(sys.getsizeof(name) for name in self._names))
+            values = sys.getsizeof(self._values) + sys.getsizeof(self._node_ids)
+            entries = self._key_count() + self._pending_count()
+            count = len(self._names)
+        return {
+            "ready": self.ready,
+            "names": count,
+            "entries": entries,
+            "bytes": {"keys": keys, "owners": owners, "names": names, "values": values,
+                      "total": keys + owners + names + values},
+        }
+
+
+person_index = AutocompleteIndex("age")
+disease_index = AutocompleteIndex("description")
+
+
+def warm_autocomplete(persons, diseases):
+    """Load both indexes, e.g. from get_all_persons() and get_all_diseases()."""
+    person_index.load(persons)
+    disease_index.load(diseases)
+    return len(person_index), len(disease_index)
+
+
+def autocomplete_stats():
+    return {"persons": person_index.memory_report(), "diseases": disease_index.memory_report()}
+
+
+events.subscribe(events.PERSON_CREATED,
+                 lambda name, age=None, id=None, **_: person_index.add(name, age, id))
+events.subscribe(events.DISEASE_CREATED,
+                 lambda name, description=None, id=None, **_: disease_index.add(name, description, id))
@@ -0,0 +1,287 @@
+#!/usr/bin/env python
+"""Batched bulk ingest of persons, diseases and relationships.
+
+Each batch is one repository call (app.repository), so the loaders and
+/api/bulk/<kind> work on every backend: one UNWIND query on Neo4j, one
+transaction of batched inserts on SQLite.
+"""
+
+import os
+import json
+import time
+from itertools import islice
+from app.main import repository
+from app import events
+from app.vitals_store import validate_readings, get_vitals_store, timeseries_enabled
+from app.model import to_datetime
+from app.ids import new_id
+
+DEFAULT_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "1000"))
+
+class IngestReport:
+    """Per-record outcome and throughput of a bulk ingest run."""
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.results = []
+        self.counts = {"created": 0, "skipped": 0, "failed": 0}
+        self.batches = 0
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def add(self, index, key, status, message):
+        self.counts[status] += 1
+        self.results.append({"index": index, "key": key, "status": status, "message": message})
+
+    def finish(self):
+        self.elapsed = time.perf_counter() - self.started
+        self.results.sort(key=lambda result: result["index"])
+        return self
+
+    def to_dict(self, include_results=True):
+        total = sum(self.counts.values())
+        report = {
+            "kind": self.kind,
+            "total": total,
+            "created": self.counts["created"],
+            "skipped": self.counts["skipped"],
+            "failed": self.counts["failed"],
+            "batches": self.batches,
+            "elapsed_seconds": round(self.elapsed, 4),
+            "records_per_second": round(total / self.elapsed, 1) if self.elapsed else 0.0,
+        }
+        if include_results:
+            report["results"] = self.results
+        return report
+
+
+class InvalidRecord:
+    """Placeholder for an input record that could not be parsed; reported as failed."""
+
+    def __init__(self, message):
+        self.message = message
+
+
+def parse_ndjson(lines):
+    """Yield one record per non-blank NDJSON line (str or bytes), lazily."""
+    for number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield InvalidRecord(f"Invalid JSON on line {number}: {str(e)}")
+
+
+def chunked(records, batch_size):
+    """Yield lists of at most batch_size items from any iterable."""
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+    iterator = iter(records)
+    while True:
+        chunk = list(islice(iterator, batch_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _field(record, key, position):
+    """Read a field from a dict record or a positional list/tuple record."""
+    if isinstance(record, dict):
+        return record.get(key)
+    try:
+        return record[position]
+    except IndexError:
+        return None
+
+
+def _person_row(record):
+    name = _field(record, "name", 0)
+    age = _field(record, "age", 1)
+    if not name:
+        return None, "Name is required"
+    try:
+        age = int(age)
+    except (TypeError, ValueError):
+        return None, f"Invalid age for person '{name}'"
+    return {"id": new_id(), "name": name, "age": age}, None
+
+
+def _disease_row(record):
+    name = _field(record, "name", 0)
+    description = _field(record, "description", 1)
+    if not name or not description:
+        return None, "Name and description are required"
+    return {"id": new_id(), "name": name, "description": description}, None
+
+
+def _relationship_row(record):
+    person_name = _field(record, "person_name", 0)
+    disease_name = _field(record, "disease_name", 1)
+    if not person_name or not disease_name:
+        return None, "Person name and disease name are required"
+    return {"id": new_id(), "person_name": person_name, "disease_name": disease_name}, None
+
+
+def _ingest(kind, records, batch_size, build_row, key_of, write, interpret, created_event):
+    """Validate records batch by batch and write each batch with write(rows).
+
+    write is a Repository.bulk_* method: one transaction per batch, retried on
+    transient errors on Neo4j. Rows are keyed on fresh ids, so a replay
+    writes nothing twice.
+    """
+    report = IngestReport(kind)
+    indexed = enumerate(records)
+
+    for chunk in chunked(indexed, batch_size):
+        rows = []
+        seen = set()
+        for index, record in chunk:
+            if isinstance(record, InvalidRecord):
+                report.add(index, None, "failed", record.message)
+                continue
+            # A bare string would otherwise be read one character per field
+            if not isinstance(record, (dict, list, tuple)):
+                report.add(index, None, "failed", "Invalid record: expected an object or an "
+                                                  f"array, got {type(record).__name__}")
+                continue
+            row, error = build_row(record)
+            if error:
+                report.add(index, None, "failed", error)
+                continue
+            key = key_of(row)
+            if key in seen:
+                report.add(index, key, "skipped", "Duplicate record in batch")
+                continue
+            seen.add(key)
+            row["index"] = index
+            rows.append(row)
+
+        if not rows:
+            continue
+
+        report.batches += 1
+        by_index = {row["index"]: row for row in rows}
+        try:
+            results = write(rows)
+        except Exception as e:
+            for row in rows:
+                report.add(row["index"], key_of(row), "failed", f"Error writing batch: {str(e)}")
+            continue
+
+        for result in results:
+            row = by_index[result["index"]]
+            status, message = interpret(key_of(row), result)
+            report.add(row["index"], key_of(row), status, message)
+            if status == "created":
+                events.emit(created_event, **{k: v for k, v in row.items() if k != "index"})
+
+    return report.finish()
+
+
+def _interpret_node(label):
+    def interpret(key, result):
+        if result["created"]:
+            return "created", f"Successfully created {label} '{key}'"
+        return "skipped", f"{label.capitalize()} '{key}' already exists"
+    return interpret
+
+
+def _interpret_relationship(key, result):
+    person_name, disease_name = key
+    if not result["person_found"]:
+        return "failed", f"Person '{person_name}' does not exist"
+    if not result["disease_found"]:
+        return "failed", f"Disease '{disease_name}' does not exist"
+    if result["created"]:
+        return "created", f"Successfully created relationship between '{person_name}' and '{disease_name}'"
+    return "skipped", f"Relationship already exists between '{person_name}' and '{disease_name}'"
+
+
+def bulk_create_persons(records, batch_size=DEFAULT_BATCH_SIZE):
+    """Create Person nodes from an iterable of {name, age} dicts or (name, age) tuples."""
+    return _ingest("persons", records, batch_size, _person_row,
+                   lambda row: row["name"], repository.bulk_create_persons,
+                   _interpret_node("person"),
+                   events.PERSON_CREATED)
+
+
+def bulk_create_diseases(records, batch_size=DEFAULT_BATCH_SIZE):
+    """Create Disease nodes from an iterable of {name, description} dicts or tuples."""
+    return _ingest("diseases", records, batch_size, _disease_row,
+                   lambda row: row["name"], repository.bulk_create_diseases,
+                   _interpret_node("disease"),
+                   events.DISEASE_CREATED)
+
+
+def bulk_create_relationships(records, batch_size=DEFAULT_BATCH_SIZE):
+    """Create HAS_DISEASE relationships from {person_name, disease_name} dicts or tuples."""
+    return _ingest("relationships", records, batch_size, _relationship_row,
+                   lambda row: (row["person_name"], row["disease_name"]),
+                   repository.bulk_create_relationships, _interpret_relationship,
+                   events.RELATIONSHIP_CREATED)
+
+
+def _known_patients(names, known):
+    """Add the names that exist as Person nodes to known; one query per chunk."""
+    missing = sorted(set(names) - known)
+    if missing:
+        known |= repository.existing_persons(missing)
+    return known
+
+
+def bulk_add_vitals(records, batch_size=DEFAULT_BATCH_SIZE):
+    """Record vital-sign readings for many patients.
+
+    Each chunk is validated (and BMI computed) in one vectorised pass. Readings
+    for existing patients are then written in one transaction: to the vitals
+    time-series store, or through the repository when VITALS_BACKEND=neo4j.
+    """
+    report = IngestReport("vitals")
+    known = set()
+
+    for chunk in chunked(enumerate(records), batch_size):
+        rows = []
+        for (index, record), (reading, error) in zip(
+                chunk, validate_readings([record if isinstance(record, dict) else {}
+                                          for _, record in chunk])):
+            if isinstance(record, InvalidRecord):
+                report.add(index, None, "failed", record.message)
+                continue
+            if error:
+                patient = record.get("patient") or record.get("patient_name") if isinstance(record, dict) else None
+                report.add(index, patient, "failed", error)
+                continue
+            reading["index"] = index
+            rows.append(reading)
+
+        if not rows:
+            continue
+
+        report.batches += 1
+        try:
+            if timeseries_enabled():
+                _known_patients([row["patient"] for row in rows], known)
+                accepted = [row for row in rows if row["patient"] in known]
+                get_vitals_store().add_many([(row["patient"], row) for row in accepted])
+                written = {row["index"] for row in accepted}
+            else:
+                typed = [dict(row, id=new_id(), recorded_at=to_datetime(row["recorded_at"]))
+                         for row in rows]
+                written = {result["index"] for result in repository.bulk_add_vitals(typed)}
+        except Exception as e:
+            for row in rows:
+                report.add(row["index"], row["patient"], "failed", f"Error writing batch: {str(e)}")
+            continue
+
+        for row in rows:
+            if row["index"] in written:
+                report.add(row["index"], row["patient"], "created", "Vital signs recorded")
+            else:
+                report.add(row["index"], row["patient"], "failed",
+                           f"Patient '{row['patient']}' does not exist")
+        for patient in {row["patient"] for row in rows if row["index"] in written}:
+            events.emit(events.VITALS_ADDED, patient_name=patient)
+
+    return report.finish()
@@ -0,0 +1,272 @@
+#!/usr/bin/env python
+"""Read-through cache for patient and disease reads.
+
+The backend is chosen with CACHE_BACKEND:
+  memory (default)  in-process LRU bounded by CACHE_MAX_ENTRIES with CACHE_TTL_SECONDS
+  redis             shared Redis-compatible server at CACHE_REDIS_URL (requires `redis`)
+  none              caching disabled
+
+Entries are invalidated by write events (see app/events.py). With the memory
+backend each worker process holds its own cache, so run a single worker or use
+the redis backend when writes can arrive on another process.
+
+Each delete bumps the key's generation. get_or_load records the generation
+before calling the loader and stores the result only if it is unchanged, so
+a read that raced with a write cannot put the pre-write value back.
+"""
+
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+from app import events
+
+MISSING = object()
+
+PERSONS_KEY = "persons:all"
+DISEASES_KEY = "diseases:all"
+
+
+def patient_key(name):
+    return f"patient:{name}"
+
+
+def person_diseases_key(name):
+    return f"person_diseases:{name}"
+
+
+def id_key(label, name):
+    return f"id:{label}:{name}"
+
+
+def name_key(label, node_id):
+    return f"name:{label}:{node_id}"
+
+
+class LRUCache:
+    """Thread-safe LRU cache with a per-entry time-to-live."""
+
+    backend = "memory"
+
+    def __init__(self, max_entries=1024, ttl=300, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        # Per-key delete counts; clear() starts a new epoch instead of keeping them
+        self._generations = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= self.clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def generation(self, key):
+        with self._lock:
+            return self._epoch, self._generations.get(key, 0)
+
+    def set(self, key, value, generation=None):
+        """Store value; skipped if generation is given and key was deleted since."""
+        if self.max_entries <= 0:
+            return
+        expires_at = self.clock() + self.ttl if self.ttl else None
+        with self._lock:
+            if generation is not None and generation != (self._epoch,
+                                                         self._generations.get(key, 0)):
+                return
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._generations[key] = self._generations.get(key, 0) + 1
+                if self._entries.pop(key, MISSING) is not MISSING:
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+            self._epoch += 1
+
+    def stats(self):
+        with self._lock:
+            size = len(self._entries)
+        return {
+            "backend": self.backend,
+            "size": size,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+class RedisCache:
+    """Cache stored in a Redis-compatible server; values are JSON encoded."""
+
+    backend = "redis"
+
+    def __init__(self, url="redis://localhost:6379/0", ttl=300, prefix="medgraph:"):
+        import redis  # optional dependency, only needed for this backend
+
+        self._watch_error = redis.WatchError
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+        # Version keys: one per deleted key, and an epoch bumped by clear()
+        self.generation_prefix = prefix + "generation:"
+        self.epoch_key = prefix + "epoch"
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            self.misses += 1
+            return MISSING
+        self.hits += 1
+        return json.loads(raw)
+
+    def _versions(self, key):
+        return [self.epoch_key, self.generation_prefix + key]
+
+    def generation(self, key):
+        return self.client.mget(self._versions(key))
+
+    def set(self, key, value, generation=None):
+        """Store value; skipped if generation is given and key was deleted since."""
+        if generation is None:
+            self.client.set(self.prefix + key, json.dumps(value), ex=self.ttl or None)
+            return
+        with self.client.pipeline() as pipe:
+            try:
+                pipe.watch(*self._versions(key))
+                if pipe.mget(self._versions(key)) != generation:
+                    return
+                pipe.multi()
+                pipe.set(self.prefix + key, json.dumps(value), ex=self.ttl or None)
+                pipe.execute()
+            except self._watch_error:
+                pass  # deleted while we stored it; the next read loads again
+
+    def delete(self, *keys):
+        if keys:
+            with self.client.pipeline() as pipe:
+                pipe.delete(*[self.prefix + key for key in keys])
+                for key in keys:
+                    # Outlive any entry stored under the old generation
+                    pipe.incr(self.generation_prefix + key)
+                    pipe.expire(self.generation_prefix + key, self.ttl or 3600)
+                self.invalidations += pipe.execute()[0]
+
+    def _entry_keys(self):
+        return [key for key in self.client.scan_iter(match=self.prefix + "*")
+                if not key.decode().startswith((self.generation_prefix, self.epoch_key))]
+
+    def clear(self):
+        keys = self._entry_keys()
+        if keys:
+            self.client.delete(*keys)
+        self.client.incr(self.epoch_key)
+
+    def stats(self):
+        info = self.client.info("stats")
+        return {
+            "backend": self.backend,
+            "size": len(self._entry_keys()),
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": info.get("evicted_keys"),
+            "expirations": info.get("expired_keys"),
+            "invalidations": self.invalidations,
+        }
+
+
+def create_cache():
+    """Build the cache backend configured in the environment."""
+    backend = os.getenv("CACHE_BACKEND", "memory")
+    ttl = int(os.getenv("CACHE_TTL_SECONDS", "300"))
+    if backend == "redis":
+        return RedisCache(os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0"), ttl=ttl)
+    if backend == "none":
+        return LRUCache(max_entries=0, ttl=ttl)
+    return LRUCache(max_entries=int(os.getenv("CACHE_MAX_ENTRIES", "1024")), ttl=ttl)
+
+
+cache = create_cache()
+
+
+def get_or_load(key, loader):
+    """Return the cached value for key, calling loader() on a miss.
+
+    None results are not cached so a later create is seen immediately.
+    Loader exceptions propagate and nothing is stored. If key is invalidated
+    while the loader runs, the result is returned but not stored.
+    """
+    value = cache.get(key)
+    if value is not MISSING:
+        return value
+    generation = cache.generation(key)
+    value = loader()
+    if value is not None:
+        cache.set(key, value, generation)
+    return value
+
+
+def cache_stats():
+    try:
+        return cache.stats()
+    except Exception as e:
+        return {"backend": cache.backend, "error": str(e)}
+
+
+# Write event -> cache keys whose contents it changes. Diagnosis, prescription,
+# vitals and history writes are not listed: none of the cached reads depend on them.
+INVALIDATIONS = {
+    events.PERSON_CREATED: lambda name, **_: [
+        PERSONS_KEY, patient_key(name), person_diseases_key(name)],
+    events.DISEASE_CREATED: lambda name, **_: [DISEASES_KEY],
+    events.RELATIONSHIP_CREATED: lambda person_name, **_: [
+        patient_key(person_name), person_diseases_key(person_name)],
+    events.RELATIONSHIP_DELETED: lambda person_name, **_: [
+        patient_key(person_name), person_diseases_key(person_name)],
+}
+
+
+def _invalidator(keys_for):
+    def invalidate(**payload):
+        cache.delete(*keys_for(**payload))
+    return invalidate
+
+
+for _event, _keys_for in INVALIDATIONS.items():
+    events.subscribe(_event, _invalidator(_keys_for))
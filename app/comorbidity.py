@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+"""In-memory disease co-occurrence (comorbidity) engine.
+
+The disease x disease matrix C holds, for every pair of diseases, the number
+of patients with an active diagnosis of both; the diagonal holds each
+disease's patient count. It is built once from the active DIAGNOSED_WITH
+edges as Xᵀ·X of the sparse patient x disease incidence matrix X, then kept
+current from diagnosis events, so comorbidity queries never touch Neo4j.
+Like the other derived indexes, each worker process holds its own copy.
+"""
+
+import threading
+import numpy as np
+from scipy import sparse
+from app import events
+
+ACTIVE_DIAGNOSES_QUERY = """
+    MATCH (p:Person)-[r:DIAGNOSED_WITH]->(d:Disease)
+    WHERE r.status = 'active'
+    RETURN p.name AS patient, d.name AS disease
+"""
+
+ACTIVE_STATUS = "active"
+COMORBIDITY_SCORES = ("count", "lift", "odds_ratio")
+DEFAULT_TOP_K = 10
+MAX_TOP_K = 100
+
+
+class ComorbidityMatrix:
+    """Sparse co-occurrence counts with per-disease top-k caches."""
+
+    def __init__(self):
+        self.ready = False
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self._ids = {}
+        self._names = []
+        # patient -> {disease id: number of active DIAGNOSED_WITH edges}
+        self._active = {}
+        self._matrix = sparse.lil_matrix((0, 0), dtype=np.int64)
+        self._ranked = {}
+        self.updates = 0
+
+    def _disease_id(self, disease):
+        disease_id = self._ids.get(disease)
+        if disease_id is None:
+            disease_id = self._ids[disease] = len(self._names)
+            self._names.append(disease)
+            size = len(self._names)
+            if size > self._matrix.shape[0]:
+                # Grow in steps so a stream of new diseases does not resize every time
+                capacity = max(size, 2 * self._matrix.shape[0], 16)
+                self._matrix.resize((capacity, capacity))
+        return disease_id
+
+    def load(self, rows):
+        """Rebuild from ({patient, disease}) rows of active diagnoses."""
+        with self._lock:
+            self._clear()
+            patient_ids = {}
+            pairs = []
+            for row in rows:
+                disease_id = self._disease_id(row["disease"])
+                patient_id = patient_ids.setdefault(row["patient"], len(patient_ids))
+                counts = self._active.setdefault(row["patient"], {})
+                counts[disease_id] = counts.get(disease_id, 0) + 1
+                pairs.append((patient_id, disease_id))
+
+            size = self._matrix.shape[0]
+            if pairs:
+                patients, diseases = np.array(pairs, dtype=np.int64).T
+                incidence = sparse.csr_matrix(
+                    (np.ones(len(pairs), dtype=np.int64), (patients, diseases)),
+                    shape=(len(patient_ids), size))
+                # Duplicate diagnoses of one disease count the patient once
+                incidence.data[:] = 1
+                self._matrix = (incidence.T @ incidence).tolil()
+            self.ready = True
+
+    def _link(self, patient_diseases, disease_id, delta):
+        matrix = self._matrix
+        for other in patient_diseases:
+            matrix[disease_id, other] += delta
+            if other != disease_id:
+                matrix[other, disease_id] += delta
+            self._ranked.pop(other, None)
+        self._ranked.pop(disease_id, None)
+        self.updates += 1
+
+    def add_diagnosis(self, patient, disease):
+        """Record one new active diagnosis."""
+        with self._lock:
+            disease_id = self._disease_id(disease)
+            counts = self._active.setdefault(patient, {})
+            counts[disease_id] = counts.get(disease_id, 0) + 1
+            if counts[disease_id] == 1:
+                self._link(counts, disease_id, 1)
+
+    def set_status(self, patient, disease, status):
+        """Apply a status change to every diagnosis of disease for patient.
+
+        update_diagnosis_status sets the status on all matching edges at once,
+        so the patient either keeps one active diagnosis or none.
+        """
+        with self._lock:
+            disease_id = self._disease_id(disease)
+            counts = self._active.setdefault(patient, {})
+            was_active = counts.get(disease_id, 0) > 0
+            if status == ACTIVE_STATUS and not was_active:
+                counts[disease_id] = 1
+                self._link(counts, disease_id, 1)
+            elif status != ACTIVE_STATUS and was_active:
+                self._link(counts, disease_id, -1)
+                del counts[disease_id]
+            if not counts:
+                del self._active[patient]
+
+    def _ranked_row(self, disease_id):
+        """Other diseases in the row, sorted by descending count; cached until the row changes."""
+        ranked = self._ranked.get(disease_id)
+        if ranked is None:
+            columns = np.array(self._matrix.rows[disease_id], dtype=np.int64)
+            counts = np.array(self._matrix.data[disease_id], dtype=np.int64)
+            keep = (columns != disease_id) & (counts > 0)
+            columns, counts = columns[keep], counts[keep]
+            order = np.lexsort((columns, -counts))
+            ranked = self._ranked[disease_id] = (columns[order], counts[order])
+        return ranked
+
+    def _prevalence(self, ids):
+        return np.array([self._matrix[i, i] for i in ids], dtype=np.float64)
+
+    def top_comorbidities(self, disease, k=DEFAULT_TOP_K, by="count"):
+        """Top-k diseases co-occurring with disease, scored by count, lift or odds ratio.
+
+        Returns None if the disease has no active diagnoses. Ranking by count
+        slices the cached row in O(k); lift and odds ratio are vectorised over
+        the row.
+        """
+        if by not in COMORBIDITY_SCORES:
+            raise ValueError(f"Unknown score '{by}'; expected one of {', '.join(COMORBIDITY_SCORES)}")
+        k = max(1, min(int(k), MAX_TOP_K))
+        with self._lock:
+            disease_id = self._ids.get(disease)
+            if disease_id is None or self._matrix[disease_id, disease_id] == 0:
+                return None
+            columns, counts = self._ranked_row(disease_id)
+            total = len(self._active)
+            n_a = float(self._matrix[disease_id, disease_id])
+            if by == "count":
+                columns, counts = columns[:k], counts[:k]
+            n_b = self._prevalence(columns)
+            names = [self._names[i] for i in columns]
+
+        both = counts.astype(np.float64)
+        lift = both * total / (n_a * n_b)
+        # 2x2 table with a 0.5 (Haldane) correction so empty cells stay finite
+        odds_ratio = (((both + 0.5) * (total - n_a - n_b + both + 0.5))
+                      / ((n_a - both + 0.5) * (n_b - both + 0.5)))
+        scores = {"count": both, "lift": lift, "odds_ratio": odds_ratio}[by]
+        order = np.lexsort((np.arange(len(names)), -scores))[:k]
+
+        return {
+            "disease": disease,
+            "patients": int(n_a),
+            "total_patients": total,
+            "by": by,
+            "comorbidities": [{
+                "disease": names[i],
+                "count": int(both[i]),
+                "lift": round(float(lift[i]), 4),
+                "odds_ratio": round(float(odds_ratio[i]), 4),
+            } for i in order],
+        }
+
+    def disease_network(self, disease, k=DEFAULT_TOP_K, by="count"):
+        """vis.js nodes/edges for a disease and its top-k comorbidities."""
+        top = self.top_comorbidities(disease, k, by)
+        if top is None:
+            return None
+        nodes = [{"id": disease, "label": f"{disease} ({top['patients']})", "color": "#e74c3c",
+                  "shape": "star", "size": 30}]
+        edges = []
+        for item in top["comorbidities"]:
+            nodes.append({"id": item["disease"], "label": item["disease"], "color": "#95a5a6",
+                          "shape": "square",
+                          "title": f"Shared patients: {item['count']}\n"
+                                   f"Lift: {item['lift']}\nOdds ratio: {item['odds_ratio']}"})
+            edges.append({"from": disease, "to": item["disease"], "value": item["count"],
+                          "title": f"{item['count']} shared patients"})
+        return {"nodes": nodes, "edges": edges, "meta": {"by": by, "patients": top["patients"]}}
+
+    def stats(self):
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "diseases": len(self._names),
+                "patients": len(self._active),
+                "pairs": int(self._matrix.nnz),
+                "cached_rows": len(self._ranked),
+                "updates": self.updates,
+            }
+
+
+comorbidity = ComorbidityMatrix()
+
+
+def warm_comorbidity(rows):
+    """Load the matrix from ACTIVE_DIAGNOSES_QUERY rows; returns (diseases, patients)."""
+    comorbidity.load(rows)
+    stats = comorbidity.stats()
+    return stats["diseases"], stats["patients"]
+
+
+events.subscribe(events.DIAGNOSIS_CREATED,
+                 lambda patient_name, disease_name, **_: comorbidity.add_diagnosis(
+                     patient_name, disease_name))
+events.subscribe(events.DIAGNOSIS_UPDATED,
+                 lambda patient_name, disease_name, status, **_: comorbidity.set_status(
+                     patient_name, disease_name, status))
@@ -0,0 +1,336 @@
+#!/usr/bin/env python
+"""Neo4j driver lifecycle: pool settings, read/write sessions, health and pool metrics.
+
+Pool settings come from the environment (defaults are the driver's own):
+  NEO4J_MAX_POOL_SIZE              connections per server (100)
+  NEO4J_ACQUISITION_TIMEOUT        seconds to wait for a free connection (60)
+  NEO4J_MAX_CONNECTION_LIFETIME    seconds before a connection is replaced (3600)
+  NEO4J_CONNECTION_TIMEOUT         seconds to open a new connection (30)
+  NEO4J_KEEP_ALIVE                 TCP keep-alive (True)
+  NEO4J_LIVENESS_CHECK_TIMEOUT     seconds idle before a connection is checked on
+                                   checkout (unset: never)
+  NEO4J_DATABASE                   database name (unset: the server default)
+
+Sessions are opened for reads or writes explicitly, so in a cluster reads are
+routed to followers and writes to the leader.
+
+Writes run as managed transactions (execute_write). Transient failures
+(deadlocks, leader switches, lost connections) are retried with exponential
+backoff and jitter, configured by:
+  NEO4J_WRITE_ATTEMPTS             attempts per write, including the first (5)
+  NEO4J_RETRY_INITIAL_DELAY        seconds before the first retry (0.1)
+  NEO4J_RETRY_MULTIPLIER           delay growth per retry (2.0)
+  NEO4J_RETRY_MAX_DELAY            upper bound on one delay (5.0)
+  NEO4J_RETRY_JITTER               +/- fraction of random jitter (0.2)
+"""
+
+import os
+import time
+import random
+import threading
+from contextlib import contextmanager, asynccontextmanager
+from app.query_metrics import InstrumentedRunner, AsyncInstrumentedRunner
+
+# Same values as neo4j.READ_ACCESS / neo4j.WRITE_ACCESS
+READ_ACCESS = "READ"
+WRITE_ACCESS = "WRITE"
+
+# (environment variable, driver option, type, driver default)
+POOL_SETTINGS = (
+    ("NEO4J_MAX_POOL_SIZE", "max_connection_pool_size", int, 100),
+    ("NEO4J_ACQUISITION_TIMEOUT", "connection_acquisition_timeout", float, 60.0),
+    ("NEO4J_MAX_CONNECTION_LIFETIME", "max_connection_lifetime", float, 3600.0),
+    ("NEO4J_CONNECTION_TIMEOUT", "connection_timeout", float, 30.0),
+    ("NEO4J_KEEP_ALIVE", "keep_alive", bool, True),
+    ("NEO4J_LIVENESS_CHECK_TIMEOUT", "liveness_check_timeout", float, None),
+)
+
+
+def _parse(name, value, kind):
+    if kind is bool:
+        return value.strip().lower() in ("true", "1", "yes")
+    try:
+        return kind(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number, got '{value}'")
+
+
+def driver_config(environ=None):
+    """Driver keyword arguments from the NEO4J_* pool settings; raises ValueError."""
+    environ = os.environ if environ is None else environ
+    config = {}
+    for name, option, kind, default in POOL_SETTINGS:
+        value = environ.get(name)
+        config[option] = default if value in (None, "") else _parse(name, value, kind)
+    return config
+
+
+class RetryPolicy:
+    """Exponential backoff with jitter for retryable transaction failures."""
+
+    SETTINGS = (
+        ("NEO4J_WRITE_ATTEMPTS", "max_attempts", int),
+        ("NEO4J_RETRY_INITIAL_DELAY", "initial_delay", float),
+        ("NEO4J_RETRY_MULTIPLIER", "multiplier", float),
+        ("NEO4J_RETRY_MAX_DELAY", "max_delay", float),
+        ("NEO4J_RETRY_JITTER", "jitter", float),
+    )
+
+    def __init__(self, max_attempts=5, initial_delay=0.1, multiplier=2.0, max_delay=5.0,
+                 jitter=0.2):
+        if max_attempts < 1:
+            raise ValueError("NEO4J_WRITE_ATTEMPTS must be at least 1")
+        self.max_attempts = max_attempts
+        self.initial_delay = initial_delay
+        self.multiplier = multiplier
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.retries = 0
+        self.failures = 0
+
+    @classmethod
+    def from_env(cls, environ=None):
+        environ = os.environ if environ is None else environ
+        return cls(**{option: _parse(name, environ[name], kind)
+                      for name, option, kind in cls.SETTINGS if environ.get(name)})
+
+    def delay(self, attempt):
+        """Seconds to wait after failed attempt number attempt (1-based)."""
+        base = min(self.max_delay, self.initial_delay * self.multiplier ** (attempt - 1))
+        return max(0.0, base * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    @staticmethod
+    def retryable(error):
+        # Neo4j errors classify themselves (TransientError, ServiceUnavailable, ...)
+        is_retryable = getattr(error, "is_retryable", None)
+        return bool(is_retryable and is_retryable())
+
+    def _give_up(self, error, attempt):
+        if attempt >= self.max_attempts or not self.retryable(error):
+            self.failures += 1
+            return True
+        self.retries += 1
+        return False
+
+    def run(self, attempt, sleep=time.sleep):
+        """Call attempt() until it succeeds, retrying retryable errors."""
+        for number in range(1, self.max_attempts + 1):
+            try:
+                return attempt()
+            except Exception as e:
+                if self._give_up(e, number):
+                    raise
+            sleep(self.delay(number))
+
+    async def run_async(self, attempt):
+        """Await attempt() until it succeeds, retrying retryable errors."""
+        import asyncio
+        for number in range(1, self.max_attempts + 1):
+            try:
+                return await attempt()
+            except Exception as e:
+                if self._give_up(e, number):
+                    raise
+            await asyncio.sleep(self.delay(number))
+
+    def to_dict(self):
+        return {"max_attempts": self.max_attempts, "initial_delay": self.initial_delay,
+                "multiplier": self.multiplier, "max_delay": self.max_delay,
+                "jitter": self.jitter, "retries": self.retries, "failures": self.failures}
+
+
+def pool_snapshot(driver):
+    """{in_use, idle, addresses} read from the driver's connection pool, or None.
+
+    The driver has no public pool API, so this looks at its internals and
+    gives up quietly if they change.
+    """
+    try:
+        connections = driver._pool.connections
+        addresses = {}
+        for address, pooled in list(connections.items()):
+            pooled = list(pooled)
+            in_use = sum(1 for connection in pooled if getattr(connection, "in_use", False))
+            addresses[str(address)] = {"in_use": in_use, "idle": len(pooled) - in_use}
+    except Exception:
+        return None
+    return {"in_use": sum(a["in_use"] for a in addresses.values()),
+            "idle": sum(a["idle"] for a in addresses.values()),
+            "addresses": addresses}
+
+
+class SessionStats:
+    """Open, peak and total sessions per access mode, and time spent in them."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._modes = {mode: {"active": 0, "peak": 0, "opened": 0, "seconds": 0.0}
+                       for mode in (READ_ACCESS, WRITE_ACCESS)}
+
+    def opened(self, mode):
+        with self._lock:
+            stats = self._modes[mode]
+            stats["active"] += 1
+            stats["opened"] += 1
+            stats["peak"] = max(stats["peak"], stats["active"])
+        return time.perf_counter()
+
+    def closed(self, mode, started):
+        with self._lock:
+            stats = self._modes[mode]
+            stats["active"] -= 1
+            stats["seconds"] += time.perf_counter() - started
+
+    def to_dict(self):
+        with self._lock:
+            return {mode.lower(): dict(stats, seconds=round(stats["seconds"], 3))
+                    for mode, stats in self._modes.items()}
+
+
+class _Manager:
+    """Settings, lazy driver creation and metrics shared by both managers."""
+
+    def __init__(self, uri, auth, database=None, config=None, factory=None, retry=None):
+        self.uri = uri
+        self.auth = auth
+        self.database = database or None
+        self.config = driver_config() if config is None else config
+        self.retry = RetryPolicy.from_env() if retry is None else retry
+        self.factory = factory or self._default_factory
+        self.sessions = SessionStats()
+        self._driver = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, **kwargs):
+        return cls(os.getenv("NEO4J_URI"),
+                   (os.getenv("NEO4J_USERNAME"), os.getenv("NEO4J_PASSWORD")),
+                   database=os.getenv("NEO4J_DATABASE"), **kwargs)
+
+    @property
+    def driver(self):
+        """The driver, created on first use."""
+        if self._driver is None:
+            with self._lock:
+                if self._driver is None:
+                    # The driver's own retry loop is off: self.retry decides
+                    self._driver = self.factory(self.uri, auth=self.auth,
+                                                max_transaction_retry_time=0, **self.config)
+        return self._driver
+
+    def _session_args(self, access_mode):
+        return {"database": self.database, "default_access_mode": access_mode}
+
+    def pool_stats(self):
+        """Pool settings, live pool usage and per-mode session counts."""
+        max_size = self.config["max_connection_pool_size"]
+        pool = pool_snapshot(self._driver) if self._driver is not None else None
+        if pool is not None:
+            busiest = max((a["in_use"] for a in pool["addresses"].values()), default=0)
+            pool["utilisation"] = round(busiest / max_size, 3) if max_size > 0 else None
+        return {"connected": self._driver is not None, "database": self.database,
+                "config": dict(self.config), "pool": pool,
+                "sessions": self.sessions.to_dict(), "retry": self.retry.to_dict()}
+
+
+class DriverManager(_Manager):
+    """Owns the synchronous driver for app.main and the modules built on it."""
+
+    @staticmethod
+    def _default_factory(uri, **kwargs):
+        from neo4j import GraphDatabase
+        return GraphDatabase.driver(uri, **kwargs)
+
+    @contextmanager
+    def session(self, access_mode=WRITE_ACCESS):
+        started = self.sessions.opened(access_mode)
+        try:
+            with self.driver.session(**self._session_args(access_mode)) as session:
+                yield InstrumentedRunner(session, access_mode, self.profile)
+        finally:
+            self.sessions.closed(access_mode, started)
+
+    def read_session(self):
+        return self.session(READ_ACCESS)
+
+    def write_session(self):
+        return self.session(WRITE_ACCESS)
+
+    def execute_write(self, work, *args, **kwargs):
+        """Run work(tx, *args, **kwargs) in a write transaction, retried per self.retry.
+
+        work may run more than once, so it must only touch the database; its
+        return value is returned once the transaction commits.
+        """
+        with self.write_session() as session:
+            return self.retry.run(lambda: session.execute_write(work, *args, **kwargs))
+
+    def profile(self, query, params):
+        """PROFILE plan of a read query, run on an uninstrumented read session."""
+        with self.driver.session(**self._session_args(READ_ACCESS)) as session:
+            return session.run("PROFILE " + query, params).consume().profile
+
+    def check_ready(self):
+        """(ready, details): whether the server accepts connections right now."""
+        started = time.perf_counter()
+        try:
+            self.driver.verify_connectivity()
+        except Exception as e:
+            return False, {"error": str(e)}
+        return True, {"latency_ms": round((time.perf_counter() - started) * 1000, 2)}
+
+    def close(self):
+        """Close the driver and its pooled connections; the next use reopens it."""
+        with self._lock:
+            driver, self._driver = self._driver, None
+        if driver is not None:
+            driver.close()
+
+
+class AsyncDriverManager(_Manager):
+    """Owns the AsyncDriver for app.async_db."""
+
+    @staticmethod
+    def _default_factory(uri, **kwargs):
+        from neo4j import AsyncGraphDatabase
+        return AsyncGraphDatabase.driver(uri, **kwargs)
+
+    @asynccontextmanager
+    async def session(self, access_mode=WRITE_ACCESS):
+        started = self.sessions.opened(access_mode)
+        try:
+            async with self.driver.session(**self._session_args(access_mode)) as session:
+                yield AsyncInstrumentedRunner(session, access_mode, self.profile)
+        finally:
+            self.sessions.closed(access_mode, started)
+
+    def read_session(self):
+        return self.session(READ_ACCESS)
+
+    def write_session(self):
+        return self.session(WRITE_ACCESS)
+
+    async def execute_write(self, work, *args, **kwargs):
+        """Async execute_write; work is a coroutine function taking the transaction."""
+        async with self.write_session() as session:
+            return await self.retry.run_async(lambda: session.execute_write(work, *args, **kwargs))
+
+    async def profile(self, query, params):
+        async with self.driver.session(**self._session_args(READ_ACCESS)) as session:
+            result = await session.run("PROFILE " + query, params)
+            return (await result.consume()).profile
+
+    async def check_ready(self):
+        started = time.perf_counter()
+        try:
+            await self.driver.verify_connectivity()
+        except Exception as e:
+            return False, {"error": str(e)}
+        return True, {"latency_ms": round((time.perf_counter() - started) * 1000, 2)}
+
+    async def close(self):
+        with self._lock:
+            driver, self._driver = self._driver, None
+        if driver is not None:
+            await driver.close()
+
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+"""In-process events emitted by data-layer writes.
+
+Write functions call `emit` after a successful write; caches and derived
+indexes `subscribe` to keep themselves in sync without the write functions
+knowing about them.
+"""
+
+import threading
+from collections import defaultdict
+
+PERSON_CREATED = "person_created"
+DISEASE_CREATED = "disease_created"
+RELATIONSHIP_CREATED = "relationship_created"
+RELATIONSHIP_DELETED = "relationship_deleted"
+DIAGNOSIS_CREATED = "diagnosis_created"
+DIAGNOSIS_UPDATED = "diagnosis_updated"
+PRESCRIPTION_ADDED = "prescription_added"
+VITALS_ADDED = "vitals_added"
+HISTORY_ADDED = "history_added"
+
+_subscribers = defaultdict(list)
+_lock = threading.Lock()
+
+
+def subscribe(event, handler=None):
+    """Register handler(**payload) for an event. Usable as a decorator."""
+    def register(func):
+        with _lock:
+            _subscribers[event].append(func)
+        return func
+
+    if handler is None:
+        return register
+    return register(handler)
+
+
+def unsubscribe(event, handler):
+    """Remove a previously registered handler."""
+    with _lock:
+        if handler in _subscribers[event]:
+            _subscribers[event].remove(handler)
+
+
+def emit(event, **payload):
+    """Call every handler for event. Handler errors are reported, never raised."""
+    with _lock:
+        handlers = list(_subscribers[event])
+    for handler in handlers:
+        try:
+            handler(**payload)
+        except Exception as e:
+            print(f"Error handling {event} event: {str(e)}")
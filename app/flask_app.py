@@ -1,43 +1,141 @@
 #!/usr/bin/env python
-"""Flask backend for MedGraph application."""
+"""Flask backend for MedGraph application.
+
+create_app() builds the app; importing this module opens no connection and
+loads no index. Serve it with `python app/flask_app.py`, or with a WSGI
+server as `app.flask_app:app` (built on first access) or
+`app.flask_app:create_app()`.
+"""
 
 import sys
 import os
+import signal
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, Blueprint, Response, request, jsonify, render_template
 from flask_cors import CORS
 import json
+from types import GeneratorType
 from app.main import (create_person, create_disease, create_relationship,
-                     fetch_person_diseases, GraphVisualizer, get_all_persons,
-                     get_all_diseases, search_patients, get_patient_details,
-                     delete_relationship)
+                     fetch_person_diseases, get_all_persons,
+                     get_all_diseases, search_patients, search_diseases,
+                     get_patient_details,
+                     delete_relationship, get_persons_page, get_diseases_page,
+                     stream_persons, stream_diseases, resolve_fields,
+                     project_fields, PERSON_FIELDS, DISEASE_FIELDS,
+                     DEFAULT_PAGE_SIZE, resolve_name, resolve_ids, driver_manager,
+                     repository)
 from app.medical_features import (create_diagnosis, add_medical_history,
                                 add_prescription, add_vitals,
-                                get_patient_medical_record,
+                                get_patient_medical_record, RECENT_VITALS_LIMIT,
                                 search_by_diagnosis,
                                 update_diagnosis_status)
-
-app = Flask(__name__, static_folder='../frontend/static', template_folder='../frontend')
-CORS(app)
-
-@app.route('/')
+from app.bulk_ingest import (bulk_create_persons, bulk_create_diseases,
+                             bulk_create_relationships, bulk_add_vitals,
+                             parse_ndjson, DEFAULT_BATCH_SIZE)
+from app.schema import ensure_schema
+from app.cache import cache_stats
+from app.query_metrics import query_metrics, app_metrics
+from app.search import search_stats, DEFAULT_SEARCH_LIMIT
+from app.autocomplete import warm_autocomplete, autocomplete_stats
+from app.comorbidity import comorbidity, warm_comorbidity, DEFAULT_TOP_K
+from app.similarity import similarity, warm_similarity
+from app.stats import dashboard_stats, Reconciler
+from app.vitals_store import get_vitals_store, timeseries_enabled, DEFAULT_RANGE_LIMIT
+from app.visualizations import (get_overview_graph, expand_overview_cluster, get_person_graph,
+                                get_active_diagnoses, get_disease_distribution,
+                                get_severity_distribution, get_doctor_performance_stats,
+                                get_patient_timeline, load_stats_rows, get_similarity_rows)
+from app.overview_graph import PhaseTimer, serialize_graph
+from app.person_graph import serialize_person_graph, etag_matches
+
+api = Blueprint('medgraph', __name__)
+
+def warm_up(app):
+    """Bootstrap the schema and load the in-process indexes: the first use of the storage backend."""
+    # Create constraints and indexes on startup; every statement is idempotent
+    if repository.backend == 'neo4j' and os.getenv('SCHEMA_BOOTSTRAP', 'True') == 'True':
+        schema_ok, schema_message = ensure_schema()
+        print(schema_message)
+
+    if os.getenv('AUTOCOMPLETE_ENABLED', 'True') == 'True':
+        persons_indexed, diseases_indexed = warm_autocomplete(get_all_persons(), get_all_diseases())
+        print(f"Autocomplete index warmed with {persons_indexed} persons and {diseases_indexed} diseases")
+
+    if os.getenv('COMORBIDITY_ENABLED', 'True') == 'True':
+        diseases_loaded, patients_loaded = warm_comorbidity(get_active_diagnoses())
+        print(f"Comorbidity matrix loaded for {diseases_loaded} diseases and {patients_loaded} patients")
+
+    if os.getenv('SIMILARITY_ENABLED', 'True') == 'True':
+        patients_loaded, features_loaded = warm_similarity(get_similarity_rows())
+        print(f"Similarity index loaded for {patients_loaded} patients and {features_loaded} features")
+
+    if os.getenv('STATS_ENABLED', 'True') == 'True':
+        try:
+            dashboard_stats.reconcile(load_stats_rows)
+        except Exception as e:
+            print(f"Error loading dashboard stats: {str(e)}")
+        app.stats_reconciler = Reconciler(dashboard_stats, load_stats_rows,
+                                          float(os.getenv('STATS_RECONCILE_SECONDS', '300'))).start()
+
+def create_app(warm=True):
+    """Build the Flask app; with warm=False nothing touches the storage backend until a request does."""
+    app = Flask(__name__, static_folder='../frontend/static', template_folder='../frontend')
+    CORS(app)
+    app.register_blueprint(api)
+    if warm:
+        warm_up(app)
+    return app
+
+_app = None
+
+def __getattr__(name):
+    # `app.flask_app:app` and `from app.flask_app import app` build the app on first access
+    global _app
+    if name == 'app':
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+@api.route('/')
 def index():
     return render_template('hospital.html')
 
-@app.route('/simple')
+@api.route('/simple')
 def simple_interface():
     return render_template('index.html')
 
-@app.route('/doctor')
+@api.route('/doctor')
 def doctor_portal():
     return render_template('doctor.html')
 
-@app.route('/api/persons', methods=['GET', 'POST'])
+def list_response(get_all, get_page, stream, allowed_fields):
+    """Serve a list endpoint as a full list, a keyset page or an NDJSON stream.
+
+    ?fields=name,...   project each record to these fields
+    ?limit=&after=     return {items, next_cursor}, ordered by name
+    ?format=ndjson     stream one JSON record per line straight from the result cursor
+    """
+    fields = request.args.get('fields')
+    fields = fields.split(',') if fields else None
+    after = request.args.get('after')
+    try:
+        if request.args.get('format') == 'ndjson':
+            rows = stream(after=after, fields=fields)
+            return Response((json.dumps(row) + '\n' for row in rows),
+                            mimetype='application/x-ndjson')
+        if 'limit' in request.args or after is not None:
+            limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+            return jsonify(get_page(limit=limit, after=after, fields=fields))
+        return jsonify(project_fields(get_all(), resolve_fields(fields, allowed_fields)))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@api.route('/api/persons', methods=['GET', 'POST'])
 def handle_persons():
     if request.method == 'GET':
-        persons = get_all_persons()
-        return jsonify(persons)
+        return list_response(get_all_persons, get_persons_page, stream_persons, PERSON_FIELDS)
     
     elif request.method == 'POST':
         data = request.json
@@ -50,11 +148,10 @@ def handle_persons():
         success, message = create_person(name, int(age))
         return jsonify({'success': success, 'message': message})
 
-@app.route('/api/diseases', methods=['GET', 'POST'])
+@api.route('/api/diseases', methods=['GET', 'POST'])
 def handle_diseases():
     if request.method == 'GET':
-        diseases = get_all_diseases()
-        return jsonify(diseases)
+        return list_response(get_all_diseases, get_diseases_page, stream_diseases, DISEASE_FIELDS)
     
     elif request.method == 'POST':
         data = request.json
@@ -67,7 +164,7 @@ def handle_diseases():
         success, message = create_disease(name, description)
         return jsonify({'success': success, 'message': message})
 
-@app.route('/api/relationships', methods=['POST'])
+@api.route('/api/relationships', methods=['POST'])
 def create_relationship_endpoint():
     data = request.json
     person_name = data.get('person_name')
@@ -79,28 +176,40 @@ def create_relationship_endpoint():
     success, message = create_relationship(person_name, disease_name)
     return jsonify({'success': success, 'message': message})
 
-@app.route('/api/persons/<name>/diseases', methods=['GET'])
+@api.route('/api/persons/<name>/diseases', methods=['GET'])
 def get_person_diseases(name):
     diseases = fetch_person_diseases(name)
     return jsonify(diseases)
 
-@app.route('/api/persons/search', methods=['GET'])
+@api.route('/api/persons/search', methods=['GET'])
 def search_patients_endpoint():
+    return search_response(search_patients)
+
+@api.route('/api/diseases/search', methods=['GET'])
+def search_diseases_endpoint():
+    return search_response(search_diseases)
+
+def search_response(search):
     search_term = request.args.get('q', '')
     if len(search_term) < 2:
         return jsonify([])
 
-    patients = search_patients(search_term)
-    return jsonify(patients)
+    try:
+        results = search(search_term,
+                         mode=request.args.get('mode', 'ranked'),
+                         limit=request.args.get('limit', DEFAULT_SEARCH_LIMIT, type=int))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(results)
 
-@app.route('/api/persons/<name>/details', methods=['GET'])
+@api.route('/api/persons/<name>/details', methods=['GET'])
 def get_patient_details_endpoint(name):
     details = get_patient_details(name)
     if details is None:
         return jsonify({'error': 'Patient not found'}), 404
     return jsonify(details)
 
-@app.route('/api/relationships', methods=['DELETE'])
+@api.route('/api/relationships', methods=['DELETE'])
 def delete_relationship_endpoint():
     data = request.json
     person_name = data.get('person_name')
@@ -112,7 +221,7 @@ def delete_relationship_endpoint():
     success, message = delete_relationship(person_name, disease_name)
     return jsonify({'success': success, 'message': message})
 
-@app.route('/api/diagnosis', methods=['POST'])
+@api.route('/api/diagnosis', methods=['POST'])
 def create_diagnosis_endpoint():
     data = request.json
     patient_name = data.get('patient_name')
@@ -127,8 +236,31 @@ def create_diagnosis_endpoint():
     success, message = create_diagnosis(patient_name, disease_name, doctor_name, notes, severity)
     return jsonify({'success': success, 'message': message})
 
-@app.route('/api/patients/<name>/vitals', methods=['POST'])
+def vitals_response(name):
+    """Latest readings, a time range (start/end) or rollups (resolution) from the vitals store."""
+    if not timeseries_enabled():
+        return jsonify({'error': 'Vitals queries need VITALS_BACKEND=timeseries'}), 400
+
+    store = get_vitals_store()
+    start = request.args.get('start')
+    end = request.args.get('end')
+    resolution = request.args.get('resolution')
+    try:
+        if resolution:
+            return jsonify(store.rollup(name, resolution, start, end,
+                                        limit=request.args.get('limit', DEFAULT_RANGE_LIMIT, type=int)))
+        if start or end:
+            return jsonify(store.range(name, start, end,
+                                       limit=request.args.get('limit', DEFAULT_RANGE_LIMIT, type=int)))
+        return jsonify(store.latest(name, request.args.get('limit', RECENT_VITALS_LIMIT, type=int)))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@api.route('/api/patients/<name>/vitals', methods=['GET', 'POST'])
 def add_vitals_endpoint(name):
+    if request.method == 'GET':
+        return vitals_response(name)
+
     data = request.json
 
     success, message = add_vitals(
@@ -143,7 +275,23 @@ def add_vitals_endpoint(name):
 
     return jsonify({'success': success, 'message': message})
 
-@app.route('/api/patients/<name>/prescription', methods=['POST'])
+@api.route('/api/patients/<name>/timeline', methods=['GET'])
+def patient_timeline_endpoint(name):
+    types = request.args.get('types')
+    try:
+        page = get_patient_timeline(name,
+                                    types=types.split(',') if types else None,
+                                    since=request.args.get('since'),
+                                    until=request.args.get('until'),
+                                    limit=request.args.get('limit', type=int),
+                                    cursor=request.args.get('cursor'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if page is None:
+        return jsonify({'error': 'Could not load timeline'}), 500
+    return jsonify(page)
+
+@api.route('/api/patients/<name>/prescription', methods=['POST'])
 def add_prescription_endpoint(name):
     data = request.json
 
@@ -159,14 +307,25 @@ def add_prescription_endpoint(name):
 
     return jsonify({'success': success, 'message': message})
 
-@app.route('/api/patients/<name>/medical-record', methods=['GET'])
+@api.route('/api/patients/<name>/medical-record', methods=['GET'])
 def get_medical_record_endpoint(name):
-    record = get_patient_medical_record(name)
+    sections = request.args.get('sections')
+    try:
+        record = get_patient_medical_record(
+            name,
+            sections=sections.split(',') if sections else None,
+            prescriptions_offset=request.args.get('prescriptions_offset', 0, type=int),
+            prescriptions_limit=request.args.get('prescriptions_limit', type=int),
+            history_offset=request.args.get('history_offset', 0, type=int),
+            history_limit=request.args.get('history_limit', type=int)
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     if record is None:
         return jsonify({'error': 'Patient not found'}), 404
     return jsonify(record)
 
-@app.route('/api/diagnosis/search', methods=['GET'])
+@api.route('/api/diagnosis/search', methods=['GET'])
 def search_by_diagnosis_endpoint():
     disease_name = request.args.get('disease')
     if not disease_name:
@@ -175,7 +334,7 @@ def search_by_diagnosis_endpoint():
     patients = search_by_diagnosis(disease_name)
     return jsonify(patients)
 
-@app.route('/api/diagnosis/status', methods=['PUT'])
+@api.route('/api/diagnosis/status', methods=['PUT'])
 def update_diagnosis_status_endpoint():
     data = request.json
     patient_name = data.get('patient_name')
@@ -189,39 +348,281 @@ def update_diagnosis_status_endpoint():
     success, message = update_diagnosis_status(patient_name, disease_name, status, notes)
     return jsonify({'success': success, 'message': message})
 
-@app.route('/api/graph/<name>', methods=['GET'])
+@api.route('/api/graph/<name>', methods=['GET'])
 def get_graph_data(name):
-    graph_visualizer = GraphVisualizer(name)
-    graph_visualizer.fetch_data()
-    graph_visualizer.build_graph()
-
-    # Convert networkx graph to JSON format for vis.js
-    nodes = []
-    edges = []
-
-    for node, data in graph_visualizer.graph.nodes(data=True):
-        node_data = {
-            'id': node,
-            'label': node
-        }
-        if 'color' in data:
-            node_data['color'] = data['color']
-        if 'title' in data:
-            node_data['title'] = data['title']
-        nodes.append(node_data)
-
-    for source, target in graph_visualizer.graph.edges():
-        edges.append({
-            'from': source,
-            'to': target
-        })
-
-    return jsonify({
-        'nodes': nodes,
-        'edges': edges
-    })
+    timer = PhaseTimer()
+    try:
+        graph = get_person_graph(name, depth=request.args.get('depth'),
+                                 limits=request.args.get('limits'), timer=timer)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return person_graph_response(graph, timer)
+
+def person_graph_response(graph, timer):
+    if graph is None:
+        return jsonify({'error': 'Could not build graph'}), 500
+    if not graph['edges']:
+        return jsonify({'error': 'No data to visualize.'}), 404
+    body, etag, server_timing = serialize_person_graph(graph, timer)
+    # no-cache: clients keep the body but revalidate it with If-None-Match every time
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache', 'Server-Timing': server_timing}
+    if etag_matches(request.headers.get('If-None-Match'), etag):
+        return Response(status=304, headers=headers)
+    return Response(body, mimetype='application/json', headers=headers)
+
+def graph_response(graph, timer):
+    if graph is None:
+        return jsonify({'error': 'Could not build overview graph'}), 500
+    body, server_timing = serialize_graph(graph, timer)
+    return Response(body, mimetype='application/json', headers={'Server-Timing': server_timing})
+
+@api.route('/api/overview/graph', methods=['GET'])
+def overview_graph_endpoint():
+    timer = PhaseTimer()
+    try:
+        graph = get_overview_graph(level=request.args.get('level', 'disease'),
+                                   status=request.args.get('status', 'active'),
+                                   max_nodes=request.args.get('max_nodes', type=int),
+                                   max_edges=request.args.get('max_edges', type=int),
+                                   timer=timer)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return graph_response(graph, timer)
+
+@api.route('/api/overview/cluster', methods=['GET'])
+def overview_cluster_endpoint():
+    disease = request.args.get('disease')
+    if not disease:
+        return jsonify({'error': 'disease is required'}), 400
+
+    timer = PhaseTimer()
+    try:
+        graph = expand_overview_cluster(disease,
+                                        severity=request.args.get('severity'),
+                                        status=request.args.get('status', 'active'),
+                                        after=request.args.get('after'),
+                                        max_nodes=request.args.get('max_nodes', type=int),
+                                        timer=timer)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return graph_response(graph, timer)
+
+@api.route('/api/diseases/<name>/comorbidities', methods=['GET'])
+def comorbidities_endpoint(name):
+    return comorbidity_response(comorbidity.top_comorbidities, name)
+
+@api.route('/api/diseases/<name>/comorbidity-network', methods=['GET'])
+def comorbidity_network_endpoint(name):
+    return comorbidity_response(comorbidity.disease_network, name)
+
+def comorbidity_response(query, name):
+    if not comorbidity.ready:
+        return jsonify({'error': 'Comorbidity index is not loaded'}), 503
+    try:
+        result = query(name,
+                       k=request.args.get('k', DEFAULT_TOP_K, type=int),
+                       by=request.args.get('by', 'count'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if result is None:
+        return jsonify({'error': 'No active diagnoses for this disease'}), 404
+    return jsonify(result)
+
+@api.route('/api/patients/<name>/similar', methods=['GET'])
+def similar_patients_endpoint(name):
+    return similarity_response(similarity.similar_patients, name)
+
+@api.route('/api/patients/<name>/similar-network', methods=['GET'])
+def similar_network_endpoint(name):
+    return similarity_response(similarity.similarity_network, name,
+                               depth=request.args.get('depth', 1, type=int))
+
+def similarity_response(query, name, **params):
+    if not similarity.ready:
+        return jsonify({'error': 'Similarity index is not loaded'}), 503
+    try:
+        result = query(name,
+                       k=request.args.get('k', DEFAULT_TOP_K, type=int),
+                       metric=request.args.get('metric', 'cosine'),
+                       **params)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if result is None:
+        return jsonify({'error': 'No diagnoses or prescriptions for this patient'}), 404
+    return jsonify(result)
+
+# Id-based routes: resolve the id to the node's name, then serve the name-based view
+def by_id(label, node_id, view):
+    name = resolve_name(label, node_id)
+    if name is None:
+        return jsonify({'error': f'{label} not found'}), 404
+    return view(name)
+
+@api.route('/api/v2/persons/<person_id>', methods=['GET'])
+def person_by_id_endpoint(person_id):
+    return by_id('Person', person_id, get_patient_details_endpoint)
+
+@api.route('/api/v2/persons/<person_id>/diseases', methods=['GET'])
+def person_diseases_by_id_endpoint(person_id):
+    return by_id('Person', person_id, get_person_diseases)
+
+@api.route('/api/v2/patients/<person_id>/medical-record', methods=['GET'])
+def medical_record_by_id_endpoint(person_id):
+    return by_id('Person', person_id, get_medical_record_endpoint)
+
+@api.route('/api/v2/patients/<person_id>/timeline', methods=['GET'])
+def timeline_by_id_endpoint(person_id):
+    return by_id('Person', person_id, patient_timeline_endpoint)
+
+@api.route('/api/v2/patients/<person_id>/vitals', methods=['GET', 'POST'])
+def vitals_by_id_endpoint(person_id):
+    return by_id('Person', person_id, add_vitals_endpoint)
+
+@api.route('/api/v2/graph/<person_id>', methods=['GET'])
+def graph_by_id_endpoint(person_id):
+    return by_id('Person', person_id, get_graph_data)
+
+@api.route('/api/v2/diseases/<disease_id>/comorbidities', methods=['GET'])
+def comorbidities_by_id_endpoint(disease_id):
+    return by_id('Disease', disease_id, comorbidities_endpoint)
+
+@api.route('/api/v2/patients/<person_id>/similar', methods=['GET'])
+def similar_patients_by_id_endpoint(person_id):
+    return by_id('Person', person_id, similar_patients_endpoint)
+
+@api.route('/api/v2/persons/ids', methods=['GET'])
+def person_ids_endpoint():
+    return ids_response('Person')
+
+@api.route('/api/v2/diseases/ids', methods=['GET'])
+def disease_ids_endpoint():
+    return ids_response('Disease')
+
+def ids_response(label):
+    try:
+        ids = resolve_ids(label, request.args.getlist('name'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(ids)
+
+@api.route('/api/stats', methods=['GET'])
+def stats_status_endpoint():
+    return jsonify(dashboard_stats.status())
+
+@api.route('/api/stats/diseases', methods=['GET'])
+def disease_stats_endpoint():
+    return jsonify(get_disease_distribution())
+
+@api.route('/api/stats/severity', methods=['GET'])
+def severity_stats_endpoint():
+    return jsonify(get_severity_distribution())
+
+@api.route('/api/stats/status', methods=['GET'])
+def status_stats_endpoint():
+    if not dashboard_stats.ready:
+        return jsonify({'error': 'Statistics are not loaded'}), 503
+    return jsonify(dashboard_stats.status_counts())
+
+@api.route('/api/stats/doctors', methods=['GET'])
+def doctors_stats_endpoint():
+    if not dashboard_stats.ready:
+        return jsonify({'error': 'Statistics are not loaded'}), 503
+    return jsonify(dashboard_stats.doctors())
+
+@api.route('/api/stats/doctors/<name>', methods=['GET'])
+def doctor_stats_endpoint(name):
+    return jsonify(get_doctor_performance_stats(name))
+
+@api.route('/api/stats/reconcile', methods=['POST'])
+def reconcile_stats_endpoint():
+    try:
+        drift = dashboard_stats.reconcile(load_stats_rows)
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'Error reconciling stats: {str(e)}'}), 500
+    return jsonify({'success': True, 'drift': drift, **dashboard_stats.status()})
+
+BULK_INGESTERS = {
+    'persons': bulk_create_persons,
+    'diseases': bulk_create_diseases,
+    'relationships': bulk_create_relationships,
+    'vitals': bulk_add_vitals,
+}
+
+@api.route('/api/bulk/<kind>', methods=['POST'])
+def bulk_ingest_endpoint(kind):
+    ingest = BULK_INGESTERS.get(kind)
+    if ingest is None:
+        return jsonify({'success': False, 'message': f"Unknown bulk type '{kind}'"}), 404
+
+    if request.mimetype == 'application/x-ndjson':
+        # One record per line, consumed lazily so large uploads are never held in memory
+        data = {'records': parse_ndjson(request.stream),
+                'batch_size': request.args.get('batch_size', DEFAULT_BATCH_SIZE),
+                'include_results': request.args.get('include_results', 'true') == 'true'}
+    else:
+        data = request.json
+    if isinstance(data, list):
+        data = {'records': data}
+    if not isinstance(data, dict) or not isinstance(data.get('records'), (list, GeneratorType)):
+        return jsonify({'success': False, 'message': 'A list of records is required'}), 400
+
+    try:
+        batch_size = int(data.get('batch_size', DEFAULT_BATCH_SIZE))
+        report = ingest(data['records'], batch_size=batch_size)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    result = report.to_dict(include_results=data.get('include_results', True))
+    result['success'] = report.counts['failed'] == 0
+    return jsonify(result)
+
+@api.route('/api/cache/stats', methods=['GET'])
+def cache_stats_endpoint():
+    return jsonify(cache_stats())
+
+@api.route('/api/db/stats', methods=['GET'])
+def db_stats_endpoint():
+    return jsonify(driver_manager.pool_stats())
+
+@api.route('/api/queries/stats', methods=['GET'])
+def query_stats_endpoint():
+    return jsonify(query_metrics.to_dict(limit=request.args.get('limit', 20, type=int)))
+
+@api.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    body = query_metrics.prometheus() + app_metrics(driver_manager.pool_stats(), cache_stats())
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
+# Liveness: the process is serving requests. Readiness: the storage backend is reachable too.
+@api.route('/health/live', methods=['GET'])
+def liveness_endpoint():
+    return jsonify({'status': 'alive'})
+
+@api.route('/health/ready', methods=['GET'])
+def readiness_endpoint():
+    ready, details = repository.check_ready()
+    return jsonify({'status': 'ready' if ready else 'unavailable',
+                    repository.backend: details}), (200 if ready else 503)
+
+@api.route('/api/search/stats', methods=['GET'])
+def search_stats_endpoint():
+    return jsonify(search_stats())
+
+@api.route('/api/autocomplete/stats', methods=['GET'])
+def autocomplete_stats_endpoint():
+    return jsonify(autocomplete_stats())
+
+@api.route('/api/comorbidity/stats', methods=['GET'])
+def comorbidity_stats_endpoint():
+    return jsonify(comorbidity.stats())
+
+@api.route('/api/similarity/stats', methods=['GET'])
+def similarity_stats_endpoint():
+    return jsonify(similarity.stats())
 
 if __name__ == '__main__':
-    app.run(debug=os.getenv('DEBUG', 'False') == 'True',
-            host=os.getenv('APP_HOST', '0.0.0.0'),
-            port=int(os.getenv('APP_PORT', '8502')))
+    # Exit on SIGTERM through SystemExit, so atexit closes the Neo4j driver's connections
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    create_app().run(debug=os.getenv('DEBUG', 'False') == 'True',
+                     host=os.getenv('APP_HOST', '0.0.0.0'),
+                     port=int(os.getenv('APP_PORT', '8502')))
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+"""Stable identifiers for Person and Disease nodes.
+
+Every Person and Disease gets an `id` when it is created: a UUIDv7, i.e. a
+48-bit millisecond timestamp followed by a counter and random bits. Ids
+created later sort later, so the uniqueness constraint's index stays
+append-mostly. Names stay unique too, and the name-based routes are unchanged;
+the /api/v2 routes take ids and resolve them to names through a cached map.
+
+    python -m app.ids               # count nodes without an id
+    python -m app.ids --backfill    # give existing nodes ids, in batches
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import threading
+import time
+import uuid
+
+ID_LABELS = ("Person", "Disease")
+DEFAULT_BACKFILL_BATCH = 1000
+MAX_RESOLVE_NAMES = 1000
+
+ID_BY_NAME_QUERY = "MATCH (n:{label} {{name: $name}}) RETURN n.id AS id"
+NAME_BY_ID_QUERY = "MATCH (n:{label} {{id: $id}}) RETURN n.name AS name"
+IDS_BY_NAMES_QUERY = """
+    UNWIND $names AS name
+    MATCH (n:{label} {{name: name}})
+    RETURN n.name AS name, n.id AS id
+"""
+
+_lock = threading.Lock()
+_last_millis = 0
+_counter = 0
+
+
+def new_id():
+    """A UUIDv7 string; ids from one process are strictly increasing."""
+    global _last_millis, _counter
+    random_bits = int.from_bytes(os.urandom(8), "big") & ((1 << 62) - 1)
+    with _lock:
+        millis = max(time.time_ns() // 1_000_000, _last_millis)
+        if millis == _last_millis:
+            _counter += 1
+            if _counter > 0xFFF:
+                # 4096 ids in one millisecond: borrow the next one
+                millis += 1
+                _counter = 0
+        else:
+            _counter = int.from_bytes(os.urandom(1), "big")
+        _last_millis = millis
+        counter = _counter
+    value = (millis << 80) | (0x7 << 76) | (counter << 64) | (0b10 << 62) | random_bits
+    return str(uuid.UUID(int=value))
+
+
+def check_label(label):
+    if label not in ID_LABELS:
+        raise ValueError(f"Unknown label '{label}'; expected one of {', '.join(ID_LABELS)}")
+    return label
+
+
+def resolve_names_params(names):
+    """Validate a batch of names to resolve; returns the distinct names in order."""
+    names = list(dict.fromkeys(name for name in names if name))
+    if not names:
+        raise ValueError("At least one name is required")
+    if len(names) > MAX_RESOLVE_NAMES:
+        raise ValueError(f"At most {MAX_RESOLVE_NAMES} names can be resolved at once")
+    return names
+
+
+def count_missing(driver):
+    """{label: nodes without an id}."""
+    with driver.session() as session:
+        return {label: session.run(f"MATCH (n:{label}) WHERE n.id IS NULL RETURN count(n) AS count")
+                .single()["count"] for label in ID_LABELS}
+
+
+def backfill(driver, batch_size=DEFAULT_BACKFILL_BATCH):
+    """Give every node without an id a new one, batch_size nodes per transaction.
+
+    Safe to re-run. Returns {label: nodes updated}.
+    """
+    updated = {}
+    with driver.session() as session:
+        for label in ID_LABELS:
+            updated[label] = 0
+            while True:
+                rows = session.run(f"""
+                    MATCH (n:{label}) WHERE n.id IS NULL
+                    RETURN elementId(n) AS element_id
+                    LIMIT $batch_size
+                """, batch_size=batch_size).data()
+                if not rows:
+                    break
+                session.run(f"""
+                    UNWIND $rows AS row
+                    MATCH (n:{label}) WHERE elementId(n) = row.element_id
+                    SET n.id = row.id
+                """, rows=[{"element_id": row["element_id"], "id": new_id()} for row in rows]).consume()
+                updated[label] += len(rows)
+    return updated
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage Person and Disease ids.")
+    parser.add_argument("--backfill", action="store_true",
+                        help="Assign ids to nodes created before ids existed")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BACKFILL_BATCH)
+    args = parser.parse_args(argv)
+
+    from app.main import driver
+
+    if args.backfill:
+        for label, count in backfill(driver, args.batch_size).items():
+            print(f"{label}: assigned {count} ids")
+    for label, count in count_missing(driver).items():
+        print(f"{label}: {count} without an id")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,201 +1,303 @@
-import networkx as nx
-from pyvis.network import Network
-from neo4j import GraphDatabase
 # Removed Streamlit import - using Flask instead
+# networkx and pyvis are imported by GraphVisualizer when it is used, not at startup
 import os
+import atexit
 from dotenv import load_dotenv
+from app import events
+from app.db import DriverManager
+from app.repository import create_repository
+from app.cache import (cache, MISSING, get_or_load, PERSONS_KEY, DISEASES_KEY, patient_key,
+                       person_diseases_key, id_key, name_key)
+from app.search import (build_fulltext_query, cached_search, search_key,
+                        DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT)
+from app.autocomplete import person_index, disease_index
+from app.ids import new_id, check_label, resolve_names_params
 
 load_dotenv()
 
-# Now you can access the environment variables
-uri = os.getenv("NEO4J_URI")
-username = os.getenv("NEO4J_USERNAME")
-password = os.getenv("NEO4J_PASSWORD")
+# Neo4j driver with pool settings from the environment, created on first use and closed on exit
+driver_manager = DriverManager.from_env()
+read_session = driver_manager.read_session
+write_session = driver_manager.write_session
+atexit.register(driver_manager.close)
 
-# Create a Neo4j driver
-driver = GraphDatabase.driver(uri, auth=(username, password))
+# Storage for everything below; MEDGRAPH_BACKEND=memory needs no Neo4j server
+repository = create_repository(driver_manager)
+atexit.register(repository.close)
+
+def __getattr__(name):
+    # `from app.main import driver` creates the driver then, not when app.main is imported
+    if name == "driver":
+        return driver_manager.driver if repository.backend == "neo4j" else None
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def run_write(query, **params):
+    """Run one write query in a managed transaction, retried on transient errors; returns the rows."""
+    return driver_manager.execute_write(lambda tx: tx.run(query, params).data())
 
 def create_person(name, age):
     """Creates a Person node in Neo4j."""
     try:
-        with driver.session() as session:
-            # Check if person already exists
-            result = session.run("MATCH (p:Person {name: $name}) RETURN p", name=name)
-            if result.single():
-                return False, f"Person '{name}' already exists"
-
-            session.run("CREATE (a:Person {name: $name, age: $age})", name=name, age=age)
-            return True, f"Successfully created person '{name}'"
+        person_id = new_id()
+        if not repository.create_person(person_id, name, age):
+            return False, f"Person '{name}' already exists"
+
+        events.emit(events.PERSON_CREATED, name=name, age=age, id=person_id)
+        return True, f"Successfully created person '{name}'"
     except Exception as e:
         return False, f"Error creating person: {str(e)}"
 
 def create_disease(name, description):
     """Creates a Disease node in Neo4j."""
     try:
-        with driver.session() as session:
-            # Check if disease already exists
-            result = session.run("MATCH (d:Disease {name: $name}) RETURN d", name=name)
-            if result.single():
-                return False, f"Disease '{name}' already exists"
-
-            session.run("CREATE (d:Disease {name: $name, description: $description})", name=name, description=description)
-            return True, f"Successfully created disease '{name}'"
+        disease_id = new_id()
+        if not repository.create_disease(disease_id, name, description):
+            return False, f"Disease '{name}' already exists"
+
+        events.emit(events.DISEASE_CREATED, name=name, description=description, id=disease_id)
+        return True, f"Successfully created disease '{name}'"
     except Exception as e:
         return False, f"Error creating disease: {str(e)}"
 
+def relationship_result(row, person_name, disease_name):
+    """(success, message) for a CREATE_RELATIONSHIP_QUERY row."""
+    if not row["person_found"]:
+        return False, f"Person '{person_name}' does not exist"
+    if not row["disease_found"]:
+        return False, f"Disease '{disease_name}' does not exist"
+    if not row["created"]:
+        return False, f"Relationship already exists between '{person_name}' and '{disease_name}'"
+    return True, f"Successfully created relationship between '{person_name}' and '{disease_name}'"
+
 def create_relationship(person_name, disease_name):
     """Creates a relationship between Person and Disease in Neo4j."""
     try:
-        with driver.session() as session:
-            # Check if person exists
-            person_result = session.run("MATCH (p:Person {name: $name}) RETURN p", name=person_name)
-            if not person_result.single():
-                return False, f"Person '{person_name}' does not exist"
-
-            # Check if disease exists
-            disease_result = session.run("MATCH (d:Disease {name: $name}) RETURN d", name=disease_name)
-            if not disease_result.single():
-                return False, f"Disease '{disease_name}' does not exist"
-
-            # Check if the relationship already exists
-            result = session.run("""
-                MATCH (p:Person {name: $person_name})-[:HAS_DISEASE]->(d:Disease {name: $disease_name})
-                RETURN COUNT(*) AS count
-            """, person_name=person_name, disease_name=disease_name)
-
-            count = result.single()['count']
-
-            # If the relationship doesn't exist, create it
-            if count == 0:
-                session.run("""
-                    MATCH (p:Person {name: $person_name}), (d:Disease {name: $disease_name})
-                    CREATE (p)-[:HAS_DISEASE]->(d)
-                """, person_name=person_name, disease_name=disease_name)
-                return True, f"Successfully created relationship between '{person_name}' and '{disease_name}'"
-            else:
-                return False, f"Relationship already exists between '{person_name}' and '{disease_name}'"
+        row = repository.create_relationship(new_id(), person_name, disease_name)
+        success, message = relationship_result(row, person_name, disease_name)
+        if success:
+            events.emit(events.RELATIONSHIP_CREATED, person_name=person_name, disease_name=disease_name)
+        return success, message
     except Exception as e:
         return False, f"Error creating relationship: {str(e)}"
 
+def _load_person_diseases(name):
+    return [{"d.id": row["id"], "d.name": row["name"], "d.description": row["description"]}
+            for row in repository.person_diseases(name)]
+
 def fetch_person_diseases(name):
     """Fetch diseases related to a person."""
     try:
-        with driver.session() as session:
-            result = session.run("""
-                MATCH (p:Person {name: $name})-[:HAS_DISEASE]->(d:Disease)
-                RETURN d.name AS disease_name, d.description AS disease_description
-            """, name=name)
-
-            diseases = [{"d.name": record["disease_name"], "d.description": record["disease_description"]} for record in result]
-            return diseases
+        return get_or_load(person_diseases_key(name), lambda: _load_person_diseases(name))
     except Exception as e:
         print(f"Error fetching diseases: {str(e)}")
         return []
 
+def _load_all_persons():
+    return repository.all_persons()
+
 def get_all_persons():
     """Get all persons in the database."""
     try:
-        with driver.session() as session:
-            result = session.run("MATCH (p:Person) RETURN p.name AS name, p.age AS age ORDER BY p.name")
-            return [{"name": record["name"], "age": record["age"]} for record in result]
+        return get_or_load(PERSONS_KEY, _load_all_persons)
     except Exception as e:
         print(f"Error fetching persons: {str(e)}")
         return []
 
+def _load_all_diseases():
+    return repository.all_diseases()
+
 def get_all_diseases():
     """Get all diseases in the database."""
     try:
-        with driver.session() as session:
-            result = session.run("MATCH (d:Disease) RETURN d.name AS name, d.description AS description ORDER BY d.name")
-            return [{"name": record["name"], "description": record["description"]} for record in result]
+        return get_or_load(DISEASES_KEY, _load_all_diseases)
     except Exception as e:
         print(f"Error fetching diseases: {str(e)}")
         return []
 
-def search_patients(search_term):
-    """Search patients by name."""
+PERSON_FIELDS = ("id", "name", "age")
+DISEASE_FIELDS = ("id", "name", "description")
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+def resolve_fields(fields, allowed):
+    """Validate a requested field projection, defaulting to every allowed field."""
+    if not fields:
+        return list(allowed)
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+    return list(fields)
+
+def project_fields(rows, fields):
+    """Keep only the requested fields of each row."""
+    return [{field: row[field] for field in fields} for row in rows]
+
+def page_from_rows(rows, limit, fields):
+    """Turn limit + 1 fetched rows into {items, next_cursor}."""
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "items": project_fields(rows, fields),
+        "next_cursor": rows[-1]["name"] if has_more else None
+    }
+
+def _get_page(label, allowed, limit, after, fields):
+    fields = resolve_fields(fields, allowed)
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
     try:
-        with driver.session() as session:
-            query = """
-                MATCH (p:Person)
-                WHERE toLower(p.name) CONTAINS toLower($search_term)
-                RETURN p.name AS name, p.age AS age
-                ORDER BY p.name
-                LIMIT 20
-            """
-            result = session.run(query, search_term=search_term)
-            return [{"name": record["name"], "age": record["age"]} for record in result]
+        return page_from_rows(list(repository.list_rows(label, fields, after, limit + 1)), limit, fields)
+    except Exception as e:
+        print(f"Error fetching {label} page: {str(e)}")
+        return {"items": [], "next_cursor": None}
+
+def _stream(label, allowed, after, fields):
+    fields = resolve_fields(fields, allowed)
+
+    def generate():
+        try:
+            for row in repository.list_rows(label, fields, after):
+                yield {field: row[field] for field in fields}
+        except Exception as e:
+            print(f"Error streaming {label} nodes: {str(e)}")
+
+    return generate()
+
+def get_persons_page(limit=DEFAULT_PAGE_SIZE, after=None, fields=None):
+    """Get one page of persons ordered by name, starting after the `after` cursor."""
+    return _get_page("Person", PERSON_FIELDS, limit, after, fields)
+
+def get_diseases_page(limit=DEFAULT_PAGE_SIZE, after=None, fields=None):
+    """Get one page of diseases ordered by name, starting after the `after` cursor."""
+    return _get_page("Disease", DISEASE_FIELDS, limit, after, fields)
+
+def stream_persons(after=None, fields=None):
+    """Yield persons ordered by name directly from the result cursor, without buffering."""
+    return _stream("Person", PERSON_FIELDS, after, fields)
+
+def stream_diseases(after=None, fields=None):
+    """Yield diseases ordered by name directly from the result cursor, without buffering."""
+    return _stream("Disease", DISEASE_FIELDS, after, fields)
+
+AUTOCOMPLETE_ENABLED = os.getenv("AUTOCOMPLETE_ENABLED", "True") == "True"
+
+def _fulltext_search(kind, search_term, query, mode, limit):
+    limit = max(1, min(int(limit), MAX_SEARCH_LIMIT))
+    return cached_search(search_key(kind, search_term, mode, limit),
+                         lambda: repository.search(kind, search_term, query, mode, limit))
+
+def autocomplete(index, search_term, mode, limit):
+    """Serve prefix matches from the in-memory index, or None to fall through to the database.
+
+    Fuzzy searches, an unwarmed index and searches with no prefix match (likely
+    typos) go to the full-text index instead.
+    """
+    if not AUTOCOMPLETE_ENABLED or mode == "fuzzy" or not index.ready:
+        return None
+    return index.search(search_term, max(1, min(int(limit), MAX_SEARCH_LIMIT))) or None
+
+def search_patients(search_term, mode="ranked", limit=DEFAULT_SEARCH_LIMIT):
+    """Search patients by name, best matches first.
+
+    mode is one of app.search.SEARCH_MODES: ranked, prefix or fuzzy. Prefix
+    matches come from the in-memory autocomplete index when it is warm; the
+    full-text index handles everything else.
+    """
+    query = build_fulltext_query(search_term, mode)
+    if query is None:
+        return []
+    results = autocomplete(person_index, search_term, mode, limit)
+    if results is not None:
+        return results
+    try:
+        return _fulltext_search("patients", search_term, query, mode, limit)
     except Exception as e:
         print(f"Error searching patients: {str(e)}")
         return []
 
+def search_diseases(search_term, mode="ranked", limit=DEFAULT_SEARCH_LIMIT):
+    """Search diseases by name and description using the full-text index.
+
+    Only mode="prefix" is served from the autocomplete index, which holds names alone.
+    """
+    query = build_fulltext_query(search_term, mode)
+    if query is None:
+        return []
+    # Ranked search also matches descriptions, which the name-only index cannot answer
+    if mode == "prefix":
+        results = autocomplete(disease_index, search_term, mode, limit)
+        if results is not None:
+            return results
+    try:
+        return _fulltext_search("diseases", search_term, query, mode, limit)
+    except Exception as e:
+        print(f"Error searching diseases: {str(e)}")
+        return []
+
+def _load_patient_details(name):
+    return repository.patient_details(name)
+
 def get_patient_details(name):
     """Get detailed patient information including all diseases."""
     try:
-        with driver.session() as session:
-            # Get patient basic info
-            patient_query = """
-                MATCH (p:Person {name: $name})
-                RETURN p.name AS name, p.age AS age
-            """
-            patient_result = session.run(patient_query, name=name).single()
-
-            if not patient_result:
-                return None
-
-            patient_info = {
-                "name": patient_result["name"],
-                "age": patient_result["age"],
-                "diseases": []
-            }
-
-            # Get all diseases for this patient
-            diseases_query = """
-                MATCH (p:Person {name: $name})-[:HAS_DISEASE]->(d:Disease)
-                RETURN d.name AS name, d.description AS description
-                ORDER BY d.name
-            """
-            diseases_result = session.run(diseases_query, name=name)
-
-            for record in diseases_result:
-                patient_info["diseases"].append({
-                    "name": record["name"],
-                    "description": record["description"]
-                })
-
-            return patient_info
+        return get_or_load(patient_key(name), lambda: _load_patient_details(name))
     except Exception as e:
         print(f"Error fetching patient details: {str(e)}")
         return None
 
+def resolve_id(label, name):
+    """The id of the Person or Disease called name, or None; cached."""
+    check_label(label)
+    try:
+        return get_or_load(id_key(label, name),
+                           lambda: repository.node_id(label, name))
+    except Exception as e:
+        print(f"Error resolving {label} id: {str(e)}")
+        return None
+
+def resolve_name(label, node_id):
+    """The name of the Person or Disease with node_id, or None; cached."""
+    check_label(label)
+    try:
+        return get_or_load(name_key(label, node_id),
+                           lambda: repository.node_name(label, node_id))
+    except Exception as e:
+        print(f"Error resolving {label} name: {str(e)}")
+        return None
+
+def resolve_ids(label, names):
+    """{name: id} for the names that exist; uncached names are resolved in one query."""
+    check_label(label)
+    names = resolve_names_params(names)
+    ids = {}
+    try:
+        for name in names:
+            node_id = cache.get(id_key(label, name))
+            if node_id is not MISSING:
+                ids[name] = node_id
+        missing = [name for name in names if name not in ids]
+        if missing:
+            for name, node_id in repository.node_ids(label, missing).items():
+                ids[name] = node_id
+                cache.set(id_key(label, name), node_id)
+    except Exception as e:
+        print(f"Error resolving {label} ids: {str(e)}")
+    return ids
+
 def delete_relationship(person_name, disease_name):
     """Delete a relationship between person and disease."""
     try:
-        with driver.session() as session:
-            # Check if the relationship exists
-            check_query = """
-                MATCH (p:Person {name: $person_name})-[r:HAS_DISEASE]->(d:Disease {name: $disease_name})
-                RETURN COUNT(r) AS count
-            """
-            result = session.run(check_query, person_name=person_name, disease_name=disease_name)
-
-            if result.single()['count'] == 0:
-                return False, f"No relationship exists between '{person_name}' and '{disease_name}'"
-
-            # Delete the relationship
-            delete_query = """
-                MATCH (p:Person {name: $person_name})-[r:HAS_DISEASE]->(d:Disease {name: $disease_name})
-                DELETE r
-            """
-            session.run(delete_query, person_name=person_name, disease_name=disease_name)
-
-            return True, f"Successfully removed relationship between '{person_name}' and '{disease_name}'"
+        if not repository.delete_relationship(person_name, disease_name):
+            return False, f"No relationship exists between '{person_name}' and '{disease_name}'"
+
+        events.emit(events.RELATIONSHIP_DELETED, person_name=person_name, disease_name=disease_name)
+        return True, f"Successfully removed relationship between '{person_name}' and '{disease_name}'"
     except Exception as e:
         return False, f"Error deleting relationship: {str(e)}"
 
 
 class GraphVisualizer:
     def __init__(self, person_name):
+        import networkx as nx
         self.person_name = person_name
         self.graph = nx.Graph()
 
@@ -241,6 +343,7 @@ class GraphVisualizer:
                 raise ValueError("No data to visualize.")
 
             # Create a Pyvis network for visualization
+            from pyvis.network import Network
             net = Network(height="600px", width="100%", directed=False)
             net.from_nx(self.graph)
 
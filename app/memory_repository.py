@@ -0,0 +1,591 @@
+#!/usr/bin/env python
+"""In-memory repository: the MedGraph graph held in Python dicts.
+
+Persons and diseases are keyed by name, with sorted name lists for keyset
+paging and id maps for the /api/v2 routes. HAS_DISEASE edges are adjacency
+dicts in both directions. Diagnoses, prescriptions, vitals and history are
+keyed by their id, with secondary indexes on patient, disease, doctor and
+status, so a patient record or a doctor's statistics touch only their own
+records and the hospital-wide reads scan one index rather than every record.
+
+One lock serialises access: each operation is short, and it gives the same
+all-or-nothing writes as a transaction. With MEMORY_SNAPSHOT_PATH set the
+graph is loaded from that JSON file at startup and written back by close().
+"""
+
+import os
+import json
+import heapq
+import threading
+from bisect import bisect_right, insort
+from collections import Counter, defaultdict
+from itertools import combinations
+from app.repository import Repository
+from app.search import search_words, match_score
+from app.model import to_datetime
+
+SNAPSHOT_VERSION = 1
+UNKNOWN_SEVERITY = "unknown"
+ACTIVE_STATUS = "active"
+
+# Record kind -> properties stored as datetimes
+DATETIME_FIELDS = {
+    "diagnoses": ("date", "updated_at"),
+    "prescriptions": ("prescribed_date",),
+    "vitals": ("recorded_at",),
+    "history": ("created_at",),
+}
+
+
+def _iso(value):
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+def _millis(value):
+    return int(value.timestamp() * 1000)
+
+
+def _newest_first(records, field):
+    # Records without the field sort last
+    return sorted(records, key=lambda record: (record.get(field) is not None,
+                                               record.get(field) or 0), reverse=True)
+
+
+class MemoryRepository(Repository):
+    backend = "memory"
+
+    def __init__(self, snapshot_path=None):
+        self.snapshot_path = snapshot_path
+        self._lock = threading.RLock()
+        self.persons = {}
+        self.diseases = {}
+        self._nodes = {"Person": self.persons, "Disease": self.diseases}
+        self._sorted_names = {"Person": [], "Disease": []}
+        self._names_by_id = {"Person": {}, "Disease": {}}
+        # HAS_DISEASE: person -> {disease: edge id} and disease -> {persons}
+        self.person_disease_edges = defaultdict(dict)
+        self.disease_person_edges = defaultdict(set)
+        # Records by id, and secondary indexes of record ids
+        self.diagnoses = {}
+        self.prescriptions = {}
+        self.vitals = {}
+        self.history = {}
+        self.diagnoses_by_patient = defaultdict(list)
+        self.diagnoses_by_disease = defaultdict(set)
+        self.diagnoses_by_doctor = defaultdict(set)
+        self.diagnoses_by_status = defaultdict(set)
+        self.prescriptions_by_patient = defaultdict(list)
+        self.prescriptions_by_doctor = defaultdict(set)
+        self.vitals_by_patient = defaultdict(list)
+        self.history_by_patient = defaultdict(list)
+
+    @classmethod
+    def from_env(cls, environ=None):
+        environ = os.environ if environ is None else environ
+        repository = cls(environ.get("MEMORY_SNAPSHOT_PATH") or None)
+        if repository.snapshot_path and os.path.exists(repository.snapshot_path):
+            repository.load(repository.snapshot_path)
+        return repository
+
+    # Writes
+
+    def _add_node(self, label, node):
+        self._nodes[label][node["name"]] = node
+        insort(self._sorted_names[label], node["name"])
+        if node.get("id") is not None:
+            self._names_by_id[label][node["id"]] = node["name"]
+
+    def create_person(self, id, name, age):
+        with self._lock:
+            if name in self.persons:
+                return self.persons[name]["id"] == id
+            self._add_node("Person", {"id": id, "name": name, "age": age})
+            return True
+
+    def create_disease(self, id, name, description):
+        with self._lock:
+            if name in self.diseases:
+                return self.diseases[name]["id"] == id
+            self._add_node("Disease", {"id": id, "name": name, "description": description})
+            return True
+
+    def create_relationship(self, id, person_name, disease_name):
+        with self._lock:
+            row = {"person_found": person_name in self.persons,
+                   "disease_found": disease_name in self.diseases, "created": False}
+            if row["person_found"] and row["disease_found"]:
+                edges = self.person_disease_edges[person_name]
+                if disease_name not in edges:
+                    edges[disease_name] = id
+                    self.disease_person_edges[disease_name].add(person_name)
+                row["created"] = edges[disease_name] == id
+            return row
+
+    def delete_relationship(self, person_name, disease_name):
+        with self._lock:
+            if self.person_disease_edges.get(person_name, {}).pop(disease_name, None) is None:
+                return False
+            self.disease_person_edges[disease_name].discard(person_name)
+            return True
+
+    def _add_diagnosis(self, diagnosis):
+        self.diagnoses[diagnosis["id"]] = diagnosis
+        self.diagnoses_by_patient[diagnosis["patient"]].append(diagnosis["id"])
+        self.diagnoses_by_disease[diagnosis["disease"]].add(diagnosis["id"])
+        self.diagnoses_by_doctor[diagnosis["doctor"]].add(diagnosis["id"])
+        self.diagnoses_by_status[diagnosis["status"]].add(diagnosis["id"])
+
+    def create_diagnosis(self, id, patient_name, disease_name, doctor_name, date, notes, severity):
+        with self._lock:
+            if patient_name not in self.persons or disease_name not in self.diseases:
+                return False
+            if id not in self.diagnoses:
+                self._add_diagnosis({"id": id, "patient": patient_name, "disease": disease_name,
+                                     "doctor": doctor_name, "date": date, "notes": notes,
+                                     "severity": severity, "status": ACTIVE_STATUS})
+            return True
+
+    def _add_history(self, entry):
+        self.history[entry["id"]] = entry
+        self.history_by_patient[entry["patient"]].append(entry["id"])
+
+    def add_history(self, id, patient_name, condition, date_diagnosed, resolved, notes, created_at):
+        with self._lock:
+            if patient_name not in self.persons:
+                return False
+            if id not in self.history:
+                self._add_history({"id": id, "patient": patient_name, "condition": condition,
+                                   "date_diagnosed": date_diagnosed, "resolved": resolved,
+                                   "notes": notes, "created_at": created_at})
+            return True
+
+    def _add_prescription(self, prescription):
+        self.prescriptions[prescription["id"]] = prescription
+        self.prescriptions_by_patient[prescription["patient"]].append(prescription["id"])
+        self.prescriptions_by_doctor[prescription["doctor"]].add(prescription["id"])
+
+    def add_prescription(self, id, patient_name, medication, dosage, frequency, doctor_name,
+                         duration, notes, prescribed_date):
+        with self._lock:
+            if patient_name not in self.persons:
+                return False
+            if id not in self.prescriptions:
+                self._add_prescription({"id": id, "patient": patient_name, "medication": medication,
+                                        "dosage": dosage, "frequency": frequency,
+                                        "doctor": doctor_name, "duration": duration, "notes": notes,
+                                        "prescribed_date": prescribed_date, "status": ACTIVE_STATUS})
+            return True
+
+    def _add_vitals(self, reading):
+        self.vitals[reading["id"]] = reading
+        self.vitals_by_patient[reading["patient"]].append(reading["id"])
+
+    def add_vitals(self, id, patient_name, notes, recorded_at, **vitals):
+        with self._lock:
+            if patient_name not in self.persons:
+                return False
+            if id not in self.vitals:
+                self._add_vitals(dict(vitals, id=id, patient=patient_name, notes=notes,
+                                      recorded_at=recorded_at))
+            return True
+
+    def update_diagnosis_status(self, patient_name, disease_name, status, notes, updated_at):
+        with self._lock:
+            previous = []
+            for diagnosis_id in self.diagnoses_by_patient.get(patient_name, ()):
+                diagnosis = self.diagnoses[diagnosis_id]
+                if diagnosis["disease"] != disease_name:
+                    continue
+                previous.append({"doctor": diagnosis["doctor"], "severity": diagnosis["severity"],
+                                 "previous_status": diagnosis["status"]})
+                self.diagnoses_by_status[diagnosis["status"]].discard(diagnosis_id)
+                self.diagnoses_by_status[status].add(diagnosis_id)
+                diagnosis["status"] = status
+                diagnosis["updated_at"] = updated_at
+                if notes != "":
+                    diagnosis["resolution_notes"] = notes
+            return previous
+
+    def bulk_create_persons(self, rows):
+        with self._lock:
+            return [{"index": row["index"],
+                     "created": self.create_person(row["id"], row["name"], row["age"])}
+                    for row in rows]
+
+    def bulk_create_diseases(self, rows):
+        with self._lock:
+            return [{"index": row["index"],
+                     "created": self.create_disease(row["id"], row["name"], row["description"])}
+                    for row in rows]
+
+    def bulk_create_relationships(self, rows):
+        with self._lock:
+            return [dict(self.create_relationship(row["id"], row["person_name"],
+                                                  row["disease_name"]),
+                         index=row["index"]) for row in rows]
+
+    def bulk_add_vitals(self, rows):
+        with self._lock:
+            return [{"index": row["index"]} for row in rows if self.add_vitals(
+                row["id"], row["patient"], row["notes"], row["recorded_at"],
+                **{key: value for key, value in row.items()
+                   if key not in ("index", "id", "patient", "notes", "recorded_at")})]
+
+    # Persons and diseases
+
+    def person_exists(self, name):
+        return name in self.persons
+
+    def existing_persons(self, names):
+        with self._lock:
+            return {name for name in names if name in self.persons}
+
+    def _disease_row(self, name):
+        disease = self.diseases[name]
+        return {"id": disease["id"], "name": name, "description": disease["description"]}
+
+    def person_diseases(self, name):
+        with self._lock:
+            return [self._disease_row(disease)
+                    for disease in self.person_disease_edges.get(name, {})]
+
+    def graph_patients(self, diseases, exclude, limit):
+        exclude = set(exclude)
+        with self._lock:
+            rows = []
+            for disease in diseases:
+                people = (name for name in self.disease_person_edges.get(disease, ())
+                          if name not in exclude)
+                rows += [{"disease": disease, "patient": name, "age": self.persons[name]["age"]}
+                         for name in heapq.nsmallest(limit, people)]
+            return rows
+
+    def graph_diseases(self, patients, limit):
+        with self._lock:
+            return [{"patient": patient, "disease": disease,
+                     "description": self.diseases[disease]["description"]}
+                    for patient in patients
+                    for disease in heapq.nsmallest(limit, self.person_disease_edges.get(patient, {}))]
+
+    def all_persons(self):
+        with self._lock:
+            return [dict(self.persons[name]) for name in self._sorted_names["Person"]]
+
+    def all_diseases(self):
+        with self._lock:
+            return [dict(self.diseases[name]) for name in self._sorted_names["Disease"]]
+
+    def list_rows(self, label, fields, after="", limit=None):
+        with self._lock:
+            names = self._sorted_names[label]
+            start = bisect_right(names, after or "")
+            selected = names[start:] if limit is None else names[start:start + limit]
+            nodes = self._nodes[label]
+            rows = [{field: nodes[name].get(field) for field in dict.fromkeys(["name"] + fields)}
+                    for name in selected]
+        return iter(rows)
+
+    def search(self, kind, search_term, query, mode, limit):
+        tokens = search_term.lower().split()
+        label, field = ("Person", "age") if kind == "patients" else ("Disease", "description")
+        with self._lock:
+            nodes = list(self._nodes[label].values())
+        matches = []
+        for node in nodes:
+            score = match_score(search_words(label, node), tokens, mode)
+            if score:
+                matches.append({"id": node["id"], "name": node["name"],
+                                field: node.get(field), "score": score})
+        matches.sort(key=lambda match: (-match["score"], match["name"]))
+        return matches[:limit]
+
+    def patient_details(self, name):
+        with self._lock:
+            person = self.persons.get(name)
+            if person is None:
+                return None
+            return dict(person, diseases=sorted(
+                (self._disease_row(disease) for disease in self.person_disease_edges.get(name, {})),
+                key=lambda disease: disease["name"]))
+
+    def node_id(self, label, name):
+        node = self._nodes[label].get(name)
+        return node["id"] if node else None
+
+    def node_name(self, label, node_id):
+        return self._names_by_id[label].get(node_id)
+
+    def node_ids(self, label, names):
+        nodes = self._nodes[label]
+        return {name: nodes[name]["id"] for name in names
+                if name in nodes and nodes[name]["id"] is not None}
+
+    # Medical records
+
+    def _records(self, records, index, patient_name):
+        return [records[record_id] for record_id in index.get(patient_name, ())]
+
+    def medical_record(self, name, sections, params):
+        with self._lock:
+            person = self.persons.get(name)
+            if person is None:
+                return None
+            row = {"id": person["id"], "name": name, "age": person["age"]}
+            if "diagnoses" in sections:
+                row["diagnoses"] = [
+                    {"disease": d["disease"], "doctor": d["doctor"], "date": _iso(d["date"]),
+                     "notes": d["notes"], "severity": d["severity"], "status": d["status"]}
+                    for d in _newest_first(self._records(
+                        self.diagnoses, self.diagnoses_by_patient, name), "date")]
+            if "prescriptions" in sections:
+                prescriptions = _newest_first(self._records(
+                    self.prescriptions, self.prescriptions_by_patient, name), "prescribed_date")
+                offset = params["prescriptions_offset"]
+                row["prescriptions"] = [
+                    {"medication": rx["medication"], "dosage": rx["dosage"],
+                     "frequency": rx["frequency"], "doctor": rx["doctor"],
+                     "duration": rx["duration"], "date": _iso(rx["prescribed_date"]),
+                     "status": rx["status"], "notes": rx["notes"]}
+                    for rx in prescriptions[offset:offset + params["prescriptions_limit"]]]
+                row["prescriptions_total"] = len(prescriptions)
+            if "vitals" in sections:
+                row["vitals"] = [
+                    {"blood_pressure": v.get("blood_pressure"), "systolic": v.get("systolic"),
+                     "diastolic": v.get("diastolic"), "heart_rate": v.get("heart_rate"),
+                     "temperature": v.get("temperature"), "weight": v.get("weight"),
+                     "height": v.get("height"), "bmi": v.get("bmi"), "date": _iso(v["recorded_at"])}
+                    for v in _newest_first(self._records(
+                        self.vitals, self.vitals_by_patient, name),
+                        "recorded_at")[:params["vitals_limit"]]]
+            if "medical_history" in sections:
+                history = _newest_first(self._records(
+                    self.history, self.history_by_patient, name), "date_diagnosed")
+                offset = params["history_offset"]
+                row["medical_history"] = [
+                    {"condition": h["condition"], "date_diagnosed": h["date_diagnosed"],
+                     "resolved": h["resolved"], "notes": h["notes"]}
+                    for h in history[offset:offset + params["history_limit"]]]
+                row["medical_history_total"] = len(history)
+            return row
+
+    def _active(self, diagnosis_ids=None):
+        active = self.diagnoses_by_status.get(ACTIVE_STATUS, set())
+        if diagnosis_ids is not None:
+            active = active & diagnosis_ids
+        return [self.diagnoses[diagnosis_id] for diagnosis_id in active]
+
+    def active_patients_with(self, disease_name):
+        with self._lock:
+            return [{"patient_id": self.persons[d["patient"]]["id"], "patient_name": d["patient"],
+                     "age": self.persons[d["patient"]]["age"], "doctor": d["doctor"],
+                     "diagnosed_date": _iso(d["date"]), "severity": d["severity"]}
+                    for d in _newest_first(self._active(
+                        self.diagnoses_by_disease.get(disease_name, set())), "date")]
+
+    def _timeline_events(self, name, event_type):
+        """(datetime, key, event) for one patient and event type."""
+        if event_type == "diagnosis":
+            for d in self._records(self.diagnoses, self.diagnoses_by_patient, name):
+                yield d["date"], d["id"], {"disease": d["disease"], "severity": d["severity"],
+                                           "status": d["status"]}
+        elif event_type == "prescription":
+            for rx in self._records(self.prescriptions, self.prescriptions_by_patient, name):
+                yield rx["prescribed_date"], rx["id"], {"item": rx["medication"],
+                                                        "status": rx["status"]}
+        else:
+            for v in self._records(self.vitals, self.vitals_by_patient, name):
+                yield v["recorded_at"], v["id"], {"item": "Vitals Recorded", "status": "active"}
+
+    def timeline_rows(self, name, event_type, since, until, limit, before, tie, before_key):
+        with self._lock:
+            events = list(self._timeline_events(name, event_type))
+        rows = []
+        for date, key, event in events:
+            if date is None or (since is not None and date < since) or (until is not None and date >= until):
+                continue
+            ts = _millis(date)
+            if before is not None and not (ts < before or (ts == before and tie and (
+                    before_key is None or key < before_key))):
+                continue
+            rows.append(dict(event, date=_iso(date), type=event_type, ts=ts, key=key))
+        rows.sort(key=lambda row: (row["ts"], row["key"]), reverse=True)
+        return rows[:limit]
+
+    # Hospital-wide reads
+
+    def _with_status(self, status):
+        if status is None:
+            return list(self.diagnoses.values())
+        return [self.diagnoses[i] for i in self.diagnoses_by_status.get(status, ())]
+
+    def diagnosis_rows(self):
+        with self._lock:
+            return [{"patient": d["patient"], "age": self.persons[d["patient"]]["age"],
+                     "disease": d["disease"], "severity": d["severity"], "status": d["status"]}
+                    for d in self.diagnoses.values()]
+
+    def overview_clusters(self, status):
+        with self._lock:
+            clusters = defaultdict(set)
+            for d in self._with_status(status):
+                clusters[(d["disease"], d["severity"] or UNKNOWN_SEVERITY)].add(d["patient"])
+        return [{"disease": disease, "severity": severity, "patients": len(patients)}
+                for (disease, severity), patients in clusters.items()]
+
+    def overview_links(self, diseases, status, limit):
+        with self._lock:
+            by_patient = defaultdict(set)
+            for disease in diseases:
+                for diagnosis_id in self.diagnoses_by_disease.get(disease, ()):
+                    d = self.diagnoses[diagnosis_id]
+                    if status is None or d["status"] == status:
+                        by_patient[d["patient"]].add(disease)
+        shared = Counter(pair for patient_diseases in by_patient.values()
+                         for pair in combinations(sorted(patient_diseases), 2))
+        rows = [{"source": source, "target": target, "shared": count}
+                for (source, target), count in shared.items()]
+        rows.sort(key=lambda row: (-row["shared"], row["source"], row["target"]))
+        return rows[:limit]
+
+    def cluster_patients(self, disease, severity, status, after, limit):
+        with self._lock:
+            rows = [{"patient": d["patient"], "age": self.persons[d["patient"]]["age"],
+                     "severity": d["severity"], "status": d["status"]}
+                    for d in (self.diagnoses[i] for i in self.diagnoses_by_disease.get(disease, ()))
+                    if (status is None or d["status"] == status)
+                    and (severity is None or (d["severity"] or UNKNOWN_SEVERITY) == severity)
+                    and (after is None or d["patient"] > after)]
+        rows.sort(key=lambda row: row["patient"])
+        return rows[:limit]
+
+    def active_diagnoses(self):
+        with self._lock:
+            return [{"patient": d["patient"], "disease": d["disease"]} for d in self._active()]
+
+    def stats_rows(self):
+        with self._lock:
+            diagnoses = Counter((d["disease"], d["severity"], d["status"], d["doctor"])
+                                for d in self.diagnoses.values())
+            doctor_patients = Counter((d["doctor"], d["patient"]) for d in self.diagnoses.values()
+                                      if d["doctor"] is not None)
+            prescriptions = Counter(rx["doctor"] for rx in self.prescriptions.values()
+                                    if rx["doctor"] is not None)
+        return (
+            [{"disease": disease, "severity": severity, "status": status, "doctor": doctor,
+              "diagnoses": count} for (disease, severity, status, doctor), count in diagnoses.items()],
+            [{"doctor": doctor, "patient": patient, "diagnoses": count}
+             for (doctor, patient), count in doctor_patients.items()],
+            [{"doctor": doctor, "prescriptions": count} for doctor, count in prescriptions.items()],
+        )
+
+    def similarity_rows(self):
+        with self._lock:
+            diagnoses = [{"patient": d["patient"], "disease": d["disease"], "severity": d["severity"]}
+                         for d in self.diagnoses.values() if d["status"] != "resolved"]
+            medications = {(rx["patient"], rx["medication"]) for rx in self.prescriptions.values()
+                           if rx["medication"] is not None}
+        return diagnoses, [{"patient": patient, "medication": medication}
+                           for patient, medication in medications]
+
+    def disease_distribution(self):
+        with self._lock:
+            counts = Counter(d["disease"] for d in self._active())
+        return [{"disease": disease, "patient_count": count}
+                for disease, count in counts.most_common(10)]
+
+    def severity_distribution(self):
+        with self._lock:
+            counts = Counter(d["severity"] for d in self._active())
+        return [{"severity": severity, "count": count} for severity, count in counts.items()]
+
+    def doctor_stats(self, doctor):
+        with self._lock:
+            diagnoses = [self.diagnoses[i] for i in self.diagnoses_by_doctor.get(doctor, ())]
+            prescriptions = len(self.prescriptions_by_doctor.get(doctor, ()))
+        return {
+            "patients": [{"total_patients": len({d["patient"] for d in diagnoses})}],
+            "severity": [{"severity": severity, "count": count}
+                         for severity, count in Counter(d["severity"] for d in diagnoses).items()],
+            "diseases": [{"disease": disease, "count": count}
+                         for disease, count in Counter(d["disease"] for d in diagnoses).most_common(5)],
+            "prescriptions": [{"total_prescriptions": prescriptions}],
+        }
+
+    def disease_network(self, disease):
+        with self._lock:
+            rows = []
+            for diagnosis_id in self.diagnoses_by_disease.get(disease, ()):
+                patient = self.diagnoses[diagnosis_id]["patient"]
+                age = self.persons[patient]["age"]
+                others = [d for d in self._records(self.diagnoses, self.diagnoses_by_patient, patient)
+                          if d["disease"] != disease and d["status"] == ACTIVE_STATUS]
+                rows += [{"patient": patient, "age": age, "other_disease": d["disease"],
+                          "severity": d["severity"]} for d in others] or [
+                    {"patient": patient, "age": age, "other_disease": None, "severity": None}]
+            return rows
+
+    # Operations
+
+    def counts(self):
+        with self._lock:
+            return {"persons": len(self.persons), "diseases": len(self.diseases),
+                    "relationships": sum(len(edges) for edges in self.person_disease_edges.values()),
+                    "diagnoses": len(self.diagnoses), "prescriptions": len(self.prescriptions),
+                    "vitals": len(self.vitals), "medical_history": len(self.history)}
+
+    def check_ready(self):
+        return True, {"backend": self.backend, **self.counts()}
+
+    def snapshot(self):
+        """The whole graph as JSON-serialisable lists."""
+        with self._lock:
+            records = {kind: [dict(record, **{field: _iso(record.get(field))
+                                              for field in fields if field in record})
+                              for record in getattr(self, kind).values()]
+                       for kind, fields in DATETIME_FIELDS.items()}
+            return {
+                "version": SNAPSHOT_VERSION,
+                "persons": [dict(self.persons[name]) for name in self._sorted_names["Person"]],
+                "diseases": [dict(self.diseases[name]) for name in self._sorted_names["Disease"]],
+                "relationships": [[person, disease, edge_id]
+                                  for person, edges in self.person_disease_edges.items()
+                                  for disease, edge_id in edges.items()],
+                **records,
+            }
+
+    def restore(self, snapshot):
+        """Replace the graph with a snapshot() result."""
+        if snapshot.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {snapshot.get('version')}")
+        with self._lock:
+            self.__init__(self.snapshot_path)
+            for person in snapshot["persons"]:
+                self._add_node("Person", person)
+            for disease in snapshot["diseases"]:
+                self._add_node("Disease", disease)
+            for person, disease, edge_id in snapshot["relationships"]:
+                self.person_disease_edges[person][disease] = edge_id
+                self.disease_person_edges[disease].add(person)
+            adders = {"diagnoses": self._add_diagnosis, "prescriptions": self._add_prescription,
+                      "vitals": self._add_vitals, "history": self._add_history}
+            for kind, fields in DATETIME_FIELDS.items():
+                for record in snapshot[kind]:
+                    adders[kind](dict(record, **{field: to_datetime(record.get(field))
+                                                 for field in fields if field in record}))
+
+    def save(self, path=None):
+        """Write a snapshot atomically to path (default: the snapshot path)."""
+        path = path or self.snapshot_path
+        data = json.dumps(self.snapshot())
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as f:
+            f.write(data)
+        os.replace(temporary, path)
+
+    def load(self, path=None):
+        with open(path or self.snapshot_path) as f:
+            self.restore(json.load(f))
+
+    def close(self):
+        if self.snapshot_path:
+            self.save()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+"""Typed property model for the values MedGraph writes to Neo4j.
+
+Timestamps (DIAGNOSED_WITH date/updated_at, Prescription prescribed_date,
+VitalSigns recorded_at, MedicalHistory created_at, SchemaMigration
+applied_at) are stored as native DATETIME values instead of ISO strings.
+Vital signs are stored as floats, and blood pressure also as numeric
+systolic/diastolic. The range indexes on these properties then order and
+filter by value, and Cypher can aggregate them directly. Timestamps without
+an offset are read as local time, as datetime.now() wrote them.
+
+Reads project timestamps with toString(), so API responses stay ISO strings.
+
+    python -m app.model               # count values still stored as strings
+    python -m app.model --migrate     # convert them in batches
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+from datetime import datetime
+from app.vitals_store import parse_blood_pressure
+
+VITAL_NUMBERS = ("heart_rate", "temperature", "weight", "height", "bmi")
+
+# (name, match pattern binding x, temporal properties, numeric properties)
+MIGRATION_TARGETS = (
+    ("DIAGNOSED_WITH", "()-[x:DIAGNOSED_WITH]->()", ("date", "updated_at"), ()),
+    ("Prescription", "(x:Prescription)", ("prescribed_date",), ()),
+    ("MedicalHistory", "(x:MedicalHistory)", ("created_at",), ()),
+    ("VitalSigns", "(x:VitalSigns)", ("recorded_at",), VITAL_NUMBERS),
+    ("SchemaMigration", "(x:SchemaMigration)", ("applied_at",), ()),
+)
+DEFAULT_MIGRATION_BATCH = 1000
+
+
+def now():
+    """The current time as a timezone-aware datetime (a Neo4j DATETIME parameter)."""
+    return datetime.now().astimezone()
+
+
+def to_datetime(value):
+    """Timezone-aware datetime from a datetime, ISO string or Neo4j DateTime; None stays None.
+
+    Naive values are taken as local time. Raises ValueError for anything else.
+    """
+    if value is None:
+        return None
+    if hasattr(value, "to_native"):
+        value = value.to_native()
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+        except ValueError:
+            raise ValueError(f"Invalid timestamp '{value}'; expected ISO 8601")
+    if not isinstance(value, datetime):
+        raise ValueError(f"Invalid timestamp {value!r}; expected ISO 8601")
+    return value if value.tzinfo is not None else value.astimezone()
+
+
+def iso_millis(millis):
+    """ISO 8601 string, with the local offset, for epoch milliseconds."""
+    return datetime.fromtimestamp(millis / 1000).astimezone().isoformat()
+
+
+def to_number(value, name):
+    """Float from a number or numeric string; None and "" give None."""
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid {name}; expected a number")
+
+
+def vital_properties(blood_pressure=None, heart_rate=None, temperature=None, weight=None,
+                     height=None):
+    """Typed VitalSigns properties; raises ValueError for non-numeric input."""
+    properties = {name: to_number(value, name) for name, value in (
+        ("heart_rate", heart_rate), ("temperature", temperature),
+        ("weight", weight), ("height", height))}
+    systolic = diastolic = None
+    if blood_pressure not in (None, ""):
+        systolic, diastolic = parse_blood_pressure(blood_pressure)
+        if systolic is None:
+            raise ValueError("Invalid blood_pressure; expected 'systolic/diastolic'")
+        blood_pressure = f"{systolic:g}/{diastolic:g}"
+    else:
+        blood_pressure = None
+    properties.update(blood_pressure=blood_pressure, systolic=systolic, diastolic=diastolic)
+    return properties
+
+
+def typed_properties(properties, temporal=(), numeric=()):
+    """The property updates that convert one node or relationship to typed values.
+
+    Values that cannot be converted are moved to `<name>_raw` and the typed
+    property is cleared, so every migrated entity stops matching the
+    migration query.
+    """
+    updates = {}
+
+    def give_up(name, value):
+        updates[name] = None
+        updates[f"{name}_raw"] = value
+
+    for name in temporal:
+        value = properties.get(name)
+        if isinstance(value, str):
+            try:
+                updates[name] = to_datetime(value)
+            except ValueError:
+                give_up(name, value)
+    for name in numeric:
+        value = properties.get(name)
+        if isinstance(value, str):
+            try:
+                updates[name] = to_number(value, name)
+            except ValueError:
+                give_up(name, value)
+    value = properties.get("blood_pressure")
+    if numeric and value is not None and properties.get("systolic") is None:
+        systolic, diastolic = parse_blood_pressure(value)
+        if systolic is None:
+            give_up("blood_pressure", value)
+        else:
+            updates.update(systolic=systolic, diastolic=diastolic)
+    return updates
+
+
+def _untyped_filter(numeric):
+    condition = ("any(key IN $temporal WHERE x[key] = toString(x[key]))"
+                 " OR any(key IN $numeric WHERE x[key] = toString(x[key]))")
+    if numeric:
+        condition += " OR (x.blood_pressure IS NOT NULL AND x.systolic IS NULL)"
+    return condition
+
+
+def untyped_query(pattern, numeric, limit=True):
+    """Entities of pattern that still have string timestamps or vitals."""
+    query = f"MATCH {pattern}\nWHERE {_untyped_filter(numeric)}\n"
+    if limit:
+        return query + "RETURN elementId(x) AS id, properties(x) AS properties\nLIMIT $batch_size"
+    return query + "RETURN count(x) AS count"
+
+
+def update_query(pattern):
+    return f"""
+        UNWIND $rows AS row
+        MATCH {pattern}
+        WHERE elementId(x) = row.id
+        SET x += row.properties
+    """
+
+
+def count_untyped(manager):
+    """{target name: entities still holding string values}; manager is an app.db.DriverManager."""
+    counts = {}
+    with manager.read_session() as session:
+        for name, pattern, temporal, numeric in MIGRATION_TARGETS:
+            counts[name] = session.run(untyped_query(pattern, numeric, limit=False),
+                                       temporal=list(temporal), numeric=list(numeric)).single()["count"]
+    return counts
+
+
+def _migrate_batch(tx, pattern, temporal, numeric, batch_size):
+    """Convert one batch in the transaction tx; returns the number of entities converted."""
+    rows = tx.run(untyped_query(pattern, numeric), temporal=list(temporal),
+                  numeric=list(numeric), batch_size=batch_size).data()
+    if rows:
+        updates = [{"id": row["id"],
+                    "properties": typed_properties(row["properties"], temporal, numeric)}
+                   for row in rows]
+        tx.run(update_query(pattern), rows=updates).consume()
+    return len(rows)
+
+
+def migrate(manager, batch_size=DEFAULT_MIGRATION_BATCH):
+    """Convert string timestamps and vitals to typed values, batch_size entities per transaction.
+
+    Each batch is read and rewritten in one managed transaction through
+    manager.execute_write, so transient failures are retried. Safe to re-run:
+    converted entities no longer match, so an interrupted run continues where
+    it stopped. Returns {target name: entities converted}.
+    """
+    converted = {}
+    for name, pattern, temporal, numeric in MIGRATION_TARGETS:
+        converted[name] = 0
+        while True:
+            count = manager.execute_write(_migrate_batch, pattern, temporal, numeric, batch_size)
+            if not count:
+                break
+            converted[name] += count
+    return converted
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert MedGraph properties to typed values.")
+    parser.add_argument("--migrate", action="store_true",
+                        help="Convert string timestamps and vitals in place")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_MIGRATION_BATCH)
+    args = parser.parse_args(argv)
+
+    from app.main import driver_manager
+
+    if args.migrate:
+        for name, count in migrate(driver_manager, args.batch_size).items():
+            print(f"{name}: converted {count}")
+    for name, count in count_untyped(driver_manager).items():
+        print(f"{name}: {count} with untyped values")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
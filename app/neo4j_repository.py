@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+"""The Neo4j repository: every operation is one or a few Cypher queries.
+
+Reads run on read sessions and writes as retried managed transactions
+through the DriverManager (app.db), so in a cluster reads go to followers.
+The neo4j package is imported with the driver, on first use, and the
+comorbidity module (NumPy, SciPy) only when its query is run.
+"""
+
+from app.repository import Repository
+from app.queries import (PERSON_DISEASES_QUERY, ALL_PERSONS_QUERY, ALL_DISEASES_QUERY,
+                         PERSON_EXISTS_QUERY, PATIENT_QUERY, PATIENT_DISEASES_QUERY,
+                         build_list_query, FULLTEXT_SEARCH_QUERY, CONTAINS_SEARCH_QUERY,
+                         SEARCH_TARGETS, build_medical_record_query,
+                         ACTIVE_PATIENTS_WITH_DISEASE_QUERY, OVERVIEW_QUERY,
+                         DISEASE_DISTRIBUTION_QUERY, SEVERITY_DISTRIBUTION_QUERY,
+                         DOCTOR_STATS_QUERIES, DISEASE_NETWORK_QUERY)
+from app.writes import (CREATE_PERSON_QUERY, CREATE_DISEASE_QUERY, CREATE_RELATIONSHIP_QUERY,
+                        DELETE_RELATIONSHIP_QUERY, CREATE_DIAGNOSIS_QUERY, ADD_HISTORY_QUERY,
+                        ADD_PRESCRIPTION_QUERY, ADD_VITALS_QUERY, UPDATE_DIAGNOSIS_STATUS_QUERY,
+                        BULK_PERSONS_QUERY, BULK_DISEASES_QUERY, BULK_RELATIONSHIPS_QUERY,
+                        BULK_VITALS_QUERY, PERSONS_EXIST_QUERY, written)
+from app.ids import ID_BY_NAME_QUERY, NAME_BY_ID_QUERY, IDS_BY_NAMES_QUERY
+from app.overview_graph import (OVERVIEW_CLUSTERS_QUERY, OVERVIEW_LINKS_QUERY,
+                                OVERVIEW_CLUSTER_PATIENTS_QUERY)
+from app.timeline import TIMELINE_STREAM_QUERIES
+from app.person_graph import GRAPH_PATIENTS_QUERY, GRAPH_DISEASES_QUERY
+from app.stats import STATS_DIAGNOSES_QUERY, STATS_DOCTOR_PATIENTS_QUERY, STATS_PRESCRIPTIONS_QUERY
+
+
+class Neo4jRepository(Repository):
+    backend = "neo4j"
+
+    def __init__(self, driver_manager):
+        self.manager = driver_manager
+
+    def _write(self, query, **params):
+        return self.manager.execute_write(lambda tx: tx.run(query, params).data())
+
+    def _read(self, query, **params):
+        with self.manager.read_session() as session:
+            return session.run(query, params).data()
+
+    def _single(self, query, **params):
+        with self.manager.read_session() as session:
+            record = session.run(query, params).single()
+            return record[0] if record else None
+
+    # Writes
+
+    def create_person(self, id, name, age):
+        return self._write(CREATE_PERSON_QUERY, id=id, name=name, age=age)[0]["created"]
+
+    def create_disease(self, id, name, description):
+        return self._write(CREATE_DISEASE_QUERY, id=id, name=name,
+                           description=description)[0]["created"]
+
+    def create_relationship(self, id, person_name, disease_name):
+        return self._write(CREATE_RELATIONSHIP_QUERY, id=id, person_name=person_name,
+                           disease_name=disease_name)[0]
+
+    def delete_relationship(self, person_name, disease_name):
+        return written(self._write(DELETE_RELATIONSHIP_QUERY, person_name=person_name,
+                                   disease_name=disease_name))
+
+    def create_diagnosis(self, id, patient_name, disease_name, doctor_name, date, notes, severity):
+        return written(self._write(CREATE_DIAGNOSIS_QUERY, id=id, patient_name=patient_name,
+                                   disease_name=disease_name, doctor_name=doctor_name,
+                                   date=date, notes=notes, severity=severity))
+
+    def add_history(self, id, patient_name, condition, date_diagnosed, resolved, notes, created_at):
+        return written(self._write(ADD_HISTORY_QUERY, id=id, patient_name=patient_name,
+                                   condition=condition, date_diagnosed=date_diagnosed,
+                                   resolved=resolved, notes=notes, created_at=created_at))
+
+    def add_prescription(self, id, patient_name, medication, dosage, frequency, doctor_name,
+                         duration, notes, prescribed_date):
+        return written(self._write(ADD_PRESCRIPTION_QUERY, id=id, patient_name=patient_name,
+                                   medication=medication, dosage=dosage, frequency=frequency,
+                                   doctor_name=doctor_name, duration=duration, notes=notes,
+                                   prescribed_date=prescribed_date))
+
+    def add_vitals(self, id, patient_name, notes, recorded_at, **vitals):
+        return written(self._write(ADD_VITALS_QUERY, id=id, patient_name=patient_name,
+                                   notes=notes, recorded_at=recorded_at, **vitals))
+
+    def update_diagnosis_status(self, patient_name, disease_name, status, notes, updated_at):
+        return self._write(UPDATE_DIAGNOSIS_STATUS_QUERY, patient_name=patient_name,
+                           disease_name=disease_name, status=status, notes=notes,
+                           updated_at=updated_at)
+
+    def bulk_create_persons(self, rows):
+        return self._write(BULK_PERSONS_QUERY, rows=rows)
+
+    def bulk_create_diseases(self, rows):
+        return self._write(BULK_DISEASES_QUERY, rows=rows)
+
+    def bulk_create_relationships(self, rows):
+        return self._write(BULK_RELATIONSHIPS_QUERY, rows=rows)
+
+    def bulk_add_vitals(self, rows):
+        return self._write(BULK_VITALS_QUERY, rows=rows)
+
+    # Persons and diseases
+
+    def person_exists(self, name):
+        return self._single(PERSON_EXISTS_QUERY, name=name) > 0
+
+    def existing_persons(self, names):
+        return {row["name"] for row in self._read(PERSONS_EXIST_QUERY, names=list(names))
+                if row["found"]}
+
+    def person_diseases(self, name):
+        return self._read(PERSON_DISEASES_QUERY, name=name)
+
+    def graph_patients(self, diseases, exclude, limit):
+        return self._read(GRAPH_PATIENTS_QUERY, diseases=list(diseases), exclude=list(exclude),
+                          limit=limit)
+
+    def graph_diseases(self, patients, limit):
+        return self._read(GRAPH_DISEASES_QUERY, patients=list(patients), limit=limit)
+
+    def all_persons(self):
+        return self._read(ALL_PERSONS_QUERY)
+
+    def all_diseases(self):
+        return self._read(ALL_DISEASES_QUERY)
+
+    def list_rows(self, label, fields, after="", limit=None):
+        # A generator, so streams are read straight from the open result cursor
+        with self.manager.read_session() as session:
+            params = {"after": after or ""} if limit is None else {"after": after or "", "limit": limit}
+            for record in session.run(build_list_query(label, fields, limit), params):
+                yield dict(record)
+
+    def search(self, kind, search_term, query, mode, limit):
+        from neo4j.exceptions import ClientError
+        label, index, field = SEARCH_TARGETS[kind]
+        with self.manager.read_session() as session:
+            try:
+                return session.run(FULLTEXT_SEARCH_QUERY.format(field=field),
+                                   index=index, query=query, limit=limit).data()
+            except ClientError as e:
+                print(f"Full-text search unavailable, falling back to CONTAINS: {str(e)}")
+                return session.run(CONTAINS_SEARCH_QUERY.format(label=label, field=field),
+                                   search_term=search_term, limit=limit).data()
+
+    def patient_details(self, name):
+        with self.manager.read_session() as session:
+            patient = session.run(PATIENT_QUERY, name=name).single()
+            if not patient:
+                return None
+            return dict(patient, diseases=session.run(PATIENT_DISEASES_QUERY, name=name).data())
+
+    def node_id(self, label, name):
+        return self._single(ID_BY_NAME_QUERY.format(label=label), name=name)
+
+    def node_name(self, label, node_id):
+        return self._single(NAME_BY_ID_QUERY.format(label=label), id=node_id)
+
+    def node_ids(self, label, names):
+        return {row["name"]: row["id"]
+                for row in self._read(IDS_BY_NAMES_QUERY.format(label=label), names=names)
+                if row["id"] is not None}
+
+    # Medical records
+
+    def medical_record(self, name, sections, params):
+        with self.manager.read_session() as session:
+            record = session.run(build_medical_record_query(sections), params).single()
+            return dict(record) if record else None
+
+    def active_patients_with(self, disease_name):
+        return self._read(ACTIVE_PATIENTS_WITH_DISEASE_QUERY, disease_name=disease_name)
+
+    def timeline_rows(self, name, event_type, since, until, limit, before, tie, before_key):
+        return self._read(TIMELINE_STREAM_QUERIES[event_type], name=name, since=since,
+                          until=until, limit=limit, before=before, tie=tie, before_key=before_key)
+
+    # Hospital-wide reads
+
+    def diagnosis_rows(self):
+        return self._read(OVERVIEW_QUERY)
+
+    def overview_clusters(self, status):
+        return self._read(OVERVIEW_CLUSTERS_QUERY, status=status)
+
+    def overview_links(self, diseases, status, limit):
+        return self._read(OVERVIEW_LINKS_QUERY, diseases=diseases, status=status, limit=limit)
+
+    def cluster_patients(self, disease, severity, status, after, limit):
+        return self._read(OVERVIEW_CLUSTER_PATIENTS_QUERY, disease=disease, severity=severity,
+                          status=status, after=after, limit=limit)
+
+    def active_diagnoses(self):
+        from app.comorbidity import ACTIVE_DIAGNOSES_QUERY
+        return self._read(ACTIVE_DIAGNOSES_QUERY)
+
+    def stats_rows(self):
+        with self.manager.read_session() as session:
+            return tuple(session.run(query).data() for query in
+                         (STATS_DIAGNOSES_QUERY, STATS_DOCTOR_PATIENTS_QUERY,
+                          STATS_PRESCRIPTIONS_QUERY))
+
+    def similarity_rows(self):
+        from app.similarity import SIMILARITY_DIAGNOSES_QUERY, SIMILARITY_PRESCRIPTIONS_QUERY
+        with self.manager.read_session() as session:
+            return tuple(session.run(query).data() for query in
+                         (SIMILARITY_DIAGNOSES_QUERY, SIMILARITY_PRESCRIPTIONS_QUERY))
+
+    def disease_distribution(self):
+        return self._read(DISEASE_DISTRIBUTION_QUERY)
+
+    def severity_distribution(self):
+        return self._read(SEVERITY_DISTRIBUTION_QUERY)
+
+    def doctor_stats(self, doctor):
+        with self.manager.read_session() as session:
+            return {key: session.run(query, doctor=doctor).data()
+                    for key, query in DOCTOR_STATS_QUERIES.items()}
+
+    def disease_network(self, disease):
+        return self._read(DISEASE_NETWORK_QUERY, disease=disease)
+
+    def check_ready(self):
+        return self.manager.check_ready()
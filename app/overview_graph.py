@@ -0,0 +1,257 @@
+#!/usr/bin/env python
+"""Level-of-detail hospital overview graph as vis.js JSON.
+
+Instead of drawing every DIAGNOSED_WITH edge, the overview is aggregated in
+Cypher and returned in three levels:
+
+    disease   one cluster node per disease, sized by patient count, with
+              shared-patient edges between diseases
+    severity  each disease split into one cluster node per severity
+    cluster   the patients of one disease (optionally one severity), paged
+              with a keyset cursor
+
+Every response is capped at max_nodes / max_edges and reports whether it was
+truncated, plus how long the query, build and serialise phases took.
+"""
+
+import json
+import time
+from contextlib import contextmanager
+
+OVERVIEW_LEVELS = ("disease", "severity")
+OVERVIEW_STATUSES = ("active", "all")
+DEFAULT_MAX_NODES = 200
+DEFAULT_MAX_EDGES = 500
+MAX_NODES = 2000
+MAX_EDGES = 5000
+
+SEVERITY_COLORS = {
+    "mild": "#2ecc71",
+    "moderate": "#f39c12",
+    "severe": "#e74c3c",
+    "critical": "#9b59b6",
+}
+UNKNOWN_SEVERITY = "unknown"
+DISEASE_COLOR = "#e74c3c"
+PATIENT_COLOR = "#3498db"
+DEFAULT_EDGE_COLOR = "#95a5a6"
+
+OVERVIEW_CLUSTERS_QUERY = """
+    MATCH (p:Person)-[r:DIAGNOSED_WITH]->(d:Disease)
+    WHERE $status IS NULL OR r.status = $status
+    RETURN d.name AS disease, coalesce(r.severity, 'unknown') AS severity,
+           count(DISTINCT p) AS patients
+"""
+
+# Patients shared by two of the displayed diseases, strongest pairs first
+OVERVIEW_LINKS_QUERY = """
+    MATCH (d1:Disease)<-[r1:DIAGNOSED_WITH]-(p:Person)-[r2:DIAGNOSED_WITH]->(d2:Disease)
+    WHERE d1.name IN $diseases AND d2.name IN $diseases AND d1.name < d2.name
+      AND ($status IS NULL OR (r1.status = $status AND r2.status = $status))
+    RETURN d1.name AS source, d2.name AS target, count(DISTINCT p) AS shared
+    ORDER BY shared DESC, source, target
+    LIMIT $limit
+"""
+
+OVERVIEW_CLUSTER_PATIENTS_QUERY = """
+    MATCH (p:Person)-[r:DIAGNOSED_WITH]->(d:Disease {name: $disease})
+    WHERE ($status IS NULL OR r.status = $status)
+      AND ($severity IS NULL OR coalesce(r.severity, 'unknown') = $severity)
+      AND ($after IS NULL OR p.name > $after)
+    RETURN p.name AS patient, p.age AS age, r.severity AS severity, r.status AS status
+    ORDER BY p.name
+    LIMIT $limit
+"""
+
+
+class PhaseTimer:
+    """Wall-clock milliseconds per named phase, reported in meta and Server-Timing."""
+
+    def __init__(self):
+        self.timings = {}
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            self.timings[name] = round(self.timings.get(name, 0) + elapsed, 3)
+
+
+def overview_limits(max_nodes=None, max_edges=None):
+    """Validate and clamp the per-response caps."""
+    max_nodes = DEFAULT_MAX_NODES if max_nodes is None else int(max_nodes)
+    max_edges = DEFAULT_MAX_EDGES if max_edges is None else int(max_edges)
+    if max_nodes < 1 or max_edges < 0:
+        raise ValueError("max_nodes must be at least 1 and max_edges at least 0")
+    return min(max_nodes, MAX_NODES), min(max_edges, MAX_EDGES)
+
+
+def status_param(status):
+    """Map the status filter to the $status query parameter (None means all)."""
+    if status not in OVERVIEW_STATUSES:
+        raise ValueError(f"Unknown status '{status}'; expected one of {', '.join(OVERVIEW_STATUSES)}")
+    return None if status == "all" else status
+
+
+def check_level(level):
+    if level not in OVERVIEW_LEVELS:
+        raise ValueError(f"Unknown level '{level}'; expected one of {', '.join(OVERVIEW_LEVELS)}")
+    return level
+
+
+def disease_node_id(disease):
+    return f"disease:{disease}"
+
+
+def severity_node_id(disease, severity):
+    return f"cluster:{disease}:{severity}"
+
+
+def patient_node_id(patient):
+    return f"patient:{patient}"
+
+
+def _node_size(patients):
+    # Area rather than radius grows with the patient count
+    return round(10 + 4 * patients ** 0.5, 1)
+
+
+def summarize_clusters(rows):
+    """Group OVERVIEW_CLUSTERS_QUERY rows into [(disease, total, {severity: count})], largest first."""
+    clusters = {}
+    for row in rows:
+        severities = clusters.setdefault(row["disease"], {})
+        severities[row["severity"]] = severities.get(row["severity"], 0) + row["patients"]
+    summary = [(disease, sum(severities.values()), severities)
+               for disease, severities in clusters.items()]
+    summary.sort(key=lambda item: (-item[1], item[0]))
+    return summary
+
+
+def select_clusters(summary, level, max_nodes):
+    """Keep the largest diseases whose nodes fit within max_nodes."""
+    check_level(level)
+    selected = []
+    used = 0
+    for disease, total, severities in summary:
+        cost = 1 + (len(severities) if level == "severity" else 0)
+        if used + cost > max_nodes:
+            break
+        selected.append((disease, total, severities))
+        used += cost
+    return selected
+
+
+def build_overview_graph(selected, links, level, max_edges, total_diseases):
+    """Build vis.js nodes/edges for the disease or severity level.
+
+    Patient counts are distinct patients per disease/severity and a disease's
+    total is the sum of its severities, so a patient diagnosed twice with
+    different severities counts twice.
+    """
+    nodes = []
+    edges = []
+    for disease, total, severities in selected:
+        breakdown = ", ".join(f"{severity}: {count}" for severity, count in sorted(severities.items()))
+        nodes.append({
+            "id": disease_node_id(disease), "label": f"{disease} ({total})",
+            "group": "disease", "shape": "dot", "color": DISEASE_COLOR,
+            "size": _node_size(total), "value": total,
+            "title": f"Disease: {disease}\nPatients: {total}\n{breakdown}",
+            "cluster": {"disease": disease},
+        })
+        if level == "severity":
+            for severity, count in sorted(severities.items()):
+                color = SEVERITY_COLORS.get(severity, DEFAULT_EDGE_COLOR)
+                nodes.append({
+                    "id": severity_node_id(disease, severity), "label": f"{severity} ({count})",
+                    "group": "severity", "shape": "dot", "color": color,
+                    "size": _node_size(count), "value": count,
+                    "title": f"{disease} / {severity}\nPatients: {count}",
+                    "cluster": {"disease": disease, "severity": severity},
+                })
+                edges.append({"from": disease_node_id(disease),
+                              "to": severity_node_id(disease, severity), "color": color})
+
+    edges_truncated = len(edges) > max_edges
+    edges = edges[:max_edges]
+    for link in links:
+        if len(edges) >= max_edges:
+            edges_truncated = True
+            break
+        edges.append({
+            "from": disease_node_id(link["source"]), "to": disease_node_id(link["target"]),
+            "value": link["shared"], "title": f"Shared patients: {link['shared']}",
+            "color": DEFAULT_EDGE_COLOR, "dashes": True,
+        })
+
+    return {
+        "nodes": nodes,
+        "edges": edges,
+        "meta": {
+            "level": level,
+            "node_count": len(nodes),
+            "edge_count": len(edges),
+            "diseases_shown": len(selected),
+            "diseases_total": total_diseases,
+            "truncated": len(selected) < total_diseases or edges_truncated,
+        },
+    }
+
+
+def build_cluster_expansion(disease, severity, rows, max_nodes):
+    """Build the patient nodes of one cluster from up to max_nodes + 1 query rows.
+
+    The extra row only signals that another page exists; next_after is the
+    cursor to pass back as `after`.
+    """
+    rows = list(rows)
+    has_more = len(rows) > max_nodes
+    rows = rows[:max_nodes]
+    parent = severity_node_id(disease, severity) if severity else disease_node_id(disease)
+
+    nodes = []
+    edges = []
+    seen = set()
+    for row in rows:
+        node_id = patient_node_id(row["patient"])
+        row_severity = row["severity"] or UNKNOWN_SEVERITY
+        color = SEVERITY_COLORS.get(row_severity, DEFAULT_EDGE_COLOR)
+        if node_id not in seen:
+            seen.add(node_id)
+            nodes.append({
+                "id": node_id, "label": row["patient"], "group": "patient",
+                "shape": "circle", "color": PATIENT_COLOR,
+                "title": f"Patient: {row['patient']}\nAge: {row['age']}",
+            })
+        edges.append({"from": node_id, "to": parent, "color": color,
+                      "title": f"Severity: {row_severity}\nStatus: {row['status']}"})
+
+    return {
+        "nodes": nodes,
+        "edges": edges,
+        "meta": {
+            "level": "cluster",
+            "parent": parent,
+            "node_count": len(nodes),
+            "edge_count": len(edges),
+            "truncated": has_more,
+            "next_after": rows[-1]["patient"] if has_more else None,
+        },
+    }
+
+
+def serialize_graph(graph, timer):
+    """Return (JSON body, Server-Timing header) for a graph.
+
+    Query and build timings are included in meta.timing_ms; the serialise time
+    can only be reported in the header.
+    """
+    graph["meta"]["timing_ms"] = dict(timer.timings)
+    with timer.phase("serialize"):
+        body = json.dumps(graph)
+    header = ", ".join(f"{name};dur={ms}" for name, ms in timer.timings.items())
+    return body, header
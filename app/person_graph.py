@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+"""A person's disease graph as vis.js JSON, built straight from the query rows.
+
+/api/graph/<name> returns the person and their HAS_DISEASE diseases. With
+?depth= it walks further, one batched query and one bounded hop at a time:
+
+    1  the person's diseases
+    2  other people with those diseases
+    3  those people's diseases
+
+?limits= caps each hop: diseases of the person, people per disease, and
+diseases per person. Queries ask for one row more than the cap, so meta
+reports which hops were truncated. Node ids are the person and disease
+names, as the frontend expects.
+
+Each response carries an ETag of its body. A request whose If-None-Match
+names the current ETag is answered 304 Not Modified without a body.
+"""
+
+import json
+import hashlib
+from app.overview_graph import PATIENT_COLOR
+
+GRAPH_DEPTHS = (1, 2, 3)
+DEFAULT_DEPTH = 1
+DEFAULT_HOP_LIMITS = (50, 10, 10)
+MAX_HOP_LIMITS = (500, 100, 100)
+
+PERSON_COLOR = "blue"
+DISEASE_COLOR = "green"
+
+# Hop 2: up to $limit other people per disease, by name
+GRAPH_PATIENTS_QUERY = """
+    UNWIND $diseases AS disease
+    CALL {
+        WITH disease
+        MATCH (:Disease {name: disease})<-[:HAS_DISEASE]-(p:Person)
+        WHERE NOT p.name IN $exclude
+        RETURN p
+        ORDER BY p.name
+        LIMIT $limit
+    }
+    RETURN disease, p.name AS patient, p.age AS age
+"""
+
+# Hop 3: up to $limit diseases per person, by name
+GRAPH_DISEASES_QUERY = """
+    UNWIND $patients AS patient
+    CALL {
+        WITH patient
+        MATCH (:Person {name: patient})-[:HAS_DISEASE]->(d:Disease)
+        RETURN d
+        ORDER BY d.name
+        LIMIT $limit
+    }
+    RETURN patient, d.name AS disease, d.description AS description
+"""
+
+
+def graph_params(depth=None, limits=None):
+    """Validate ?depth= and ?limits=a,b,c into (depth, hop limits); raises ValueError.
+
+    Missing limits keep their defaults and larger ones are clamped.
+    """
+    depth = DEFAULT_DEPTH if depth is None else int(depth)
+    if depth not in GRAPH_DEPTHS:
+        raise ValueError(f"Unknown depth {depth}; expected one of "
+                         f"{', '.join(map(str, GRAPH_DEPTHS))}")
+    hop_limits = list(DEFAULT_HOP_LIMITS)
+    if limits:
+        values = [int(value) for value in limits.split(",")]
+        if len(values) > len(hop_limits) or min(values) < 1:
+            raise ValueError("limits must be up to three positive integers, one per hop")
+        hop_limits[:len(values)] = values
+    return depth, tuple(min(limit, cap) for limit, cap in zip(hop_limits, MAX_HOP_LIMITS))
+
+
+def _grouped(rows, key, limit):
+    """{key: rows[:limit]} in row order, and whether any group had more than limit rows."""
+    groups = {}
+    for row in rows:
+        groups.setdefault(row[key], []).append(row)
+    truncated = any(len(group) > limit for group in groups.values())
+    return {name: group[:limit] for name, group in groups.items()}, truncated
+
+
+class PersonGraph:
+    """vis.js nodes and edges for one person, added one hop at a time."""
+
+    def __init__(self, name, depth=DEFAULT_DEPTH, limits=DEFAULT_HOP_LIMITS):
+        self.name = name
+        self.depth = depth
+        self.limits = limits
+        self.nodes = []
+        self.edges = []
+        self.truncated = []
+        self._nodes = set()
+        self._edges = set()
+        self._node(name, color=PERSON_COLOR)
+
+    def _node(self, node_id, **attributes):
+        if node_id not in self._nodes:
+            self._nodes.add(node_id)
+            self.nodes.append(dict(id=node_id, label=node_id, **attributes))
+
+    def _edge(self, source, target):
+        if (source, target) not in self._edges:
+            self._edges.add((source, target))
+            self.edges.append({"from": source, "to": target})
+
+    def add_diseases(self, rows):
+        """Hop 1 from [{name, description}] rows; returns the disease names shown."""
+        unique = {}
+        for row in rows:
+            unique.setdefault(row["name"], row["description"])
+        limit = self.limits[0]
+        self.truncated.append(len(unique) > limit)
+        shown = list(unique)[:limit]
+        for disease in shown:
+            self._node(disease, color=DISEASE_COLOR, title=unique[disease])
+            self._edge(self.name, disease)
+        return shown
+
+    def add_patients(self, rows):
+        """Hop 2 from GRAPH_PATIENTS_QUERY rows; returns the people shown."""
+        groups, truncated = _grouped(rows, "disease", self.limits[1])
+        self.truncated.append(truncated)
+        shown = []
+        for disease, group in groups.items():
+            for row in group:
+                patient = row["patient"]
+                if patient not in self._nodes:
+                    shown.append(patient)
+                    title = f"Age {row['age']}" if row["age"] is not None else None
+                    self._node(patient, color=PATIENT_COLOR, title=title)
+                self._edge(patient, disease)
+        return shown
+
+    def add_patient_diseases(self, rows):
+        """Hop 3 from GRAPH_DISEASES_QUERY rows."""
+        groups, truncated = _grouped(rows, "patient", self.limits[2])
+        self.truncated.append(truncated)
+        for patient, group in groups.items():
+            for row in group:
+                self._node(row["disease"], color=DISEASE_COLOR, title=row["description"])
+                self._edge(patient, row["disease"])
+
+    def to_dict(self):
+        return {
+            "nodes": self.nodes,
+            "edges": self.edges,
+            "meta": {
+                "person": self.name,
+                "depth": self.depth,
+                "limits": list(self.limits[:self.depth]),
+                "node_count": len(self.nodes),
+                "edge_count": len(self.edges),
+                # Hops not walked (no diseases or people to expand) are not truncated
+                "truncated": self.truncated + [False] * (self.depth - len(self.truncated)),
+            },
+        }
+
+
+def serialize_person_graph(graph, timer):
+    """Return (JSON body, ETag, Server-Timing header) for a person graph.
+
+    Timings go only in the header, so the body and its ETag depend on the
+    data alone.
+    """
+    with timer.phase("serialize"):
+        body = json.dumps(graph)
+        etag = '"' + hashlib.blake2b(body.encode(), digest_size=16).hexdigest() + '"'
+    header = ", ".join(f"{name};dur={ms}" for name, ms in timer.timings.items())
+    return body, etag, header
+
+
+def etag_matches(if_none_match, etag):
+    """True if an If-None-Match header names etag (weak or strong) or is *."""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or (tag[2:] if tag.startswith("W/") else tag) == etag:
+            return True
+    return False
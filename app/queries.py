@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+"""Cypher for the reads, shared by app.neo4j_repository and app.async_db.
+
+The single-record writes are in app.writes; the overview, timeline, stats
+and comorbidity queries stay next to the builders that shape their rows.
+"""
+
+from app.search import PERSON_FULLTEXT_INDEX, DISEASE_FULLTEXT_INDEX
+
+PERSON_DISEASES_QUERY = """
+    MATCH (p:Person {name: $name})-[:HAS_DISEASE]->(d:Disease)
+    RETURN d.id AS id, d.name AS name, d.description AS description
+"""
+
+ALL_PERSONS_QUERY = "MATCH (p:Person) RETURN p.id AS id, p.name AS name, p.age AS age ORDER BY p.name"
+ALL_DISEASES_QUERY = ("MATCH (d:Disease) RETURN d.id AS id, d.name AS name, "
+                      "d.description AS description ORDER BY d.name")
+PERSON_EXISTS_QUERY = "MATCH (p:Person {name: $name}) RETURN count(p) AS count"
+
+PATIENT_QUERY = """
+    MATCH (p:Person {name: $name})
+    RETURN p.id AS id, p.name AS name, p.age AS age
+"""
+
+PATIENT_DISEASES_QUERY = """
+    MATCH (p:Person {name: $name})-[:HAS_DISEASE]->(d:Disease)
+    RETURN d.id AS id, d.name AS name, d.description AS description
+    ORDER BY d.name
+"""
+
+
+def build_list_query(label, fields, limit=None):
+    """Keyset query over label ordered by name, starting after $after.
+
+    `name` is always returned so the last row can serve as the next cursor,
+    and the `name > $after` predicate lets the name constraint's index drive the order.
+    """
+    columns = ", ".join(f"n.{field} AS {field}" for field in dict.fromkeys(["name"] + fields))
+    query = f"MATCH (n:{label}) WHERE n.name > $after RETURN {columns} ORDER BY n.name"
+    if limit is not None:
+        query += " LIMIT $limit"
+    return query
+
+
+FULLTEXT_SEARCH_QUERY = """
+    CALL db.index.fulltext.queryNodes($index, $query) YIELD node, score
+    RETURN node.id AS id, node.name AS name, node.{field} AS {field}, score
+    ORDER BY score DESC, name
+    LIMIT $limit
+"""
+
+# Used only until the full-text indexes exist (see app/schema.py)
+CONTAINS_SEARCH_QUERY = """
+    MATCH (n:{label})
+    WHERE toLower(n.name) CONTAINS toLower($search_term)
+    RETURN n.id AS id, n.name AS name, n.{field} AS {field}, null AS score
+    ORDER BY n.name
+    LIMIT $limit
+"""
+
+SEARCH_TARGETS = {
+    "patients": ("Person", PERSON_FULLTEXT_INDEX, "age"),
+    "diseases": ("Disease", DISEASE_FULLTEXT_INDEX, "description"),
+}
+
+# COLLECT/COUNT subqueries (Neo4j 5.6+) let every section come back in one round trip
+MEDICAL_RECORD_FRAGMENTS = {
+    "diagnoses": """
+        COLLECT {
+            MATCH (p)-[r:DIAGNOSED_WITH]->(d:Disease)
+            WITH r, d ORDER BY r.date DESC
+            RETURN {disease: d.name, doctor: r.doctor, date: toString(r.date),
+                    notes: r.notes, severity: r.severity, status: r.status}
+        } AS diagnoses""",
+    "prescriptions": """
+        COLLECT {
+            MATCH (p)-[:HAS_PRESCRIPTION]->(rx:Prescription)
+            WITH rx ORDER BY rx.prescribed_date DESC
+            SKIP $prescriptions_offset LIMIT $prescriptions_limit
+            RETURN {medication: rx.medication, dosage: rx.dosage,
+                    frequency: rx.frequency, doctor: rx.doctor,
+                    duration: rx.duration, date: toString(rx.prescribed_date),
+                    status: rx.status, notes: rx.notes}
+        } AS prescriptions,
+        COUNT { (p)-[:HAS_PRESCRIPTION]->(:Prescription) } AS prescriptions_total""",
+    "vitals": """
+        COLLECT {
+            MATCH (p)-[:HAS_VITALS]->(v:VitalSigns)
+            WITH v ORDER BY v.recorded_at DESC LIMIT $vitals_limit
+            RETURN {blood_pressure: v.blood_pressure, systolic: v.systolic,
+                    diastolic: v.diastolic, heart_rate: v.heart_rate,
+                    temperature: v.temperature, weight: v.weight,
+                    height: v.height, bmi: v.bmi, date: toString(v.recorded_at)}
+        } AS vitals""",
+    "medical_history": """
+        COLLECT {
+            MATCH (p)-[:HAS_HISTORY]->(h:MedicalHistory)
+            WITH h ORDER BY h.date_diagnosed DESC
+            SKIP $history_offset LIMIT $history_limit
+            RETURN {condition: h.condition, date_diagnosed: h.date_diagnosed,
+                    resolved: h.resolved, notes: h.notes}
+        } AS medical_history,
+        COUNT { (p)-[:HAS_HISTORY]->(:MedicalHistory) } AS medical_history_total""",
+}
+
+
+def build_medical_record_query(sections):
+    """The medical record query returning the given sections (see MEDICAL_RECORD_FRAGMENTS)."""
+    columns = ["p.id AS id", "p.name AS name", "p.age AS age"]
+    columns += [MEDICAL_RECORD_FRAGMENTS[section] for section in sections]
+    return "MATCH (p:Person {name: $name})\nRETURN " + ",".join(columns)
+
+
+ACTIVE_PATIENTS_WITH_DISEASE_QUERY = """
+    MATCH (p:Person)-[r:DIAGNOSED_WITH]->(d:Disease {name: $disease_name})
+    WHERE r.status = 'active'
+    RETURN p.id AS patient_id, p.name AS patient_name, p.age AS age,
+           r.doctor AS doctor, toString(r.date) AS diagnosed_date,
+           r.severity AS severity
+    ORDER BY r.date DESC
+"""
+
+OVERVIEW_QUERY = """
+    MATCH (p:Person)-[r:DIAGNOSED_WITH]->(d:Disease)
+    RETURN p.name AS patient, p.age AS age, d.name AS disease,
+           r.severity AS severity, r.status AS status
+"""
+
+DISEASE_DISTRIBUTION_QUERY = """
+    MATCH (p:Person)-[r:DIAGNOSED_WITH]->(d:Disease)
+    WHERE r.status = 'active'
+    RETURN d.name AS disease, COUNT(p) AS patient_count
+    ORDER BY patient_count DESC
+    LIMIT 10
+"""
+
+SEVERITY_DISTRIBUTION_QUERY = """
+    MATCH (p:Person)-[r:DIAGNOSED_WITH]->(d:Disease)
+    WHERE r.status = 'active'
+    RETURN r.severity AS severity, COUNT(*) AS count
+"""
+
+DOCTOR_STATS_QUERIES = {
+    # Total patients treated
+    "patients": """
+        MATCH (p:Person)-[r:DIAGNOSED_WITH]->(d:Disease)
+        WHERE r.doctor = $doctor
+        RETURN COUNT(DISTINCT p) AS total_patients
+    """,
+    # Diagnoses by severity
+    "severity": """
+        MATCH (p:Person)-[r:DIAGNOSED_WITH]->(d:Disease)
+        WHERE r.doctor = $doctor
+        RETURN r.severity AS severity, COUNT(*) AS count
+    """,
+    # Most common diseases treated
+    "diseases": """
+        MATCH (p:Person)-[r:DIAGNOSED_WITH]->(d:Disease)
+        WHERE r.doctor = $doctor
+        RETURN d.name AS disease, COUNT(*) AS count
+        ORDER BY count DESC
+        LIMIT 5
+    """,
+    # Prescriptions written
+    "prescriptions": """
+        MATCH (p:Person)-[:HAS_PRESCRIPTION]->(rx:Prescription)
+        WHERE rx.doctor = $doctor
+        RETURN COUNT(*) AS total_prescriptions
+    """,
+}
+
+# Get all patients with this disease and their other conditions
+DISEASE_NETWORK_QUERY = """
+    MATCH (p:Person)-[r1:DIAGNOSED_WITH]->(d1:Disease {name: $disease})
+    OPTIONAL MATCH (p)-[r2:DIAGNOSED_WITH]->(d2:Disease)
+    WHERE d2.name <> $disease AND r2.status = 'active'
+    RETURN p.name AS patient, p.age AS age,
+           d2.name AS other_disease, r2.severity AS severity
+"""
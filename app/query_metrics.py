@@ -0,0 +1,486 @@
+#!/usr/bin/env python
+"""Per-query instrumentation for every Cypher query the app runs.
+
+DriverManager hands out sessions wrapped in InstrumentedRunner, so every
+session.run and transaction tx.run is measured. Queries are identified by a
+fingerprint of their whitespace-normalised text. For each one this records:
+  - a latency histogram (from run() until the result is consumed)
+  - rows returned
+  - database server time (result_available_after + result_consumed_after)
+  - errors
+
+Queries slower than QUERY_SLOW_MS (default 500) are written to the slow-query
+log: JSON lines on the "medgraph.queries" logger, also appended to
+QUERY_LOG_PATH if set. Parameter names are logged, but values are not, since
+they hold patient data. With QUERY_PROFILE_SLOW=True, a slow read query is
+re-run once with PROFILE in the background, at most once per
+QUERY_PROFILE_INTERVAL seconds per fingerprint, and its plan is logged.
+Writes are never profiled, because PROFILE executes the query.
+
+Everything is exported in Prometheus text format by the /metrics endpoint.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from bisect import bisect_left
+from collections import deque
+from functools import lru_cache
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SLOW_LOG_SIZE = 100
+QUERY_TEXT_LIMIT = 500
+
+logger = logging.getLogger("medgraph.queries")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(query):
+    """(id, normalised text) for a Cypher string; the id is stable across processes."""
+    text = " ".join(query.split())
+    return hashlib.sha1(text.encode()).hexdigest()[:12], text
+
+
+def plan_summary(profile, depth=0):
+    """Indented operator lines ("ProduceResults rows=10 dbHits=0") from a PROFILE plan dict."""
+    if not profile:
+        return []
+    line = "  " * depth + str(profile.get("operatorType", "?"))
+    if profile.get("identifiers"):
+        line += f" ({', '.join(profile['identifiers'])})"
+    line += f" rows={profile.get('rows', 0)} dbHits={profile.get('dbHits', 0)}"
+    lines = [line]
+    for child in profile.get("children", []):
+        lines.extend(plan_summary(child, depth + 1))
+    return lines
+
+
+def _server_ms(summary):
+    if summary is None:
+        return None
+    available = getattr(summary, "result_available_after", None)
+    consumed = getattr(summary, "result_consumed_after", None)
+    if available is None and consumed is None:
+        return None
+    return (available or 0) + (consumed or 0)
+
+
+class QueryStats:
+    """Histogram and totals for one query fingerprint."""
+
+    def __init__(self, text, buckets):
+        self.text = text
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows = 0
+        self.server_ms = 0
+        self.errors = 0
+        self.slow = 0
+        self.plan = None
+        self.profiled_at = None
+
+
+class QueryMetrics:
+    """Registry of QueryStats by fingerprint, plus the recent slow-query log."""
+
+    def __init__(self, slow_ms=500, profile_slow=False, profile_interval=300,
+                 buckets=DEFAULT_BUCKETS, log_path=None, clock=time.monotonic):
+        self.slow_seconds = slow_ms / 1000
+        self.profile_slow = profile_slow
+        self.profile_interval = profile_interval
+        self.buckets = tuple(buckets)
+        self.clock = clock
+        self.slow_log = deque(maxlen=SLOW_LOG_SIZE)
+        self._queries = {}
+        self._lock = threading.Lock()
+        if log_path:
+            handler = logging.FileHandler(log_path)
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+            logger.setLevel(logging.INFO)
+
+    @classmethod
+    def from_env(cls):
+        return cls(slow_ms=float(os.getenv("QUERY_SLOW_MS", "500")),
+                   profile_slow=os.getenv("QUERY_PROFILE_SLOW", "False") == "True",
+                   profile_interval=float(os.getenv("QUERY_PROFILE_INTERVAL", "300")),
+                   log_path=os.getenv("QUERY_LOG_PATH"))
+
+    def observe(self, query, params, seconds, rows=0, summary=None, mode=None, error=None):
+        """Record one execution; returns True if it should be profiled."""
+        query_id, text = fingerprint(query)
+        server_ms = _server_ms(summary)
+        slow = seconds >= self.slow_seconds
+        profile = False
+        with self._lock:
+            stats = self._queries.get(query_id)
+            if stats is None:
+                stats = self._queries[query_id] = QueryStats(text, self.buckets)
+            stats.bucket_counts[bisect_left(self.buckets, seconds)] += 1
+            stats.count += 1
+            stats.seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            stats.rows += rows
+            stats.server_ms += server_ms or 0
+            if error is not None:
+                stats.errors += 1
+            if slow:
+                stats.slow += 1
+                now = self.clock()
+                if (self.profile_slow and error is None and mode == "READ"
+                        and not text.upper().startswith(("PROFILE", "EXPLAIN"))
+                        and (stats.profiled_at is None
+                             or now - stats.profiled_at >= self.profile_interval)):
+                    stats.profiled_at = now
+                    profile = True
+
+        if error is not None:
+            self._log("query_error", query_id, text, seconds, rows, server_ms, params, mode,
+                      error=f"{type(error).__name__}: {error}")
+        elif slow:
+            entry = self._log("slow_query", query_id, text, seconds, rows, server_ms, params, mode)
+            self.slow_log.append(entry)
+        return profile
+
+    def record_plan(self, query, plan):
+        query_id, text = fingerprint(query)
+        lines = plan_summary(plan)
+        with self._lock:
+            if query_id in self._queries:
+                self._queries[query_id].plan = lines
+        self._emit({"event": "query_plan", "query_id": query_id, "plan": lines}, logging.INFO)
+
+    def _log(self, event, query_id, text, seconds, rows, server_ms, params, mode, **extra):
+        entry = {"event": event, "query_id": query_id, "ms": round(seconds * 1000, 2),
+                 "server_ms": server_ms, "rows": rows, "mode": mode,
+                 "params": sorted(params or ()), "query": text[:QUERY_TEXT_LIMIT],
+                 "at": time.time(), **extra}
+        self._emit(entry)
+        return entry
+
+    @staticmethod
+    def _emit(entry, level=logging.WARNING):
+        logger.log(level, json.dumps(entry, default=str))
+
+    def reset(self):
+        with self._lock:
+            self._queries.clear()
+        self.slow_log.clear()
+
+    def to_dict(self, limit=20):
+        """The limit queries with the most total time, slowest first, and the slow log."""
+        with self._lock:
+            queries = [{"query_id": query_id, "query": stats.text[:QUERY_TEXT_LIMIT],
+                        "count": stats.count, "total_ms": round(stats.seconds * 1000, 2),
+                        "mean_ms": round(stats.seconds * 1000 / stats.count, 2),
+                        "max_ms": round(stats.max_seconds * 1000, 2),
+                        "rows": stats.rows, "server_ms": stats.server_ms,
+                        "errors": stats.errors, "slow": stats.slow, "plan": stats.plan}
+                       for query_id, stats in self._queries.items() if stats.count]
+        queries.sort(key=lambda q: -q["total_ms"])
+        return {"slow_ms": self.slow_seconds * 1000, "queries": queries[:limit],
+                "slow_log": list(self.slow_log)}
+
+    def prometheus(self):
+        """Prometheus text exposition of every query's metrics."""
+        lines = [
+            "# HELP medgraph_query_duration_seconds Cypher query latency, run to result consumed.",
+            "# TYPE medgraph_query_duration_seconds histogram",
+        ]
+        with self._lock:
+            snapshot = [(query_id, stats.text, list(stats.bucket_counts), stats.count,
+                         stats.seconds, stats.rows, stats.server_ms, stats.errors, stats.slow)
+                        for query_id, stats in sorted(self._queries.items())]
+        for query_id, _, bucket_counts, count, seconds, *_ in snapshot:
+            cumulative = 0
+            for bound, bucket in zip(self.buckets + (float("inf"),), bucket_counts):
+                cumulative += bucket
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'medgraph_query_duration_seconds_bucket{{query="{query_id}",le="{le}"}} {cumulative}')
+            lines.append(f'medgraph_query_duration_seconds_sum{{query="{query_id}"}} {seconds}')
+            lines.append(f'medgraph_query_duration_seconds_count{{query="{query_id}"}} {count}')
+        for name, help_text, index in (
+                ("medgraph_query_rows_total", "Rows returned.", 5),
+                ("medgraph_query_server_milliseconds_total", "Database server time from result summaries.", 6),
+                ("medgraph_query_errors_total", "Failed executions.", 7),
+                ("medgraph_query_slow_total", "Executions slower than QUERY_SLOW_MS.", 8)):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            lines += [f'{name}{{query="{row[0]}"}} {row[index]}' for row in snapshot]
+        lines += ["# HELP medgraph_query_info Normalised Cypher text per query id.",
+                  "# TYPE medgraph_query_info gauge"]
+        lines += [f'medgraph_query_info{{query="{row[0]}",text="{_escape(row[1][:200])}"}} 1'
+                  for row in snapshot]
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def gauges(name, help_text, samples, kind="gauge"):
+    """Prometheus lines for one metric; samples are ({label: value}, number) pairs."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        if value is None:
+            continue
+        label_text = ",".join(f'{key}="{_escape(str(label))}"' for key, label in labels.items())
+        lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+    return lines
+
+
+def app_metrics(pool_stats, cache_stats):
+    """Prometheus lines for the driver pool and the read cache."""
+    sessions = pool_stats["sessions"]
+    pool = pool_stats.get("pool") or {}
+    lines = []
+    lines += gauges("medgraph_neo4j_sessions_active", "Open sessions by access mode.",
+                    [({"mode": mode}, stats["active"]) for mode, stats in sessions.items()])
+    lines += gauges("medgraph_neo4j_sessions_opened_total", "Sessions opened by access mode.",
+                    [({"mode": mode}, stats["opened"]) for mode, stats in sessions.items()], "counter")
+    lines += gauges("medgraph_neo4j_pool_connections", "Pooled connections by state.",
+                    [({"state": "in_use"}, pool.get("in_use")), ({"state": "idle"}, pool.get("idle"))])
+    lines += gauges("medgraph_neo4j_pool_max_size", "Maximum connections per server.",
+                    [({}, pool_stats["config"]["max_connection_pool_size"])])
+    lines += gauges("medgraph_neo4j_write_retries_total", "Write transactions retried.",
+                    [({}, pool_stats["retry"]["retries"])], "counter")
+    for key in ("hits", "misses", "evictions", "invalidations"):
+        if isinstance(cache_stats.get(key), (int, float)):
+            lines += gauges(f"medgraph_cache_{key}_total", f"Read cache {key}.",
+                            [({}, cache_stats[key])], "counter")
+    return "\n".join(lines) + "\n"
+
+
+# --- Session, transaction and result wrappers ----------------------------------
+
+class TimedResult:
+    """Wraps a neo4j Result; records the query once the result has been consumed."""
+
+    def __init__(self, result, observe):
+        self._result = result
+        self._observe = observe
+        self._rows = 0
+        self._done = False
+
+    def _finish(self, summary=None, error=None):
+        if self._done:
+            return
+        self._done = True
+        if summary is None and error is None:
+            try:
+                summary = self._result.consume()
+            except Exception as e:
+                error = e
+        self._observe(self._rows, summary, error)
+
+    def _abandoned(self):
+        # The caller stopped iterating early; record what it read without
+        # consuming the rest of the stream
+        if not self._done:
+            self._done = True
+            self._observe(self._rows, None, None)
+
+    def __iter__(self):
+        try:
+            for record in self._result:
+                self._rows += 1
+                yield record
+        except GeneratorExit:
+            self._abandoned()
+            raise
+        except Exception as e:
+            self._finish(error=e)
+            raise
+        self._finish()
+
+    def single(self, *args, **kwargs):
+        try:
+            record = self._result.single(*args, **kwargs)
+        except Exception as e:
+            self._finish(error=e)
+            raise
+        self._rows += record is not None
+        self._finish()
+        return record
+
+    def data(self, *keys):
+        try:
+            rows = self._result.data(*keys)
+        except Exception as e:
+            self._finish(error=e)
+            raise
+        self._rows += len(rows)
+        self._finish()
+        return rows
+
+    def consume(self):
+        try:
+            summary = self._result.consume()
+        except Exception as e:
+            self._finish(error=e)
+            raise
+        self._finish(summary)
+        return summary
+
+    def __getattr__(self, name):
+        return getattr(self._result, name)
+
+
+class AsyncTimedResult(TimedResult):
+    """TimedResult for neo4j AsyncResult."""
+
+    async def _afinish(self, summary=None, error=None):
+        if self._done:
+            return
+        if summary is None and error is None:
+            try:
+                summary = await self._result.consume()
+            except Exception as e:
+                error = e
+        self._finish(summary, error)
+
+    async def __aiter__(self):
+        try:
+            async for record in self._result:
+                self._rows += 1
+                yield record
+        except GeneratorExit:
+            self._abandoned()
+            raise
+        except Exception as e:
+            self._finish(error=e)
+            raise
+        await self._afinish()
+
+    async def single(self, *args, **kwargs):
+        try:
+            record = await self._result.single(*args, **kwargs)
+        except Exception as e:
+            self._finish(error=e)
+            raise
+        self._rows += record is not None
+        await self._afinish()
+        return record
+
+    async def data(self, *keys):
+        try:
+            rows = await self._result.data(*keys)
+        except Exception as e:
+            self._finish(error=e)
+            raise
+        self._rows += len(rows)
+        await self._afinish()
+        return rows
+
+    async def consume(self):
+        try:
+            summary = await self._result.consume()
+        except Exception as e:
+            self._finish(error=e)
+            raise
+        self._finish(summary)
+        return summary
+
+
+class InstrumentedRunner:
+    """Wraps a session or transaction so that run() returns a TimedResult."""
+
+    def __init__(self, runner, mode, profiler=None, metrics=None):
+        self._runner = runner
+        self._mode = mode
+        self._profiler = profiler
+        self._metrics = metrics or query_metrics
+
+    def _observer(self, query, params, started):
+        def observe(rows, summary, error):
+            seconds = time.perf_counter() - started
+            if self._metrics.observe(query, params, seconds, rows, summary, self._mode, error):
+                self._schedule_profile(query, params)
+        return observe
+
+    def _schedule_profile(self, query, params):
+        if self._profiler is None:
+            return
+
+        def profile():
+            try:
+                self._metrics.record_plan(query, self._profiler(query, params))
+            except Exception as e:
+                print(f"Error profiling slow query: {str(e)}")
+        threading.Thread(target=profile, daemon=True).start()
+
+    @staticmethod
+    def _params(parameters, kwargs):
+        params = dict(parameters or {})
+        params.update(kwargs)
+        return params
+
+    def run(self, query, parameters=None, **kwargs):
+        params = self._params(parameters, kwargs)
+        started = time.perf_counter()
+        try:
+            result = self._runner.run(query, params)
+        except Exception as e:
+            self._metrics.observe(query, params, time.perf_counter() - started, 0, None,
+                                  self._mode, e)
+            raise
+        return TimedResult(result, self._observer(query, params, started))
+
+    def execute_write(self, work, *args, **kwargs):
+        return self._runner.execute_write(
+            lambda tx, *a, **k: work(InstrumentedRunner(tx, "WRITE", None, self._metrics), *a, **k),
+            *args, **kwargs)
+
+    def execute_read(self, work, *args, **kwargs):
+        return self._runner.execute_read(
+            lambda tx, *a, **k: work(InstrumentedRunner(tx, "READ", self._profiler, self._metrics),
+                                     *a, **k),
+            *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._runner, name)
+
+
+class AsyncInstrumentedRunner(InstrumentedRunner):
+    """InstrumentedRunner for neo4j AsyncSession and AsyncTransaction."""
+
+    def _schedule_profile(self, query, params):
+        if self._profiler is None:
+            return
+        import asyncio
+
+        async def profile():
+            try:
+                self._metrics.record_plan(query, await self._profiler(query, params))
+            except Exception as e:
+                print(f"Error profiling slow query: {str(e)}")
+        asyncio.ensure_future(profile())
+
+    async def run(self, query, parameters=None, **kwargs):
+        params = self._params(parameters, kwargs)
+        started = time.perf_counter()
+        try:
+            result = await self._runner.run(query, params)
+        except Exception as e:
+            self._metrics.observe(query, params, time.perf_counter() - started, 0, None,
+                                  self._mode, e)
+            raise
+        return AsyncTimedResult(result, self._observer(query, params, started))
+
+    async def execute_write(self, work, *args, **kwargs):
+        async def instrumented(tx, *a, **k):
+            return await work(AsyncInstrumentedRunner(tx, "WRITE", None, self._metrics), *a, **k)
+        return await self._runner.execute_write(instrumented, *args, **kwargs)
+
+    async def execute_read(self, work, *args, **kwargs):
+        async def instrumented(tx, *a, **k):
+            return await work(AsyncInstrumentedRunner(tx, "READ", self._profiler, self._metrics),
+                              *a, **k)
+        return await self._runner.execute_read(instrumented, *args, **kwargs)
+
+
+query_metrics = QueryMetrics.from_env()
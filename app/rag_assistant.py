@@ -2,24 +2,26 @@
 """RAG-based medical assistant for MedGraph."""
 
 import os
+import threading
 from typing import List, Dict
-import openai
-from neo4j import GraphDatabase
-from app.main import driver
+from app.main import read_session
 import json
 
-# Configure OpenAI (you'll need to set your API key)
-openai.api_key = os.getenv("OPENAI_API_KEY", "")
+def chat_completion(**kwargs):
+    """openai.ChatCompletion.create; openai is imported and configured on first use."""
+    import openai
+    # Configure OpenAI (you'll need to set your API key)
+    openai.api_key = os.getenv("OPENAI_API_KEY", "")
+    return openai.ChatCompletion.create(**kwargs)
 
 class MedicalRAGAssistant:
     def __init__(self):
-        self.driver = driver
         self.context_limit = 3000  # Characters to stay within token limits
         
     def get_relevant_medical_context(self, query: str) -> str:
         """Retrieve relevant medical context from Neo4j based on the query."""
         try:
-            with self.driver.session() as session:
+            with read_session() as session:
                 # Extract potential disease names from query
                 diseases_query = """
                     MATCH (d:Disease)
@@ -84,7 +86,7 @@ class MedicalRAGAssistant:
         """Get AI-powered diagnostic suggestions based on symptoms."""
         try:
             # Get disease patterns from database
-            with self.driver.session() as session:
+            with read_session() as session:
                 diseases_query = """
                     MATCH (d:Disease)
                     RETURN d.name AS name, d.description AS description
@@ -114,7 +116,7 @@ class MedicalRAGAssistant:
             Format the response as JSON.
             """
             
-            response = openai.ChatCompletion.create(
+            response = chat_completion(
                 model="gpt-4",
                 messages=[
                     {"role": "system", "content": "You are a medical assistant AI. Provide helpful diagnostic suggestions based on symptoms."},
@@ -139,7 +141,7 @@ class MedicalRAGAssistant:
         """Get AI-powered treatment recommendations."""
         try:
             # Get current treatment patterns from database
-            with self.driver.session() as session:
+            with read_session() as session:
                 treatment_query = """
                     MATCH (p:Person)-[r:DIAGNOSED_WITH]->(d:Disease {name: $disease})
                     MATCH (p)-[:HAS_PRESCRIPTION]->(rx:Prescription)
@@ -175,7 +177,7 @@ class MedicalRAGAssistant:
             Format the response as JSON.
             """
             
-            response = openai.ChatCompletion.create(
+            response = chat_completion(
                 model="gpt-4",
                 messages=[
                     {"role": "system", "content": "You are a medical AI assistant. Provide treatment recommendations based on patient information and common practices."},
@@ -211,7 +213,7 @@ class MedicalRAGAssistant:
             If the context doesn't contain relevant information, provide general medical guidance.
             """
             
-            response = openai.ChatCompletion.create(
+            response = chat_completion(
                 model="gpt-4",
                 messages=[
                     {"role": "system", "content": "You are a medical AI assistant. Answer questions based on the provided context from a medical database."},
@@ -252,7 +254,7 @@ class MedicalRAGAssistant:
             Please generate professional clinical notes in SOAP format.
             """
             
-            response = openai.ChatCompletion.create(
+            response = chat_completion(
                 model="gpt-4",
                 messages=[
                     {"role": "system", "content": "You are a medical documentation AI. Generate professional clinical notes in SOAP format."},
@@ -268,5 +270,20 @@ class MedicalRAGAssistant:
             print(f"Error generating clinical notes: {str(e)}")
             return f"Error generating notes: {str(e)}"
 
-# Singleton instance
-rag_assistant = MedicalRAGAssistant()
+# Singleton instance, created on first use
+_assistant = None
+_assistant_lock = threading.Lock()
+
+def get_rag_assistant():
+    """Return the shared assistant, creating it on first use."""
+    global _assistant
+    with _assistant_lock:
+        if _assistant is None:
+            _assistant = MedicalRAGAssistant()
+        return _assistant
+
+def __getattr__(name):
+    # `from app.rag_assistant import rag_assistant` still works
+    if name == "rag_assistant":
+        return get_rag_assistant()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
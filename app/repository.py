@@ -0,0 +1,236 @@
+#!/usr/bin/env python
+"""Data access behind app.main, app.medical_features and app.visualizations.
+
+Those modules keep caching, events, validation and error handling; the
+repository only reads and writes records. The backend is chosen with
+MEDGRAPH_BACKEND:
+  neo4j (default)  the Neo4j server at NEO4J_URI (app.neo4j_repository)
+  memory           an in-process graph (app.memory_repository); set
+                   MEMORY_SNAPSHOT_PATH to keep the data across restarts
+  sqlite           an embedded database file at SQLITE_PATH
+                   (app.sqlite_repository), for sites without a Neo4j server
+
+Rows have the shape the Neo4j queries return, so the pure builders in
+app.overview_graph, app.timeline, app.stats and app.visualizations work on
+either backend. Datetimes are passed in and compared as timezone-aware
+datetimes; dates come back as ISO strings.
+"""
+
+import os
+
+BACKENDS = ("neo4j", "memory", "sqlite")
+
+
+class Repository:
+    """The operations every backend implements."""
+
+    backend = None
+
+    # Writes. The create_* methods take a fresh id and report whether this
+    # call stored it, so a retried or concurrent call cannot create twice.
+
+    def create_person(self, id, name, age):
+        """True if the person was created, False if the name exists."""
+        raise NotImplementedError
+
+    def create_disease(self, id, name, description):
+        raise NotImplementedError
+
+    def create_relationship(self, id, person_name, disease_name):
+        """{person_found, disease_found, created} for a HAS_DISEASE edge."""
+        raise NotImplementedError
+
+    def delete_relationship(self, person_name, disease_name):
+        """True if a HAS_DISEASE edge was deleted."""
+        raise NotImplementedError
+
+    def create_diagnosis(self, id, patient_name, disease_name, doctor_name, date, notes, severity):
+        """True if written; False when the patient or disease does not exist."""
+        raise NotImplementedError
+
+    def add_history(self, id, patient_name, condition, date_diagnosed, resolved, notes, created_at):
+        raise NotImplementedError
+
+    def add_prescription(self, id, patient_name, medication, dosage, frequency, doctor_name,
+                         duration, notes, prescribed_date):
+        raise NotImplementedError
+
+    def add_vitals(self, id, patient_name, notes, recorded_at, **vitals):
+        raise NotImplementedError
+
+    def update_diagnosis_status(self, patient_name, disease_name, status, notes, updated_at):
+        """[{doctor, severity, previous_status}] per diagnosis updated."""
+        raise NotImplementedError
+
+    # Bulk writes (app.bulk_ingest). Each call writes one batch in one
+    # transaction; every row has an index, a fresh id and a distinct key.
+
+    def bulk_create_persons(self, rows):
+        """[{index, created}] for [{index, id, name, age}] rows."""
+        raise NotImplementedError
+
+    def bulk_create_diseases(self, rows):
+        """[{index, created}] for [{index, id, name, description}] rows."""
+        raise NotImplementedError
+
+    def bulk_create_relationships(self, rows):
+        """[{index, person_found, disease_found, created}] for
+        [{index, id, person_name, disease_name}] rows."""
+        raise NotImplementedError
+
+    def bulk_add_vitals(self, rows):
+        """[{index}] of the [{index, id, patient, notes, recorded_at, <vitals>}] rows written.
+
+        Rows for unknown patients are not written.
+        """
+        raise NotImplementedError
+
+    # Persons and diseases
+
+    def person_exists(self, name):
+        raise NotImplementedError
+
+    def existing_persons(self, names):
+        """The set of names that belong to a Person."""
+        raise NotImplementedError
+
+    def person_diseases(self, name):
+        """[{id, name, description}] of the person's HAS_DISEASE diseases."""
+        raise NotImplementedError
+
+    def graph_patients(self, diseases, exclude, limit):
+        """[{disease, patient, age}]: up to limit HAS_DISEASE people per disease, by name.
+
+        Rows follow the order of diseases; people named in exclude are skipped.
+        """
+        raise NotImplementedError
+
+    def graph_diseases(self, patients, limit):
+        """[{patient, disease, description}]: up to limit HAS_DISEASE diseases per person, by name."""
+        raise NotImplementedError
+
+    def all_persons(self):
+        """[{id, name, age}] ordered by name."""
+        raise NotImplementedError
+
+    def all_diseases(self):
+        """[{id, name, description}] ordered by name."""
+        raise NotImplementedError
+
+    def list_rows(self, label, fields, after="", limit=None):
+        """Iterate `name` plus fields of label nodes with name > after, ordered by name."""
+        raise NotImplementedError
+
+    def search(self, kind, search_term, query, mode, limit):
+        """[{id, name, age|description, score}] for "patients" or "diseases", best first.
+
+        query is the full-text query built by app.search for the same term.
+        """
+        raise NotImplementedError
+
+    def patient_details(self, name):
+        """{id, name, age, diseases: [{id, name, description}]} or None."""
+        raise NotImplementedError
+
+    def node_id(self, label, name):
+        raise NotImplementedError
+
+    def node_name(self, label, node_id):
+        raise NotImplementedError
+
+    def node_ids(self, label, names):
+        """{name: id} for the names that exist."""
+        raise NotImplementedError
+
+    # Medical records
+
+    def medical_record(self, name, sections, params):
+        """One row: id, name, age, each section and the *_total counts, or None.
+
+        params are the paging parameters built by app.medical_features.
+        """
+        raise NotImplementedError
+
+    def active_patients_with(self, disease_name):
+        """Active diagnoses of a disease: [{patient_id, patient_name, age, doctor,
+        diagnosed_date, severity}], newest first."""
+        raise NotImplementedError
+
+    def timeline_rows(self, name, event_type, since, until, limit, before, tie, before_key):
+        """One TIMELINE_STREAM_QUERIES stream, newest first (see app.timeline)."""
+        raise NotImplementedError
+
+    # Hospital-wide reads for app.visualizations, app.stats and app.comorbidity
+
+    def diagnosis_rows(self):
+        """[{patient, age, disease, severity, status}] for every diagnosis."""
+        raise NotImplementedError
+
+    def overview_clusters(self, status):
+        """OVERVIEW_CLUSTERS_QUERY rows; status None means every status."""
+        raise NotImplementedError
+
+    def overview_links(self, diseases, status, limit):
+        raise NotImplementedError
+
+    def cluster_patients(self, disease, severity, status, after, limit):
+        raise NotImplementedError
+
+    def active_diagnoses(self):
+        """[{patient, disease}] of every active diagnosis."""
+        raise NotImplementedError
+
+    def stats_rows(self):
+        """(diagnoses, doctor patients, prescriptions) rows of the app.stats queries."""
+        raise NotImplementedError
+
+    def similarity_rows(self):
+        """([{patient, disease, severity}] of unresolved diagnoses, [{patient, medication}])."""
+        raise NotImplementedError
+
+    def disease_distribution(self):
+        """[{disease, patient_count}] of the ten diseases with most active diagnoses."""
+        raise NotImplementedError
+
+    def severity_distribution(self):
+        """[{severity, count}] of active diagnoses."""
+        raise NotImplementedError
+
+    def doctor_stats(self, doctor):
+        """{patients, severity, diseases, prescriptions} rows for build_doctor_stats."""
+        raise NotImplementedError
+
+    def disease_network(self, disease):
+        """[{patient, age, other_disease, severity}] for DISEASE_NETWORK_QUERY."""
+        raise NotImplementedError
+
+    # Operations
+
+    def check_ready(self):
+        """(ready, details)."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+def backend_name(environ=None):
+    environ = os.environ if environ is None else environ
+    backend = environ.get("MEDGRAPH_BACKEND", "neo4j").strip().lower() or "neo4j"
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown MEDGRAPH_BACKEND '{backend}'; expected one of {', '.join(BACKENDS)}")
+    return backend
+
+
+def create_repository(driver_manager=None, environ=None):
+    """Build the repository configured in the environment."""
+    environ = os.environ if environ is None else environ
+    backend = backend_name(environ)
+    if backend == "memory":
+        from app.memory_repository import MemoryRepository
+        return MemoryRepository.from_env(environ)
+    if backend == "sqlite":
+        from app.sqlite_repository import SQLiteRepository
+        return SQLiteRepository.from_env(environ)
+    from app.neo4j_repository import Neo4jRepository
+    return Neo4jRepository(driver_manager)
@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+"""Versioned Neo4j schema (constraints and indexes) for MedGraph."""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+from app.main import read_session, write_session
+from app.model import now
+
+# Each migration is (version, description, [(kind, name, statement)]).
+# Statements must be idempotent so a partially applied migration can be re-run.
+MIGRATIONS = [
+    (1, "Uniqueness constraints on Person and Disease names", [
+        ("constraint", "person_name_unique",
+         "CREATE CONSTRAINT person_name_unique IF NOT EXISTS "
+         "FOR (p:Person) REQUIRE p.name IS UNIQUE"),
+        ("constraint", "disease_name_unique",
+         "CREATE CONSTRAINT disease_name_unique IF NOT EXISTS "
+         "FOR (d:Disease) REQUIRE d.name IS UNIQUE"),
+    ]),
+    (2, "DIAGNOSED_WITH relationship property indexes", [
+        ("index", "diagnosed_with_status",
+         "CREATE INDEX diagnosed_with_status IF NOT EXISTS "
+         "FOR ()-[r:DIAGNOSED_WITH]-() ON (r.status)"),
+        ("index", "diagnosed_with_doctor",
+         "CREATE INDEX diagnosed_with_doctor IF NOT EXISTS "
+         "FOR ()-[r:DIAGNOSED_WITH]-() ON (r.doctor)"),
+        ("index", "diagnosed_with_date",
+         "CREATE INDEX diagnosed_with_date IF NOT EXISTS "
+         "FOR ()-[r:DIAGNOSED_WITH]-() ON (r.date)"),
+    ]),
+    (3, "Timestamp indexes on medical record nodes", [
+        ("index", "prescription_prescribed_date",
+         "CREATE INDEX prescription_prescribed_date IF NOT EXISTS "
+         "FOR (rx:Prescription) ON (rx.prescribed_date)"),
+        ("index", "prescription_doctor",
+         "CREATE INDEX prescription_doctor IF NOT EXISTS "
+         "FOR (rx:Prescription) ON (rx.doctor)"),
+        ("index", "vital_signs_recorded_at",
+         "CREATE INDEX vital_signs_recorded_at IF NOT EXISTS "
+         "FOR (v:VitalSigns) ON (v.recorded_at)"),
+        ("index", "medical_history_date_diagnosed",
+         "CREATE INDEX medical_history_date_diagnosed IF NOT EXISTS "
+         "FOR (h:MedicalHistory) ON (h.date_diagnosed)"),
+        ("index", "medical_history_created_at",
+         "CREATE INDEX medical_history_created_at IF NOT EXISTS "
+         "FOR (h:MedicalHistory) ON (h.created_at)"),
+    ]),
+    (4, "Full-text indexes for patient and disease search", [
+        ("index", "person_name_fulltext",
+         "CREATE FULLTEXT INDEX person_name_fulltext IF NOT EXISTS "
+         "FOR (p:Person) ON EACH [p.name]"),
+        ("index", "disease_fulltext",
+         "CREATE FULLTEXT INDEX disease_fulltext IF NOT EXISTS "
+         "FOR (d:Disease) ON EACH [d.name, d.description]"),
+    ]),
+    (5, "Uniqueness constraints on Person and Disease ids", [
+        ("constraint", "person_id_unique",
+         "CREATE CONSTRAINT person_id_unique IF NOT EXISTS "
+         "FOR (p:Person) REQUIRE p.id IS UNIQUE"),
+        ("constraint", "disease_id_unique",
+         "CREATE CONSTRAINT disease_id_unique IF NOT EXISTS "
+         "FOR (d:Disease) REQUIRE d.id IS UNIQUE"),
+    ]),
+    (6, "Uniqueness constraints on medical record ids (writes MERGE on them)", [
+        ("constraint", "prescription_id_unique",
+         "CREATE CONSTRAINT prescription_id_unique IF NOT EXISTS "
+         "FOR (rx:Prescription) REQUIRE rx.id IS UNIQUE"),
+        ("constraint", "medical_history_id_unique",
+         "CREATE CONSTRAINT medical_history_id_unique IF NOT EXISTS "
+         "FOR (h:MedicalHistory) REQUIRE h.id IS UNIQUE"),
+        ("constraint", "vital_signs_id_unique",
+         "CREATE CONSTRAINT vital_signs_id_unique IF NOT EXISTS "
+         "FOR (v:VitalSigns) REQUIRE v.id IS UNIQUE"),
+    ]),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_applied_version():
+    """Return the highest migration version recorded in the database."""
+    with read_session() as session:
+        result = session.run(
+            "MATCH (m:SchemaMigration) RETURN coalesce(max(m.version), 0) AS version"
+        ).single()
+        return result["version"]
+
+
+def get_existing_schema():
+    """Return the names of constraints and indexes currently in the database."""
+    with read_session() as session:
+        constraints = {record["name"] for record in session.run("SHOW CONSTRAINTS YIELD name")}
+        indexes = {record["name"] for record in session.run("SHOW INDEXES YIELD name")}
+    return {"constraint": constraints, "index": indexes}
+
+
+def check_schema():
+    """Compare the database against the expected schema without changing anything."""
+    try:
+        applied = get_applied_version()
+        existing = get_existing_schema()
+    except Exception as e:
+        return {"ok": False, "error": f"Error reading schema: {str(e)}"}
+
+    missing = [
+        {"version": version, "kind": kind, "name": name}
+        for version, _, statements in MIGRATIONS
+        for kind, name, _ in statements
+        if name not in existing[kind]
+    ]
+    return {
+        "ok": applied >= SCHEMA_VERSION and not missing,
+        "applied_version": applied,
+        "expected_version": SCHEMA_VERSION,
+        "missing": missing,
+    }
+
+
+def ensure_schema():
+    """Apply any pending migrations. Safe to call on every startup."""
+    try:
+        applied = get_applied_version()
+        existing = get_existing_schema()
+        executed = []
+        with write_session() as session:
+            for version, description, statements in MIGRATIONS:
+                pending = [(kind, name, statement) for kind, name, statement in statements
+                           if name not in existing[kind]]
+                if version <= applied and not pending:
+                    continue
+                for kind, name, statement in pending:
+                    session.run(statement).consume()
+                    executed.append(name)
+                session.run("""
+                    MERGE (m:SchemaMigration {version: $version})
+                    ON CREATE SET m.description = $description, m.applied_at = $applied_at
+                """, version=version, description=description,
+                     applied_at=now()).consume()
+        if executed:
+            return True, f"Schema at version {SCHEMA_VERSION}; created {', '.join(executed)}"
+        return True, f"Schema already at version {SCHEMA_VERSION}"
+    except Exception as e:
+        return False, f"Error applying schema: {str(e)}"
+
+
+def drop_schema():
+    """Drop every MedGraph constraint and index and forget applied migrations."""
+    try:
+        with write_session() as session:
+            for _, _, statements in reversed(MIGRATIONS):
+                for kind, name, _ in statements:
+                    keyword = "CONSTRAINT" if kind == "constraint" else "INDEX"
+                    session.run(f"DROP {keyword} {name} IF EXISTS").consume()
+            session.run("MATCH (m:SchemaMigration) DELETE m").consume()
+        return True, "Schema dropped"
+    except Exception as e:
+        return False, f"Error dropping schema: {str(e)}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the MedGraph Neo4j schema.")
+    parser.add_argument("--check", action="store_true",
+                        help="Report missing constraints/indexes and exit non-zero if any")
+    args = parser.parse_args(argv)
+
+    if args.check:
+        status = check_schema()
+        if "error" in status:
+            print(status["error"])
+            return 2
+        print(f"Applied version: {status['applied_version']} (expected {status['expected_version']})")
+        for item in status["missing"]:
+            print(f"  ✗ missing {item['kind']} {item['name']} (v{item['version']})")
+        print("✓ Schema up to date" if status["ok"] else "✗ Schema out of date")
+        return 0 if status["ok"] else 1
+
+    success, message = ensure_schema()
+    print(message)
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
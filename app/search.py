@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+"""Full-text search helpers: Lucene query building and request coalescing.
+
+The type-ahead boxes fire one request per keystroke, often from several
+clients at once. Identical concurrent searches share a single database call
+(`SingleFlight`), and results are kept for a few seconds so repeated
+keystrokes are served without a round trip. Creates clear the result cache.
+"""
+
+import os
+import re
+import threading
+from app import events
+from app.cache import LRUCache, MISSING
+
+PERSON_FULLTEXT_INDEX = "person_name_fulltext"
+DISEASE_FULLTEXT_INDEX = "disease_fulltext"
+
+SEARCH_MODES = ("ranked", "prefix", "fuzzy")
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+
+_LUCENE_SPECIAL = re.compile(r'([+\-&|!(){}\[\]^"~*?:\\/])')
+
+
+def escape_lucene(token):
+    """Escape Lucene query syntax characters in a single search token."""
+    return _LUCENE_SPECIAL.sub(r"\\\1", token)
+
+
+def fuzzy_distance(token):
+    """Edit distance allowed for a token: none for very short words, 2 for long ones."""
+    if len(token) <= 2:
+        return 0
+    return 1 if len(token) <= 5 else 2
+
+
+def build_fulltext_query(search_term, mode="ranked"):
+    """Translate free text into a Lucene query for db.index.fulltext.queryNodes.
+
+    prefix  every word must start a word in the name ("jo smi" -> jo* AND smi*)
+    fuzzy   every word must match within a small edit distance
+    ranked  exact, prefix and fuzzy matches per word, boosted in that order
+    Returns None when the term contains nothing searchable.
+    """
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Unknown search mode '{mode}'")
+
+    tokens = [escape_lucene(token) for token in search_term.lower().split()]
+    tokens = [token for token in tokens if token]
+    if not tokens:
+        return None
+
+    clauses = []
+    for token in tokens:
+        distance = fuzzy_distance(token)
+        if mode == "prefix":
+            clauses.append(f"{token}*")
+        elif mode == "fuzzy":
+            clauses.append(f"{token}~{distance}" if distance else token)
+        else:
+            options = [f"{token}^4", f"{token}*^2"]
+            if distance:
+                options.append(f"{token}~{distance}")
+            clauses.append("(" + " OR ".join(options) + ")")
+    return " AND ".join(clauses)
+
+
+def within_distance(distance, a, b):
+    """Whether the edit distance between a and b is at most distance."""
+    if abs(len(a) - len(b)) > distance:
+        return False
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (char_a != char_b)))
+        if min(current) > distance:
+            return False
+        previous = current
+    return previous[-1] <= distance
+
+
+def search_words(label, node):
+    """The words of a node that search matches against: the name, plus a disease's description."""
+    text = node["name"] if label == "Person" else f"{node['name']} {node.get('description') or ''}"
+    return text.lower().split()
+
+
+def match_score(words, tokens, mode):
+    """Score of a node's words against every search token, or 0 if a token misses.
+
+    Mirrors build_fulltext_query for the backends without Lucene: an exact
+    word scores 4, a prefix 2 and a near miss 1 in ranked mode; prefix and
+    fuzzy modes accept only their own kind of match (an exact word always
+    matches).
+    """
+    score = 0.0
+    for token in tokens:
+        distance = fuzzy_distance(token)
+        best = 0.0
+        for word in words:
+            if word == token:
+                best = 4.0 if mode == "ranked" else 1.0
+            elif mode != "fuzzy" and word.startswith(token):
+                best = max(best, 2.0 if mode == "ranked" else 1.0)
+            elif mode != "prefix" and distance and within_distance(distance, token, word):
+                best = max(best, 1.0)
+            if best == 4.0 or (best and mode != "ranked"):
+                break
+        if not best:
+            return 0.0
+        score += best
+    return score
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one execution."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.shared = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+
+class AsyncSingleFlight:
+    """asyncio variant of SingleFlight: waiters await the leader's future."""
+
+    def __init__(self):
+        self._calls = {}
+        self.shared = 0
+
+    async def do(self, key, fn):
+        import asyncio
+        future = self._calls.get(key)
+        if future is not None:
+            self.shared += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await fn()
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an unawaited failure does not warn
+            future.exception()
+            raise
+        finally:
+            del self._calls[key]
+
+
+search_flight = SingleFlight()
+async_search_flight = AsyncSingleFlight()
+search_results = LRUCache(max_entries=int(os.getenv("SEARCH_CACHE_ENTRIES", "2048")),
+                          ttl=float(os.getenv("SEARCH_CACHE_TTL_SECONDS", "5")))
+
+
+def search_key(kind, search_term, mode, limit):
+    return (kind, search_term.strip().lower(), mode, limit)
+
+
+def cached_search(key, fn):
+    """Serve a search from the short-lived result cache, coalescing concurrent misses."""
+    value = search_results.get(key)
+    if value is not MISSING:
+        return value
+
+    def load():
+        result = fn()
+        search_results.set(key, result)
+        return result
+
+    return search_flight.do(key, load)
+
+
+async def async_cached_search(key, fn):
+    """Async variant of cached_search; fn is a coroutine function."""
+    value = search_results.get(key)
+    if value is not MISSING:
+        return value
+
+    async def load():
+        result = await fn()
+        search_results.set(key, result)
+        return result
+
+    return await async_search_flight.do(key, load)
+
+
+def search_stats():
+    stats = search_results.stats()
+    stats["coalesced"] = search_flight.shared + async_search_flight.shared
+    return stats
+
+
+def _clear_results(**_):
+    search_results.clear()
+
+
+events.subscribe(events.PERSON_CREATED, _clear_results)
+events.subscribe(events.DISEASE_CREATED, _clear_results)
@@ -0,0 +1,368 @@
+#!/usr/bin/env python
+"""In-memory patient similarity engine.
+
+Each patient is a sparse feature vector. Every disease they have an
+unresolved DIAGNOSED_WITH edge to is weighted by its severity (mild 1 to
+critical 4), and every medication they have been prescribed is weighted
+PRESCRIPTION_WEIGHT. Two scores are served:
+
+    cosine   x·y / (|x| |y|) over the weighted vectors
+    jaccard  weighted Jaccard, sum(min(x, y)) / sum(max(x, y))
+
+Both come from one sparse product of the patient's row with the transposed
+patient x feature incidence matrix. The product only touches patients who
+share a feature. Weights are small integers, so min(x, y) is the dot
+product of their unary expansions (one column per feature and weight
+level); the Jaccard numerator is therefore a matrix product too.
+
+create_diagnosis, update_diagnosis_status and add_prescription keep the
+engine current through app.events. Changed patients are held as dicts and
+scored exactly on top of the matrices. The matrices are rebuilt once more
+than REBUILD_FRACTION of patients have changed. Like app.comorbidity, each
+worker process holds its own copy.
+"""
+
+import threading
+import numpy as np
+from scipy import sparse
+from app import events
+
+SIMILARITY_DIAGNOSES_QUERY = """
+    MATCH (p:Person)-[r:DIAGNOSED_WITH]->(d:Disease)
+    WHERE coalesce(r.status, 'active') <> 'resolved'
+    RETURN p.name AS patient, d.name AS disease, r.severity AS severity
+"""
+
+SIMILARITY_PRESCRIPTIONS_QUERY = """
+    MATCH (p:Person)-[:HAS_PRESCRIPTION]->(rx:Prescription)
+    WHERE rx.medication IS NOT NULL
+    RETURN DISTINCT p.name AS patient, rx.medication AS medication
+"""
+
+SEVERITY_WEIGHTS = {"mild": 1, "moderate": 2, "severe": 3, "critical": 4}
+# Diagnoses without a known severity count as create_diagnosis's default
+DEFAULT_SEVERITY_WEIGHT = SEVERITY_WEIGHTS["moderate"]
+PRESCRIPTION_WEIGHT = 1
+MAX_WEIGHT = max(SEVERITY_WEIGHTS.values())
+RESOLVED_STATUS = "resolved"
+SIMILARITY_METRICS = ("cosine", "jaccard")
+DEFAULT_TOP_K = 10
+MAX_TOP_K = 100
+NETWORK_DEPTHS = (1, 2)
+REBUILD_FRACTION = 0.01
+MIN_REBUILD = 100
+
+DISEASE = "disease"
+MEDICATION = "medication"
+
+
+def severity_weight(severity):
+    return SEVERITY_WEIGHTS.get(severity, DEFAULT_SEVERITY_WEIGHT)
+
+
+def check_metric(metric):
+    if metric not in SIMILARITY_METRICS:
+        raise ValueError(f"Unknown metric '{metric}'; expected one of {', '.join(SIMILARITY_METRICS)}")
+    return metric
+
+
+class PatientSimilarity:
+    """Weighted patient x feature incidence with a delta of changed patients."""
+
+    def __init__(self):
+        self.ready = False
+        self._lock = threading.RLock()
+        self._clear()
+
+    def _clear(self):
+        self._ids = {}
+        self._names = []
+        self._feature_ids = {}
+        self._features = []
+        # patient id -> {feature id: weight}; authoritative for every patient
+        self._vectors = []
+        # patient id -> {disease feature id: {severity weight: diagnoses}}
+        self._diagnoses = {}
+        self._dirty = set()
+        self._built_patients = 0
+        self._built_features = 0
+        self._weighted = sparse.csr_matrix((0, 0), dtype=np.float64)
+        self._unary = sparse.csr_matrix((0, 0), dtype=np.float64)
+        self._norms = np.zeros(0)
+        self._sums = np.zeros(0)
+        self.updates = 0
+        self.rebuilds = 0
+
+    def _patient_id(self, patient):
+        patient_id = self._ids.get(patient)
+        if patient_id is None:
+            patient_id = self._ids[patient] = len(self._names)
+            self._names.append(patient)
+            self._vectors.append({})
+        return patient_id
+
+    def _feature_id(self, kind, name):
+        feature_id = self._feature_ids.get((kind, name))
+        if feature_id is None:
+            feature_id = self._feature_ids[(kind, name)] = len(self._features)
+            self._features.append((kind, name))
+        return feature_id
+
+    def _count_diagnosis(self, patient_id, feature_id, weight, delta):
+        """Add delta diagnoses at weight; the feature weighs the most severe one left."""
+        levels = self._diagnoses.setdefault(patient_id, {}).setdefault(feature_id, {})
+        levels[weight] = levels.get(weight, 0) + delta
+        if levels[weight] <= 0:
+            del levels[weight]
+        vector = self._vectors[patient_id]
+        if levels:
+            vector[feature_id] = max(levels)
+        else:
+            del self._diagnoses[patient_id][feature_id]
+            vector.pop(feature_id, None)
+
+    def load(self, diagnoses, prescriptions):
+        """Rebuild from SIMILARITY_DIAGNOSES_QUERY and SIMILARITY_PRESCRIPTIONS_QUERY rows."""
+        with self._lock:
+            self._clear()
+            for row in diagnoses:
+                self._count_diagnosis(self._patient_id(row["patient"]),
+                                      self._feature_id(DISEASE, row["disease"]),
+                                      severity_weight(row["severity"]), 1)
+            for row in prescriptions:
+                self._vectors[self._patient_id(row["patient"])][
+                    self._feature_id(MEDICATION, row["medication"])] = PRESCRIPTION_WEIGHT
+            self._build()
+            self.ready = True
+
+    def _build(self):
+        """Rebuild the transposed weighted and unary matrices from the vectors."""
+        rows, columns, weights = [], [], []
+        for patient_id, vector in enumerate(self._vectors):
+            rows += [patient_id] * len(vector)
+            columns += vector.keys()
+            weights += vector.values()
+        patients, features = len(self._vectors), len(self._features)
+        rows = np.array(rows, dtype=np.int64)
+        columns = np.array(columns, dtype=np.int64)
+        weights = np.array(weights, dtype=np.int64)
+        self._weighted = sparse.csr_matrix((weights.astype(np.float64), (columns, rows)),
+                                           shape=(features, patients))
+        # Unary expansion: feature f at weight w fills columns f*MAX_WEIGHT + 0..w-1
+        repeat = np.repeat(np.arange(len(weights)), weights)
+        levels = np.arange(len(repeat)) - np.repeat(np.cumsum(weights) - weights, weights)
+        self._unary = sparse.csr_matrix(
+            (np.ones(len(repeat)), (columns[repeat] * MAX_WEIGHT + levels, rows[repeat])),
+            shape=(features * MAX_WEIGHT, patients))
+        self._norms = np.sqrt(np.bincount(rows, weights=weights.astype(np.float64) ** 2,
+                                          minlength=patients))
+        self._sums = np.bincount(rows, weights=weights, minlength=patients).astype(np.float64)
+        self._built_patients, self._built_features = patients, features
+        self._dirty = set()
+        self.rebuilds += 1
+
+    def _changed(self, patient_id):
+        self._dirty.add(patient_id)
+        self.updates += 1
+
+    def add_diagnosis(self, patient, disease, severity=None):
+        """Record one new active diagnosis."""
+        with self._lock:
+            patient_id = self._patient_id(patient)
+            self._count_diagnosis(patient_id, self._feature_id(DISEASE, disease),
+                                  severity_weight(severity), 1)
+            self._changed(patient_id)
+
+    def set_status(self, patient, disease, status, previous=()):
+        """Apply update_diagnosis_status to every diagnosis of disease for patient.
+
+        previous holds one {severity, previous_status} row per diagnosis updated.
+        """
+        with self._lock:
+            patient_id = self._patient_id(patient)
+            feature_id = self._feature_id(DISEASE, disease)
+            for row in previous:
+                was_counted = row.get("previous_status") != RESOLVED_STATUS
+                counted = status != RESOLVED_STATUS
+                if was_counted != counted:
+                    self._count_diagnosis(patient_id, feature_id, severity_weight(row.get("severity")),
+                                          1 if counted else -1)
+            self._changed(patient_id)
+
+    def add_prescription(self, patient, medication):
+        with self._lock:
+            if medication is None:
+                return
+            patient_id = self._patient_id(patient)
+            feature_id = self._feature_id(MEDICATION, medication)
+            if feature_id not in self._vectors[patient_id]:
+                self._vectors[patient_id][feature_id] = PRESCRIPTION_WEIGHT
+                self._changed(patient_id)
+
+    def _scores(self, patient_id, metric):
+        """(patient ids, scores) of every other patient sharing a feature."""
+        if len(self._dirty) > max(MIN_REBUILD, REBUILD_FRACTION * len(self._vectors)):
+            self._build()
+        vector = self._vectors[patient_id]
+        built = [(feature_id, weight) for feature_id, weight in vector.items()
+                 if feature_id < self._built_features]
+        if metric == "cosine":
+            norm = np.sqrt(sum(weight * weight for weight in vector.values()))
+            query = sparse.csr_matrix(
+                ([float(weight) for _, weight in built],
+                 ([0] * len(built), [feature_id for feature_id, _ in built])),
+                shape=(1, self._built_features))
+            product = (query @ self._weighted).tocoo()
+            candidates, values = product.col, product.data / (norm * self._norms[product.col])
+        else:
+            total = float(sum(vector.values()))
+            unary = [feature_id * MAX_WEIGHT + level for feature_id, weight in built
+                     for level in range(weight)]
+            query = sparse.csr_matrix((np.ones(len(unary)), ([0] * len(unary), unary)),
+                                      shape=(1, self._built_features * MAX_WEIGHT))
+            product = (query @ self._unary).tocoo()
+            overlap = product.data
+            candidates, values = product.col, overlap / (total + self._sums[product.col] - overlap)
+
+        # Changed patients are scored from their current vectors instead
+        keep = candidates != patient_id
+        if self._dirty:
+            keep &= ~np.isin(candidates, np.fromiter(self._dirty, dtype=candidates.dtype))
+        candidates, values = candidates[keep], values[keep]
+        extra_ids, extra_values = [], []
+        for other in self._dirty:
+            if other == patient_id:
+                continue
+            score = self._pair_score(vector, self._vectors[other], metric)
+            if score > 0:
+                extra_ids.append(other)
+                extra_values.append(score)
+        if extra_ids:
+            candidates = np.concatenate([candidates, np.array(extra_ids, dtype=candidates.dtype)])
+            values = np.concatenate([values, np.array(extra_values)])
+        return candidates, values
+
+    @staticmethod
+    def _pair_score(vector, other, metric):
+        shared = vector.keys() & other.keys()
+        if not shared:
+            return 0.0
+        if metric == "cosine":
+            dot = sum(vector[feature] * other[feature] for feature in shared)
+            return dot / np.sqrt(sum(w * w for w in vector.values()) *
+                                 sum(w * w for w in other.values()))
+        overlap = sum(min(vector[feature], other[feature]) for feature in shared)
+        return overlap / (sum(vector.values()) + sum(other.values()) - overlap)
+
+    def _top(self, patient_id, k, metric):
+        """[(patient id, score)] of the k most similar patients, best first, ties by name."""
+        candidates, values = self._scores(patient_id, metric)
+        # Equal scores reached through different float sums must tie
+        values = np.round(values, 12)
+        if len(values) > k:
+            # Keep every candidate tied with the k-th score so ties break by name
+            threshold = np.partition(values, len(values) - k)[len(values) - k]
+            keep = values >= threshold
+            candidates, values = candidates[keep], values[keep]
+        ranked = sorted(zip(candidates.tolist(), values.tolist()),
+                        key=lambda item: (-item[1], self._names[item[0]]))
+        return ranked[:k]
+
+    def _shared(self, patient_id, other_id, kind):
+        vector, other = self._vectors[patient_id], self._vectors[other_id]
+        return sorted(self._features[feature][1] for feature in vector.keys() & other.keys()
+                      if self._features[feature][0] == kind)
+
+    def similar_patients(self, patient, k=DEFAULT_TOP_K, metric="cosine"):
+        """Top-k patients most similar to patient, with the diseases and medications shared.
+
+        Returns None if the patient has no diagnoses or prescriptions.
+        """
+        check_metric(metric)
+        k = max(1, min(int(k), MAX_TOP_K))
+        with self._lock:
+            patient_id = self._ids.get(patient)
+            if patient_id is None or not self._vectors[patient_id]:
+                return None
+            return {
+                "patient": patient,
+                "metric": metric,
+                "similar": [{
+                    "patient": self._names[other_id],
+                    "score": round(score, 4),
+                    "shared_diseases": self._shared(patient_id, other_id, DISEASE),
+                    "shared_medications": self._shared(patient_id, other_id, MEDICATION),
+                } for other_id, score in self._top(patient_id, k, metric)],
+            }
+
+    def similarity_network(self, patient, k=DEFAULT_TOP_K, metric="cosine", depth=1):
+        """vis.js nodes/edges of the patient's top-k neighbours, and theirs at depth 2."""
+        check_metric(metric)
+        depth = int(depth)
+        if depth not in NETWORK_DEPTHS:
+            raise ValueError(f"Unknown depth {depth}; expected one of "
+                             f"{', '.join(map(str, NETWORK_DEPTHS))}")
+        k = max(1, min(int(k), MAX_TOP_K))
+        with self._lock:
+            patient_id = self._ids.get(patient)
+            if patient_id is None or not self._vectors[patient_id]:
+                return None
+            levels = {patient_id: 0}
+            edges = {}
+            frontier = [patient_id]
+            for hop in range(1, depth + 1):
+                following = []
+                for source in frontier:
+                    for target, score in self._top(source, k, metric):
+                        edges.setdefault(tuple(sorted((source, target))), score)
+                        if target not in levels:
+                            levels[target] = hop
+                            following.append(target)
+                frontier = following
+
+            nodes = [{"id": self._names[node_id], "label": self._names[node_id],
+                      "level": level, "color": "#e74c3c" if level == 0 else "#3498db",
+                      "size": 30 if level == 0 else 20 - 5 * level}
+                     for node_id, level in levels.items()]
+            return {
+                "nodes": nodes,
+                "edges": [{"from": self._names[a], "to": self._names[b], "value": round(score, 4),
+                           "title": f"{metric}: {score:.3f}"}
+                          for (a, b), score in edges.items()],
+                "meta": {"patient": patient, "metric": metric, "k": k, "depth": depth,
+                         "node_count": len(nodes), "edge_count": len(edges)},
+            }
+
+    def stats(self):
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "patients": len(self._vectors),
+                "features": len(self._features),
+                "nonzeros": int(self._weighted.nnz),
+                "pending_patients": len(self._dirty),
+                "updates": self.updates,
+                "rebuilds": self.rebuilds,
+            }
+
+
+similarity = PatientSimilarity()
+
+
+def warm_similarity(rows):
+    """Load from (diagnoses, prescriptions) rows; returns (patients, features)."""
+    diagnoses, prescriptions = rows
+    similarity.load(diagnoses, prescriptions)
+    stats = similarity.stats()
+    return stats["patients"], stats["features"]
+
+
+events.subscribe(events.DIAGNOSIS_CREATED,
+                 lambda patient_name, disease_name, severity=None, **_: similarity.add_diagnosis(
+                     patient_name, disease_name, severity))
+events.subscribe(events.DIAGNOSIS_UPDATED,
+                 lambda patient_name, disease_name, status, previous=(), **_: similarity.set_status(
+                     patient_name, disease_name, status, previous))
+events.subscribe(events.PRESCRIPTION_ADDED,
+                 lambda patient_name, medication=None, **_: similarity.add_prescription(
+                     patient_name, medication))
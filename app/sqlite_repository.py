@@ -0,0 +1,709 @@
+#!/usr/bin/env python
+"""Embedded repository: the MedGraph graph in a local SQLite file.
+
+For sites that cannot run a Neo4j server. Relationships are adjacency
+tables, each indexed in both directions of the traversals the app makes:
+
+    has_disease  clustered on (person, disease), indexed on (disease, person)
+    diagnoses    indexed on (person, status, disease) for records and the
+                 second hop of the disease network, and on
+                 (disease, status, ts) for search_by_diagnosis, the first hop
+                 and the overview clusters, already in date order
+
+Prescriptions, vitals and history are indexed on (person, time), so a
+patient's record reads contiguous index ranges. Person and disease search
+uses a word table (label, word, node) for prefix range scans and a scan of
+the distinct words for fuzzy matches, scored like the full-text index.
+
+The database runs in WAL mode: one connection writes under a lock, and each
+reading thread gets its own connection, so reads never wait for writes.
+"""
+
+import os
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from app.repository import Repository
+from app.search import search_words, match_score, within_distance, fuzzy_distance
+from app.model import to_datetime
+
+DEFAULT_SQLITE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                   "data", "medgraph.sqlite3")
+ACTIVE_STATUS = "active"
+VITAL_COLUMNS = ("blood_pressure", "systolic", "diastolic", "heart_rate", "temperature",
+                 "weight", "height", "bmi")
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS persons (
+           pk INTEGER PRIMARY KEY, id TEXT UNIQUE, name TEXT NOT NULL UNIQUE, age INTEGER)""",
+    """CREATE TABLE IF NOT EXISTS diseases (
+           pk INTEGER PRIMARY KEY, id TEXT UNIQUE, name TEXT NOT NULL UNIQUE, description TEXT)""",
+    """CREATE TABLE IF NOT EXISTS has_disease (
+           person INTEGER NOT NULL, disease INTEGER NOT NULL, id TEXT,
+           PRIMARY KEY (person, disease)
+       ) WITHOUT ROWID""",
+    "CREATE INDEX IF NOT EXISTS has_disease_by_disease ON has_disease (disease, person)",
+    """CREATE TABLE IF NOT EXISTS diagnoses (
+           id TEXT PRIMARY KEY, person INTEGER NOT NULL, disease INTEGER NOT NULL,
+           doctor TEXT, ts INTEGER, date TEXT, notes TEXT, severity TEXT, status TEXT,
+           updated_at TEXT, resolution_notes TEXT)""",
+    "CREATE INDEX IF NOT EXISTS diagnoses_by_person ON diagnoses (person, status, disease)",
+    "CREATE INDEX IF NOT EXISTS diagnoses_by_disease ON diagnoses (disease, status, ts)",
+    "CREATE INDEX IF NOT EXISTS diagnoses_by_doctor ON diagnoses (doctor)",
+    """CREATE TABLE IF NOT EXISTS prescriptions (
+           id TEXT PRIMARY KEY, person INTEGER NOT NULL, medication TEXT, dosage TEXT,
+           frequency TEXT, doctor TEXT, duration TEXT, notes TEXT, ts INTEGER, date TEXT,
+           status TEXT)""",
+    "CREATE INDEX IF NOT EXISTS prescriptions_by_person ON prescriptions (person, ts)",
+    "CREATE INDEX IF NOT EXISTS prescriptions_by_doctor ON prescriptions (doctor)",
+    """CREATE TABLE IF NOT EXISTS vitals (
+           id TEXT PRIMARY KEY, person INTEGER NOT NULL, ts INTEGER, date TEXT,
+           blood_pressure TEXT, systolic REAL, diastolic REAL, heart_rate REAL,
+           temperature REAL, weight REAL, height REAL, bmi REAL, notes TEXT)""",
+    "CREATE INDEX IF NOT EXISTS vitals_by_person ON vitals (person, ts)",
+    """CREATE TABLE IF NOT EXISTS history (
+           id TEXT PRIMARY KEY, person INTEGER NOT NULL, condition TEXT, date_diagnosed TEXT,
+           resolved INTEGER, notes TEXT, created_at TEXT)""",
+    "CREATE INDEX IF NOT EXISTS history_by_person ON history (person, date_diagnosed)",
+    """CREATE TABLE IF NOT EXISTS search_words (
+           label TEXT NOT NULL, word TEXT NOT NULL, node INTEGER NOT NULL,
+           PRIMARY KEY (label, word, node)
+       ) WITHOUT ROWID""",
+]
+
+TABLES = {"Person": "persons", "Disease": "diseases"}
+COLUMNS = {"Person": ("id", "name", "age"), "Disease": ("id", "name", "description")}
+
+PERSON_PK = "(SELECT pk FROM persons WHERE name = :patient)"
+DISEASE_PK = "(SELECT pk FROM diseases WHERE name = :disease)"
+
+# The timeline streams of app.timeline.TIMELINE_STREAM_QUERIES
+_TIMELINE_FILTER = """
+      AND {t}.ts IS NOT NULL
+      AND (:since IS NULL OR {t}.ts >= :since) AND (:until IS NULL OR {t}.ts < :until)
+      AND (:before IS NULL OR {t}.ts < :before
+           OR ({t}.ts = :before AND :tie AND (:before_key IS NULL OR {t}.id < :before_key)))
+    ORDER BY ts DESC, key DESC
+    LIMIT :limit
+"""
+
+TIMELINE_STREAM_QUERIES = {
+    "diagnosis": """
+        SELECT d.name AS disease, g.date AS date, g.severity AS severity, g.status AS status,
+               'diagnosis' AS type, g.ts AS ts, g.id AS key
+        FROM diagnoses g JOIN diseases d ON d.pk = g.disease
+        WHERE g.person = """ + PERSON_PK + _TIMELINE_FILTER.format(t="g"),
+    "prescription": """
+        SELECT rx.medication AS item, rx.date AS date, rx.status AS status,
+               'prescription' AS type, rx.ts AS ts, rx.id AS key
+        FROM prescriptions rx
+        WHERE rx.person = """ + PERSON_PK + _TIMELINE_FILTER.format(t="rx"),
+    "vitals": """
+        SELECT 'Vitals Recorded' AS item, v.date AS date, 'active' AS status,
+               'vitals' AS type, v.ts AS ts, v.id AS key
+        FROM vitals v
+        WHERE v.person = """ + PERSON_PK + _TIMELINE_FILTER.format(t="v"),
+}
+
+
+def _dict_row(cursor, row):
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+def _iso(value):
+    value = to_datetime(value)
+    return value.isoformat() if value is not None else None
+
+
+def _millis(value):
+    value = to_datetime(value)
+    return int(value.timestamp() * 1000) if value is not None else None
+
+
+def _names(values):
+    """One JSON parameter for `IN (SELECT value FROM json_each(?))`, free of variable limits."""
+    return json.dumps(list(values))
+
+
+class SQLiteRepository(Repository):
+    backend = "sqlite"
+
+    def __init__(self, path=DEFAULT_SQLITE_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        # An in-memory database exists only on its own connection, so reads share it
+        self._shared = path == ":memory:"
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._readers = []
+        self._conn = self._connect()
+        with self._conn:
+            for statement in SCHEMA:
+                self._conn.execute(statement)
+
+    @classmethod
+    def from_env(cls, environ=None):
+        environ = os.environ if environ is None else environ
+        return cls(environ.get("SQLITE_PATH") or DEFAULT_SQLITE_PATH)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.row_factory = _dict_row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def _write(self):
+        """The writer connection inside one transaction."""
+        with self._lock, self._conn:
+            yield self._conn
+
+    @contextmanager
+    def _read(self):
+        if self._shared:
+            with self._lock:
+                yield self._conn
+            return
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+            with self._lock:
+                self._readers.append(conn)
+        yield conn
+
+    def _all(self, query, params=()):
+        with self._read() as conn:
+            return conn.execute(query, params).fetchall()
+
+    def _one(self, query, params=()):
+        with self._read() as conn:
+            return conn.execute(query, params).fetchone()
+
+    # Writes
+
+    def _create_node(self, label, id, name, value):
+        table, columns = TABLES[label], COLUMNS[label]
+        with self._write() as conn:
+            inserted = conn.execute(
+                f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) VALUES (?, ?, ?)",
+                (id, name, value)).rowcount
+            node = conn.execute(f"SELECT pk, id FROM {table} WHERE name = ?", (name,)).fetchone()
+            if inserted:
+                words = set(search_words(label, dict(zip(columns, (id, name, value)))))
+                conn.executemany("INSERT OR IGNORE INTO search_words VALUES (?, ?, ?)",
+                                 [(label, word, node["pk"]) for word in words])
+            return node["id"] == id
+
+    def create_person(self, id, name, age):
+        return self._create_node("Person", id, name, age)
+
+    def create_disease(self, id, name, description):
+        return self._create_node("Disease", id, name, description)
+
+    def create_relationship(self, id, person_name, disease_name):
+        params = {"patient": person_name, "disease": disease_name}
+        with self._write() as conn:
+            row = conn.execute(f"SELECT {PERSON_PK} AS person, {DISEASE_PK} AS disease",
+                               params).fetchone()
+            result = {"person_found": row["person"] is not None,
+                      "disease_found": row["disease"] is not None, "created": False}
+            if result["person_found"] and result["disease_found"]:
+                conn.execute("INSERT OR IGNORE INTO has_disease VALUES (?, ?, ?)",
+                             (row["person"], row["disease"], id))
+                stored = conn.execute("SELECT id FROM has_disease WHERE person = ? AND disease = ?",
+                                      (row["person"], row["disease"])).fetchone()
+                result["created"] = stored["id"] == id
+            return result
+
+    def delete_relationship(self, person_name, disease_name):
+        with self._write() as conn:
+            return conn.execute(f"DELETE FROM has_disease WHERE person = {PERSON_PK} "
+                                f"AND disease = {DISEASE_PK}",
+                                {"patient": person_name, "disease": disease_name}).rowcount > 0
+
+    @staticmethod
+    def _stored(conn, table, id):
+        """Whether the record id exists, i.e. this call or an earlier retry wrote it."""
+        return conn.execute(f"SELECT 1 FROM {table} WHERE id = ?", (id,)).fetchone() is not None
+
+    def create_diagnosis(self, id, patient_name, disease_name, doctor_name, date, notes, severity):
+        with self._write() as conn:
+            conn.execute(f"""
+                INSERT OR IGNORE INTO diagnoses
+                    (id, person, disease, doctor, ts, date, notes, severity, status)
+                SELECT :id, {PERSON_PK}, {DISEASE_PK}, :doctor, :ts, :date, :notes, :severity,
+                       'active'
+                WHERE {PERSON_PK} IS NOT NULL AND {DISEASE_PK} IS NOT NULL
+            """, {"id": id, "patient": patient_name, "disease": disease_name,
+                  "doctor": doctor_name, "ts": _millis(date), "date": _iso(date),
+                  "notes": notes, "severity": severity})
+            return self._stored(conn, "diagnoses", id)
+
+    def _add_record(self, table, values):
+        """Insert a per-patient record; values holds id, patient and the other columns."""
+        columns = [column for column in values if column != "patient"]
+        with self._write() as conn:
+            conn.execute(f"""
+                INSERT OR IGNORE INTO {table} (person, {', '.join(columns)})
+                SELECT pk, {', '.join(':' + column for column in columns)}
+                FROM persons WHERE name = :patient
+            """, values)
+            return self._stored(conn, table, values["id"])
+
+    def add_history(self, id, patient_name, condition, date_diagnosed, resolved, notes, created_at):
+        return self._add_record("history", {
+            "id": id, "patient": patient_name, "condition": condition,
+            "date_diagnosed": date_diagnosed, "resolved": resolved, "notes": notes,
+            "created_at": _iso(created_at)})
+
+    def add_prescription(self, id, patient_name, medication, dosage, frequency, doctor_name,
+                         duration, notes, prescribed_date):
+        return self._add_record("prescriptions", {
+            "id": id, "patient": patient_name, "medication": medication, "dosage": dosage,
+            "frequency": frequency, "doctor": doctor_name, "duration": duration, "notes": notes,
+            "ts": _millis(prescribed_date), "date": _iso(prescribed_date),
+            "status": ACTIVE_STATUS})
+
+    def add_vitals(self, id, patient_name, notes, recorded_at, **vitals):
+        values = {"id": id, "patient": patient_name, "notes": notes,
+                  "ts": _millis(recorded_at), "date": _iso(recorded_at)}
+        values.update((column, vitals.get(column)) for column in VITAL_COLUMNS)
+        return self._add_record("vitals", values)
+
+    def update_diagnosis_status(self, patient_name, disease_name, status, notes, updated_at):
+        match = f"person = {PERSON_PK} AND disease = {DISEASE_PK}"
+        params = {"patient": patient_name, "disease": disease_name, "status": status,
+                  "notes": notes, "updated_at": _iso(updated_at)}
+        with self._write() as conn:
+            previous = conn.execute(f"SELECT doctor, severity, status AS previous_status "
+                                    f"FROM diagnoses WHERE {match}", params).fetchall()
+            conn.execute(f"""
+                UPDATE diagnoses
+                SET status = :status, updated_at = :updated_at,
+                    resolution_notes = CASE WHEN :notes <> '' THEN :notes ELSE resolution_notes END
+                WHERE {match}
+            """, params)
+            return previous
+
+    def _bulk_create_nodes(self, label, rows):
+        table, columns = TABLES[label], COLUMNS[label]
+        values = [tuple(row[column] for column in columns) for row in rows]
+        with self._write() as conn:
+            conn.executemany(f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) "
+                             f"VALUES (?, ?, ?)", values)
+            stored = {node["name"]: node for node in conn.execute(
+                f"SELECT pk, id, name FROM {table} WHERE name IN (SELECT value FROM json_each(?))",
+                (_names(row["name"] for row in rows),))}
+            results, words = [], []
+            for row, value in zip(rows, values):
+                node = stored[row["name"]]
+                created = node["id"] == row["id"]
+                if created:
+                    words += [(label, word, node["pk"]) for word in
+                              set(search_words(label, dict(zip(columns, value))))]
+                results.append({"index": row["index"], "created": created})
+            conn.executemany("INSERT OR IGNORE INTO search_words VALUES (?, ?, ?)", words)
+            return results
+
+    def bulk_create_persons(self, rows):
+        return self._bulk_create_nodes("Person", rows)
+
+    def bulk_create_diseases(self, rows):
+        return self._bulk_create_nodes("Disease", rows)
+
+    def bulk_create_relationships(self, rows):
+        with self._write() as conn:
+            persons = {node["name"]: node["pk"] for node in conn.execute(
+                "SELECT pk, name FROM persons WHERE name IN (SELECT value FROM json_each(?))",
+                (_names(row["person_name"] for row in rows),))}
+            diseases = {node["name"]: node["pk"] for node in conn.execute(
+                "SELECT pk, name FROM diseases WHERE name IN (SELECT value FROM json_each(?))",
+                (_names(row["disease_name"] for row in rows),))}
+            found = [(persons[row["person_name"]], diseases[row["disease_name"]], row["id"])
+                     for row in rows
+                     if row["person_name"] in persons and row["disease_name"] in diseases]
+            conn.executemany("INSERT OR IGNORE INTO has_disease VALUES (?, ?, ?)", found)
+            stored = {edge["id"] for edge in conn.execute(
+                "SELECT id FROM has_disease WHERE id IN (SELECT value FROM json_each(?))",
+                (_names(edge[2] for edge in found),))}
+        return [{"index": row["index"], "person_found": row["person_name"] in persons,
+                 "disease_found": row["disease_name"] in diseases, "created": row["id"] in stored}
+                for row in rows]
+
+    def bulk_add_vitals(self, rows):
+        columns = ("id", "notes", "ts", "date") + VITAL_COLUMNS
+        values = [dict({column: row.get(column) for column in VITAL_COLUMNS},
+                       id=row["id"], patient=row["patient"], notes=row["notes"],
+                       ts=_millis(row["recorded_at"]), date=_iso(row["recorded_at"]))
+                  for row in rows]
+        with self._write() as conn:
+            conn.executemany(f"""
+                INSERT OR IGNORE INTO vitals (person, {', '.join(columns)})
+                SELECT pk, {', '.join(':' + column for column in columns)}
+                FROM persons WHERE name = :patient
+            """, values)
+            stored = {record["id"] for record in conn.execute(
+                "SELECT id FROM vitals WHERE id IN (SELECT value FROM json_each(?))",
+                (_names(row["id"] for row in rows),))}
+        return [{"index": row["index"]} for row in rows if row["id"] in stored]
+
+    # Persons and diseases
+
+    def person_exists(self, name):
+        return self._one("SELECT 1 FROM persons WHERE name = ?", (name,)) is not None
+
+    def existing_persons(self, names):
+        return {row["name"] for row in self._all(
+            "SELECT name FROM persons WHERE name IN (SELECT value FROM json_each(?))",
+            (_names(names),))}
+
+    def person_diseases(self, name):
+        return self._all(f"""
+            SELECT d.id AS id, d.name AS name, d.description AS description
+            FROM has_disease h JOIN diseases d ON d.pk = h.disease
+            WHERE h.person = {PERSON_PK}
+        """, {"patient": name})
+
+    def graph_patients(self, diseases, exclude, limit):
+        # The (disease, person) index gives each disease's people; rows keep the input order
+        return self._all("""
+            SELECT disease, patient, age FROM (
+                SELECT j.key AS position, d.name AS disease, p.name AS patient, p.age AS age,
+                       ROW_NUMBER() OVER (PARTITION BY d.pk ORDER BY p.name) AS n
+                FROM json_each(:diseases) j
+                JOIN diseases d ON d.name = j.value
+                JOIN has_disease h ON h.disease = d.pk
+                JOIN persons p ON p.pk = h.person
+                WHERE p.name NOT IN (SELECT value FROM json_each(:exclude))
+            )
+            WHERE n <= :limit
+            ORDER BY position, patient
+        """, {"diseases": _names(diseases), "exclude": _names(exclude), "limit": limit})
+
+    def graph_diseases(self, patients, limit):
+        return self._all("""
+            SELECT patient, disease, description FROM (
+                SELECT j.key AS position, p.name AS patient, d.name AS disease,
+                       d.description AS description,
+                       ROW_NUMBER() OVER (PARTITION BY p.pk ORDER BY d.name) AS n
+                FROM json_each(:patients) j
+                JOIN persons p ON p.name = j.value
+                JOIN has_disease h ON h.person = p.pk
+                JOIN diseases d ON d.pk = h.disease
+            )
+            WHERE n <= :limit
+            ORDER BY position, disease
+        """, {"patients": _names(patients), "limit": limit})
+
+    def all_persons(self):
+        return self._all("SELECT id, name, age FROM persons ORDER BY name")
+
+    def all_diseases(self):
+        return self._all("SELECT id, name, description FROM diseases ORDER BY name")
+
+    def list_rows(self, label, fields, after="", limit=None):
+        unknown = [field for field in fields if field not in COLUMNS[label]]
+        if unknown:
+            raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+        columns = ", ".join(dict.fromkeys(["name"] + list(fields)))
+        query = f"SELECT {columns} FROM {TABLES[label]} WHERE name > ? ORDER BY name"
+        params = (after or "",)
+        if limit is not None:
+            query += " LIMIT ?"
+            params += (limit,)
+        with self._read() as conn:
+            cursor = conn.execute(query, params)
+            # A thread's own connection streams from the cursor; the shared one cannot
+            return iter(cursor.fetchall() if self._shared else cursor)
+
+    def _word_matches(self, conn, label, token, mode):
+        """pks of label nodes with a word matching token in mode."""
+        words = []
+        if mode == "fuzzy":
+            words.append(token)
+        else:
+            nodes = {row["node"] for row in conn.execute(
+                "SELECT node FROM search_words WHERE label = ? AND word >= ? AND word < ?",
+                (label, token, token + "\U0010ffff"))}
+        distance = fuzzy_distance(token)
+        if mode != "prefix" and distance:
+            words += [row["word"] for row in conn.execute(
+                "SELECT DISTINCT word FROM search_words WHERE label = ? "
+                "AND length(word) BETWEEN ? AND ?",
+                (label, len(token) - distance, len(token) + distance))
+                if within_distance(distance, token, row["word"])]
+        matched = {row["node"] for row in conn.execute(
+            "SELECT node FROM search_words WHERE label = ? "
+            "AND word IN (SELECT value FROM json_each(?))", (label, _names(words)))}
+        return matched if mode == "fuzzy" else matched | nodes
+
+    def search(self, kind, search_term, query, mode, limit):
+        label, field = ("Person", "age") if kind == "patients" else ("Disease", "description")
+        tokens = search_term.lower().split()
+        with self._read() as conn:
+            candidates = None
+            for token in tokens:
+                matched = self._word_matches(conn, label, token, mode)
+                candidates = matched if candidates is None else candidates & matched
+                if not candidates:
+                    return []
+            nodes = conn.execute(f"SELECT id, name, {field} FROM {TABLES[label]} "
+                                 f"WHERE pk IN (SELECT value FROM json_each(?))",
+                                 (_names(candidates),)).fetchall()
+        matches = []
+        for node in nodes:
+            score = match_score(search_words(label, node), tokens, mode)
+            if score:
+                matches.append(dict(node, score=score))
+        matches.sort(key=lambda match: (-match["score"], match["name"]))
+        return matches[:limit]
+
+    def patient_details(self, name):
+        with self._read() as conn:
+            person = conn.execute("SELECT id, name, age FROM persons WHERE name = ?",
+                                  (name,)).fetchone()
+            if person is None:
+                return None
+            person["diseases"] = conn.execute(f"""
+                SELECT d.id AS id, d.name AS name, d.description AS description
+                FROM has_disease h JOIN diseases d ON d.pk = h.disease
+                WHERE h.person = {PERSON_PK}
+                ORDER BY d.name
+            """, {"patient": name}).fetchall()
+            return person
+
+    def node_id(self, label, name):
+        row = self._one(f"SELECT id FROM {TABLES[label]} WHERE name = ?", (name,))
+        return row["id"] if row else None
+
+    def node_name(self, label, node_id):
+        row = self._one(f"SELECT name FROM {TABLES[label]} WHERE id = ?", (node_id,))
+        return row["name"] if row else None
+
+    def node_ids(self, label, names):
+        return {row["name"]: row["id"] for row in self._all(
+            f"SELECT name, id FROM {TABLES[label]} "
+            f"WHERE name IN (SELECT value FROM json_each(?)) AND id IS NOT NULL", (_names(names),))}
+
+    # Medical records
+
+    def medical_record(self, name, sections, params):
+        with self._read() as conn:
+            person = conn.execute("SELECT pk, id, name, age FROM persons WHERE name = ?",
+                                  (name,)).fetchone()
+            if person is None:
+                return None
+            pk = person.pop("pk")
+            if "diagnoses" in sections:
+                person["diagnoses"] = conn.execute("""
+                    SELECT d.name AS disease, g.doctor AS doctor, g.date AS date,
+                           g.notes AS notes, g.severity AS severity, g.status AS status
+                    FROM diagnoses g JOIN diseases d ON d.pk = g.disease
+                    WHERE g.person = ?
+                    ORDER BY g.ts DESC
+                """, (pk,)).fetchall()
+            if "prescriptions" in sections:
+                person["prescriptions"] = conn.execute("""
+                    SELECT medication, dosage, frequency, doctor, duration, date, status, notes
+                    FROM prescriptions WHERE person = ?
+                    ORDER BY ts DESC LIMIT ? OFFSET ?
+                """, (pk, params["prescriptions_limit"], params["prescriptions_offset"])).fetchall()
+                person["prescriptions_total"] = conn.execute(
+                    "SELECT count(*) AS n FROM prescriptions WHERE person = ?", (pk,)).fetchone()["n"]
+            if "vitals" in sections:
+                person["vitals"] = conn.execute(f"""
+                    SELECT {', '.join(VITAL_COLUMNS)}, date FROM vitals WHERE person = ?
+                    ORDER BY ts DESC LIMIT ?
+                """, (pk, params["vitals_limit"])).fetchall()
+            if "medical_history" in sections:
+                history = conn.execute("""
+                    SELECT condition, date_diagnosed, resolved, notes FROM history
+                    WHERE person = ?
+                    ORDER BY date_diagnosed DESC LIMIT ? OFFSET ?
+                """, (pk, params["history_limit"], params["history_offset"])).fetchall()
+                for entry in history:
+                    if entry["resolved"] is not None:
+                        entry["resolved"] = bool(entry["resolved"])
+                person["medical_history"] = history
+                person["medical_history_total"] = conn.execute(
+                    "SELECT count(*) AS n FROM history WHERE person = ?", (pk,)).fetchone()["n"]
+            return person
+
+    def active_patients_with(self, disease_name):
+        # diagnoses_by_disease yields the disease's active diagnoses already in date order
+        return self._all(f"""
+            SELECT p.id AS patient_id, p.name AS patient_name, p.age AS age,
+                   g.doctor AS doctor, g.date AS diagnosed_date, g.severity AS severity
+            FROM diagnoses g JOIN persons p ON p.pk = g.person
+            WHERE g.disease = {DISEASE_PK} AND g.status = 'active'
+            ORDER BY g.ts DESC
+        """, {"disease": disease_name})
+
+    def timeline_rows(self, name, event_type, since, until, limit, before, tie, before_key):
+        return self._all(TIMELINE_STREAM_QUERIES[event_type], {
+            "patient": name, "since": _millis(since), "until": _millis(until), "limit": limit,
+            "before": before, "tie": bool(tie), "before_key": before_key})
+
+    # Hospital-wide reads
+
+    def diagnosis_rows(self):
+        return self._all("""
+            SELECT p.name AS patient, p.age AS age, d.name AS disease,
+                   g.severity AS severity, g.status AS status
+            FROM diagnoses g JOIN persons p ON p.pk = g.person JOIN diseases d ON d.pk = g.disease
+        """)
+
+    def overview_clusters(self, status):
+        return self._all("""
+            SELECT d.name AS disease, coalesce(g.severity, 'unknown') AS severity,
+                   count(DISTINCT g.person) AS patients
+            FROM diagnoses g JOIN diseases d ON d.pk = g.disease
+            WHERE :status IS NULL OR g.status = :status
+            GROUP BY g.disease, coalesce(g.severity, 'unknown')
+        """, {"status": status})
+
+    def overview_links(self, diseases, status, limit):
+        return self._all("""
+            WITH shown AS (SELECT pk, name FROM diseases
+                           WHERE name IN (SELECT value FROM json_each(:diseases)))
+            SELECT d1.name AS source, d2.name AS target, count(DISTINCT a.person) AS shared
+            FROM shown d1
+            JOIN diagnoses a ON a.disease = d1.pk
+            JOIN diagnoses b ON b.person = a.person
+            JOIN shown d2 ON d2.pk = b.disease
+            WHERE d1.name < d2.name
+              AND (:status IS NULL OR (a.status = :status AND b.status = :status))
+            GROUP BY d1.name, d2.name
+            ORDER BY shared DESC, source, target
+            LIMIT :limit
+        """, {"diseases": _names(diseases), "status": status, "limit": limit})
+
+    def cluster_patients(self, disease, severity, status, after, limit):
+        return self._all(f"""
+            SELECT p.name AS patient, p.age AS age, g.severity AS severity, g.status AS status
+            FROM diagnoses g JOIN persons p ON p.pk = g.person
+            WHERE g.disease = {DISEASE_PK}
+              AND (:status IS NULL OR g.status = :status)
+              AND (:severity IS NULL OR coalesce(g.severity, 'unknown') = :severity)
+              AND (:after IS NULL OR p.name > :after)
+            ORDER BY p.name
+            LIMIT :limit
+        """, {"disease": disease, "status": status, "severity": severity, "after": after,
+              "limit": limit})
+
+    def active_diagnoses(self):
+        return self._all("""
+            SELECT p.name AS patient, d.name AS disease
+            FROM diagnoses g JOIN persons p ON p.pk = g.person JOIN diseases d ON d.pk = g.disease
+            WHERE g.status = 'active'
+        """)
+
+    def stats_rows(self):
+        with self._read() as conn:
+            return (
+                conn.execute("""
+                    SELECT d.name AS disease, g.severity AS severity, g.status AS status,
+                           g.doctor AS doctor, count(*) AS diagnoses
+                    FROM diagnoses g JOIN diseases d ON d.pk = g.disease
+                    GROUP BY g.disease, g.severity, g.status, g.doctor
+                """).fetchall(),
+                conn.execute("""
+                    SELECT g.doctor AS doctor, p.name AS patient, count(*) AS diagnoses
+                    FROM diagnoses g JOIN persons p ON p.pk = g.person
+                    WHERE g.doctor IS NOT NULL
+                    GROUP BY g.doctor, g.person
+                """).fetchall(),
+                conn.execute("""
+                    SELECT doctor, count(*) AS prescriptions FROM prescriptions
+                    WHERE doctor IS NOT NULL GROUP BY doctor
+                """).fetchall(),
+            )
+
+    def similarity_rows(self):
+        with self._read() as conn:
+            return (
+                conn.execute("""
+                    SELECT p.name AS patient, d.name AS disease, g.severity AS severity
+                    FROM diagnoses g JOIN persons p ON p.pk = g.person JOIN diseases d ON d.pk = g.disease
+                    WHERE coalesce(g.status, 'active') <> 'resolved'
+                """).fetchall(),
+                conn.execute("""
+                    SELECT DISTINCT p.name AS patient, rx.medication AS medication
+                    FROM prescriptions rx JOIN persons p ON p.pk = rx.person
+                    WHERE rx.medication IS NOT NULL
+                """).fetchall(),
+            )
+
+    def disease_distribution(self):
+        return self._all("""
+            SELECT d.name AS disease, count(*) AS patient_count
+            FROM diagnoses g JOIN diseases d ON d.pk = g.disease
+            WHERE g.status = 'active'
+            GROUP BY g.disease
+            ORDER BY patient_count DESC
+            LIMIT 10
+        """)
+
+    def severity_distribution(self):
+        return self._all("SELECT severity, count(*) AS count FROM diagnoses "
+                         "WHERE status = 'active' GROUP BY severity")
+
+    def doctor_stats(self, doctor):
+        with self._read() as conn:
+            return {
+                "patients": conn.execute(
+                    "SELECT count(DISTINCT person) AS total_patients FROM diagnoses "
+                    "WHERE doctor = ?", (doctor,)).fetchall(),
+                "severity": conn.execute(
+                    "SELECT severity, count(*) AS count FROM diagnoses WHERE doctor = ? "
+                    "GROUP BY severity", (doctor,)).fetchall(),
+                "diseases": conn.execute("""
+                    SELECT d.name AS disease, count(*) AS count
+                    FROM diagnoses g JOIN diseases d ON d.pk = g.disease
+                    WHERE g.doctor = ?
+                    GROUP BY g.disease ORDER BY count DESC LIMIT 5
+                """, (doctor,)).fetchall(),
+                "prescriptions": conn.execute(
+                    "SELECT count(*) AS total_prescriptions FROM prescriptions WHERE doctor = ?",
+                    (doctor,)).fetchall(),
+            }
+
+    def disease_network(self, disease):
+        # Both hops are index range scans: disease -> patients, then patient -> active diseases
+        return self._all(f"""
+            SELECT p.name AS patient, p.age AS age, d2.name AS other_disease,
+                   g2.severity AS severity
+            FROM diagnoses g1
+            JOIN persons p ON p.pk = g1.person
+            LEFT JOIN diagnoses g2 ON g2.person = g1.person AND g2.status = 'active'
+                                  AND g2.disease <> g1.disease
+            LEFT JOIN diseases d2 ON d2.pk = g2.disease
+            WHERE g1.disease = {DISEASE_PK}
+        """, {"disease": disease})
+
+    # Operations
+
+    def counts(self):
+        with self._read() as conn:
+            return {key: conn.execute(f"SELECT count(*) AS n FROM {table}").fetchone()["n"]
+                    for key, table in (("persons", "persons"), ("diseases", "diseases"),
+                                       ("relationships", "has_disease"),
+                                       ("diagnoses", "diagnoses"),
+                                       ("prescriptions", "prescriptions"), ("vitals", "vitals"),
+                                       ("medical_history", "history"))}
+
+    def check_ready(self):
+        try:
+            return True, {"backend": self.backend, "path": self.path, **self.counts()}
+        except sqlite3.Error as e:
+            return False, {"backend": self.backend, "path": self.path, "error": str(e)}
+
+    def close(self):
+        with self._lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers = []
+            self._conn.close()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python
+"""Materialised dashboard statistics.
+
+The disease, severity, status and per-doctor aggregates behind the dashboard
+are kept as in-memory counters. Diagnosis and prescription events update them
+as writes happen, so reading them does not depend on the size of the graph.
+A background reconciler periodically recomputes everything from Neo4j. That
+corrects drift from writes made outside this process, e.g. bulk scripts or
+other workers.
+"""
+
+import threading
+from collections import Counter, defaultdict
+from datetime import datetime
+from app import events
+
+ACTIVE_STATUS = "active"
+
+# One pass over every diagnosis, grouped by everything the counters need
+STATS_DIAGNOSES_QUERY = """
+    MATCH (p:Person)-[r:DIAGNOSED_WITH]->(d:Disease)
+    RETURN d.name AS disease, r.severity AS severity, r.status AS status,
+           r.doctor AS doctor, count(*) AS diagnoses
+"""
+
+STATS_DOCTOR_PATIENTS_QUERY = """
+    MATCH (p:Person)-[r:DIAGNOSED_WITH]->(:Disease)
+    WHERE r.doctor IS NOT NULL
+    RETURN r.doctor AS doctor, p.name AS patient, count(*) AS diagnoses
+"""
+
+STATS_PRESCRIPTIONS_QUERY = """
+    MATCH (:Person)-[:HAS_PRESCRIPTION]->(rx:Prescription)
+    WHERE rx.doctor IS NOT NULL
+    RETURN rx.doctor AS doctor, count(*) AS prescriptions
+"""
+
+
+class DashboardStats:
+    """Counters for active diagnoses by disease/severity, all diagnoses by status, and per doctor."""
+
+    def __init__(self):
+        self.ready = False
+        self.reconciled_at = None
+        self.last_drift = None
+        self.updates = 0
+        self._lock = threading.Lock()
+        self._counters = self._empty()
+
+    @staticmethod
+    def _empty():
+        return {
+            "active_by_disease": Counter(),
+            "active_by_severity": Counter(),
+            "by_status": Counter(),
+            "doctor_severity": defaultdict(Counter),
+            "doctor_diseases": defaultdict(Counter),
+            # doctor -> patient -> diagnoses, for distinct patients per doctor
+            "doctor_patients": defaultdict(Counter),
+            "doctor_prescriptions": Counter(),
+        }
+
+    @classmethod
+    def build(cls, diagnoses, doctor_patients, prescriptions):
+        """Counters from the rows of the three STATS_*_QUERY queries."""
+        counters = cls._empty()
+        for row in diagnoses:
+            cls._count_diagnosis(counters, row["disease"], row["severity"], row["status"],
+                                 row["doctor"], row["diagnoses"])
+        for row in doctor_patients:
+            counters["doctor_patients"][row["doctor"]][row["patient"]] += row["diagnoses"]
+        for row in prescriptions:
+            counters["doctor_prescriptions"][row["doctor"]] += row["prescriptions"]
+        return counters
+
+    @staticmethod
+    def _count_diagnosis(counters, disease, severity, status, doctor, delta):
+        counters["by_status"][status] += delta
+        if status == ACTIVE_STATUS:
+            counters["active_by_disease"][disease] += delta
+            counters["active_by_severity"][severity] += delta
+        if doctor is not None:
+            counters["doctor_severity"][doctor][severity] += delta
+            counters["doctor_diseases"][doctor][disease] += delta
+
+    def load(self, counters):
+        """Swap in freshly built counters and record how many values changed."""
+        with self._lock:
+            self.last_drift = self._drift(self._counters, counters) if self.ready else 0
+            self._counters = counters
+            self.reconciled_at = datetime.now().isoformat()
+            self.ready = True
+
+    @staticmethod
+    def _flatten(counters):
+        flat = {}
+        for key, counter in counters.items():
+            for name, value in counter.items():
+                if isinstance(value, Counter):
+                    for sub, count in value.items():
+                        flat[(key, name, sub)] = count
+                else:
+                    flat[(key, name)] = value
+        return flat
+
+    @classmethod
+    def _drift(cls, old, new):
+        old, new = cls._flatten(old), cls._flatten(new)
+        return sum(abs(new.get(key, 0) - old.get(key, 0)) for key in set(old) | set(new))
+
+    def reconcile(self, load_rows):
+        """Recompute from load_rows() -> (diagnoses, doctor_patients, prescriptions).
+
+        Writes that land while the queries run may be missed or counted twice;
+        the next reconcile corrects them.
+        """
+        self.load(self.build(*load_rows()))
+        return self.last_drift
+
+    def diagnosis_created(self, patient_name, disease_name, doctor_name=None,
+                          severity=None, **_):
+        with self._lock:
+            self._count_diagnosis(self._counters, disease_name, severity, ACTIVE_STATUS,
+                                  doctor_name, 1)
+            if doctor_name is not None:
+                self._counters["doctor_patients"][doctor_name][patient_name] += 1
+            self.updates += 1
+
+    def diagnosis_updated(self, disease_name, status, previous=(), **_):
+        """Move each updated diagnosis from its previous status to the new one."""
+        with self._lock:
+            for diagnosis in previous:
+                self._count_diagnosis(self._counters, disease_name, diagnosis["severity"],
+                                      diagnosis["previous_status"], diagnosis["doctor"], -1)
+                self._count_diagnosis(self._counters, disease_name, diagnosis["severity"],
+                                      status, diagnosis["doctor"], 1)
+            self.updates += 1
+
+    def prescription_added(self, doctor_name=None, **_):
+        if doctor_name is None:
+            return
+        with self._lock:
+            self._counters["doctor_prescriptions"][doctor_name] += 1
+            self.updates += 1
+
+    def disease_rows(self, limit=10):
+        """Rows shaped like DISEASE_DISTRIBUTION_QUERY, largest first."""
+        with self._lock:
+            top = [(disease, count) for disease, count in self._counters["active_by_disease"].items()
+                   if count > 0]
+        top.sort(key=lambda item: (-item[1], item[0]))
+        return [{"disease": disease, "patient_count": count} for disease, count in top[:limit]]
+
+    def severity_rows(self):
+        """Rows shaped like SEVERITY_DISTRIBUTION_QUERY."""
+        with self._lock:
+            return [{"severity": severity, "count": count}
+                    for severity, count in self._counters["active_by_severity"].items()]
+
+    def status_counts(self):
+        with self._lock:
+            return {status: count for status, count in self._counters["by_status"].items()
+                    if count > 0}
+
+    def doctor_rows(self, doctor, top_diseases=5):
+        """Keyword arguments for build_doctor_stats, shaped like DOCTOR_STATS_QUERIES rows."""
+        with self._lock:
+            counters = self._counters
+            patients = counters["doctor_patients"].get(doctor, Counter())
+            severity = counters["doctor_severity"].get(doctor, Counter())
+            diseases = counters["doctor_diseases"].get(doctor, Counter())
+            return {
+                "patients": [{"total_patients": sum(1 for count in patients.values() if count > 0)}],
+                "severity": [{"severity": name, "count": count}
+                             for name, count in severity.items() if count > 0],
+                "diseases": [{"disease": name, "count": count}
+                             for name, count in diseases.most_common(top_diseases) if count > 0],
+                "prescriptions": [{"total_prescriptions": counters["doctor_prescriptions"].get(doctor, 0)}],
+            }
+
+    def doctors(self):
+        """Diagnosis, patient and prescription totals for every doctor."""
+        with self._lock:
+            counters = self._counters
+            names = set(counters["doctor_diseases"]) | set(counters["doctor_prescriptions"])
+            return {
+                doctor: {
+                    "diagnoses": sum(counters["doctor_diseases"].get(doctor, Counter()).values()),
+                    "patients": sum(1 for count in counters["doctor_patients"].get(doctor, Counter()).values()
+                                    if count > 0),
+                    "prescriptions": counters["doctor_prescriptions"].get(doctor, 0),
+                }
+                for doctor in sorted(names)
+            }
+
+    def status(self):
+        return {
+            "ready": self.ready,
+            "reconciled_at": self.reconciled_at,
+            "last_drift": self.last_drift,
+            "updates": self.updates,
+        }
+
+
+class Reconciler:
+    """Background thread that calls stats.reconcile(load_rows) every interval seconds."""
+
+    def __init__(self, stats, load_rows, interval):
+        self.stats = stats
+        self.load_rows = load_rows
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None and self.interval > 0:
+            self._thread = threading.Thread(target=self._run, name="stats-reconciler", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                drift = self.stats.reconcile(self.load_rows)
+                if drift:
+                    print(f"Stats reconciler corrected {drift} counter values")
+            except Exception as e:
+                print(f"Error reconciling stats: {str(e)}")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+dashboard_stats = DashboardStats()
+
+events.subscribe(events.DIAGNOSIS_CREATED, dashboard_stats.diagnosis_created)
+events.subscribe(events.DIAGNOSIS_UPDATED, dashboard_stats.diagnosis_updated)
+events.subscribe(events.PRESCRIPTION_ADDED, dashboard_stats.prescription_added)
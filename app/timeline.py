@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+"""Paginated patient timeline merged from pre-sorted event streams.
+
+Each event type (diagnoses, prescriptions, vitals) is its own stream, already
+sorted newest first by the database and cut to one page plus one row. The
+streams are combined with a lazy k-way merge (heapq.merge), so a page costs
+O(page size x types) no matter how long the patient's history is.
+
+Events are totally ordered by (ts, type, key), newest first, where ts is the
+timestamp in epoch milliseconds and key is the element id of the relationship
+or node (or the reading sequence number in the vitals store). A page's cursor
+is the position of its last event, and each stream resumes strictly after it.
+Events without a timestamp are left out.
+"""
+
+import base64
+import heapq
+import json
+from itertools import islice
+from operator import itemgetter
+from app.model import to_datetime, iso_millis
+from app.vitals_store import timeseries_enabled
+
+TIMELINE_TYPES = ("diagnosis", "prescription", "vitals")
+DEFAULT_TIMELINE_LIMIT = 50
+MAX_TIMELINE_LIMIT = 500
+
+# $tie / $before_key pick which events at exactly $before are still to come,
+# see stream_params()
+_CURSOR_FILTER = """
+      AND ($before IS NULL OR {date}.epochMillis < $before
+           OR ({date}.epochMillis = $before AND $tie
+               AND ($before_key IS NULL OR elementId({key}) < $before_key)))
+"""
+
+TIMELINE_STREAM_QUERIES = {
+    "diagnosis": """
+        MATCH (:Person {name: $name})-[r:DIAGNOSED_WITH]->(d:Disease)
+        WHERE r.date IS NOT NULL
+          AND ($since IS NULL OR r.date >= $since) AND ($until IS NULL OR r.date < $until)
+    """ + _CURSOR_FILTER.format(date="r.date", key="r") + """
+        RETURN d.name AS disease, toString(r.date) AS date, r.severity AS severity,
+               r.status AS status, 'diagnosis' AS type,
+               r.date.epochMillis AS ts, elementId(r) AS key
+        ORDER BY ts DESC, key DESC
+        LIMIT $limit
+    """,
+    "prescription": """
+        MATCH (:Person {name: $name})-[:HAS_PRESCRIPTION]->(rx:Prescription)
+        WHERE rx.prescribed_date IS NOT NULL
+          AND ($since IS NULL OR rx.prescribed_date >= $since)
+          AND ($until IS NULL OR rx.prescribed_date < $until)
+    """ + _CURSOR_FILTER.format(date="rx.prescribed_date", key="rx") + """
+        RETURN rx.medication AS item, toString(rx.prescribed_date) AS date,
+               rx.status AS status, 'prescription' AS type,
+               rx.prescribed_date.epochMillis AS ts, elementId(rx) AS key
+        ORDER BY ts DESC, key DESC
+        LIMIT $limit
+    """,
+    "vitals": """
+        MATCH (:Person {name: $name})-[:HAS_VITALS]->(v:VitalSigns)
+        WHERE v.recorded_at IS NOT NULL
+          AND ($since IS NULL OR v.recorded_at >= $since)
+          AND ($until IS NULL OR v.recorded_at < $until)
+    """ + _CURSOR_FILTER.format(date="v.recorded_at", key="v") + """
+        RETURN 'Vitals Recorded' AS item, toString(v.recorded_at) AS date,
+               'active' AS status, 'vitals' AS type,
+               v.recorded_at.epochMillis AS ts, elementId(v) AS key
+        ORDER BY ts DESC, key DESC
+        LIMIT $limit
+    """,
+}
+
+
+def neo4j_stream_types(types):
+    """The requested types read from Neo4j; vitals come from the store in timeseries mode."""
+    if timeseries_enabled():
+        return [t for t in types if t != "vitals"]
+    return list(types)
+
+
+def encode_cursor(position):
+    """Opaque URL-safe cursor for a (ts, type, key) position."""
+    return base64.urlsafe_b64encode(json.dumps(list(position)).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        ts, event_type, key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {str(e)}")
+    if not isinstance(ts, int) or event_type not in TIMELINE_TYPES:
+        raise ValueError("Invalid cursor")
+    return ts, event_type, key
+
+
+def _check_date(value, name):
+    try:
+        return to_datetime(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an ISO 8601 date or datetime")
+
+
+def timeline_params(types=None, since=None, until=None, limit=None, cursor=None):
+    """Validate the timeline filters; returns (types, since, until, limit, position).
+
+    since and until come back as timezone-aware datetimes (DATETIME parameters).
+    """
+    if types is None:
+        types = TIMELINE_TYPES
+    else:
+        requested = set(types)
+        types = tuple(t for t in TIMELINE_TYPES if t in requested)
+        if requested - set(TIMELINE_TYPES) or not types:
+            raise ValueError(f"types must be a subset of {', '.join(TIMELINE_TYPES)}")
+    limit = DEFAULT_TIMELINE_LIMIT if limit is None else int(limit)
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+    position = decode_cursor(cursor) if cursor else None
+    return (types, _check_date(since, "since"), _check_date(until, "until"),
+            min(limit, MAX_TIMELINE_LIMIT), position)
+
+
+def stream_params(event_type, position):
+    """Query parameters that resume the event_type stream strictly after position.
+
+    In (ts, type, key) order, events timed exactly at the cursor are still to
+    come only for types sorting before the cursor's type (all of them), or for
+    the cursor's own type (keys below the cursor's key).
+    """
+    if position is None:
+        return {"before": None, "tie": False, "before_key": None}
+    ts, cursor_type, key = position
+    if event_type == cursor_type:
+        return {"before": ts, "tie": True, "before_key": key}
+    return {"before": ts, "tie": event_type < cursor_type, "before_key": None}
+
+
+def record_stream(records):
+    """(position, event) pairs from TIMELINE_STREAM_QUERIES records, in query order."""
+    for record in records:
+        event = dict(record)
+        ts, key = event.pop("ts"), event.pop("key")
+        yield (ts, event["type"], key), event
+
+
+def store_vitals_stream(store, patient_name, since=None, until=None, position=None, batch=100):
+    """(position, event) pairs from the vitals time-series store, newest first.
+
+    Readings are fetched batch at a time with the store's (ts, seq) keyset.
+    """
+    params = stream_params("vitals", position)
+    if params["before"] is None:
+        after = None
+    elif params["before_key"] is not None:
+        after = (params["before"], params["before_key"])
+    else:
+        # Sequence numbers start at 1, so (ts, 0) excludes every reading at ts
+        after = (params["before"] + 1, 0) if params["tie"] else (params["before"], 0)
+    while True:
+        rows = store.newest(patient_name, since, until, before=after, limit=batch)
+        for (ts, seq), reading in rows:
+            event = {"item": "Vitals Recorded", "date": iso_millis(ts), "status": "active",
+                     "type": "vitals"}
+            yield (ts, "vitals", seq), event
+        if len(rows) < batch:
+            return
+        after = rows[-1][0]
+
+
+def merge_streams(streams, limit):
+    """Merge streams newest first and cut one page.
+
+    Returns (events, next_cursor); the merge reads at most limit + 1 events in
+    total, so streams only need to provide that many each.
+    """
+    merged = heapq.merge(*streams, key=itemgetter(0), reverse=True)
+    page = list(islice(merged, limit + 1))
+    has_more = len(page) > limit
+    page = page[:limit]
+    next_cursor = encode_cursor(page[-1][0]) if has_more else None
+    return [event for _, event in page], next_cursor
+
+
+def build_timeline_page(patient_name, events, next_cursor, types, since, until, limit):
+    return {
+        "patient": patient_name,
+        "events": events,
+        "next_cursor": next_cursor,
+        "meta": {"types": list(types),
+                 "since": since.isoformat() if since else None,
+                 "until": until.isoformat() if until else None,
+                 "limit": limit, "count": len(events)},
+    }
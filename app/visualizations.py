@@ -1,306 +1,331 @@
 #!/usr/bin/env python
 """Medical data visualization functions."""
 
-import networkx as nx
-from pyvis.network import Network
 from collections import Counter
 import json
-from app.main import driver
+from app.main import repository, fetch_person_diseases
+from app.overview_graph import (PhaseTimer, overview_limits, status_param, check_level,
+                                summarize_clusters, select_clusters, build_overview_graph,
+                                build_cluster_expansion)
+from app.person_graph import graph_params, PersonGraph
+from app.vitals_store import get_vitals_store, timeseries_enabled
+from app.timeline import (timeline_params, stream_params,
+                          neo4j_stream_types, record_stream, store_vitals_stream,
+                          merge_streams, build_timeline_page)
+from app.stats import dashboard_stats
+
+def build_overview_network(records):
+    """Build the pyvis hospital overview page from OVERVIEW_QUERY records."""
+    from pyvis.network import Network
+    # Create network
+    net = Network(height="600px", width="100%", directed=True,
+                 bgcolor="#ffffff", font_color="#000000")
+    
+    # Track nodes to avoid duplicates
+    patients = set()
+    diseases = set()
+    
+    for record in records:
+        patient = record["patient"]
+        disease = record["disease"]
+        severity = record["severity"]
+        status = record["status"]
+        
+        # Add patient node
+        if patient not in patients:
+            net.add_node(patient, label=patient, color="#3498db", 
+                        title=f"Patient: {patient}\nAge: {record['age']}",
+                        shape="circle", size=20)
+            patients.add(patient)
+        
+        # Add disease node
+        if disease not in diseases:
+            net.add_node(disease, label=disease, color="#e74c3c",
+                        title=f"Disease: {disease}", shape="square", size=15)
+            diseases.add(disease)
+        
+        # Add edge with severity color
+        edge_color = {
+            "mild": "#2ecc71",
+            "moderate": "#f39c12",
+            "severe": "#e74c3c",
+            "critical": "#9b59b6"
+        }.get(severity, "#95a5a6")
+        
+        if status == "active":
+            net.add_edge(patient, disease, color=edge_color, 
+                       title=f"Severity: {severity}\nStatus: {status}")
+    
+    # Set physics
+    net.set_options("""
+        var options = {
+            "physics": {
+                "barnesHut": {
+                    "gravitationalConstant": -10000,
+                    "springConstant": 0.001,
+                    "springLength": 200
+                },
+                "minVelocity": 0.75
+            },
+            "edges": {
+                "smooth": {
+                    "type": "continuous"
+                }
+            },
+            "nodes": {
+                "font": {
+                    "size": 12
+                }
+            }
+        }
+    """)
+    
+    return net.get_graph()
 
 def get_hospital_overview_graph():
-    """Generate hospital-wide visualization of all patients and diseases."""
+    """Generate hospital-wide visualization of all patients and diseases.
+
+    Draws every diagnosis; for large databases use get_overview_graph instead.
+    """
     try:
-        with driver.session() as session:
-            # Get all relationships
-            query = """
-                MATCH (p:Person)-[r:DIAGNOSED_WITH]->(d:Disease)
-                RETURN p.name AS patient, p.age AS age, d.name AS disease, 
-                       r.severity AS severity, r.status AS status
-            """
-            result = session.run(query)
-            
-            # Create network
-            net = Network(height="600px", width="100%", directed=True,
-                         bgcolor="#ffffff", font_color="#000000")
-            
-            # Track nodes to avoid duplicates
-            patients = set()
-            diseases = set()
-            
-            for record in result:
-                patient = record["patient"]
-                disease = record["disease"]
-                severity = record["severity"]
-                status = record["status"]
-                
-                # Add patient node
-                if patient not in patients:
-                    net.add_node(patient, label=patient, color="#3498db", 
-                                title=f"Patient: {patient}\nAge: {record['age']}",
-                                shape="circle", size=20)
-                    patients.add(patient)
-                
-                # Add disease node
-                if disease not in diseases:
-                    net.add_node(disease, label=disease, color="#e74c3c",
-                                title=f"Disease: {disease}", shape="square", size=15)
-                    diseases.add(disease)
-                
-                # Add edge with severity color
-                edge_color = {
-                    "mild": "#2ecc71",
-                    "moderate": "#f39c12",
-                    "severe": "#e74c3c",
-                    "critical": "#9b59b6"
-                }.get(severity, "#95a5a6")
-                
-                if status == "active":
-                    net.add_edge(patient, disease, color=edge_color, 
-                               title=f"Severity: {severity}\nStatus: {status}")
-            
-            # Set physics
-            net.set_options("""
-                var options = {
-                    "physics": {
-                        "barnesHut": {
-                            "gravitationalConstant": -10000,
-                            "springConstant": 0.001,
-                            "springLength": 200
-                        },
-                        "minVelocity": 0.75
-                    },
-                    "edges": {
-                        "smooth": {
-                            "type": "continuous"
-                        }
-                    },
-                    "nodes": {
-                        "font": {
-                            "size": 12
-                        }
-                    }
-                }
-            """)
-            
-            return net.get_graph()
+        return build_overview_network(repository.diagnosis_rows())
     except Exception as e:
         print(f"Error creating hospital overview graph: {str(e)}")
         return None
 
+def get_overview_graph(level="disease", status="active", max_nodes=None, max_edges=None,
+                       timer=None):
+    """Aggregated hospital overview as vis.js JSON (see app.overview_graph).
+
+    Raises ValueError for an unknown level or status or invalid caps.
+    """
+    max_nodes, max_edges = overview_limits(max_nodes, max_edges)
+    status = status_param(status)
+    check_level(level)
+    timer = timer or PhaseTimer()
+    try:
+        with timer.phase("query"):
+            rows = repository.overview_clusters(status)
+        with timer.phase("build"):
+            summary = summarize_clusters(rows)
+            selected = select_clusters(summary, level, max_nodes)
+        with timer.phase("query"):
+            links = repository.overview_links([disease for disease, _, _ in selected],
+                                              status, max_edges)
+        with timer.phase("build"):
+            return build_overview_graph(selected, links, level, max_edges, len(summary))
+    except Exception as e:
+        print(f"Error creating overview graph: {str(e)}")
+        return None
+
+def expand_overview_cluster(disease, severity=None, status="active", after=None,
+                            max_nodes=None, timer=None):
+    """Patients in one disease (or disease/severity) cluster, one bounded page at a time."""
+    max_nodes, _ = overview_limits(max_nodes)
+    status = status_param(status)
+    timer = timer or PhaseTimer()
+    try:
+        with timer.phase("query"):
+            rows = repository.cluster_patients(disease, severity, status, after, max_nodes + 1)
+        with timer.phase("build"):
+            return build_cluster_expansion(disease, severity, rows, max_nodes)
+    except Exception as e:
+        print(f"Error expanding overview cluster: {str(e)}")
+        return None
+
+def get_person_graph(name, depth=None, limits=None, timer=None):
+    """A person's disease graph to depth hops as vis.js JSON (see app.person_graph).
+
+    Raises ValueError for an invalid depth or limits.
+    """
+    depth, limits = graph_params(depth, limits)
+    timer = timer or PhaseTimer()
+    try:
+        graph = PersonGraph(name, depth, limits)
+        with timer.phase("query"):
+            rows = fetch_person_diseases(name)
+        with timer.phase("build"):
+            diseases = graph.add_diseases({"name": row["d.name"], "description": row["d.description"]}
+                                          for row in rows)
+        if depth > 1 and diseases:
+            with timer.phase("query"):
+                rows = repository.graph_patients(diseases, [name], limits[1] + 1)
+            with timer.phase("build"):
+                patients = graph.add_patients(rows)
+            if depth > 2 and patients:
+                with timer.phase("query"):
+                    rows = repository.graph_diseases(patients, limits[2] + 1)
+                with timer.phase("build"):
+                    graph.add_patient_diseases(rows)
+        return graph.to_dict()
+    except Exception as e:
+        print(f"Error creating person graph: {str(e)}")
+        return None
+
+def get_active_diagnoses():
+    """(patient, disease) rows of every active diagnosis, for warming app.comorbidity."""
+    try:
+        return repository.active_diagnoses()
+    except Exception as e:
+        print(f"Error loading active diagnoses: {str(e)}")
+        return []
+
+def load_stats_rows():
+    """Rows of the three app.stats queries, for DashboardStats.reconcile."""
+    return repository.stats_rows()
+
+def get_similarity_rows():
+    """(diagnoses, prescriptions) rows for warming app.similarity."""
+    try:
+        return repository.similarity_rows()
+    except Exception as e:
+        print(f"Error loading similarity rows: {str(e)}")
+        return [], []
+
+def build_disease_distribution(records):
+    """Shape DISEASE_DISTRIBUTION_QUERY records into chart data."""
+    data = {
+        "labels": [],
+        "values": [],
+        "colors": []
+    }
+    
+    colors = ["#3498db", "#e74c3c", "#2ecc71", "#f39c12", "#9b59b6",
+             "#1abc9c", "#34495e", "#e67e22", "#95a5a6", "#d35400"]
+    
+    for i, record in enumerate(records):
+        data["labels"].append(record["disease"])
+        data["values"].append(record["patient_count"])
+        data["colors"].append(colors[i % len(colors)])
+    
+    return data
+
 def get_disease_distribution():
     """Get disease distribution statistics."""
+    if dashboard_stats.ready:
+        return build_disease_distribution(dashboard_stats.disease_rows())
     try:
-        with driver.session() as session:
-            query = """
-                MATCH (p:Person)-[r:DIAGNOSED_WITH]->(d:Disease)
-                WHERE r.status = 'active'
-                RETURN d.name AS disease, COUNT(p) AS patient_count
-                ORDER BY patient_count DESC
-                LIMIT 10
-            """
-            result = session.run(query)
-            
-            data = {
-                "labels": [],
-                "values": [],
-                "colors": []
-            }
-            
-            colors = ["#3498db", "#e74c3c", "#2ecc71", "#f39c12", "#9b59b6",
-                     "#1abc9c", "#34495e", "#e67e22", "#95a5a6", "#d35400"]
-            
-            for i, record in enumerate(result):
-                data["labels"].append(record["disease"])
-                data["values"].append(record["patient_count"])
-                data["colors"].append(colors[i % len(colors)])
-            
-            return data
+        return build_disease_distribution(repository.disease_distribution())
     except Exception as e:
         print(f"Error getting disease distribution: {str(e)}")
         return {"labels": [], "values": [], "colors": []}
 
+def build_severity_distribution(records):
+    """Shape SEVERITY_DISTRIBUTION_QUERY records into chart data."""
+    severities = {"mild": 0, "moderate": 0, "severe": 0, "critical": 0}
+    
+    for record in records:
+        severity = record["severity"]
+        if severity in severities:
+            severities[severity] = record["count"]
+    
+    return {
+        "labels": list(severities.keys()),
+        "values": list(severities.values()),
+        "colors": ["#2ecc71", "#f39c12", "#e74c3c", "#9b59b6"]
+    }
+
 def get_severity_distribution():
     """Get severity distribution of active diagnoses."""
+    if dashboard_stats.ready:
+        return build_severity_distribution(dashboard_stats.severity_rows())
     try:
-        with driver.session() as session:
-            query = """
-                MATCH (p:Person)-[r:DIAGNOSED_WITH]->(d:Disease)
-                WHERE r.status = 'active'
-                RETURN r.severity AS severity, COUNT(*) AS count
-            """
-            result = session.run(query)
-            
-            severities = {"mild": 0, "moderate": 0, "severe": 0, "critical": 0}
-            
-            for record in result:
-                severity = record["severity"]
-                if severity in severities:
-                    severities[severity] = record["count"]
-            
-            return {
-                "labels": list(severities.keys()),
-                "values": list(severities.values()),
-                "colors": ["#2ecc71", "#f39c12", "#e74c3c", "#9b59b6"]
-            }
+        return build_severity_distribution(repository.severity_distribution())
     except Exception as e:
         print(f"Error getting severity distribution: {str(e)}")
         return {"labels": [], "values": [], "colors": []}
 
-def get_patient_timeline(patient_name):
-    """Get patient's medical timeline."""
+def get_patient_timeline(patient_name, types=None, since=None, until=None, limit=None,
+                         cursor=None):
+    """Get one page of a patient's medical timeline, newest first.
+
+    Each event type is read as its own sorted, limited stream and the streams
+    are merged lazily, so the page size bounds the work rather than the
+    length of the history.
+    """
+    types, since, until, limit, position = timeline_params(types, since, until, limit, cursor)
     try:
-        with driver.session() as session:
-            # Get diagnoses timeline
-            diagnoses_query = """
-                MATCH (p:Person {name: $name})-[r:DIAGNOSED_WITH]->(d:Disease)
-                RETURN d.name AS disease, r.date AS date, r.severity AS severity,
-                       r.status AS status, 'diagnosis' AS type
-                ORDER BY r.date DESC
-            """
-            
-            # Get prescriptions timeline
-            rx_query = """
-                MATCH (p:Person {name: $name})-[:HAS_PRESCRIPTION]->(rx:Prescription)
-                RETURN rx.medication AS item, rx.prescribed_date AS date,
-                       rx.status AS status, 'prescription' AS type
-                ORDER BY rx.prescribed_date DESC
-            """
-            
-            # Get vitals timeline
-            vitals_query = """
-                MATCH (p:Person {name: $name})-[:HAS_VITALS]->(v:VitalSigns)
-                RETURN 'Vitals Recorded' AS item, v.recorded_at AS date,
-                       'active' AS status, 'vitals' AS type
-                ORDER BY v.recorded_at DESC
-                LIMIT 10
-            """
-            
-            timeline = []
-            
-            # Execute queries
-            for query, params in [(diagnoses_query, {"name": patient_name}),
-                                 (rx_query, {"name": patient_name}),
-                                 (vitals_query, {"name": patient_name})]:
-                result = session.run(query, params)
-                for record in result:
-                    timeline.append(dict(record))
-            
-            # Sort by date
-            timeline.sort(key=lambda x: x["date"], reverse=True)
-            
-            return timeline
+        streams = [record_stream(repository.timeline_rows(patient_name, event_type, since, until,
+                                                          limit + 1,
+                                                          **stream_params(event_type, position)))
+                   for event_type in neo4j_stream_types(types)]
+        if "vitals" in types and timeseries_enabled():
+            streams.append(store_vitals_stream(get_vitals_store(), patient_name, since, until,
+                                               position, batch=limit + 1))
+        timeline, next_cursor = merge_streams(streams, limit)
+        return build_timeline_page(patient_name, timeline, next_cursor, types, since, until, limit)
     except Exception as e:
         print(f"Error getting patient timeline: {str(e)}")
-        return []
+        return None
+
+def build_doctor_stats(patients, severity, diseases, prescriptions):
+    """Combine the DOCTOR_STATS_QUERIES results into one stats dict."""
+    stats = {
+        "total_patients": patients[0]["total_patients"],
+        "severity_distribution": {},
+        "common_diseases": [],
+        "total_prescriptions": prescriptions[0]["total_prescriptions"]
+    }
+    
+    for record in severity:
+        stats["severity_distribution"][record["severity"]] = record["count"]
+    
+    for record in diseases:
+        stats["common_diseases"].append({
+            "disease": record["disease"],
+            "count": record["count"]
+        })
+    
+    return stats
 
 def get_doctor_performance_stats(doctor_name):
     """Get performance statistics for a doctor."""
+    if dashboard_stats.ready:
+        return build_doctor_stats(**dashboard_stats.doctor_rows(doctor_name))
     try:
-        with driver.session() as session:
-            # Total patients treated
-            patients_query = """
-                MATCH (p:Person)-[r:DIAGNOSED_WITH]->(d:Disease)
-                WHERE r.doctor = $doctor
-                RETURN COUNT(DISTINCT p) AS total_patients
-            """
-            
-            # Diagnoses by severity
-            severity_query = """
-                MATCH (p:Person)-[r:DIAGNOSED_WITH]->(d:Disease)
-                WHERE r.doctor = $doctor
-                RETURN r.severity AS severity, COUNT(*) AS count
-            """
-            
-            # Most common diseases treated
-            diseases_query = """
-                MATCH (p:Person)-[r:DIAGNOSED_WITH]->(d:Disease)
-                WHERE r.doctor = $doctor
-                RETURN d.name AS disease, COUNT(*) AS count
-                ORDER BY count DESC
-                LIMIT 5
-            """
-            
-            # Prescriptions written
-            rx_query = """
-                MATCH (p:Person)-[:HAS_PRESCRIPTION]->(rx:Prescription)
-                WHERE rx.doctor = $doctor
-                RETURN COUNT(*) AS total_prescriptions
-            """
-            
-            stats = {
-                "total_patients": 0,
-                "severity_distribution": {},
-                "common_diseases": [],
-                "total_prescriptions": 0
-            }
-            
-            # Execute queries
-            result = session.run(patients_query, doctor=doctor_name)
-            stats["total_patients"] = result.single()["total_patients"]
-            
-            result = session.run(severity_query, doctor=doctor_name)
-            for record in result:
-                stats["severity_distribution"][record["severity"]] = record["count"]
-            
-            result = session.run(diseases_query, doctor=doctor_name)
-            for record in result:
-                stats["common_diseases"].append({
-                    "disease": record["disease"],
-                    "count": record["count"]
-                })
-            
-            result = session.run(rx_query, doctor=doctor_name)
-            stats["total_prescriptions"] = result.single()["total_prescriptions"]
-            
-            return stats
+        return build_doctor_stats(**repository.doctor_stats(doctor_name))
     except Exception as e:
         print(f"Error getting doctor stats: {str(e)}")
         return {}
 
+def build_disease_network(disease_name, records):
+    """Build the pyvis disease network page from DISEASE_NETWORK_QUERY records."""
+    from pyvis.network import Network
+    # Create network
+    net = Network(height="500px", width="100%", directed=False,
+                 bgcolor="#ffffff", font_color="#000000")
+    
+    # Add the main disease node
+    net.add_node(disease_name, label=disease_name, color="#e74c3c",
+                size=30, shape="star")
+    
+    patients = set()
+    diseases = set()
+    
+    for record in records:
+        patient = record["patient"]
+        other_disease = record["other_disease"]
+        
+        # Add patient node
+        if patient not in patients:
+            net.add_node(patient, label=patient, color="#3498db",
+                        title=f"Patient: {patient}\nAge: {record['age']}")
+            patients.add(patient)
+            net.add_edge(disease_name, patient, color="#e74c3c")
+        
+        # Add other disease nodes
+        if other_disease and other_disease not in diseases:
+            net.add_node(other_disease, label=other_disease, 
+                        color="#95a5a6", shape="square")
+            diseases.add(other_disease)
+            net.add_edge(patient, other_disease, color="#95a5a6")
+    
+    return net.get_graph()
+
 def get_disease_network(disease_name):
     """Get network visualization for a specific disease."""
     try:
-        with driver.session() as session:
-            # Get all patients with this disease and their other conditions
-            query = """
-                MATCH (p:Person)-[r1:DIAGNOSED_WITH]->(d1:Disease {name: $disease})
-                OPTIONAL MATCH (p)-[r2:DIAGNOSED_WITH]->(d2:Disease)
-                WHERE d2.name <> $disease AND r2.status = 'active'
-                RETURN p.name AS patient, p.age AS age, 
-                       d2.name AS other_disease, r2.severity AS severity
-            """
-            result = session.run(query, disease=disease_name)
-            
-            # Create network
-            net = Network(height="500px", width="100%", directed=False,
-                         bgcolor="#ffffff", font_color="#000000")
-            
-            # Add the main disease node
-            net.add_node(disease_name, label=disease_name, color="#e74c3c",
-                        size=30, shape="star")
-            
-            patients = set()
-            diseases = set()
-            
-            for record in result:
-                patient = record["patient"]
-                other_disease = record["other_disease"]
-                
-                # Add patient node
-                if patient not in patients:
-                    net.add_node(patient, label=patient, color="#3498db",
-                                title=f"Patient: {patient}\nAge: {record['age']}")
-                    patients.add(patient)
-                    net.add_edge(disease_name, patient, color="#e74c3c")
-                
-                # Add other disease nodes
-                if other_disease and other_disease not in diseases:
-                    net.add_node(other_disease, label=other_disease, 
-                                color="#95a5a6", shape="square")
-                    diseases.add(other_disease)
-                    net.add_edge(patient, other_disease, color="#95a5a6")
-            
-            return net.get_graph()
+        return build_disease_network(disease_name, repository.disease_network(disease_name))
     except Exception as e:
         print(f"Error creating disease network: {str(e)}")
         return None
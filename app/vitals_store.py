@@ -0,0 +1,526 @@
+#!/usr/bin/env python
+"""Time-series store for patient vital signs.
+
+Readings live in a local SQLite database instead of one VitalSigns node per
+reading. The readings table is clustered on (patient, time), so latest-N and
+range queries read one contiguous run of rows instead of sorting. Each append
+also updates min/max/sum/count rollups at 1 minute, 1 hour and 1 day
+resolution. Day buckets are aligned to UTC midnight.
+
+    python -m app.vitals_store --import-neo4j    # copy existing VitalSigns nodes
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import sqlite3
+import threading
+from datetime import datetime
+# numpy is imported by the functions that use it, so importing this module stays cheap
+
+VITALS_BACKEND = os.getenv("VITALS_BACKEND", "timeseries")
+DEFAULT_STORE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  "data", "vitals.sqlite3")
+
+METRICS = ("heart_rate", "temperature", "systolic", "diastolic", "weight", "height", "bmi")
+RESOLUTIONS = {"1m": 60, "1h": 3600, "1d": 86400}
+DEFAULT_RANGE_LIMIT = 1000
+MAX_RANGE_LIMIT = 10000
+
+
+def timeseries_enabled():
+    return VITALS_BACKEND == "timeseries"
+
+
+def to_millis(value):
+    """Epoch milliseconds from a datetime, ISO string, Neo4j DateTime or epoch seconds."""
+    if value is None:
+        value = datetime.now()
+    if hasattr(value, "to_native"):
+        value = value.to_native()
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        return int(value.timestamp() * 1000)
+    return int(float(value) * 1000)
+
+
+def to_iso(millis):
+    return datetime.fromtimestamp(millis / 1000).isoformat()
+
+
+def parse_blood_pressure(value):
+    """Split "120/80" into (120.0, 80.0); anything unparseable gives (None, None)."""
+    try:
+        systolic, diastolic = str(value).split("/")
+        return float(systolic), float(diastolic)
+    except (TypeError, ValueError):
+        return None, None
+
+
+def _number(value):
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# Plausible ranges (inclusive) for device readings; anything outside is rejected
+VITAL_RANGES = {
+    "heart_rate": (20, 300),
+    "temperature": (25, 45),
+    "systolic": (40, 300),
+    "diastolic": (20, 200),
+    "weight": (0.5, 500),
+    "height": (30, 275),
+}
+MEASUREMENTS = ("heart_rate", "temperature", "systolic", "diastolic", "weight", "height")
+
+
+def _column(records, field):
+    """Float array of one field (NaN where missing) and a mask of non-numeric values."""
+    import numpy as np
+    values = np.full(len(records), np.nan)
+    invalid = np.zeros(len(records), dtype=bool)
+    for i, record in enumerate(records):
+        value = record.get(field)
+        if value is None or value == "":
+            continue
+        try:
+            values[i] = float(value)
+        except (TypeError, ValueError):
+            invalid[i] = True
+    return values, invalid
+
+
+def validate_readings(records):
+    """Validate a batch of reading dicts and compute BMI, vectorised over the batch.
+
+    Each record has a patient name (`patient` or `patient_name`), any of the
+    MEASUREMENTS (or a "120/80" `blood_pressure`), optional `recorded_at` and
+    `notes`. Returns one (reading, error) pair per record; reading is None
+    when the record is rejected.
+    """
+    import numpy as np
+    records = list(records)
+    n = len(records)
+    errors = [None] * n
+
+    def reject(mask, message):
+        for i in np.flatnonzero(mask):
+            if errors[i] is None:
+                errors[i] = message(i) if callable(message) else message
+
+    patients = [record.get("patient") or record.get("patient_name") for record in records]
+    reject(np.array([not patient for patient in patients], dtype=bool), "Patient name is required")
+
+    pressures = [parse_blood_pressure(record["blood_pressure"])
+                 if record.get("blood_pressure") not in (None, "") else (None, None)
+                 for record in records]
+    reject(np.array([record.get("blood_pressure") not in (None, "") and pressure[0] is None
+                     for record, pressure in zip(records, pressures)], dtype=bool),
+           "Invalid blood_pressure; expected 'systolic/diastolic'")
+    for i, (systolic, diastolic) in enumerate(pressures):
+        if systolic is not None:
+            records[i] = dict(records[i], systolic=systolic, diastolic=diastolic)
+
+    columns = {}
+    for field in MEASUREMENTS:
+        values, invalid = _column(records, field)
+        reject(invalid, f"Invalid {field}; expected a number")
+        low, high = VITAL_RANGES[field]
+        with np.errstate(invalid="ignore"):
+            reject((values < low) | (values > high), f"{field} outside {low}-{high}")
+        columns[field] = values
+
+    with np.errstate(invalid="ignore"):
+        reject(columns["systolic"] <= columns["diastolic"], "systolic must be above diastolic")
+    measured = np.zeros(n, dtype=bool)
+    for values in columns.values():
+        measured |= ~np.isnan(values)
+    reject(~measured, "At least one measurement is required")
+
+    height_m = columns["height"] / 100
+    bmi = np.round(columns["weight"] / (height_m * height_m), 2)
+
+    recorded_at = []
+    for i, record in enumerate(records):
+        try:
+            value = record.get("recorded_at")
+            recorded_at.append(datetime.fromisoformat(value).isoformat() if value
+                               else datetime.now().isoformat())
+        except (TypeError, ValueError):
+            recorded_at.append(None)
+            if errors[i] is None:
+                errors[i] = "Invalid recorded_at; expected an ISO timestamp"
+
+    as_lists = {field: values.tolist() for field, values in columns.items()}
+    as_lists["bmi"] = bmi.tolist()
+    results = []
+    for i in range(n):
+        if errors[i] is not None:
+            results.append((None, errors[i]))
+            continue
+        reading = {field: (None if values[i] != values[i] else values[i])
+                   for field, values in as_lists.items()}
+        systolic, diastolic = reading["systolic"], reading["diastolic"]
+        reading.update({
+            "patient": patients[i],
+            "blood_pressure": (f"{systolic:g}/{diastolic:g}"
+                               if systolic is not None and diastolic is not None else None),
+            "recorded_at": recorded_at[i],
+            "notes": records[i].get("notes") or "",
+        })
+        results.append((reading, None))
+    return results
+
+
+def _schema():
+    metric_columns = ", ".join(f"{metric} REAL" for metric in METRICS)
+    statements = [
+        "CREATE TABLE IF NOT EXISTS patients (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)",
+        # Last tie-break seq handed out; shared by every process writing to the file
+        "CREATE TABLE IF NOT EXISTS sequence (id INTEGER PRIMARY KEY CHECK (id = 0), value INTEGER NOT NULL)",
+        # Source ids (Neo4j elementIds) of imported readings, so re-imports add nothing
+        "CREATE TABLE IF NOT EXISTS imported (source_id TEXT PRIMARY KEY) WITHOUT ROWID",
+        f"""CREATE TABLE IF NOT EXISTS vitals (
+                patient_id INTEGER NOT NULL, ts INTEGER NOT NULL, seq INTEGER NOT NULL,
+                {metric_columns}, blood_pressure TEXT, notes TEXT,
+                PRIMARY KEY (patient_id, ts, seq)
+            ) WITHOUT ROWID""",
+    ]
+    rollup_columns = ", ".join(f"{metric}_n INTEGER, {metric}_sum REAL, {metric}_min REAL, "
+                               f"{metric}_max REAL" for metric in METRICS)
+    # Stores created before the sequence table start after their highest seq
+    statements.append("INSERT OR IGNORE INTO sequence (id, value) "
+                      "SELECT 0, coalesce(max(seq), 0) FROM vitals")
+    for resolution in RESOLUTIONS:
+        statements.append(f"""CREATE TABLE IF NOT EXISTS vitals_{resolution} (
+                patient_id INTEGER NOT NULL, bucket INTEGER NOT NULL, n INTEGER NOT NULL,
+                {rollup_columns},
+                PRIMARY KEY (patient_id, bucket)
+            ) WITHOUT ROWID""")
+    return statements
+
+
+def _rollup_upsert(resolution):
+    columns = ["patient_id", "bucket", "n"]
+    updates = ["n = n + excluded.n"]
+    for metric in METRICS:
+        columns += [f"{metric}_n", f"{metric}_sum", f"{metric}_min", f"{metric}_max"]
+        updates += [
+            f"{metric}_n = {metric}_n + excluded.{metric}_n",
+            f"{metric}_sum = {metric}_sum + excluded.{metric}_sum",
+            # SQLite's multi-argument min/max return NULL if any argument is NULL
+            f"{metric}_min = coalesce(min({metric}_min, excluded.{metric}_min), {metric}_min, excluded.{metric}_min)",
+            f"{metric}_max = coalesce(max({metric}_max, excluded.{metric}_max), {metric}_max, excluded.{metric}_max)",
+        ]
+    placeholders = ", ".join("?" for _ in columns)
+    return (f"INSERT INTO vitals_{resolution} ({', '.join(columns)}) VALUES ({placeholders}) "
+            f"ON CONFLICT (patient_id, bucket) DO UPDATE SET {', '.join(updates)}")
+
+
+READING_COLUMNS = ("ts",) + METRICS + ("blood_pressure", "notes")
+READING_INSERT = (f"INSERT INTO vitals (patient_id, seq, {', '.join(READING_COLUMNS)}) "
+                  f"VALUES (?, ?, {', '.join('?' for _ in READING_COLUMNS)})")
+ROLLUP_UPSERTS = {resolution: _rollup_upsert(resolution) for resolution in RESOLUTIONS}
+
+
+class VitalsStore:
+    """SQLite-backed vitals time series; safe to share between threads."""
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            for statement in _schema():
+                self._conn.execute(statement)
+        # name -> id; a cache only, since other processes add patients to the same file
+        self._patient_ids = {}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _patient_id(self, name):
+        """The patient's id, or None if no reading was ever stored for them."""
+        patient_id = self._patient_ids.get(name)
+        if patient_id is None:
+            row = self._conn.execute("SELECT id FROM patients WHERE name = ?", (name,)).fetchone()
+            if row is not None:
+                patient_id = self._patient_ids[name] = row[0]
+        return patient_id
+
+    @staticmethod
+    def reading_row(reading):
+        """Column values for one reading dict (blood_pressure, heart_rate, ..., recorded_at)."""
+        systolic, diastolic = parse_blood_pressure(reading.get("blood_pressure"))
+        values = {
+            "heart_rate": _number(reading.get("heart_rate")),
+            "temperature": _number(reading.get("temperature")),
+            "systolic": _number(reading.get("systolic", systolic)),
+            "diastolic": _number(reading.get("diastolic", diastolic)),
+            "weight": _number(reading.get("weight")),
+            "height": _number(reading.get("height")),
+            "bmi": _number(reading.get("bmi")),
+        }
+        blood_pressure = reading.get("blood_pressure")
+        if blood_pressure is None and values["systolic"] is not None and values["diastolic"] is not None:
+            blood_pressure = f"{values['systolic']:g}/{values['diastolic']:g}"
+        return ((to_millis(reading.get("recorded_at")),) + tuple(values[m] for m in METRICS)
+                + (blood_pressure, reading.get("notes") or ""))
+
+    def add(self, patient_name, reading):
+        """Append one reading; returns its timestamp in epoch milliseconds."""
+        return self.add_many([(patient_name, reading)])[0]
+
+    def add_many(self, readings):
+        """Append (patient_name, reading) pairs in one transaction; returns their timestamps."""
+        with self._lock:
+            with self._conn:
+                # Take the write lock up front, so the ids and seqs read below stay ours
+                self._conn.execute("BEGIN IMMEDIATE")
+                timestamps, patient_ids = self._append(readings)
+            # Cached only once committed; a rolled-back id can be reused by another name
+            self._patient_ids.update(patient_ids)
+            return timestamps
+
+    def add_imported(self, readings):
+        """Append (source_id, patient_name, reading) triples whose source_id is new.
+
+        Returns the number appended; readings imported before are skipped.
+        """
+        with self._lock:
+            with self._conn:
+                self._conn.execute("BEGIN IMMEDIATE")
+                new = [(patient_name, reading) for source_id, patient_name, reading in readings
+                       if self._conn.execute("INSERT OR IGNORE INTO imported VALUES (?)",
+                                             (source_id,)).rowcount]
+                timestamps, patient_ids = self._append(new)
+            self._patient_ids.update(patient_ids)
+            return len(timestamps)
+
+    def _append(self, readings):
+        """Write readings inside the caller's transaction: (timestamps, {name: id})."""
+        readings = list(readings)
+        if not readings:
+            return [], {}
+        ids = {}
+        for patient_name, _ in readings:
+            if patient_name not in ids:
+                self._conn.execute("INSERT OR IGNORE INTO patients (name) VALUES (?)", (patient_name,))
+                ids[patient_name] = self._conn.execute(
+                    "SELECT id FROM patients WHERE name = ?", (patient_name,)).fetchone()[0]
+        last_seq = self._conn.execute("SELECT value FROM sequence WHERE id = 0").fetchone()[0]
+        self._conn.execute("UPDATE sequence SET value = ? WHERE id = 0", (last_seq + len(readings),))
+        inserts = [(ids[patient_name], last_seq + i) + self.reading_row(reading)
+                   for i, (patient_name, reading) in enumerate(readings, 1)]
+        self._conn.executemany(READING_INSERT, inserts)
+
+        import numpy as np
+        patient_ids = np.array([row[0] for row in inserts], dtype=np.int64)
+        timestamps = np.array([row[2] for row in inserts], dtype=np.int64)
+        # None becomes NaN, so missing metrics drop out of the aggregates below
+        values = np.array([row[3:3 + len(METRICS)] for row in inserts], dtype=float)
+        for resolution, seconds in RESOLUTIONS.items():
+            self._conn.executemany(ROLLUP_UPSERTS[resolution],
+                                   self._rollup_rows(patient_ids, timestamps, values, seconds * 1000))
+        return timestamps.tolist(), ids
+
+    @staticmethod
+    def _rollup_rows(patient_ids, timestamps, values, width):
+        """Aggregate a batch per (patient, bucket) with NumPy: one upsert row per bucket."""
+        import numpy as np
+        slots = timestamps // width
+        keys, groups = np.unique(patient_ids * (1 << 40) + slots, return_inverse=True)
+        size = len(keys)
+        columns = [keys >> 40, (keys & ((1 << 40) - 1)) * width, np.bincount(groups, minlength=size)]
+        present = ~np.isnan(values)
+        for i in range(len(METRICS)):
+            column = values[:, i]
+            count = np.bincount(groups, weights=present[:, i], minlength=size)
+            total = np.bincount(groups, weights=np.where(present[:, i], column, 0.0), minlength=size)
+            low = np.full(size, np.inf)
+            high = np.full(size, -np.inf)
+            np.fmin.at(low, groups, column)
+            np.fmax.at(high, groups, column)
+            empty = count == 0
+            low[empty] = np.nan
+            high[empty] = np.nan
+            columns += [count.astype(np.int64), total, low, high]
+        rows = np.array(columns, dtype=object).T.tolist()
+        return [[None if value != value else value for value in row] for row in rows]
+
+    @staticmethod
+    def _reading(row):
+        reading = {"date": to_iso(row[0])}
+        reading.update(zip(METRICS, row[1:1 + len(METRICS)]))
+        reading["blood_pressure"], reading["notes"] = row[1 + len(METRICS):]
+        return reading
+
+    def latest(self, patient_name, n=5):
+        """The n most recent readings, newest first."""
+        n = max(1, min(int(n), MAX_RANGE_LIMIT))
+        with self._lock:
+            patient_id = self._patient_id(patient_name)
+            if patient_id is None:
+                return []
+            rows = self._conn.execute(
+                f"SELECT {', '.join(READING_COLUMNS)} FROM vitals WHERE patient_id = ? "
+                f"ORDER BY ts DESC, seq DESC LIMIT ?", (patient_id, n)).fetchall()
+        return [self._reading(row) for row in rows]
+
+    def range(self, patient_name, start=None, end=None, limit=DEFAULT_RANGE_LIMIT):
+        """Readings with start <= recorded_at < end, oldest first."""
+        limit = max(1, min(int(limit), MAX_RANGE_LIMIT))
+        start = to_millis(start) if start is not None else 0
+        end = to_millis(end) if end is not None else 2 ** 62
+        with self._lock:
+            patient_id = self._patient_id(patient_name)
+            if patient_id is None:
+                return []
+            rows = self._conn.execute(
+                f"SELECT {', '.join(READING_COLUMNS)} FROM vitals "
+                f"WHERE patient_id = ? AND ts >= ? AND ts < ? ORDER BY ts, seq LIMIT ?",
+                (patient_id, start, end, limit)).fetchall()
+        return [self._reading(row) for row in rows]
+
+    def newest(self, patient_name, start=None, end=None, before=None, limit=DEFAULT_RANGE_LIMIT):
+        """[((ts, seq), reading)] with start <= recorded_at < end, newest first.
+
+        before is the (ts, seq) key of the last reading already seen, so pages
+        continue with a keyset seek instead of an OFFSET.
+        """
+        limit = max(1, min(int(limit), MAX_RANGE_LIMIT))
+        start = to_millis(start) if start is not None else 0
+        end = to_millis(end) if end is not None else 2 ** 62
+        before_ts, before_seq = before if before is not None else (2 ** 62, 0)
+        with self._lock:
+            patient_id = self._patient_id(patient_name)
+            if patient_id is None:
+                return []
+            rows = self._conn.execute(
+                f"SELECT seq, {', '.join(READING_COLUMNS)} FROM vitals "
+                f"WHERE patient_id = ? AND ts >= ? AND ts < ? AND (ts, seq) < (?, ?) "
+                f"ORDER BY ts DESC, seq DESC LIMIT ?",
+                (patient_id, start, end, before_ts, before_seq, limit)).fetchall()
+        return [((row[1], row[0]), self._reading(row[1:])) for row in rows]
+
+    def rollup(self, patient_name, resolution, start=None, end=None, limit=DEFAULT_RANGE_LIMIT):
+        """Per-bucket count and min/max/mean of every metric, oldest bucket first."""
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Unknown resolution '{resolution}'; expected one of {', '.join(RESOLUTIONS)}")
+        limit = max(1, min(int(limit), MAX_RANGE_LIMIT))
+        start = to_millis(start) if start is not None else 0
+        # From the start of the bucket holding start, which buckets are keyed on
+        start -= start % (RESOLUTIONS[resolution] * 1000)
+        end = to_millis(end) if end is not None else 2 ** 62
+        columns = ["bucket", "n"] + [f"{metric}_{part}" for metric in METRICS
+                                     for part in ("n", "sum", "min", "max")]
+        with self._lock:
+            patient_id = self._patient_id(patient_name)
+            if patient_id is None:
+                return []
+            rows = self._conn.execute(
+                f"SELECT {', '.join(columns)} FROM vitals_{resolution} "
+                f"WHERE patient_id = ? AND bucket >= ? AND bucket < ? ORDER BY bucket LIMIT ?",
+                (patient_id, start, end, limit)).fetchall()
+
+        buckets = []
+        for row in rows:
+            bucket = {"start": to_iso(row[0]), "count": row[1]}
+            for i, metric in enumerate(METRICS):
+                n, total, low, high = row[2 + 4 * i:6 + 4 * i]
+                bucket[metric] = ({"min": low, "max": high, "mean": round(total / n, 3), "count": n}
+                                  if n else None)
+            buckets.append(bucket)
+        return buckets
+
+    def stats(self):
+        with self._lock:
+            patients = self._conn.execute("SELECT count(*) FROM patients").fetchone()[0]
+            readings = self._conn.execute("SELECT count(*) FROM vitals").fetchone()[0]
+            buckets = {resolution: self._conn.execute(
+                f"SELECT count(*) FROM vitals_{resolution}").fetchone()[0]
+                for resolution in RESOLUTIONS}
+        return {"backend": VITALS_BACKEND, "path": self.path, "patients": patients,
+                "readings": readings, "rollup_buckets": buckets}
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_vitals_store():
+    """Return the shared store, opening VITALS_STORE_PATH on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = VitalsStore(os.getenv("VITALS_STORE_PATH", DEFAULT_STORE_PATH))
+        return _store
+
+
+IMPORT_QUERY = """
+    MATCH (p:Person)-[:HAS_VITALS]->(v:VitalSigns)
+    RETURN elementId(v) AS source_id, p.name AS patient, v.blood_pressure AS blood_pressure,
+           v.heart_rate AS heart_rate, v.temperature AS temperature,
+           v.weight AS weight, v.height AS height, v.bmi AS bmi,
+           v.notes AS notes, v.recorded_at AS recorded_at
+    ORDER BY v.recorded_at
+"""
+
+
+def import_from_neo4j(store, batch_size=5000, delete_nodes=False):
+    """Copy every VitalSigns node into the store; optionally delete the nodes afterwards.
+
+    Nodes copied by an earlier run are skipped, so an interrupted import can be re-run.
+    """
+    from app.main import read_session, write_session
+
+    imported = 0
+    batch = []
+    with (write_session() if delete_nodes else read_session()) as session:
+        for record in session.run(IMPORT_QUERY):
+            reading = dict(record)
+            batch.append((reading.pop("source_id"), reading.pop("patient"), reading))
+            if len(batch) >= batch_size:
+                imported += store.add_imported(batch)
+                batch = []
+        if batch:
+            imported += store.add_imported(batch)
+        if delete_nodes:
+            session.run("""
+                MATCH (:Person)-[:HAS_VITALS]->(v:VitalSigns)
+                CALL { WITH v DETACH DELETE v } IN TRANSACTIONS OF 10000 ROWS
+            """).consume()
+    return imported
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the vitals time-series store.")
+    parser.add_argument("--import-neo4j", action="store_true",
+                        help="Copy existing VitalSigns nodes from Neo4j into the store")
+    parser.add_argument("--delete-nodes", action="store_true",
+                        help="With --import-neo4j, delete the VitalSigns nodes once copied")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    store = get_vitals_store()
+    if args.import_neo4j:
+        imported = import_from_neo4j(store, args.batch_size, args.delete_nodes)
+        print(f"Imported {imported} readings")
+    print(store.stats())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
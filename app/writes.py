@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+"""Cypher for the single-record writes, shared by app.main, app.medical_features and app.async_db.
+
+Every write runs in one managed transaction (see DriverManager.execute_write)
+that may be replayed after a transient failure, so each query is idempotent:
+it MERGEs on a unique name or on an id generated once per call. Existence
+checks happen inside the same transaction as the write, so two concurrent
+calls cannot both pass them, and `created` is true only for the call whose
+id was stored.
+"""
+
+CREATE_PERSON_QUERY = """
+    MERGE (p:Person {name: $name})
+    ON CREATE SET p.id = $id, p.age = $age
+    RETURN p.id = $id AS created
+"""
+
+CREATE_DISEASE_QUERY = """
+    MERGE (d:Disease {name: $name})
+    ON CREATE SET d.id = $id, d.description = $description
+    RETURN d.id = $id AS created
+"""
+
+# MERGE locks both nodes, so concurrent calls for one pair create one edge
+CREATE_RELATIONSHIP_QUERY = """
+    OPTIONAL MATCH (p:Person {name: $person_name})
+    OPTIONAL MATCH (d:Disease {name: $disease_name})
+    CALL {
+        WITH p, d
+        WITH p, d WHERE p IS NOT NULL AND d IS NOT NULL
+        MERGE (p)-[r:HAS_DISEASE]->(d)
+        ON CREATE SET r.id = $id
+        RETURN collect(r.id = $id) AS merged
+    }
+    RETURN p IS NOT NULL AS person_found, d IS NOT NULL AS disease_found,
+           coalesce(merged[0], false) AS created
+"""
+
+DELETE_RELATIONSHIP_QUERY = """
+    MATCH (p:Person {name: $person_name})-[r:HAS_DISEASE]->(d:Disease {name: $disease_name})
+    DELETE r
+    RETURN COUNT(*) AS count
+"""
+
+CREATE_DIAGNOSIS_QUERY = """
+    MATCH (p:Person {name: $patient_name}), (d:Disease {name: $disease_name})
+    MERGE (p)-[r:DIAGNOSED_WITH {id: $id}]->(d)
+    ON CREATE SET r.doctor = $doctor_name, r.date = $date, r.notes = $notes,
+                  r.severity = $severity, r.status = 'active'
+    RETURN COUNT(r) AS count
+"""
+
+ADD_HISTORY_QUERY = """
+    MATCH (p:Person {name: $patient_name})
+    MERGE (h:MedicalHistory {id: $id})
+    ON CREATE SET h.condition = $condition, h.date_diagnosed = $date_diagnosed,
+                  h.resolved = $resolved, h.notes = $notes, h.created_at = $created_at
+    MERGE (p)-[:HAS_HISTORY]->(h)
+    RETURN COUNT(h) AS count
+"""
+
+ADD_PRESCRIPTION_QUERY = """
+    MATCH (p:Person {name: $patient_name})
+    MERGE (rx:Prescription {id: $id})
+    ON CREATE SET rx.medication = $medication, rx.dosage = $dosage,
+                  rx.frequency = $frequency, rx.doctor = $doctor_name,
+                  rx.duration = $duration, rx.notes = $notes,
+                  rx.prescribed_date = $prescribed_date, rx.status = 'active'
+    MERGE (p)-[:HAS_PRESCRIPTION]->(rx)
+    RETURN COUNT(rx) AS count
+"""
+
+ADD_VITALS_QUERY = """
+    MATCH (p:Person {name: $patient_name})
+    MERGE (v:VitalSigns {id: $id})
+    ON CREATE SET v.blood_pressure = $blood_pressure, v.systolic = $systolic,
+                  v.diastolic = $diastolic, v.heart_rate = $heart_rate,
+                  v.temperature = $temperature, v.weight = $weight, v.height = $height,
+                  v.bmi = $bmi, v.notes = $notes, v.recorded_at = $recorded_at
+    MERGE (p)-[:HAS_VITALS]->(v)
+    RETURN COUNT(v) AS count
+"""
+
+UPDATE_DIAGNOSIS_STATUS_QUERY = """
+    MATCH (p:Person {name: $patient_name})-[r:DIAGNOSED_WITH]->(d:Disease {name: $disease_name})
+    WITH r, r.status AS previous_status
+    SET r.status = $status, r.updated_at = $updated_at
+    FOREACH (_ IN CASE WHEN $notes <> '' THEN [1] ELSE [] END |
+        SET r.resolution_notes = $notes)
+    RETURN r.doctor AS doctor, r.severity AS severity, previous_status
+"""
+
+
+# Bulk writes, one UNWIND per batch (app.bulk_ingest). Every row carries a fresh
+# id, so `created` is true only for rows whose node this transaction created,
+# even when concurrent writers race on one name
+BULK_PERSONS_QUERY = """
+    UNWIND $rows AS row
+    MERGE (p:Person {name: row.name})
+    ON CREATE SET p.id = row.id, p.age = row.age
+    RETURN row.index AS index, p.id = row.id AS created
+"""
+
+BULK_DISEASES_QUERY = """
+    UNWIND $rows AS row
+    MERGE (d:Disease {name: row.name})
+    ON CREATE SET d.id = row.id, d.description = row.description
+    RETURN row.index AS index, d.id = row.id AS created
+"""
+
+BULK_RELATIONSHIPS_QUERY = """
+    UNWIND $rows AS row
+    OPTIONAL MATCH (p:Person {name: row.person_name})
+    OPTIONAL MATCH (d:Disease {name: row.disease_name})
+    CALL {
+        WITH row, p, d
+        WITH row, p, d WHERE p IS NOT NULL AND d IS NOT NULL
+        MERGE (p)-[r:HAS_DISEASE]->(d)
+        ON CREATE SET r.id = row.id
+        RETURN collect(r.id = row.id) AS merged
+    }
+    RETURN row.index AS index, p IS NOT NULL AS person_found,
+           d IS NOT NULL AS disease_found, coalesce(merged[0], false) AS created
+"""
+
+PERSONS_EXIST_QUERY = """
+    UNWIND $names AS name
+    OPTIONAL MATCH (p:Person {name: name})
+    RETURN name, p IS NOT NULL AS found
+"""
+
+# Rows for unknown patients produce no result
+BULK_VITALS_QUERY = """
+    UNWIND $rows AS row
+    MATCH (p:Person {name: row.patient})
+    MERGE (v:VitalSigns {id: row.id})
+    ON CREATE SET v.blood_pressure = row.blood_pressure, v.systolic = row.systolic,
+                  v.diastolic = row.diastolic, v.heart_rate = row.heart_rate,
+                  v.temperature = row.temperature, v.weight = row.weight,
+                  v.height = row.height, v.bmi = row.bmi, v.notes = row.notes,
+                  v.recorded_at = row.recorded_at
+    MERGE (p)-[:HAS_VITALS]->(v)
+    RETURN row.index AS index
+"""
+
+
+def written(rows):
+    """Whether a COUNT(...) AS count write query wrote anything."""
+    return bool(rows) and rows[0]["count"] > 0
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""Benchmark the in-memory autocomplete index against the Cypher CONTAINS search.
+
+    python benchmarks/bench_autocomplete.py --names 200000
+    python benchmarks/bench_autocomplete.py --neo4j   # index the persons in Neo4j and compare
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import random
+import statistics
+import time
+from app.autocomplete import AutocompleteIndex
+
+FIRST_NAMES = ["James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda",
+               "William", "Elizabeth", "David", "Barbara", "Richard", "Susan", "Joseph", "Jessica",
+               "Aisha", "Mohammed", "Wei", "Priya", "Olga", "Kwame", "Sofia", "Hiroshi"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis",
+              "Rodriguez", "Martinez", "Hernandez", "Lopez", "Wilson", "Anderson", "Taylor",
+              "Khan", "Chen", "Patel", "Ivanova", "Mensah", "Rossi", "Tanaka", "Okafor", "Novak"]
+
+
+def synthetic_persons(count, seed):
+    rng = random.Random(seed)
+    return [{"name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i}", "age": rng.randint(1, 99)}
+            for i in range(count)]
+
+
+def percentiles(timings_us):
+    timings_us = sorted(timings_us)
+    return {
+        "p50_us": round(statistics.median(timings_us), 2),
+        "p95_us": round(timings_us[int(len(timings_us) * 0.95) - 1], 2),
+        "p99_us": round(timings_us[int(len(timings_us) * 0.99) - 1], 2),
+    }
+
+
+def time_calls(fn, terms):
+    timings = []
+    for term in terms:
+        started = time.perf_counter()
+        fn(term)
+        timings.append((time.perf_counter() - started) * 1_000_000)
+    return percentiles(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--names", type=int, default=200_000, help="Synthetic names to index")
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--neo4j", action="store_true",
+                        help="Index the persons in Neo4j and also time the CONTAINS query")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    if args.neo4j:
+        from app.main import _load_all_persons
+        persons = _load_all_persons()
+    else:
+        persons = synthetic_persons(args.names, args.seed)
+
+    rng = random.Random(args.seed)
+    terms = []
+    for _ in range(args.queries):
+        word = rng.choice(rng.choice(persons)["name"].split())
+        terms.append(word[:rng.randint(2, 4)])
+
+    index = AutocompleteIndex("age")
+    started = time.perf_counter()
+    index.load(persons)
+    report = {
+        "names": len(index),
+        "load_seconds": round(time.perf_counter() - started, 3),
+        "memory": index.memory_report()["bytes"],
+        "autocomplete": time_calls(lambda term: index.search(term, 20), terms),
+    }
+
+    started = time.perf_counter()
+    for i in range(1000):
+        index.add(f"Incremental Patient {i}", 50)
+    report["add_us"] = round((time.perf_counter() - started) * 1000, 2)
+
+    if args.neo4j:
+        from app.main import driver
+        from app.queries import CONTAINS_SEARCH_QUERY
+        query = CONTAINS_SEARCH_QUERY.format(label="Person", field="age")
+        with driver.session() as session:
+            report["cypher_contains"] = time_calls(
+                lambda term: session.run(query, search_term=term, limit=20).consume(), terms)
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+"""Compare the storage backends (app.repository) on one synthetic hospital.
+
+    python benchmarks/bench_backends.py --patients 20000                 # memory and sqlite
+    python benchmarks/bench_backends.py --patients 20000 --neo4j --yes   # wipe and load Neo4j too
+    python benchmarks/bench_backends.py --patients 20000 --neo4j --loaded
+        # use a Neo4j already loaded by benchmarks/synthetic.py with the same --patients/--seed
+
+Every backend gets the same seeded sequence of repository calls: the reads
+behind the patient, diagnosis-search, disease-network, overview and doctor
+pages, plus prescription writes. Reports load time, database size and
+p50/p95/p99 per operation.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from benchmarks.synthetic import Hospital, DEFAULT_SEED, LAST_NAMES, FORMULARY, load, load_repository
+from benchmarks.workload import summarise
+from app.search import build_fulltext_query
+
+BACKENDS = ("memory", "sqlite", "neo4j")
+DEFAULT_OPERATIONS = 300
+RECORD_SECTIONS = ["diagnoses", "prescriptions", "vitals", "medical_history"]
+RECORD_PARAMS = {"prescriptions_offset": 0, "prescriptions_limit": 50, "history_offset": 0,
+                 "history_limit": 50, "vitals_limit": 5}
+TIMELINE_LIMIT = 51
+
+
+def plan(hospital, operations, seed):
+    """[(operation, args)] drawn from the hospital; the same for every backend."""
+    rng = random.Random(seed)
+    patients = [p["name"] for p in hospital.persons]
+    diseases = sorted({d["disease"] for d in hospital.diagnoses})
+    medications = [item for items in FORMULARY.values() for item in items]
+    calls = []
+    for i in range(operations):
+        patient, disease = rng.choice(patients), rng.choice(diseases)
+        term = rng.choice(LAST_NAMES)[:rng.randint(3, 6)]
+        medication, dosage, frequency = rng.choice(medications)
+        calls += [
+            ("patient_details", (patient,)),
+            ("medical_record", (patient, RECORD_SECTIONS, dict(RECORD_PARAMS, name=patient))),
+            ("timeline", (patient,)),
+            ("search_patients", ("patients", term, build_fulltext_query(term, "ranked"),
+                                 "ranked", 20)),
+            ("search_by_diagnosis", (disease,)),
+            ("disease_network", (disease,)),
+            ("doctor_stats", (rng.choice(hospital.doctors),)),
+            ("add_prescription", (f"bench-{seed}-{i}", patient, medication, dosage, frequency,
+                                  rng.choice(hospital.doctors), "30 days", "", None)),
+        ]
+        if i % 10 == 0:
+            calls.append(("overview", ("active",)))
+    rng.shuffle(calls)
+    return calls
+
+
+def timeline(repository, patient):
+    return [repository.timeline_rows(patient, event_type, None, None, TIMELINE_LIMIT,
+                                     None, False, None)
+            for event_type in ("diagnosis", "prescription", "vitals")]
+
+
+def overview(repository, status):
+    clusters = repository.overview_clusters(status)
+    top = sorted({row["disease"] for row in clusters})[:200]
+    return repository.overview_links(top, status, 500)
+
+
+OPERATIONS = {
+    "patient_details": lambda repository, *args: repository.patient_details(*args),
+    "medical_record": lambda repository, *args: repository.medical_record(*args),
+    "timeline": timeline,
+    "search_patients": lambda repository, *args: repository.search(*args),
+    "search_by_diagnosis": lambda repository, *args: repository.active_patients_with(*args),
+    "disease_network": lambda repository, *args: repository.disease_network(*args),
+    "doctor_stats": lambda repository, *args: repository.doctor_stats(*args),
+    "add_prescription": lambda repository, *args: repository.add_prescription(*args),
+    "overview": overview,
+}
+
+
+def measure(repository, calls):
+    samples = []
+    started = time.perf_counter()
+    for name, args in calls:
+        call_started = time.perf_counter()
+        try:
+            OPERATIONS[name](repository, *args)
+            status = 200
+        except Exception as e:
+            print(f"{name} failed: {e}")
+            status = 0
+        samples.append((name, (time.perf_counter() - call_started) * 1000, status))
+    return summarise(samples, time.perf_counter() - started)
+
+
+def open_backend(backend, hospital, workdir, args):
+    """(repository, load timings, size in bytes or None) for one backend."""
+    if backend == "memory":
+        from app.memory_repository import MemoryRepository
+        repository = MemoryRepository()
+        return repository, load_repository(hospital, repository), None
+    if backend == "sqlite":
+        from app.sqlite_repository import SQLiteRepository
+        path = os.path.join(workdir, "medgraph.sqlite3")
+        repository = SQLiteRepository(path)
+        timings = load_repository(hospital, repository)
+        size = sum(os.path.getsize(path + suffix) for suffix in ("", "-wal")
+                   if os.path.exists(path + suffix))
+        return repository, timings, size
+
+    from app.db import DriverManager
+    from app.neo4j_repository import Neo4jRepository
+    manager = DriverManager.from_env()
+    timings = None
+    if not args.loaded:
+        with manager.write_session() as session:
+            session.run("MATCH (n) CALL { WITH n DETACH DELETE n } IN TRANSACTIONS").consume()
+        timings = load(hospital, args.batch_size)
+    return Neo4jRepository(manager), timings, None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--patients", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--operations", type=int, default=DEFAULT_OPERATIONS,
+                        help="Calls per operation type")
+    parser.add_argument("--backends", default="memory,sqlite",
+                        help=f"Comma-separated subset of {', '.join(BACKENDS)}")
+    parser.add_argument("--neo4j", action="store_true", help="Also benchmark NEO4J_URI")
+    parser.add_argument("--loaded", action="store_true",
+                        help="Neo4j already holds this hospital; do not wipe and reload it")
+    parser.add_argument("--yes", action="store_true", help="Confirm Neo4j may be wiped")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    args = parser.parse_args(argv)
+
+    backends = [backend.strip() for backend in args.backends.split(",") if backend.strip()]
+    if args.neo4j and "neo4j" not in backends:
+        backends.append("neo4j")
+    unknown = [backend for backend in backends if backend not in BACKENDS]
+    if unknown:
+        parser.error(f"Unknown backend(s): {', '.join(unknown)}")
+    if "neo4j" in backends and not (args.loaded or args.yes):
+        print("Loading deletes ALL data in the configured Neo4j database. "
+              "Re-run with --yes, or --loaded to use data already there.")
+        return 1
+
+    hospital = Hospital(args.patients, args.seed)
+    calls = plan(hospital, args.operations, args.seed)
+    report = {"patients": args.patients, "seed": args.seed, "calls": len(calls), "backends": {}}
+    with tempfile.TemporaryDirectory() as workdir:
+        for backend in backends:
+            repository, timings, size = open_backend(backend, hospital, workdir, args)
+            try:
+                result = {"load_seconds": timings, "size_bytes": size}
+                result.update(measure(repository, calls))
+            finally:
+                repository.close()
+            report["backends"][backend] = result
+            print(f"{backend}: p50 {result['p50_ms']} ms, p95 {result['p95_ms']} ms, "
+                  f"{result['throughput_rps']} calls/s")
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
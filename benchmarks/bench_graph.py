@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+"""Compare the /api/graph/<name> builders on one synthetic hospital.
+
+    python benchmarks/bench_graph.py --patients 20000
+    python benchmarks/bench_graph.py --patients 20000 --requests 2000 --output graph.json
+
+The old path builds a GraphVisualizer (networkx, printing every node and
+edge) and walks the networkx graph into vis.js JSON. The new path goes from
+the rows straight to JSON (app.person_graph). It is timed at depth 1, which
+gives the same graph, and at depths 2 and 3. Both run on the in-memory
+backend with the read cache on, so they are timed on the same rows.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# The whole hospital is held in process; nothing is written to Neo4j
+os.environ["MEDGRAPH_BACKEND"] = "memory"
+os.environ.pop("MEMORY_SNAPSHOT_PATH", None)
+
+import argparse
+import contextlib
+import io
+import json
+import random
+import statistics
+import time
+from benchmarks.synthetic import Hospital, DEFAULT_SEED, load_repository
+from app.main import repository, GraphVisualizer
+from app.overview_graph import PhaseTimer
+from app.person_graph import serialize_person_graph
+from app.visualizations import get_person_graph
+
+DEFAULT_REQUESTS = 1000
+
+
+def legacy_graph(name):
+    """The body /api/graph/<name> built through GraphVisualizer and networkx."""
+    graph_visualizer = GraphVisualizer(name)
+    graph_visualizer.fetch_data()
+    with contextlib.redirect_stdout(io.StringIO()):
+        graph_visualizer.build_graph()
+    nodes = []
+    for node, data in graph_visualizer.graph.nodes(data=True):
+        node_data = {'id': node, 'label': node}
+        if 'color' in data:
+            node_data['color'] = data['color']
+        if 'title' in data:
+            node_data['title'] = data['title']
+        nodes.append(node_data)
+    edges = [{'from': source, 'to': target} for source, target in graph_visualizer.graph.edges()]
+    return json.dumps({'nodes': nodes, 'edges': edges})
+
+
+def direct_graph(name, depth):
+    timer = PhaseTimer()
+    body, _, _ = serialize_person_graph(get_person_graph(name, depth=depth, timer=timer), timer)
+    return body
+
+
+def timed(build, names):
+    timings, sizes = [], []
+    for name in names:
+        started = time.perf_counter()
+        body = build(name)
+        timings.append((time.perf_counter() - started) * 1000)
+        sizes.append(len(body))
+    timings.sort()
+    return {
+        "mean_ms": round(statistics.mean(timings), 4),
+        "p50_ms": round(statistics.median(timings), 4),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 4),
+        "p99_ms": round(timings[int(len(timings) * 0.99) - 1], 4),
+        "mean_bytes": round(statistics.mean(sizes)),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--patients", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS)
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    args = parser.parse_args(argv)
+
+    hospital = Hospital(args.patients, args.seed)
+    load_repository(hospital, repository)
+    rng = random.Random(args.seed)
+    names = [rng.choice(hospital.persons)["name"] for _ in range(args.requests)]
+    # Warm the read cache for both paths alike
+    for name in names:
+        direct_graph(name, 1)
+
+    report = {"patients": args.patients, "requests": args.requests, "paths": {
+        "graph_visualizer": timed(legacy_graph, names),
+        "direct_depth_1": timed(lambda name: direct_graph(name, 1), names),
+        "direct_depth_2": timed(lambda name: direct_graph(name, 2), names),
+        "direct_depth_3": timed(lambda name: direct_graph(name, 3), names),
+    }}
+    legacy, direct = report["paths"]["graph_visualizer"], report["paths"]["direct_depth_1"]
+    report["speedup_p50"] = round(legacy["p50_ms"] / direct["p50_ms"], 2) if direct["p50_ms"] else None
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
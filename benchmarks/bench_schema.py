@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+"""Benchmark lookup latency with and without the MedGraph schema.
+
+Loads a synthetic graph into an EMPTY scratch database, runs the lookups used by
+the app with no constraints/indexes, applies the schema and runs them again.
+
+    python benchmarks/bench_schema.py --patients 100000 --yes
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from app.main import driver
+from app.bulk_ingest import bulk_create_persons, bulk_create_diseases, chunked
+from app.schema import ensure_schema, drop_schema
+from data.diseases_data import DISEASE_CATEGORIES
+
+DOCTORS = [f"Dr. Synthetic {i}" for i in range(50)]
+SEVERITIES = ["mild", "moderate", "severe", "critical"]
+STATUSES = ["active", "active", "active", "resolved", "chronic"]
+
+DIAGNOSES_QUERY = """
+    UNWIND $rows AS row
+    MATCH (p:Person {name: row.patient}), (d:Disease {name: row.disease})
+    CREATE (p)-[:DIAGNOSED_WITH {doctor: row.doctor, date: row.date, notes: '',
+                                 severity: row.severity, status: row.status}]->(d)
+"""
+
+LOOKUPS = {
+    "person_by_name": ("MATCH (p:Person {name: $name}) RETURN p.age AS age", "patient"),
+    "disease_by_name": ("MATCH (d:Disease {name: $name}) RETURN d.description AS description", "disease"),
+    "diagnoses_by_doctor": ("""
+        MATCH (p:Person)-[r:DIAGNOSED_WITH]->(d:Disease)
+        WHERE r.doctor = $name
+        RETURN COUNT(*) AS count
+    """, "doctor"),
+    "recent_active_diagnoses": ("""
+        MATCH (p:Person)-[r:DIAGNOSED_WITH]->(d:Disease)
+        WHERE r.status = 'active' AND r.date >= $name
+        RETURN p.name AS patient ORDER BY r.date DESC LIMIT 10
+    """, "date"),
+}
+
+
+def generate_graph(patients, seed, batch_size=5000):
+    """Load patients, the disease catalogue and random diagnoses."""
+    rng = random.Random(seed)
+    diseases = [d["name"] for category in DISEASE_CATEGORIES.values() for d in category]
+    bulk_create_diseases(
+        ({"name": d["name"], "description": d["description"]}
+         for category in DISEASE_CATEGORIES.values() for d in category))
+    bulk_create_persons(
+        ({"name": f"Patient {i:06d}", "age": rng.randint(1, 99)} for i in range(patients)),
+        batch_size=batch_size)
+
+    start = datetime(2015, 1, 1)
+
+    def diagnoses():
+        for i in range(patients):
+            for disease in rng.sample(diseases, rng.randint(1, 4)):
+                yield {
+                    "patient": f"Patient {i:06d}",
+                    "disease": disease,
+                    "doctor": rng.choice(DOCTORS),
+                    "date": (start + timedelta(minutes=rng.randint(0, 5_000_000))).isoformat(),
+                    "severity": rng.choice(SEVERITIES),
+                    "status": rng.choice(STATUSES),
+                }
+
+    with driver.session() as session:
+        for rows in chunked(diagnoses(), batch_size):
+            session.execute_write(lambda tx: tx.run(DIAGNOSES_QUERY, rows=rows).consume())
+    return diseases
+
+
+def measure(patients, diseases, iterations, seed):
+    """Run every lookup `iterations` times and return latency percentiles in ms."""
+    rng = random.Random(seed)
+    arguments = {
+        "patient": lambda: f"Patient {rng.randrange(patients):06d}",
+        "disease": lambda: rng.choice(diseases),
+        "doctor": lambda: rng.choice(DOCTORS),
+        "date": lambda: datetime(2024, rng.randint(1, 12), 1).isoformat(),
+    }
+    results = {}
+    with driver.session() as session:
+        for name, (query, argument) in LOOKUPS.items():
+            timings = []
+            for _ in range(iterations):
+                value = arguments[argument]()
+                started = time.perf_counter()
+                session.run(query, name=value).consume()
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            results[name] = {
+                "p50_ms": round(statistics.median(timings), 3),
+                "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 3),
+                "mean_ms": round(statistics.fmean(timings), 3),
+            }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--patients", type=int, default=100_000)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--yes", action="store_true", help="Confirm the database may be wiped")
+    args = parser.parse_args(argv)
+
+    if not args.yes:
+        print("This benchmark deletes ALL data in the configured database. Re-run with --yes.")
+        return 1
+
+    with driver.session() as session:
+        session.run("MATCH (n) CALL { WITH n DETACH DELETE n } IN TRANSACTIONS").consume()
+    drop_schema()
+
+    print(f"Generating {args.patients} patients...")
+    started = time.perf_counter()
+    diseases = generate_graph(args.patients, args.seed)
+    print(f"Generated in {time.perf_counter() - started:.1f}s")
+
+    before = measure(args.patients, diseases, args.iterations, args.seed)
+    print(ensure_schema()[1])
+    with driver.session() as session:
+        session.run("CALL db.awaitIndexes(600)").consume()
+    after = measure(args.patients, diseases, args.iterations, args.seed)
+
+    report = {"patients": args.patients, "iterations": args.iterations,
+              "before": before, "after": after}
+    print(f"{'lookup':<26}{'p50 before':>12}{'p50 after':>12}{'speedup':>10}")
+    for name in LOOKUPS:
+        b, a = before[name]["p50_ms"], after[name]["p50_ms"]
+        print(f"{name:<26}{b:>12.3f}{a:>12.3f}{b / a if a else 0:>9.1f}x")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+"""Time the patient similarity engine (app.similarity) on one synthetic hospital.
+
+    python benchmarks/bench_similarity.py --patients 200000
+    python benchmarks/bench_similarity.py --patients 20000 --queries 2000 --output similarity.json
+
+The hospital is written to the in-memory backend and read back with
+similarity_rows(). The report covers building the matrices, top-k queries
+for both metrics and the depth 2 network, and a stream of incremental
+updates, then the same queries again. Updates are scored from the changed
+patients' vectors until enough have changed to rebuild the matrices.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import random
+import statistics
+import time
+from benchmarks.synthetic import Hospital, DEFAULT_SEED, load_repository
+from app.memory_repository import MemoryRepository
+from app.similarity import PatientSimilarity, SIMILARITY_METRICS, DEFAULT_TOP_K
+
+DEFAULT_QUERIES = 1000
+DEFAULT_UPDATES = 1000
+
+
+def timed(query, names):
+    timings = []
+    for name in names:
+        started = time.perf_counter()
+        query(name)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "mean_ms": round(statistics.mean(timings), 4),
+        "p50_ms": round(statistics.median(timings), 4),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 4),
+        "p99_ms": round(timings[int(len(timings) * 0.99) - 1], 4),
+    }
+
+
+def query_report(engine, names, k):
+    report = {metric: timed(lambda name: engine.similar_patients(name, k=k, metric=metric), names)
+              for metric in SIMILARITY_METRICS}
+    report["network_depth_2"] = timed(
+        lambda name: engine.similarity_network(name, k=k, depth=2), names[:len(names) // 10 or 1])
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--patients", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--queries", type=int, default=DEFAULT_QUERIES)
+    parser.add_argument("--updates", type=int, default=DEFAULT_UPDATES)
+    parser.add_argument("--k", type=int, default=DEFAULT_TOP_K)
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    args = parser.parse_args(argv)
+
+    hospital = Hospital(args.patients, args.seed)
+    repository = MemoryRepository()
+    load_repository(hospital, repository)
+    started = time.perf_counter()
+    diagnoses, prescriptions = repository.similarity_rows()
+    rows_s = time.perf_counter() - started
+
+    engine = PatientSimilarity()
+    started = time.perf_counter()
+    engine.load(diagnoses, prescriptions)
+    build_s = time.perf_counter() - started
+
+    rng = random.Random(args.seed)
+    names = [rng.choice(diagnoses)["patient"] for _ in range(args.queries)]
+    report = {"patients": args.patients, "queries": args.queries, "k": args.k,
+              "rows_seconds": round(rows_s, 3), "build_seconds": round(build_s, 3),
+              "index": engine.stats(), "built": query_report(engine, names, args.k)}
+
+    diseases = [disease["name"] for disease in hospital.diseases]
+    medications = sorted({row["medication"] for row in prescriptions})
+    severities = ["mild", "moderate", "severe", "critical"]
+    rebuilds = engine.rebuilds
+    started = time.perf_counter()
+    for _ in range(args.updates):
+        patient = rng.choice(diagnoses)["patient"]
+        if rng.random() < 0.5:
+            engine.add_diagnosis(patient, rng.choice(diseases), rng.choice(severities))
+        else:
+            engine.add_prescription(patient, rng.choice(medications))
+    update_s = time.perf_counter() - started
+    report["updates"] = {"count": args.updates, "seconds": round(update_s, 4),
+                         "per_second": round(args.updates / update_s) if update_s else None,
+                         "pending_patients": engine.stats()["pending_patients"]}
+    report["after_updates"] = query_report(engine, names, args.k)
+    report["updates"]["rebuild_triggered"] = engine.rebuilds > rebuilds
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
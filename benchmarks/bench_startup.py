@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+"""Measure the import (startup) time of the entry points with `python -X importtime`.
+
+    python benchmarks/bench_startup.py                # check against benchmarks/startup_budget.json
+    python benchmarks/bench_startup.py --runs 7 --top 15
+    python benchmarks/bench_startup.py --update       # record the current times as the budget
+
+Each target is imported in a fresh interpreter --runs times. Its cumulative
+import time (the median) is compared with its budget. None of the target's
+`deferred` modules may be imported: networkx, pyvis, openai and the neo4j
+driver load on first use, not at startup. Exits 1 if any target fails.
+"""
+
+import sys
+import os
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+import argparse
+import json
+import statistics
+import subprocess
+import time
+
+BUDGET_PATH = os.path.join(ROOT, "benchmarks", "startup_budget.json")
+DEFAULT_RUNS = 5
+DEFAULT_TOP = 10
+# --update sets each budget this much above the measured median
+BUDGET_HEADROOM = 1.5
+
+
+def parse_importtime(text):
+    """[(module, self_us, cumulative_us, depth)] from `-X importtime` output."""
+    rows = []
+    for line in text.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue  # the header line
+        module = name.strip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((module, int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def import_once(module, environ=None):
+    """Import module in a fresh interpreter: (wall ms, importtime rows)."""
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, env=environ, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - started) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return wall_ms, parse_importtime(result.stderr)
+
+
+def measure(module, runs=DEFAULT_RUNS, top=DEFAULT_TOP, environ=None):
+    """Median import and wall time of module over runs, its heaviest imports and every module loaded."""
+    imports, walls, rows = [], [], []
+    for _ in range(runs):
+        wall_ms, rows = import_once(module, environ)
+        walls.append(wall_ms)
+        imports.append(sum(cumulative for name, _, cumulative, depth in rows
+                           if name == module and depth == 0) / 1000)
+    heaviest = sorted(rows, key=lambda row: row[1], reverse=True)[:top]
+    return {
+        "import_ms": round(statistics.median(imports), 1),
+        "wall_ms": round(statistics.median(walls), 1),
+        "modules": sorted({name for name, _, _, _ in rows}),
+        "heaviest": [{"module": name, "self_ms": round(self_us / 1000, 1)}
+                     for name, self_us, _, _ in heaviest],
+    }
+
+
+def check(result, budget):
+    """Problems with one measured target: over budget, or a deferred module imported."""
+    problems = []
+    if result["import_ms"] > budget["budget_ms"]:
+        problems.append(f"import took {result['import_ms']} ms, budget {budget['budget_ms']} ms")
+    loaded = set(result["modules"])
+    eager = [module for module in budget.get("deferred", [])
+             if module in loaded or any(name.startswith(module + ".") for name in loaded)]
+    if eager:
+        problems.append(f"imported at startup: {', '.join(eager)}")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget", default=BUDGET_PATH, help="Budget file (JSON)")
+    parser.add_argument("--targets", help="Comma-separated modules (default: every budgeted one)")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="Heaviest imports to list")
+    parser.add_argument("--update", action="store_true",
+                        help=f"Set each budget to {BUDGET_HEADROOM}x the measured time")
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    args = parser.parse_args(argv)
+
+    with open(args.budget) as f:
+        budgets = json.load(f)
+    targets = args.targets.split(",") if args.targets else list(budgets)
+
+    report, failed = {}, False
+    for module in targets:
+        budget = budgets.get(module)
+        try:
+            result = measure(module, args.runs, args.top)
+        except RuntimeError as e:
+            report[module] = {"error": str(e)}
+            print(f"{module}: FAILED to import: {e}")
+            failed = True
+            continue
+        if args.update:
+            budget = budgets.setdefault(module, {"budget_ms": 0, "deferred": []})
+            budget["budget_ms"] = round(result["import_ms"] * BUDGET_HEADROOM)
+        # Targets without a budget are only measured
+        problems = check(result, budget) if budget else []
+        failed = failed or bool(problems)
+        del result["modules"]
+        report[module] = dict(result, budget_ms=budget["budget_ms"] if budget else None,
+                              problems=problems)
+        print(f"{module}: {result['import_ms']} ms import, {result['wall_ms']} ms wall"
+              f"{', budget ' + str(budget['budget_ms']) + ' ms' if budget else ''}"
+              f"{': ' + '; '.join(problems) if problems else ''}")
+
+    if args.update:
+        with open(args.budget, "w") as f:
+            json.dump(budgets, f, indent=2)
+            f.write("\n")
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
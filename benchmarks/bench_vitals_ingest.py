@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+"""Benchmark bulk vitals ingestion against the 10k readings/second target.
+
+    python benchmarks/bench_vitals_ingest.py --patients 500 --readings 200000
+    python benchmarks/bench_vitals_ingest.py --validate-only   # no database needed
+
+Readings go wherever VITALS_BACKEND points (the time-series store by default,
+at VITALS_STORE_PATH). Patients are created first with the bulk person loader.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from app.vitals_store import validate_readings
+
+TARGET_READINGS_PER_SECOND = 10_000
+
+
+def generate_readings(patients, count, seed):
+    """Minute-by-minute ward monitor readings spread over the given patients."""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    for i in range(count):
+        yield {
+            "patient": f"Ward Patient {i % patients}",
+            "blood_pressure": f"{rng.randint(100, 150)}/{rng.randint(60, 95)}",
+            "heart_rate": rng.randint(50, 120),
+            "temperature": round(rng.uniform(36.0, 39.0), 1),
+            "weight": round(rng.uniform(45, 120), 1),
+            "height": rng.randint(150, 200),
+            "recorded_at": (start + timedelta(minutes=i // patients)).isoformat(),
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--patients", type=int, default=500)
+    parser.add_argument("--readings", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--target", type=float, default=TARGET_READINGS_PER_SECOND,
+                        help="Minimum readings/second; exit non-zero below it")
+    parser.add_argument("--validate-only", action="store_true",
+                        help="Time validation and BMI only, without writing")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    readings = list(generate_readings(args.patients, args.readings, args.seed))
+
+    if args.validate_only:
+        started = time.perf_counter()
+        for i in range(0, len(readings), args.batch_size):
+            validate_readings(readings[i:i + args.batch_size])
+        elapsed = time.perf_counter() - started
+        summary = {"readings": len(readings), "elapsed_seconds": round(elapsed, 3)}
+    else:
+        from app.bulk_ingest import bulk_create_persons, bulk_add_vitals
+        bulk_create_persons(({"name": f"Ward Patient {i}", "age": 30 + i % 60}
+                             for i in range(args.patients)), batch_size=args.batch_size)
+        report = bulk_add_vitals(readings, batch_size=args.batch_size)
+        summary = report.to_dict(include_results=False)
+        elapsed = summary["elapsed_seconds"]
+
+    summary["readings_per_second"] = round(len(readings) / elapsed, 1) if elapsed else 0.0
+    summary["target_readings_per_second"] = args.target
+    summary["meets_target"] = summary["readings_per_second"] >= args.target
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+    return 0 if summary["meets_target"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,363 @@
+#!/usr/bin/env python
+"""Seeded synthetic hospital for the benchmarks.
+
+    python benchmarks/synthetic.py --patients 10000 --summary   # generate only, no database needed
+    python benchmarks/synthetic.py --patients 10000 --yes       # wipe the database and load it
+
+The same --patients and --seed always produce the same hospital, so the
+workload runner (benchmarks/workload.py) picks patients, diseases and doctors
+from a regenerated copy instead of querying the database.
+
+Patients get 1 + Poisson(0.4 + age/40) diagnoses, drawn by category prevalence
+(chronic categories weighted up with age) and a Zipf tail within each
+category. Severity, status and prescriptions depend on the category; vitals
+are a per-patient baseline (age, hypertension, infection) plus noise.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import math
+import random
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from data.diseases_data import DISEASE_CATEGORIES
+
+DEFAULT_SEED = 42
+FIRST_NAMES = ["James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda",
+               "William", "Elizabeth", "David", "Barbara", "Richard", "Susan", "Joseph", "Jessica",
+               "Aisha", "Mohammed", "Wei", "Priya", "Olga", "Kwame", "Sofia", "Hiroshi"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis",
+              "Rodriguez", "Martinez", "Hernandez", "Lopez", "Wilson", "Anderson", "Taylor",
+              "Khan", "Chen", "Patel", "Ivanova", "Mensah", "Rossi", "Tanaka", "Okafor", "Novak"]
+DOCTORS = [f"Dr. {name}" for name in LAST_NAMES] + [f"Dr. {name} {i}" for i in range(2, 4)
+                                                     for name in LAST_NAMES[:18]]
+
+START = datetime(2015, 1, 1, 8, 0).astimezone()
+END = datetime(2024, 12, 31, 18, 0).astimezone()
+MAX_DIAGNOSES = 8
+MAX_VITALS = 30
+MEAN_VITALS = 4
+
+# Relative prevalence of a diagnosis in each category
+CATEGORY_WEIGHTS = {
+    "Cardiovascular": 18, "Endocrine": 14, "Respiratory": 12, "Mental Health": 12,
+    "Musculoskeletal": 11, "Gastrointestinal": 9, "Infectious": 9, "Renal": 6,
+    "Neurological": 5, "Cancer": 4,
+}
+AGE_RELATED = {"Cardiovascular", "Cancer", "Neurological", "Renal", "Musculoskeletal", "Endocrine"}
+SEVERITY_WEIGHTS = {
+    "default": {"mild": 40, "moderate": 35, "severe": 18, "critical": 7},
+    "Cancer": {"mild": 5, "moderate": 30, "severe": 45, "critical": 20},
+    "Mental Health": {"mild": 35, "moderate": 45, "severe": 17, "critical": 3},
+}
+STATUS_WEIGHTS = {
+    "default": {"active": 50, "resolved": 30, "chronic": 20},
+    "Infectious": {"active": 25, "resolved": 75, "chronic": 0},
+    "chronic": {"active": 40, "resolved": 5, "chronic": 55},
+}
+CHRONIC = {"Cardiovascular", "Endocrine", "Neurological", "Musculoskeletal", "Mental Health", "Renal"}
+PRESCRIPTION_RATE = 0.75
+
+# (medication, dosage, frequency) commonly prescribed for each category
+FORMULARY = {
+    "Infectious": [("Amoxicillin", "500mg", "Three times daily"), ("Oseltamivir", "75mg", "Twice daily"),
+                   ("Azithromycin", "250mg", "Once daily"), ("Paracetamol", "1g", "Every 6 hours")],
+    "Cardiovascular": [("Amlodipine", "5mg", "Once daily"), ("Atorvastatin", "40mg", "Once daily"),
+                       ("Bisoprolol", "2.5mg", "Once daily"), ("Apixaban", "5mg", "Twice daily"),
+                       ("Ramipril", "5mg", "Once daily")],
+    "Respiratory": [("Salbutamol", "100mcg", "As needed"), ("Budesonide", "200mcg", "Twice daily"),
+                    ("Tiotropium", "18mcg", "Once daily"), ("Prednisolone", "30mg", "Once daily")],
+    "Endocrine": [("Metformin", "500mg", "Twice daily"), ("Insulin glargine", "10 units", "Once daily"),
+                  ("Levothyroxine", "50mcg", "Once daily"), ("Carbimazole", "20mg", "Once daily")],
+    "Neurological": [("Levetiracetam", "500mg", "Twice daily"), ("Donepezil", "5mg", "Once daily"),
+                     ("Sumatriptan", "50mg", "As needed"), ("Levodopa", "100mg", "Three times daily")],
+    "Musculoskeletal": [("Ibuprofen", "400mg", "Three times daily"), ("Methotrexate", "15mg", "Weekly"),
+                        ("Alendronic acid", "70mg", "Weekly"), ("Allopurinol", "100mg", "Once daily")],
+    "Gastrointestinal": [("Omeprazole", "20mg", "Once daily"), ("Mesalazine", "800mg", "Three times daily"),
+                         ("Mebeverine", "135mg", "Three times daily")],
+    "Mental Health": [("Sertraline", "50mg", "Once daily"), ("Quetiapine", "100mg", "Twice daily"),
+                      ("Lithium carbonate", "400mg", "Once daily"), ("Methylphenidate", "10mg", "Twice daily")],
+    "Cancer": [("Tamoxifen", "20mg", "Once daily"), ("Ondansetron", "8mg", "Twice daily"),
+               ("Morphine sulfate", "10mg", "Every 4 hours")],
+    "Renal": [("Furosemide", "40mg", "Once daily"), ("Nitrofurantoin", "100mg", "Twice daily"),
+              ("Sodium bicarbonate", "500mg", "Three times daily")],
+}
+DURATIONS = {"chronic": "Ongoing", "active": "30 days", "resolved": "14 days"}
+
+
+def disease_catalogue():
+    """[(name, description, category)], each disease once, in catalogue order."""
+    seen = {}
+    for category, diseases in DISEASE_CATEGORIES.items():
+        for disease in diseases:
+            seen.setdefault(disease["name"], (disease["name"], disease["description"], category))
+    return list(seen.values())
+
+
+def _weighted(rng, weights):
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def _poisson(rng, mean):
+    """Knuth's method; fine for the small means used here."""
+    limit, k, product = math.exp(-mean), 0, rng.random()
+    while product > limit:
+        k += 1
+        product *= rng.random()
+    return k
+
+
+def _date_between(rng, start, end):
+    return start + timedelta(seconds=rng.randint(0, int((end - start).total_seconds())))
+
+
+class Hospital:
+    """Persons, diseases, diagnoses, prescriptions and vitals generated from one seed."""
+
+    def __init__(self, patients, seed=DEFAULT_SEED):
+        self.patients = patients
+        self.seed = seed
+        self.persons = []
+        self.diseases = [{"name": name, "description": description}
+                         for name, description, _ in disease_catalogue()]
+        self.diagnoses = []
+        self.prescriptions = []
+        self.vitals = []
+        self._generate(random.Random(seed))
+
+    @property
+    def doctors(self):
+        return DOCTORS
+
+    def _generate(self, rng):
+        catalogue = disease_catalogue()
+        by_category = {}
+        for name, _, category in catalogue:
+            by_category.setdefault(category, []).append(name)
+        category_of = {name: category for name, _, category in catalogue}
+        zipf = {category: [1 / (rank + 1) for rank in range(len(names))]
+                for category, names in by_category.items()}
+        doctor_weights = [1 / (i + 1) ** 0.8 for i in range(len(DOCTORS))]
+
+        for i in range(self.patients):
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i:06d}"
+            age = max(1, min(99, int(rng.triangular(1, 99, 58))))
+            self.persons.append({"name": name, "age": age})
+
+            age_factor = 0.3 + age / 50
+            weights = {category: weight * (age_factor if category in AGE_RELATED else 1)
+                       for category, weight in CATEGORY_WEIGHTS.items()}
+            wanted = min(MAX_DIAGNOSES, 1 + _poisson(rng, 0.4 + age / 40))
+            chosen = []
+            while len(chosen) < wanted:
+                category = _weighted(rng, weights)
+                disease = rng.choices(by_category[category], weights=zipf[category])[0]
+                if disease not in chosen:
+                    chosen.append(disease)
+
+            first_seen = END
+            for disease in chosen:
+                category = category_of[disease]
+                doctor = rng.choices(DOCTORS, weights=doctor_weights)[0]
+                date = _date_between(rng, START, END)
+                first_seen = min(first_seen, date)
+                status = _weighted(rng, STATUS_WEIGHTS.get(
+                    category, STATUS_WEIGHTS["chronic" if category in CHRONIC else "default"]))
+                self.diagnoses.append({
+                    "patient": name, "disease": disease, "doctor": doctor, "date": date,
+                    "severity": _weighted(rng, SEVERITY_WEIGHTS.get(category, SEVERITY_WEIGHTS["default"])),
+                    "status": status, "notes": f"{category} referral",
+                })
+                if status != "resolved" and rng.random() < PRESCRIPTION_RATE:
+                    medication, dosage, frequency = rng.choice(FORMULARY[category])
+                    self.prescriptions.append({
+                        "patient": name, "medication": medication, "dosage": dosage,
+                        "frequency": frequency, "doctor": doctor, "duration": DURATIONS[status],
+                        "notes": f"For {disease}",
+                        "prescribed_date": date + timedelta(days=rng.randint(0, 14)),
+                    })
+
+            self._add_vitals(rng, name, age, chosen, first_seen)
+
+    def _add_vitals(self, rng, name, age, diseases, first_seen):
+        adult = age >= 18
+        height = rng.gauss(170, 9) if adult else 75 + age * 5.5
+        weight = rng.gauss(26, 4.5 if adult else 2) * (height / 100) ** 2 if adult \
+            else rng.gauss(17, 2) * (height / 100) ** 2
+        systolic = 100 + 0.45 * age + (18 if "Hypertension" in diseases else 0)
+        febrile = any(d in ("Influenza", "COVID-19", "Pneumonia", "Malaria", "Dengue Fever")
+                      for d in diseases)
+        heart_rate = rng.gauss(76 if adult else 95, 8)
+
+        count = min(MAX_VITALS, 1 + int(rng.expovariate(1 / MEAN_VITALS)))
+        recorded_at = first_seen
+        for _ in range(count):
+            sys_reading = int(max(70, min(240, rng.gauss(systolic, 9))))
+            dia_reading = int(max(40, min(sys_reading - 10, rng.gauss(sys_reading * 0.62, 5))))
+            self.vitals.append({
+                "patient": name,
+                "blood_pressure": f"{sys_reading}/{dia_reading}",
+                "heart_rate": int(max(35, min(180, rng.gauss(heart_rate, 6)))),
+                "temperature": round(max(35.0, min(41.0, rng.gauss(
+                    37.9 if febrile and rng.random() < 0.3 else 36.8, 0.3))), 1),
+                "weight": round(max(3.0, rng.gauss(weight, 1.2)), 1),
+                "height": round(height),
+                "recorded_at": recorded_at.isoformat(),
+            })
+            recorded_at += timedelta(days=rng.randint(7, 120), minutes=rng.randint(0, 600))
+
+    def summary(self):
+        """Counts and the shape of each distribution, for checking a generated hospital."""
+        per_patient = Counter(Counter(d["patient"] for d in self.diagnoses).values())
+        return {
+            "seed": self.seed,
+            "patients": len(self.persons),
+            "diseases": len(self.diseases),
+            "doctors": len(DOCTORS),
+            "diagnoses": len(self.diagnoses),
+            "prescriptions": len(self.prescriptions),
+            "vitals": len(self.vitals),
+            "diagnoses_per_patient": dict(sorted(per_patient.items())),
+            "severity": dict(Counter(d["severity"] for d in self.diagnoses).most_common()),
+            "status": dict(Counter(d["status"] for d in self.diagnoses).most_common()),
+            "top_diseases": dict(Counter(d["disease"] for d in self.diagnoses).most_common(10)),
+        }
+
+
+DIAGNOSES_QUERY = """
+    UNWIND $rows AS row
+    MATCH (p:Person {name: row.patient}), (d:Disease {name: row.disease})
+    MERGE (p)-[r:DIAGNOSED_WITH {id: row.id}]->(d)
+    ON CREATE SET r.doctor = row.doctor, r.date = row.date, r.notes = row.notes,
+                  r.severity = row.severity, r.status = row.status
+"""
+
+PRESCRIPTIONS_QUERY = """
+    UNWIND $rows AS row
+    MATCH (p:Person {name: row.patient})
+    MERGE (rx:Prescription {id: row.id})
+    ON CREATE SET rx.medication = row.medication, rx.dosage = row.dosage,
+                  rx.frequency = row.frequency, rx.doctor = row.doctor,
+                  rx.duration = row.duration, rx.notes = row.notes,
+                  rx.prescribed_date = row.prescribed_date, rx.status = 'active'
+    MERGE (p)-[:HAS_PRESCRIPTION]->(rx)
+"""
+
+
+def load(hospital, batch_size=5000):
+    """Write a generated hospital to the configured database; returns seconds per kind.
+
+    Persons, diseases, HAS_DISEASE edges and vitals go through the bulk
+    loaders; diagnoses and prescriptions keep their generated dates, so they
+    are written with UNWIND here. Running servers should reconcile their
+    dashboard statistics afterwards (POST /api/stats/reconcile).
+    """
+    from app.main import run_write
+    from app.ids import new_id
+    from app.bulk_ingest import (bulk_create_persons, bulk_create_diseases,
+                                 bulk_create_relationships, bulk_add_vitals, chunked)
+
+    timings = {}
+
+    def timed(kind, load_kind):
+        started = time.perf_counter()
+        load_kind()
+        timings[kind] = round(time.perf_counter() - started, 3)
+
+    def write_rows(query, rows):
+        for chunk in chunked(rows, batch_size):
+            run_write(query, rows=[dict(row, id=new_id()) for row in chunk])
+
+    timed("diseases", lambda: bulk_create_diseases(hospital.diseases, batch_size=batch_size))
+    timed("persons", lambda: bulk_create_persons(hospital.persons, batch_size=batch_size))
+    timed("relationships", lambda: bulk_create_relationships(
+        ({"person_name": d["patient"], "disease_name": d["disease"]} for d in hospital.diagnoses),
+        batch_size=batch_size))
+    timed("diagnoses", lambda: write_rows(DIAGNOSES_QUERY, hospital.diagnoses))
+    timed("prescriptions", lambda: write_rows(PRESCRIPTIONS_QUERY, hospital.prescriptions))
+    timed("vitals", lambda: bulk_add_vitals(hospital.vitals, batch_size=batch_size))
+    return timings
+
+
+def load_repository(hospital, repository):
+    """Write a generated hospital through an app.repository backend; returns seconds per kind.
+
+    Records go one at a time through the repository's write methods, the way
+    the app writes them, so this also works for the embedded backends.
+    """
+    from app.ids import new_id
+    from app.model import to_datetime, vital_properties
+
+    timings = {}
+
+    def timed(kind, records, write):
+        started = time.perf_counter()
+        for record in records:
+            write(record)
+        timings[kind] = round(time.perf_counter() - started, 3)
+
+    def diagnose(d):
+        repository.create_diagnosis(new_id(), d["patient"], d["disease"], d["doctor"], d["date"],
+                                    d["notes"], d["severity"])
+        if d["status"] != "active":
+            repository.update_diagnosis_status(d["patient"], d["disease"], d["status"], "", d["date"])
+
+    def record_vitals(v):
+        vitals = vital_properties(v["blood_pressure"], v["heart_rate"], v["temperature"],
+                                  v["weight"], v["height"])
+        vitals["bmi"] = round(vitals["weight"] / (vitals["height"] / 100) ** 2, 1)
+        repository.add_vitals(new_id(), v["patient"], "", to_datetime(v["recorded_at"]), **vitals)
+
+    timed("diseases", hospital.diseases,
+          lambda d: repository.create_disease(new_id(), d["name"], d["description"]))
+    timed("persons", hospital.persons,
+          lambda p: repository.create_person(new_id(), p["name"], p["age"]))
+    timed("relationships", hospital.diagnoses,
+          lambda d: repository.create_relationship(new_id(), d["patient"], d["disease"]))
+    timed("diagnoses", hospital.diagnoses, diagnose)
+    timed("prescriptions", hospital.prescriptions, lambda rx: repository.add_prescription(
+        new_id(), rx["patient"], rx["medication"], rx["dosage"], rx["frequency"], rx["doctor"],
+        rx["duration"], rx["notes"], rx["prescribed_date"]))
+    timed("vitals", hospital.vitals, record_vitals)
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--patients", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--summary", action="store_true",
+                        help="Only generate and describe the data, without a database")
+    parser.add_argument("--output", help="Write the summary as JSON to this file")
+    parser.add_argument("--yes", action="store_true", help="Confirm the database may be wiped")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    hospital = Hospital(args.patients, args.seed)
+    summary = hospital.summary()
+    summary["generate_seconds"] = round(time.perf_counter() - started, 3)
+
+    if not args.summary:
+        if not args.yes:
+            print("Loading deletes ALL data in the configured database. Re-run with --yes.")
+            return 1
+        from app.main import write_session
+        with write_session() as session:
+            session.run("MATCH (n) CALL { WITH n DETACH DELETE n } IN TRANSACTIONS").consume()
+        summary["load_seconds"] = load(hospital, args.batch_size)
+
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,346 @@
+#!/usr/bin/env python
+"""Replay a weighted mix of API calls at a fixed concurrency and report latency per endpoint.
+
+    python benchmarks/workload.py --base-url http://localhost:5000 --patients 10000 --output run.json
+    python benchmarks/workload.py --in-process --duration 30 --concurrency 16
+    python benchmarks/workload.py --mix person_details=5,medical_record=3 --read-only
+    python benchmarks/workload.py --baseline run.json --tolerance 0.15   # exit 1 on regression
+
+Load the data first with benchmarks/synthetic.py using the same --patients and
+--seed: requests name patients, diseases and doctors from that hospital. Each
+of the --concurrency workers sends its next request as soon as the previous
+one returns (a closed loop), with 80% of patient requests going to the
+busiest 20% of patients. Requests during --warmup are not measured.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import http.client
+import json
+import random
+import statistics
+import threading
+import time
+from datetime import datetime
+from urllib.parse import quote, urlsplit
+from benchmarks.synthetic import Hospital, DEFAULT_SEED, LAST_NAMES, FORMULARY
+
+HOT_PATIENT_SHARE = 0.2
+HOT_REQUEST_SHARE = 0.8
+DEFAULT_TOLERANCE = 0.10
+
+# name: (method, path, body); {patient}, {disease}, {doctor} and {term} are
+# filled in per request, path values URL-quoted
+ENDPOINTS = {
+    "persons_page": ("GET", "/api/persons?limit=50", None),
+    "person_details": ("GET", "/api/persons/{patient}/details", None),
+    "person_diseases": ("GET", "/api/persons/{patient}/diseases", None),
+    "search_patients": ("GET", "/api/persons/search?q={term}", None),
+    "search_diseases": ("GET", "/api/diseases/search?q={disease}", None),
+    "medical_record": ("GET", "/api/patients/{patient}/medical-record", None),
+    "timeline": ("GET", "/api/patients/{patient}/timeline?limit=20", None),
+    "vitals": ("GET", "/api/patients/{patient}/vitals", None),
+    "diagnosis_search": ("GET", "/api/diagnosis/search?disease={disease}", None),
+    "comorbidities": ("GET", "/api/diseases/{disease}/comorbidities", None),
+    "patient_graph": ("GET", "/api/graph/{patient}", None),
+    "similar_patients": ("GET", "/api/patients/{patient}/similar", None),
+    "doctor_stats": ("GET", "/api/stats/doctors/{doctor}", None),
+    "disease_stats": ("GET", "/api/stats/diseases", None),
+    "severity_stats": ("GET", "/api/stats/severity", None),
+    "create_diagnosis": ("POST", "/api/diagnosis", {
+        "patient_name": "{patient}", "disease_name": "{disease}", "doctor_name": "{doctor}",
+        "severity": "moderate", "notes": "Workload benchmark"}),
+    "add_prescription": ("POST", "/api/patients/{patient}/prescription", {
+        "medication": "{medication}", "dosage": "{dosage}", "frequency": "{frequency}",
+        "doctor_name": "{doctor}", "duration": "30 days", "notes": "Workload benchmark"}),
+}
+WRITE_ENDPOINTS = {name for name, (method, _, _) in ENDPOINTS.items() if method != "GET"}
+
+# Roughly a ward's day: mostly record look-ups, some search, few writes
+DEFAULT_MIX = {
+    "persons_page": 4, "person_details": 20, "person_diseases": 12, "search_patients": 8,
+    "search_diseases": 3, "medical_record": 15, "timeline": 10, "vitals": 5,
+    "diagnosis_search": 4, "comorbidities": 3, "patient_graph": 3, "similar_patients": 2,
+    "doctor_stats": 2, "disease_stats": 2, "severity_stats": 2, "create_diagnosis": 2,
+    "add_prescription": 2,
+}
+
+
+def parse_mix(value, read_only=False):
+    """{endpoint: weight} from "name=weight,..." or a JSON file; raises ValueError."""
+    if not value:
+        mix = dict(DEFAULT_MIX)
+    elif os.path.exists(value):
+        with open(value) as f:
+            mix = json.load(f)
+    else:
+        mix = {}
+        for part in value.split(","):
+            name, _, weight = part.partition("=")
+            try:
+                mix[name.strip()] = float(weight) if weight else 1.0
+            except ValueError:
+                raise ValueError(f"Invalid weight for '{name}'")
+    unknown = set(mix) - set(ENDPOINTS)
+    if unknown:
+        raise ValueError(f"Unknown endpoints: {', '.join(sorted(unknown))}; "
+                         f"expected some of {', '.join(ENDPOINTS)}")
+    if read_only:
+        mix = {name: weight for name, weight in mix.items() if name not in WRITE_ENDPOINTS}
+    mix = {name: weight for name, weight in mix.items() if weight > 0}
+    if not mix:
+        raise ValueError("The mix has no endpoints with a positive weight")
+    return mix
+
+
+class RequestPlan:
+    """Draws (endpoint, method, path, body) tuples from a mix over one synthetic hospital."""
+
+    def __init__(self, hospital, mix):
+        self.names = list(mix)
+        self.weights = list(mix.values())
+        self.patients = [person["name"] for person in hospital.persons]
+        self.hot = max(1, int(len(self.patients) * HOT_PATIENT_SHARE))
+        self.diseases = [disease["name"] for disease in hospital.diseases]
+        self.doctors = hospital.doctors
+        self.medications = [item for items in FORMULARY.values() for item in items]
+
+    def _patient(self, rng):
+        if rng.random() < HOT_REQUEST_SHARE:
+            return self.patients[rng.randrange(self.hot)]
+        return rng.choice(self.patients)
+
+    def next(self, rng):
+        name = rng.choices(self.names, weights=self.weights)[0]
+        method, path, body = ENDPOINTS[name]
+        medication, dosage, frequency = rng.choice(self.medications)
+        values = {"patient": self._patient(rng), "disease": rng.choice(self.diseases),
+                  "doctor": rng.choice(self.doctors), "term": rng.choice(LAST_NAMES)[:4],
+                  "medication": medication, "dosage": dosage, "frequency": frequency}
+        path = path.format(**{key: quote(value, safe="") for key, value in values.items()})
+        if body is not None:
+            body = {key: value.format(**values) for key, value in body.items()}
+        return name, method, path, body
+
+
+class HttpClient:
+    """One keep-alive connection to a running server; reconnects after an error."""
+
+    def __init__(self, base_url, timeout=30):
+        parts = urlsplit(base_url)
+        connection = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self._connect = lambda: connection(parts.netloc, timeout=timeout)
+        self.prefix = parts.path.rstrip("/")
+        self.connection = self._connect()
+
+    def request(self, method, path, body=None):
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        try:
+            self.connection.request(method, self.prefix + path,
+                                    body=json.dumps(body) if body is not None else None, headers=headers)
+            response = self.connection.getresponse()
+            response.read()
+            return response.status
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            self.connection = self._connect()
+            return 0
+
+    def close(self):
+        self.connection.close()
+
+
+class FlaskClient:
+    """The Flask test client: no network or server process, same routes."""
+
+    def __init__(self):
+        from app.flask_app import app
+        self.client = app.test_client()
+
+    def request(self, method, path, body=None):
+        response = self.client.open(path, method=method, json=body)
+        response.get_data()
+        return response.status_code
+
+    def close(self):
+        pass
+
+
+def percentile(sorted_values, q):
+    """The q-th percentile (0-100) of an ascending list, interpolating between ranks."""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarise(samples, elapsed):
+    """Report for [(endpoint, latency_ms, status)]; statuses 0 and >= 400 count as errors."""
+    by_endpoint = {}
+    for name, latency, status in samples:
+        by_endpoint.setdefault(name, []).append((latency, status))
+
+    endpoints = {}
+    for name, rows in sorted(by_endpoint.items()):
+        latencies = sorted(latency for latency, _ in rows)
+        endpoints[name] = {
+            "requests": len(rows),
+            "errors": sum(1 for _, status in rows if status == 0 or status >= 400),
+            "throughput_rps": round(len(rows) / elapsed, 2) if elapsed else 0.0,
+            "mean_ms": round(statistics.fmean(latencies), 3),
+            "p50_ms": round(percentile(latencies, 50), 3),
+            "p95_ms": round(percentile(latencies, 95), 3),
+            "p99_ms": round(percentile(latencies, 99), 3),
+            "max_ms": round(latencies[-1], 3),
+        }
+    latencies = sorted(latency for _, latency, _ in samples)
+    return {
+        "elapsed_seconds": round(elapsed, 3),
+        "requests": len(samples),
+        "errors": sum(endpoint["errors"] for endpoint in endpoints.values()),
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "endpoints": endpoints,
+    }
+
+
+def compare(baseline, current, tolerance=DEFAULT_TOLERANCE):
+    """Regressions of current against baseline beyond the tolerance (a fraction).
+
+    Latency percentiles may not grow, and throughput may not shrink, by more
+    than the tolerance, overall or for any endpoint present in both runs.
+    """
+    regressions = []
+
+    def check(endpoint, metric, before, after, higher_is_worse=True):
+        if not before:
+            return
+        change = (after - before) / before
+        if (change if higher_is_worse else -change) > tolerance:
+            regressions.append({"endpoint": endpoint, "metric": metric, "baseline": before,
+                                "current": after, "change": round(change, 3)})
+
+    pairs = [("overall", baseline, current)] + [
+        (name, baseline["endpoints"][name], current["endpoints"][name])
+        for name in baseline.get("endpoints", {}) if name in current.get("endpoints", {})]
+    for endpoint, before, after in pairs:
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            check(endpoint, metric, before[metric], after[metric])
+        check(endpoint, "throughput_rps", before["throughput_rps"], after["throughput_rps"],
+              higher_is_worse=False)
+    return regressions
+
+
+def run(client_factory, plan, concurrency, duration=None, total=None, warmup=0.0, seed=DEFAULT_SEED):
+    """Run `concurrency` workers until `duration` seconds or `total` measured requests.
+
+    Returns ([(endpoint, latency_ms, status)], measured seconds).
+    """
+    lock = threading.Lock()
+    issued = [0]
+    results = []
+    start = time.perf_counter()
+    measure_from = start + warmup
+    deadline = measure_from + duration if duration else None
+
+    def worker(index):
+        rng = random.Random(seed * 1000 + index)
+        client = client_factory()
+        samples = []
+        try:
+            while True:
+                now = time.perf_counter()
+                if deadline is not None and now >= deadline:
+                    break
+                measured = now >= measure_from
+                if measured and total is not None:
+                    with lock:
+                        if issued[0] >= total:
+                            break
+                        issued[0] += 1
+                name, method, path, body = plan.next(rng)
+                started = time.perf_counter()
+                status = client.request(method, path, body)
+                if measured:
+                    samples.append((name, (time.perf_counter() - started) * 1000, status))
+        finally:
+            client.close()
+            with lock:
+                results.extend(samples)
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, time.perf_counter() - max(measure_from, start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--base-url", default="http://localhost:5000",
+                        help="Server to send requests to")
+    target.add_argument("--in-process", action="store_true",
+                        help="Call the Flask app through its test client instead of HTTP")
+    parser.add_argument("--patients", type=int, default=10_000,
+                        help="Patients the synthetic data was loaded with")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--mix", help="name=weight,... or a JSON file of {name: weight}")
+    parser.add_argument("--read-only", action="store_true", help="Leave out write endpoints")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=60.0, help="Measured seconds")
+    parser.add_argument("--requests", type=int, help="Stop after this many measured requests")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Unmeasured seconds first")
+    parser.add_argument("--baseline", help="Earlier report to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed fractional regression against the baseline")
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    args = parser.parse_args(argv)
+
+    try:
+        mix = parse_mix(args.mix, args.read_only)
+    except ValueError as e:
+        parser.error(str(e))
+
+    plan = RequestPlan(Hospital(args.patients, args.seed), mix)
+    if args.in_process:
+        client_factory = FlaskClient
+    else:
+        client_factory = lambda: HttpClient(args.base_url)
+
+    started_at = datetime.now().astimezone().isoformat()
+    samples, elapsed = run(client_factory, plan, args.concurrency,
+                           duration=None if args.requests else args.duration,
+                           total=args.requests, warmup=args.warmup, seed=args.seed)
+    report = {
+        "config": {"target": "in-process" if args.in_process else args.base_url,
+                   "patients": args.patients, "seed": args.seed, "concurrency": args.concurrency,
+                   "duration": args.duration, "requests": args.requests, "warmup": args.warmup,
+                   "mix": mix},
+        "started_at": started_at,
+        **summarise(samples, elapsed),
+    }
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["regressions"] = compare(json.load(f), report, args.tolerance)
+        exit_code = 1 if report["regressions"] else 0
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,7 +5,8 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.main import create_person, create_disease, create_relationship
+from app.bulk_ingest import (bulk_create_persons, bulk_create_diseases,
+                             bulk_create_relationships)
 
 def load_sample_data():
     """Load sample data into the database."""
@@ -30,14 +31,12 @@ def load_sample_data():
     ]
     
     # Create persons
-    for name, age in persons:
-        success, message = create_person(name, age)
-        print(f"Person: {message}")
+    for result in bulk_create_persons(persons).results:
+        print(f"Person: {result['message']}")
     
     # Create diseases
-    for name, description in diseases:
-        success, message = create_disease(name, description)
-        print(f"Disease: {message}")
+    for result in bulk_create_diseases(diseases).results:
+        print(f"Disease: {result['message']}")
     
     # Create relationships
     relationships = [
@@ -51,9 +50,8 @@ def load_sample_data():
         ("Charlie Brown", "Arthritis")
     ]
     
-    for person, disease in relationships:
-        success, message = create_relationship(person, disease)
-        print(f"Relationship: {message}")
+    for result in bulk_create_relationships(relationships).results:
+        print(f"Relationship: {result['message']}")
     
     print("\nSample data loaded successfully!")
     print("You can now run the Gradio app to visualise the data.")
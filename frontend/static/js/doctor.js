@@ -387,7 +387,7 @@ function showSection(section) {
 // Load diseases for dropdowns
 async function loadDiseases() {
     try {
-        const response = await fetch(`${API_BASE_URL}/api/diseases`);
+        const response = await fetch(`${API_BASE_URL}/api/diseases?fields=name`);
         allDiseases = await response.json();
         
         // Populate disease selects
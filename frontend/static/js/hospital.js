@@ -318,8 +318,8 @@ async function loadStatistics() {
     try {
         // Fetch all data
         const [personsResponse, diseasesResponse] = await Promise.all([
-            fetch(`${API_BASE_URL}/api/persons`),
-            fetch(`${API_BASE_URL}/api/diseases`)
+            fetch(`${API_BASE_URL}/api/persons?fields=name`),
+            fetch(`${API_BASE_URL}/api/diseases?fields=name`)
         ]);
         
         const persons = await personsResponse.json();
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+"""Command-line bulk loader for persons, diseases, relationships and vitals."""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import csv
+import json
+from app.bulk_ingest import (bulk_create_persons, bulk_create_diseases,
+                             bulk_create_relationships, bulk_add_vitals,
+                             DEFAULT_BATCH_SIZE)
+
+INGESTERS = {
+    "persons": bulk_create_persons,
+    "diseases": bulk_create_diseases,
+    "relationships": bulk_create_relationships,
+    "vitals": bulk_add_vitals,
+}
+
+
+def read_records(path):
+    """Stream records from a CSV, JSON array or NDJSON file."""
+    if path.endswith(".csv"):
+        with open(path, newline="") as f:
+            yield from csv.DictReader(f)
+    elif path.endswith(".json"):
+        with open(path) as f:
+            yield from json.load(f)
+    else:
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk load MedGraph records into Neo4j.")
+    parser.add_argument("kind", choices=sorted(INGESTERS), help="Type of record to load")
+    parser.add_argument("path", help="CSV, JSON or NDJSON file of records")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Records per write transaction (default {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--results", help="Write per-record results to this JSON file")
+    args = parser.parse_args(argv)
+
+    print(f"Loading {args.kind} from {args.path} in batches of {args.batch_size}...")
+    report = INGESTERS[args.kind](read_records(args.path), batch_size=args.batch_size)
+    summary = report.to_dict(include_results=False)
+
+    print("=" * 50)
+    print(f"Total: {summary['total']}")
+    print(f"Created: {summary['created']}")
+    print(f"Skipped: {summary['skipped']}")
+    print(f"Failed: {summary['failed']}")
+    print(f"Batches: {summary['batches']}")
+    print(f"Elapsed: {summary['elapsed_seconds']}s ({summary['records_per_second']} records/s)")
+
+    for result in report.results:
+        if result["status"] == "failed":
+            print(f"  ✗ #{result['index']}: {result['message']}")
+
+    if args.results:
+        with open(args.results, "w") as f:
+            json.dump(report.to_dict(), f, indent=2)
+        print(f"Per-record results written to {args.results}")
+
+    return 0 if summary["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
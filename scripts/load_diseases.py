@@ -5,40 +5,39 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.main import create_disease
+from app.bulk_ingest import bulk_create_diseases
 from data.diseases_data import DISEASE_CATEGORIES
 
 def load_all_diseases():
     """Load all diseases from the disease data into Neo4j."""
-    total_diseases = 0
-    successful = 0
-    failed = 0
-    
     print("Loading diseases into Neo4j database...")
     print("=" * 50)
-    
+
+    records = []
     for category, diseases in DISEASE_CATEGORIES.items():
-        print(f"\nLoading {category} diseases...")
-        
         for disease in diseases:
-            total_diseases += 1
             disease_full_desc = f"{disease['description']} (ICD-10: {disease['icd10']})"
-            
-            success, message = create_disease(disease['name'], disease_full_desc)
-            
-            if success:
-                successful += 1
-                print(f"  ✓ {disease['name']}")
-            else:
-                failed += 1
-                print(f"  ✗ {disease['name']}: {message}")
-    
+            records.append({"name": disease['name'], "description": disease_full_desc})
+
+    report = bulk_create_diseases(records)
+
+    for result in report.results:
+        if result["status"] == "created":
+            print(f"  ✓ {result['key']}")
+        else:
+            print(f"  ✗ {result['key']}: {result['message']}")
+
+    summary = report.to_dict(include_results=False)
+    successful = summary["created"]
+    failed = summary["skipped"] + summary["failed"]
+
     print("\n" + "=" * 50)
     print(f"Disease loading complete!")
-    print(f"Total: {total_diseases}")
+    print(f"Total: {summary['total']}")
     print(f"Successful: {successful}")
     print(f"Failed: {failed}")
-    
+    print(f"Elapsed: {summary['elapsed_seconds']}s")
+
     return successful, failed
 
 if __name__ == "__main__":
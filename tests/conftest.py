@@ -0,0 +1,38 @@
+import os
+import sys
+import pytest
+from app import vitals_store
+
+# Tests run on the in-process backend; set MEDGRAPH_BACKEND=neo4j to use a server
+os.environ.setdefault("MEDGRAPH_BACKEND", "memory")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def isolated_vitals_store(tmp_path_factory):
+    """Point the shared vitals store at a fresh file, not data/vitals.sqlite3 in the checkout."""
+    previous = vitals_store._store
+    store = vitals_store._store = vitals_store.VitalsStore(
+        str(tmp_path_factory.mktemp("vitals") / "vitals.sqlite3"))
+    yield store
+    store.close()
+    vitals_store._store = previous
+
+
+@pytest.fixture(scope="module")
+def memory_backend():
+    """An empty MemoryRepository in place of app.main.repository for one test module.
+
+    Every app module that imported the shared repository gets the fresh one,
+    and the read cache is cleared, so modules do not see each other's data.
+    """
+    from app import main
+    from app.cache import cache
+    from app.memory_repository import MemoryRepository
+    shared, repository = main.repository, MemoryRepository()
+    with pytest.MonkeyPatch.context() as patch:
+        for name, module in list(sys.modules.items()):
+            if name.startswith("app.") and getattr(module, "repository", None) is shared:
+                patch.setattr(module, "repository", repository)
+        cache.clear()
+        yield repository
+        cache.clear()
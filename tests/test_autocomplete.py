@@ -0,0 +1,72 @@
+from app import events
+from app.autocomplete import AutocompleteIndex, person_index
+
+
+def build_index():
+    index = AutocompleteIndex("age")
+    index.load([
+        {"name": "John Smith", "age": 45},
+        {"name": "Jane Smithers", "age": 32},
+        {"name": "Smith Adams", "age": 60},
+        {"name": "Bob Johnson", "age": 67},
+    ])
+    return index
+
+
+def test_search_matches_word_prefixes():
+    index = build_index()
+
+    assert [r["name"] for r in index.search("jo")] == ["John Smith", "Bob Johnson"]
+    assert [r["name"] for r in index.search("SMITH")] == [
+        "Smith Adams", "Jane Smithers", "John Smith"]
+    assert [r["name"] for r in index.search("john  sm")] == ["John Smith"]
+    assert index.search("xyz") == []
+    assert index.search("smith", limit=1)[0]["score"] == 2.0
+
+
+def test_add_keeps_index_sorted():
+    index = build_index()
+    index.add("Johanna Moss", 29)
+    index.add("John Smith", 46)
+
+    results = index.search("joh")
+    assert [r["name"] for r in results] == ["Johanna Moss", "John Smith", "Bob Johnson"]
+    assert results[1]["age"] == 46
+    assert len(index) == 5
+    assert index.memory_report()["entries"] == 10
+
+
+def test_adds_are_merged_in_batches():
+    index = AutocompleteIndex("age")
+    index.add("Early Bird", 1)
+    assert len(index) == 0
+    index.load([{"name": "Bob Johnson", "age": 67}])
+    for i in range(5000):
+        index.add(f"Patient {i:05d}", i)
+
+    assert index.memory_report()["entries"] == 2 + 10000
+    assert [r["name"] for r in index.search("patient 0499")] == [
+        f"Patient {i:05d}" for i in range(4990, 5000)]
+    assert all(keys == sorted(keys) for keys in index._keys)
+    assert [r["name"] for r in index.search("john")] == ["Bob Johnson"]
+
+
+def test_full_name_matches_are_not_crowded_out_by_word_matches():
+    index = AutocompleteIndex("age")
+    index.load([{"name": f"Patient{i:03d} Smith", "age": i} for i in range(100)]
+               + [{"name": "Smith John", "age": 40}])
+    for i in range(100, 110):
+        index.add(f"Patient{i:03d} Smith", i)
+
+    results = index.search("smith", 5)
+    assert [r["name"] for r in results] == ["Smith John"] + [
+        f"Patient{i:03d} Smith" for i in range(4)]
+    assert [r["score"] for r in results] == [2.0, 1.0, 1.0, 1.0, 1.0]
+
+
+def test_person_created_event_updates_index():
+    person_index.load([])
+    events.emit(events.PERSON_CREATED, name="Grace Hopper", age=85, id="p-1")
+
+    assert person_index.search("hop") == [
+        {"id": "p-1", "name": "Grace Hopper", "age": 85, "score": 1.0}]
@@ -0,0 +1,89 @@
+import random
+import pytest
+from benchmarks.synthetic import Hospital, MAX_DIAGNOSES
+from benchmarks.workload import (ENDPOINTS, WRITE_ENDPOINTS, RequestPlan, parse_mix, percentile,
+                                 summarise, compare, run)
+from benchmarks.bench_startup import parse_importtime, measure, check
+
+
+class FakeClient:
+    """Answers every request instantly; 404 for one patient."""
+
+    def request(self, method, path, body=None):
+        return 404 if "000001" in path else 200
+
+    def close(self):
+        pass
+
+
+def test_hospital_is_seeded_and_realistic():
+    hospital = Hospital(300, seed=7)
+    assert hospital.summary() == Hospital(300, seed=7).summary()
+    assert hospital.summary() != Hospital(300, seed=8).summary()
+
+    names = {person["name"] for person in hospital.persons}
+    diseases = {disease["name"] for disease in hospital.diseases}
+    assert len(names) == 300 and len(diseases) == len(hospital.diseases) > 90
+    per_patient = {}
+    for diagnosis in hospital.diagnoses:
+        assert diagnosis["patient"] in names and diagnosis["disease"] in diseases
+        per_patient.setdefault(diagnosis["patient"], set()).add(diagnosis["disease"])
+    assert set(per_patient) == names
+    assert all(1 <= len(d) <= MAX_DIAGNOSES for d in per_patient.values())
+    # Prescriptions follow unresolved diagnoses; every patient has vitals
+    assert 0 < len(hospital.prescriptions) < len(hospital.diagnoses)
+    assert {reading["patient"] for reading in hospital.vitals} == names
+    severity = hospital.summary()["severity"]
+    assert severity["mild"] > severity["critical"]
+
+
+def test_mix_and_plan():
+    assert not set(parse_mix(None, read_only=True)) & WRITE_ENDPOINTS
+    assert parse_mix("person_details=3,timeline") == {"person_details": 3.0, "timeline": 1.0}
+    with pytest.raises(ValueError):
+        parse_mix("nope=1")
+    with pytest.raises(ValueError):
+        parse_mix("create_diagnosis=1", read_only=True)
+
+    plan = RequestPlan(Hospital(50, seed=1), parse_mix(None))
+    rng = random.Random(0)
+    for _ in range(200):
+        name, method, path, body = plan.next(rng)
+        assert method == ENDPOINTS[name][0]
+        assert "{" not in path and " " not in path
+        assert (body is not None) == (name in WRITE_ENDPOINTS)
+
+
+def test_report_percentiles_and_regressions():
+    assert percentile([], 95) == 0.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.5
+    assert percentile(list(map(float, range(101))), 99) == 99.0
+
+    plan = RequestPlan(Hospital(20, seed=1), {"person_details": 1})
+    samples, elapsed = run(FakeClient, plan, concurrency=4, total=400)
+    report = summarise(samples, elapsed)
+    endpoint = report["endpoints"]["person_details"]
+    assert report["requests"] == endpoint["requests"] == 400
+    assert 0 < endpoint["errors"] < 400
+    assert endpoint["p50_ms"] <= endpoint["p95_ms"] <= endpoint["p99_ms"] <= endpoint["max_ms"]
+
+    baseline = summarise([("timeline", float(ms), 200) for ms in range(1, 101)], 10.0)
+    slower = summarise([("timeline", float(ms) * (2 if ms > 90 else 1), 200) for ms in range(1, 101)], 10.0)
+    assert compare(baseline, baseline) == []
+    assert {(r["endpoint"], r["metric"]) for r in compare(baseline, slower)} == {
+        ("overall", "p95_ms"), ("overall", "p99_ms"), ("timeline", "p95_ms"), ("timeline", "p99_ms")}
+
+
+def test_startup_imports_defer_heavy_modules():
+    rows = parse_importtime("import time: self [us] | cumulative | imported package\n"
+                            "import time:       120 |        120 |   json.decoder\n"
+                            "import time:       300 |        420 | json\n")
+    assert rows == [("json.decoder", 120, 120, 1), ("json", 300, 420, 0)]
+
+    budget = {"budget_ms": 10000, "deferred": ["numpy", "scipy", "neo4j", "networkx"]}
+    for module in ("app.repository", "app.neo4j_repository", "app.memory_repository",
+                   "app.sqlite_repository", "app.vitals_store"):
+        result = measure(module, runs=1)
+        assert result["import_ms"] > 0 and module in result["modules"]
+        assert check(result, budget) == []
+    assert check(measure("app.comorbidity", runs=1), budget) == ["imported at startup: numpy, scipy"]
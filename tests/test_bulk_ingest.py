@@ -0,0 +1,76 @@
+import pytest
+from app.main import fetch_person_diseases
+from app.bulk_ingest import (chunked, bulk_create_persons, bulk_create_diseases,
+                             bulk_create_relationships, bulk_add_vitals, parse_ndjson)
+from app.vitals_store import get_vitals_store
+
+
+@pytest.fixture(scope="module")
+def setup_graph(memory_backend):
+    return memory_backend
+
+
+def test_chunked_splits_iterables():
+    chunks = list(chunked(iter(range(7)), 3))
+    assert chunks == [[0, 1, 2], [3, 4, 5], [6]]
+
+    with pytest.raises(ValueError):
+        list(chunked([1], 0))
+
+
+def test_bulk_create_persons(setup_graph):
+    records = [{"name": f"Bulk Patient {i}", "age": 20 + i} for i in range(25)]
+    records.append({"name": "Bulk Patient 0", "age": 99})
+    records.append({"name": "No Age"})
+
+    report = bulk_create_persons(records, batch_size=10).to_dict()
+
+    assert report["created"] == 25
+    assert report["skipped"] == 1
+    assert report["failed"] == 1
+    assert report["batches"] == 3
+    assert [result["index"] for result in report["results"]] == list(range(27))
+
+    # Re-running the same load is idempotent
+    report = bulk_create_persons(records[:25], batch_size=10).to_dict()
+    assert report["created"] == 0
+    assert report["skipped"] == 25
+
+
+def test_records_must_be_objects_or_arrays(setup_graph):
+    report = bulk_create_diseases(["ab", ("Bulk Typhus", "Rickettsial infection"), 7]).to_dict()
+
+    assert [result["status"] for result in report["results"]] == ["failed", "created", "failed"]
+    assert report["results"][0]["message"] == \
+        "Invalid record: expected an object or an array, got str"
+    assert report["results"][2]["message"].endswith("got int")
+
+
+def test_bulk_create_relationships(setup_graph):
+    bulk_create_diseases([("Bulk Disease", "Loaded in bulk")])
+
+    report = bulk_create_relationships([
+        ("Bulk Patient 1", "Bulk Disease"),
+        ("Bulk Patient 1", "Bulk Disease"),
+        ("Bulk Patient 2", "Missing Disease"),
+    ]).to_dict()
+
+    statuses = [result["status"] for result in report["results"]]
+    assert statuses == ["created", "skipped", "failed"]
+
+    diseases = fetch_person_diseases("Bulk Patient 1")
+    assert len(diseases) == 1
+    assert diseases[0]['d.name'] == "Bulk Disease"
+
+
+def test_bulk_add_vitals_from_ndjson(setup_graph):
+    lines = [
+        b'{"patient": "Bulk Patient 3", "blood_pressure": "118/76", "heart_rate": 64, "weight": 70, "height": 175}',
+        b'{"patient": "Bulk Patient 3", "heart_rate": 900}',
+        b'not json',
+        b'{"patient": "Nobody", "heart_rate": 70}',
+    ]
+    report = bulk_add_vitals(parse_ndjson(lines), batch_size=2).to_dict()
+
+    assert [result["status"] for result in report["results"]] == ["created", "failed", "failed", "failed"]
+    assert get_vitals_store().latest("Bulk Patient 3", 1)[0]["bmi"] == 22.86
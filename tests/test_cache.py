@@ -0,0 +1,90 @@
+from app import events
+from app.cache import (LRUCache, MISSING, cache, get_or_load, PERSONS_KEY,
+                       patient_key, person_diseases_key)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_evicts_least_recently_used():
+    lru = LRUCache(max_entries=2, ttl=0)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    assert lru.get("a") == 1
+    lru.set("c", 3)
+
+    assert lru.get("b") is MISSING
+    assert lru.get("a") == 1
+    assert lru.get("c") == 3
+    stats = lru.stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 3
+    assert stats["misses"] == 1
+
+
+def test_lru_expires_entries_after_ttl():
+    clock = FakeClock()
+    lru = LRUCache(max_entries=10, ttl=30, clock=clock)
+    lru.set("a", 1)
+    clock.now = 29
+    assert lru.get("a") == 1
+    clock.now = 30
+    assert lru.get("a") is MISSING
+    assert lru.stats()["expirations"] == 1
+
+
+def test_get_or_load_skips_none_and_caches_values():
+    cache.clear()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return None if len(calls) == 1 else {"name": "Eve"}
+
+    assert get_or_load("patient:Eve", loader) is None
+    assert get_or_load("patient:Eve", loader) == {"name": "Eve"}
+    assert get_or_load("patient:Eve", loader) == {"name": "Eve"}
+    assert len(calls) == 2
+
+
+def test_get_or_load_does_not_store_values_invalidated_while_loading():
+    cache.clear()
+
+    def stale_loader():
+        # A write lands after the read but before the result is cached
+        events.emit(events.RELATIONSHIP_CREATED, person_name="Ivy", disease_name="Flu")
+        return ["before the write"]
+
+    assert get_or_load(person_diseases_key("Ivy"), stale_loader) == ["before the write"]
+    assert cache.get(person_diseases_key("Ivy")) is MISSING
+    assert get_or_load(person_diseases_key("Ivy"), lambda: ["Flu"]) == ["Flu"]
+    assert cache.get(person_diseases_key("Ivy")) == ["Flu"]
+
+    def cleared_loader():
+        cache.clear()
+        return ["before the clear"]
+
+    assert get_or_load(patient_key("Ivy"), cleared_loader) == ["before the clear"]
+    assert cache.get(patient_key("Ivy")) is MISSING
+
+
+def test_write_events_invalidate_affected_keys():
+    cache.clear()
+    for key in (PERSONS_KEY, patient_key("Eve"), person_diseases_key("Eve"),
+                patient_key("Frank")):
+        cache.set(key, ["cached"])
+
+    events.emit(events.RELATIONSHIP_CREATED, person_name="Eve", disease_name="Flu")
+
+    assert cache.get(patient_key("Eve")) is MISSING
+    assert cache.get(person_diseases_key("Eve")) is MISSING
+    assert cache.get(patient_key("Frank")) == ["cached"]
+    assert cache.get(PERSONS_KEY) == ["cached"]
+
+    events.emit(events.PERSON_CREATED, name="Grace", age=40)
+    assert cache.get(PERSONS_KEY) is MISSING
@@ -0,0 +1,58 @@
+import pytest
+from app import events
+from app.comorbidity import ComorbidityMatrix, comorbidity
+
+ROWS = [
+    {"patient": "Alice", "disease": "Diabetes"},
+    {"patient": "Alice", "disease": "Hypertension"},
+    {"patient": "Bob", "disease": "Diabetes"},
+    {"patient": "Bob", "disease": "Hypertension"},
+    {"patient": "Bob", "disease": "Hypertension"},
+    {"patient": "Carol", "disease": "Diabetes"},
+    {"patient": "Carol", "disease": "Asthma"},
+    {"patient": "Dan", "disease": "Asthma"},
+]
+
+
+def test_top_comorbidities_counts_and_scores():
+    matrix = ComorbidityMatrix()
+    matrix.load(ROWS)
+
+    top = matrix.top_comorbidities("Diabetes")
+    assert top["patients"] == 3
+    assert [(item["disease"], item["count"]) for item in top["comorbidities"]] == [
+        ("Hypertension", 2), ("Asthma", 1)]
+    # 2 of 3 diabetics vs 2 of 4 patients overall
+    assert top["comorbidities"][0]["lift"] == pytest.approx(2 * 4 / (3 * 2), abs=1e-4)
+
+    assert matrix.top_comorbidities("Diabetes", k=1)["comorbidities"][0]["disease"] == "Hypertension"
+    assert matrix.top_comorbidities("Gout") is None
+    with pytest.raises(ValueError):
+        matrix.top_comorbidities("Diabetes", by="jaccard")
+
+
+def test_incremental_updates_match_rebuild():
+    matrix = ComorbidityMatrix()
+    matrix.load(ROWS)
+    matrix.add_diagnosis("Dan", "Diabetes")
+    matrix.set_status("Bob", "Hypertension", "resolved")
+    matrix.set_status("Carol", "Asthma", "active")
+
+    rows = [row for row in ROWS if (row["patient"], row["disease"]) != ("Bob", "Hypertension")]
+    rebuilt = ComorbidityMatrix()
+    rebuilt.load(rows + [{"patient": "Dan", "disease": "Diabetes"}])
+
+    for by in ("count", "lift", "odds_ratio"):
+        assert matrix.top_comorbidities("Diabetes", by=by) == rebuilt.top_comorbidities("Diabetes", by=by)
+    assert matrix.disease_network("Asthma")["edges"] == [
+        {"from": "Asthma", "to": "Diabetes", "value": 2, "title": "2 shared patients"}]
+
+
+def test_diagnosis_events_update_global_matrix():
+    comorbidity.load(ROWS)
+    events.emit(events.DIAGNOSIS_CREATED, patient_name="Dan", disease_name="Gout",
+                doctor_name="Dr. Who", severity="mild")
+    assert comorbidity.top_comorbidities("Gout")["comorbidities"][0]["disease"] == "Asthma"
+
+    events.emit(events.DIAGNOSIS_UPDATED, patient_name="Dan", disease_name="Gout", status="resolved")
+    assert comorbidity.top_comorbidities("Gout") is None
@@ -0,0 +1,64 @@
+import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from app import events
+from app.main import driver, create_person, create_disease, create_relationship
+
+PERSONS = 20
+DISEASES = 10
+REPEATS = 10  # calls per (person, disease) pair
+WORKERS = int(os.getenv("STRESS_WORKERS", "32"))
+# Calls per second the whole run must sustain
+MIN_THROUGHPUT = float(os.getenv("STRESS_MIN_THROUGHPUT", "100"))
+
+# A stress test for a Neo4j server; the rest of the suite runs on the memory backend
+pytestmark = pytest.mark.skipif(os.getenv("MEDGRAPH_BACKEND") != "neo4j",
+                                reason="set MEDGRAPH_BACKEND=neo4j to run against a server")
+
+
+@pytest.fixture(scope="module")
+def graph():
+    with driver.session() as session:
+        session.run("MATCH (n) DETACH DELETE n")
+    for i in range(PERSONS):
+        create_person(f"Stress Patient {i}", 40)
+    for j in range(DISEASES):
+        create_disease(f"Stress Disease {j}", "Concurrency test")
+
+
+def test_parallel_create_relationship_creates_each_edge_once(graph):
+    pairs = [(f"Stress Patient {i}", f"Stress Disease {j}")
+             for i in range(PERSONS) for j in range(DISEASES)] * REPEATS
+    created_events = []
+    handler = lambda person_name, disease_name, **_: created_events.append((person_name, disease_name))
+    events.subscribe(events.RELATIONSHIP_CREATED, handler)
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+            results = list(pool.map(lambda pair: create_relationship(*pair), pairs))
+        elapsed = time.perf_counter() - started
+    finally:
+        events.unsubscribe(events.RELATIONSHIP_CREATED, handler)
+
+    successes = Counter(pair for pair, (success, _) in zip(pairs, results) if success)
+    errors = [message for success, message in results
+              if not success and "already exists" not in message]
+    assert errors == []
+    assert len(successes) == PERSONS * DISEASES
+    assert set(successes.values()) == {1}
+    assert sorted(created_events) == sorted(successes)
+
+    with driver.session() as session:
+        duplicates = session.run("""
+            MATCH (p:Person)-[r:HAS_DISEASE]->(d:Disease)
+            WITH p, d, count(r) AS edges
+            WHERE edges > 1
+            RETURN count(*) AS count
+        """).single()["count"]
+        total = session.run("MATCH (:Person)-[r:HAS_DISEASE]->(:Disease) RETURN count(r) AS count"
+                            ).single()["count"]
+    assert duplicates == 0
+    assert total == PERSONS * DISEASES
+    assert len(pairs) / elapsed >= MIN_THROUGHPUT
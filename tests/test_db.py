@@ -0,0 +1,110 @@
+from collections import deque
+import pytest
+from app.db import DriverManager, RetryPolicy, driver_config, READ_ACCESS, WRITE_ACCESS
+
+
+class FakeConnection:
+    def __init__(self, in_use):
+        self.in_use = in_use
+
+
+class FakeSession:
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+    def execute_write(self, work, *args, **kwargs):
+        return work(self, *args, **kwargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class TransientError(Exception):
+    def is_retryable(self):
+        return True
+
+
+class FakeDriver:
+    def __init__(self, uri, **config):
+        self.config = config
+        self.closed = False
+        self._pool = type("Pool", (), {"connections": {
+            "db1:7687": deque([FakeConnection(True), FakeConnection(True), FakeConnection(False)])}})()
+
+    def session(self, **kwargs):
+        return FakeSession(**kwargs)
+
+    def close(self):
+        self.closed = True
+
+
+def test_driver_config_from_environment():
+    config = driver_config({"NEO4J_MAX_POOL_SIZE": "20", "NEO4J_KEEP_ALIVE": "false",
+                            "NEO4J_ACQUISITION_TIMEOUT": ""})
+    assert config["max_connection_pool_size"] == 20
+    assert config["keep_alive"] is False
+    assert config["connection_acquisition_timeout"] == 60.0
+    assert config["liveness_check_timeout"] is None
+    with pytest.raises(ValueError):
+        driver_config({"NEO4J_MAX_POOL_SIZE": "lots"})
+
+
+def test_sessions_are_opened_per_access_mode_and_counted():
+    manager = DriverManager("bolt://db1:7687", ("neo4j", "pw"), database="medgraph",
+                            config=driver_config({"NEO4J_MAX_POOL_SIZE": "4"}), factory=FakeDriver)
+    assert manager.pool_stats()["connected"] is False
+
+    with manager.read_session() as session:
+        assert session.kwargs == {"database": "medgraph", "default_access_mode": READ_ACCESS}
+        with manager.write_session() as inner:
+            assert inner.kwargs["default_access_mode"] == WRITE_ACCESS
+            assert manager.pool_stats()["sessions"]["write"]["active"] == 1
+
+    stats = manager.pool_stats()
+    assert stats["sessions"]["read"]["opened"] == 1 and stats["sessions"]["read"]["active"] == 0
+    assert stats["pool"]["in_use"] == 2 and stats["pool"]["idle"] == 1
+    assert stats["pool"]["utilisation"] == 0.5
+    assert stats["config"]["max_connection_pool_size"] == 4
+
+    driver = manager.driver
+    manager.close()
+    assert driver.closed and manager.pool_stats()["connected"] is False
+
+
+def test_retry_policy_backs_off_and_gives_up():
+    policy = RetryPolicy(max_attempts=4, initial_delay=0.1, multiplier=2, max_delay=0.3, jitter=0)
+    assert [policy.delay(n) for n in (1, 2, 3)] == [0.1, 0.2, 0.3]
+
+    calls, sleeps = [], []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise TransientError("deadlock")
+        return "ok"
+
+    assert policy.run(flaky, sleep=sleeps.append) == "ok"
+    assert sleeps == [0.1, 0.2] and policy.retries == 2
+
+    with pytest.raises(ValueError):
+        policy.run(lambda: int("not retryable"), sleep=sleeps.append)
+    assert len(sleeps) == 2 and policy.failures == 1
+
+    always = RetryPolicy(max_attempts=2, initial_delay=0)
+    with pytest.raises(TransientError):
+        always.run(lambda: (_ for _ in ()).throw(TransientError("busy")), sleep=lambda _: None)
+    assert always.retries == 1
+
+
+def test_execute_write_disables_driver_retries():
+    policy = RetryPolicy.from_env({"NEO4J_WRITE_ATTEMPTS": "3", "NEO4J_RETRY_JITTER": "0"})
+    assert policy.max_attempts == 3 and policy.jitter == 0.0
+    manager = DriverManager("bolt://db1:7687", None, config=driver_config({}),
+                            factory=FakeDriver, retry=policy)
+
+    assert manager.execute_write(lambda tx, value: (tx.kwargs["default_access_mode"], value), 7) == (
+        WRITE_ACCESS, 7)
+    assert manager.driver.config["max_transaction_retry_time"] == 0
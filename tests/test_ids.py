@@ -0,0 +1,26 @@
+import uuid
+import pytest
+from app.ids import new_id, check_label, resolve_names_params, MAX_RESOLVE_NAMES
+
+
+def test_new_id_is_uuid7():
+    value = uuid.UUID(new_id())
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+
+
+def test_ids_are_unique_and_increasing():
+    ids = [new_id() for _ in range(10000)]
+    assert len(set(ids)) == len(ids)
+    assert ids == sorted(ids)
+
+
+def test_resolve_params_are_validated():
+    assert resolve_names_params(["Ann", "", "Bob", "Ann"]) == ["Ann", "Bob"]
+    assert check_label("Disease") == "Disease"
+    with pytest.raises(ValueError):
+        resolve_names_params([])
+    with pytest.raises(ValueError):
+        resolve_names_params([f"p{i}" for i in range(MAX_RESOLVE_NAMES + 1)])
+    with pytest.raises(ValueError):
+        check_label("Doctor")
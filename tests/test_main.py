@@ -6,18 +6,16 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../a
 
 import pytest
 from app.main import create_person, create_disease, create_relationship, fetch_person_diseases, GraphVisualizer
-from app.main import driver  # Assuming 'driver' is defined for Neo4j session management
+from app.main import get_persons_page, stream_persons
 
 
-# Fixture to clear data before tests run (optional)
+# Every test in this module shares one empty in-memory graph
 @pytest.fixture(scope="module")
-def setup_neo4j():
-    # Clear existing data before tests run
-    with driver.session() as session:
-        session.run("MATCH (n) DETACH DELETE n")  # Clear the database
+def setup_graph(memory_backend):
+    return memory_backend
 
 
-def test_create_person(setup_neo4j):
+def test_create_person(setup_graph):
     # Create a new person
     success, message = create_person("Bob", 25)
     assert success == True
@@ -29,7 +27,7 @@ def test_create_person(setup_neo4j):
     assert len(result) == 0
 
 
-def test_create_relationship(setup_neo4j):
+def test_create_relationship(setup_graph):
     # Create a new person and disease
     success1, msg1 = create_person("Charlie", 40)
     success2, msg2 = create_disease("Tuberculosis", "Infectious bacterial disease")
@@ -52,7 +50,7 @@ def test_create_relationship(setup_neo4j):
     assert diseases[0]['d.description'] == "Infectious bacterial disease"
 
 
-def test_graph_visualizer(setup_neo4j):
+def test_graph_visualizer(setup_graph):
     # Create a person and diseases, and add relationships for graph visualisation
     success1, msg1 = create_person("Alice", 30)
     success2, msg2 = create_disease("HIV", "Human Immunodeficiency Virus")
@@ -61,6 +59,7 @@ def test_graph_visualizer(setup_neo4j):
     assert success2 == True
     assert success3 == True
 
+    pytest.importorskip("networkx")
     # Create an instance of GraphVisualizer for the person Alice
     graph_visualizer = GraphVisualizer("Alice")
     
@@ -77,3 +76,17 @@ def test_graph_visualizer(setup_neo4j):
     assert 'Alice' in graph_visualizer.graph.nodes
     assert 'HIV' in graph_visualizer.graph.nodes
     assert graph_visualizer.graph.has_edge('Alice', 'HIV')
+
+
+def test_persons_pagination(setup_graph):
+    # Bob, Charlie and Alice exist from the earlier tests
+    first = get_persons_page(limit=2, fields=["name"])
+    assert first["items"] == [{"name": "Alice"}, {"name": "Bob"}]
+    assert first["next_cursor"] == "Bob"
+
+    second = get_persons_page(limit=2, after=first["next_cursor"])
+    assert [p["name"] for p in second["items"]] == ["Charlie"]
+    assert second["next_cursor"] is None
+
+    streamed = list(stream_persons(fields=["name"]))
+    assert streamed == [{"name": "Alice"}, {"name": "Bob"}, {"name": "Charlie"}]
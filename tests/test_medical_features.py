@@ -0,0 +1,45 @@
+import pytest
+from app.main import create_person, create_disease, resolve_id
+from app.medical_features import (create_diagnosis, add_prescription, add_vitals,
+                                  add_medical_history, get_patient_medical_record)
+
+
+@pytest.fixture(scope="module")
+def patient(memory_backend):
+    create_person("Dana", 52)
+    create_disease("Asthma", "Chronic respiratory condition")
+    create_diagnosis("Dana", "Asthma", "Dr. Grey", severity="mild")
+    for i in range(12):
+        add_prescription("Dana", f"Medication {i}", "10mg", "daily", "Dr. Grey")
+    for _ in range(7):
+        add_vitals("Dana", "120/80", 70, 36.8, 70, 175)
+    add_medical_history("Dana", "Childhood eczema", "2001-05-01", resolved=True)
+    return "Dana"
+
+
+def test_medical_record_returns_all_sections(patient):
+    record = get_patient_medical_record(patient)
+
+    assert record["patient"] == {"id": resolve_id("Person", "Dana"), "name": "Dana", "age": 52}
+    assert record["patient"]["id"]
+    assert [d["disease"] for d in record["diagnoses"]] == ["Asthma"]
+    assert len(record["prescriptions"]) == 12
+    assert len(record["vitals"]) == 5
+    assert record["medical_history"][0]["condition"] == "Childhood eczema"
+    assert record["pagination"]["prescriptions"]["total"] == 12
+
+
+def test_medical_record_sections_and_pagination(patient):
+    record = get_patient_medical_record(patient, sections=["prescriptions"],
+                                        prescriptions_offset=10, prescriptions_limit=5)
+
+    assert set(record) == {"patient", "prescriptions", "pagination"}
+    assert len(record["prescriptions"]) == 2
+    assert record["pagination"]["prescriptions"] == {"offset": 10, "limit": 5, "total": 12}
+
+
+def test_medical_record_unknown_section(patient):
+    with pytest.raises(ValueError):
+        get_patient_medical_record(patient, sections=["billing"])
+
+    assert get_patient_medical_record("Nobody") is None
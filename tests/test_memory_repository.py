@@ -0,0 +1,170 @@
+from datetime import datetime, timedelta
+import pytest
+from app.memory_repository import MemoryRepository
+from app.repository import backend_name, create_repository
+from app.search import match_score
+from app.stats import DashboardStats
+from app.timeline import record_stream, stream_params, merge_streams, decode_cursor
+from app.overview_graph import summarize_clusters, select_clusters, build_overview_graph
+
+START = datetime(2021, 3, 1, 9, 0, 0).astimezone()
+
+
+def hospital():
+    repo = MemoryRepository()
+    for i, (name, age) in enumerate([("Alice Smith", 70), ("Bob Jones", 45),
+                                     ("Carol White", 60), ("Dan Brown", 30)]):
+        assert repo.create_person(f"p{i}", name, age)
+    for i, (name, description) in enumerate([("Diabetes", "Type 2 diabetes mellitus"),
+                                             ("Hypertension", "High blood pressure"),
+                                             ("Asthma", "Chronic airway inflammation")]):
+        assert repo.create_disease(f"d{i}", name, description)
+    diagnoses = [("Alice Smith", "Diabetes", "Dr. Lee", "severe"),
+                 ("Alice Smith", "Hypertension", "Dr. Lee", "moderate"),
+                 ("Bob Jones", "Diabetes", "Dr. Kim", "mild"),
+                 ("Bob Jones", "Hypertension", "Dr. Lee", "moderate"),
+                 ("Carol White", "Hypertension", "Dr. Kim", "mild"),
+                 ("Carol White", "Asthma", None, "moderate")]
+    for i, (patient, disease, doctor, severity) in enumerate(diagnoses):
+        assert repo.create_diagnosis(f"x{i}", patient, disease, doctor,
+                                     START + timedelta(days=i), "", severity)
+    return repo
+
+
+def test_writes_are_idempotent_and_report_missing_nodes():
+    repo = hospital()
+    assert not repo.create_person("other", "Alice Smith", 71)
+    assert repo.create_relationship("r1", "Alice Smith", "Diabetes") == \
+        {"person_found": True, "disease_found": True, "created": True}
+    # A retried call with the same id succeeds; a new id for the same edge does not
+    assert repo.create_relationship("r1", "Alice Smith", "Diabetes")["created"]
+    assert not repo.create_relationship("r2", "Alice Smith", "Diabetes")["created"]
+    assert not repo.create_relationship("r3", "Nobody", "Diabetes")["person_found"]
+    assert repo.person_diseases("Alice Smith") == \
+        [{"id": "d0", "name": "Diabetes", "description": "Type 2 diabetes mellitus"}]
+
+    assert repo.create_diagnosis("x0", "Alice Smith", "Diabetes", "Dr. Lee", START, "", "severe")
+    assert repo.counts()["diagnoses"] == 6
+    assert not repo.create_diagnosis("x9", "Alice Smith", "Flu", "Dr. Lee", START, "", "mild")
+    assert not repo.add_prescription("rx", "Nobody", "Aspirin", "1", "daily", None, "", "", START)
+
+    assert repo.delete_relationship("Alice Smith", "Diabetes")
+    assert not repo.delete_relationship("Alice Smith", "Diabetes")
+    assert repo.person_diseases("Alice Smith") == []
+
+    previous = repo.update_diagnosis_status("Bob Jones", "Diabetes", "resolved", "", START)
+    assert previous == [{"doctor": "Dr. Kim", "severity": "mild", "previous_status": "active"}]
+    assert repo.update_diagnosis_status("Bob Jones", "Flu", "resolved", "", START) == []
+    assert [row["patient_name"] for row in repo.active_patients_with("Diabetes")] == ["Alice Smith"]
+
+
+def test_paging_lookups_and_search():
+    repo = hospital()
+    rows = list(repo.list_rows("Person", ["age"], after="Bob Jones", limit=2))
+    assert rows == [{"name": "Carol White", "age": 60}, {"name": "Dan Brown", "age": 30}]
+    assert [row["name"] for row in repo.list_rows("Disease", ["id"])] == \
+        ["Asthma", "Diabetes", "Hypertension"]
+    assert repo.node_id("Person", "Bob Jones") == "p1"
+    assert repo.node_name("Disease", "d2") == "Asthma"
+    assert repo.node_ids("Person", ["Bob Jones", "Nobody"]) == {"Bob Jones": "p1"}
+    assert repo.patient_details("Nobody") is None
+
+    assert [row["name"] for row in repo.search("patients", "smith", None, "ranked", 10)] == \
+        ["Alice Smith"]
+    assert [row["name"] for row in repo.search("patients", "smyth", None, "fuzzy", 10)] == \
+        ["Alice Smith"]
+    assert repo.search("patients", "smyth", None, "prefix", 10) == []
+    # Descriptions are searched too, and exact words outrank prefixes
+    assert [row["name"] for row in repo.search("diseases", "chronic", None, "ranked", 10)] == \
+        ["Asthma"]
+    assert match_score(["blood", "pressure"], ["blood"], "ranked") > \
+        match_score(["bloodwork"], ["blood"], "ranked") > 0
+
+
+def test_medical_record_and_timeline_pages():
+    repo = hospital()
+    for i in range(5):
+        repo.add_prescription(f"rx{i}", "Alice Smith", f"Drug {i}", "10mg", "daily", "Dr. Lee",
+                              "30 days", "", START + timedelta(days=i))
+    repo.add_vitals("v0", "Alice Smith", "", START + timedelta(days=1), blood_pressure="120/80",
+                    systolic=120, diastolic=80, heart_rate=70, temperature=36.6, weight=70.0,
+                    height=170.0, bmi=24.2)
+    params = {"prescriptions_offset": 1, "prescriptions_limit": 2, "history_offset": 0,
+              "history_limit": 10, "vitals_limit": 5}
+    record = repo.medical_record("Alice Smith", ["diagnoses", "prescriptions", "vitals"], params)
+    assert [rx["medication"] for rx in record["prescriptions"]] == ["Drug 3", "Drug 2"]
+    assert record["prescriptions_total"] == 5
+    assert [d["disease"] for d in record["diagnoses"]] == ["Hypertension", "Diabetes"]
+    assert record["vitals"][0]["systolic"] == 120
+    assert "medical_history" not in record
+
+    # Paging through the merged streams visits every event once, newest first
+    def page(position):
+        streams = [record_stream(repo.timeline_rows("Alice Smith", event_type, None, None, 3,
+                                                    **stream_params(event_type, position)))
+                   for event_type in ("diagnosis", "prescription", "vitals")]
+        return merge_streams(streams, 2)
+
+    seen, cursor = [], None
+    while True:
+        events, cursor = page(cursor and decode_cursor(cursor))
+        seen += events
+        if cursor is None:
+            break
+    assert len(seen) == 8
+    assert [event["date"] for event in seen] == sorted((event["date"] for event in seen),
+                                                       reverse=True)
+
+
+def test_hospital_wide_reads_match_the_stats_counters():
+    repo = hospital()
+    repo.add_prescription("rx", "Bob Jones", "Metformin", "500mg", "daily", "Dr. Kim", "", "", START)
+    stats = DashboardStats()
+    stats.load(DashboardStats.build(*repo.stats_rows()))
+    for doctor in ("Dr. Lee", "Dr. Kim"):
+        direct = repo.doctor_stats(doctor)
+        counted = stats.doctor_rows(doctor)
+        assert direct["patients"] == counted["patients"]
+        assert direct["prescriptions"] == counted["prescriptions"]
+        assert sorted(direct["severity"], key=str) == sorted(counted["severity"], key=str)
+    assert stats.disease_rows()[0] == repo.disease_distribution()[0] == \
+        {"disease": "Hypertension", "patient_count": 3}
+
+    links = repo.overview_links(["Diabetes", "Hypertension", "Asthma"], "active", 10)
+    assert links[0] == {"source": "Diabetes", "target": "Hypertension", "shared": 2}
+    summary = summarize_clusters(repo.overview_clusters("active"))
+    graph = build_overview_graph(select_clusters(summary, "disease", 10), links, "disease", 10,
+                                 len(summary))
+    assert len(graph["nodes"]) == 3
+
+    page = repo.cluster_patients("Hypertension", None, "active", "Alice Smith", 10)
+    assert [row["patient"] for row in page] == ["Bob Jones", "Carol White"]
+    network = repo.disease_network("Asthma")
+    assert network == [{"patient": "Carol White", "age": 60, "other_disease": "Hypertension",
+                        "severity": "mild"}]
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "graph.json")
+    repo = hospital()
+    repo.create_relationship("r1", "Bob Jones", "Asthma")
+    repo.add_history("h0", "Bob Jones", "Measles", "1990-01-01", True, "", START)
+    repo.update_diagnosis_status("Carol White", "Asthma", "resolved", "Outgrown", START)
+    repo.save(path)
+
+    restored = create_repository(environ={"MEDGRAPH_BACKEND": "memory",
+                                          "MEMORY_SNAPSHOT_PATH": path})
+    assert restored.counts() == repo.counts()
+    assert restored.snapshot() == repo.snapshot()
+    assert restored.diagnoses["x5"]["updated_at"] == START
+    assert restored.check_ready() == (True, dict(repo.counts(), backend="memory"))
+    # New writes after a restore keep the indexes in step
+    assert restored.create_diagnosis("x9", "Dan Brown", "Asthma", "Dr. Kim", START, "", "mild")
+    assert len(restored.active_patients_with("Asthma")) == 1
+
+
+def test_backend_name():
+    assert backend_name({}) == "neo4j"
+    assert backend_name({"MEDGRAPH_BACKEND": " Memory "}) == "memory"
+    with pytest.raises(ValueError):
+        backend_name({"MEDGRAPH_BACKEND": "mysql"})
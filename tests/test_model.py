@@ -0,0 +1,80 @@
+from datetime import datetime, timezone
+import pytest
+from app.model import (to_datetime, vital_properties, typed_properties, migrate, VITAL_NUMBERS,
+                       MIGRATION_TARGETS)
+
+
+def test_timestamps_become_timezone_aware():
+    assert to_datetime("2024-03-01T08:00:00Z") == datetime(2024, 3, 1, 8, tzinfo=timezone.utc)
+    local = to_datetime("2024-03-01T08:00:00")
+    assert local.tzinfo is not None and local.replace(tzinfo=None) == datetime(2024, 3, 1, 8)
+    assert to_datetime(None) is None
+    with pytest.raises(ValueError):
+        to_datetime("yesterday")
+
+
+def test_vital_properties_are_numeric():
+    vitals = vital_properties("120/80", "72", 36.6, "70.5", None)
+    assert vitals == {"blood_pressure": "120/80", "systolic": 120.0, "diastolic": 80.0,
+                      "heart_rate": 72.0, "temperature": 36.6, "weight": 70.5, "height": None}
+    with pytest.raises(ValueError):
+        vital_properties(heart_rate="fast")
+    with pytest.raises(ValueError):
+        vital_properties(blood_pressure="high")
+
+
+def test_migration_converts_or_sets_aside_every_string():
+    updates = typed_properties(
+        {"recorded_at": "2024-03-01T08:00:00", "heart_rate": "72", "weight": "n/a",
+         "height": 180.0, "blood_pressure": "130/85"},
+        temporal=("recorded_at",), numeric=VITAL_NUMBERS)
+    assert updates["recorded_at"] == to_datetime("2024-03-01T08:00:00")
+    assert updates["heart_rate"] == 72.0
+    assert updates["weight"] is None and updates["weight_raw"] == "n/a"
+    assert "height" not in updates
+    assert (updates["systolic"], updates["diastolic"]) == (130.0, 85.0)
+
+    # Already typed values need nothing
+    assert typed_properties({"date": to_datetime("2024-03-01")}, temporal=("date",)) == {}
+    assert typed_properties({"blood_pressure": "bad"}, numeric=VITAL_NUMBERS) == {
+        "blood_pressure": None, "blood_pressure_raw": "bad"}
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def data(self):
+        return self.rows
+
+    def consume(self):
+        return None
+
+
+class FakeManager:
+    """Records each execute_write; every target has one untyped entity, converted in one batch."""
+
+    def __init__(self):
+        self.transactions = 0
+        self.converted = set()
+
+    def execute_write(self, work, *args, **kwargs):
+        self.transactions += 1
+        return work(self, *args, **kwargs)
+
+    def run(self, query, **params):
+        if "UNWIND $rows" in query:
+            self.converted.update(row["id"] for row in params["rows"])
+            return FakeResult([])
+        target = query.split("\n")[0]
+        if target in self.converted:
+            return FakeResult([])
+        return FakeResult([{"id": target, "properties": {}}])
+
+
+def test_migration_batches_run_as_managed_writes():
+    manager = FakeManager()
+    converted = migrate(manager, batch_size=10)
+    assert converted == {name: 1 for name, _, _, _ in MIGRATION_TARGETS}
+    # One transaction converts each target, one more finds nothing left
+    assert manager.transactions == 2 * len(MIGRATION_TARGETS)
@@ -0,0 +1,64 @@
+import json
+import pytest
+from app.overview_graph import (PhaseTimer, summarize_clusters, select_clusters,
+                                build_overview_graph, build_cluster_expansion,
+                                overview_limits, serialize_graph, MAX_NODES)
+
+ROWS = [
+    {"disease": "Diabetes", "severity": "mild", "patients": 30},
+    {"disease": "Diabetes", "severity": "severe", "patients": 10},
+    {"disease": "Asthma", "severity": "moderate", "patients": 25},
+    {"disease": "Gout", "severity": "mild", "patients": 5},
+]
+
+
+def test_overview_clusters_respect_node_cap():
+    summary = summarize_clusters(ROWS)
+    assert [disease for disease, _, _ in summary] == ["Diabetes", "Asthma", "Gout"]
+
+    selected = select_clusters(summary, "severity", max_nodes=5)
+    links = [{"source": "Asthma", "target": "Diabetes", "shared": 7}]
+    graph = build_overview_graph(selected, links, "severity", max_edges=10,
+                                 total_diseases=len(summary))
+
+    assert graph["meta"]["node_count"] == 5
+    assert graph["meta"]["truncated"] is True
+    assert {node["id"] for node in graph["nodes"]} == {
+        "disease:Diabetes", "cluster:Diabetes:mild", "cluster:Diabetes:severe",
+        "disease:Asthma", "cluster:Asthma:moderate"}
+    assert graph["edges"][-1]["value"] == 7
+
+    capped = build_overview_graph(selected, links, "severity", max_edges=2,
+                                  total_diseases=len(summary))
+    assert capped["meta"]["edge_count"] == 2
+
+    with pytest.raises(ValueError):
+        select_clusters(summary, "patients", max_nodes=5)
+
+
+def test_cluster_expansion_pages_with_cursor():
+    rows = [{"patient": f"P{i}", "age": 40, "severity": "mild", "status": "active"}
+            for i in range(4)]
+    graph = build_cluster_expansion("Diabetes", "mild", rows, max_nodes=3)
+
+    assert graph["meta"]["node_count"] == 3
+    assert graph["meta"]["truncated"] is True
+    assert graph["meta"]["next_after"] == "P2"
+    assert all(edge["to"] == "cluster:Diabetes:mild" for edge in graph["edges"])
+
+    last = build_cluster_expansion("Diabetes", None, rows[3:], max_nodes=3)
+    assert last["meta"]["next_after"] is None
+    assert last["edges"][0]["to"] == "disease:Diabetes"
+
+
+def test_limits_and_serialisation_timing():
+    assert overview_limits(10 ** 6, None)[0] == MAX_NODES
+    with pytest.raises(ValueError):
+        overview_limits(0, 10)
+
+    timer = PhaseTimer()
+    with timer.phase("query"):
+        pass
+    body, header = serialize_graph({"nodes": [], "edges": [], "meta": {}}, timer)
+    assert "query" in json.loads(body)["meta"]["timing_ms"]
+    assert header.startswith("query;dur=") and "serialize;dur=" in header
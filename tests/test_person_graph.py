@@ -0,0 +1,81 @@
+import json
+import pytest
+from app.person_graph import (PersonGraph, graph_params, serialize_person_graph, etag_matches,
+                              DEFAULT_HOP_LIMITS, MAX_HOP_LIMITS)
+from app.overview_graph import PhaseTimer
+from app.memory_repository import MemoryRepository
+from app.sqlite_repository import SQLiteRepository
+
+EDGES = [("Ann", "Asthma"), ("Ann", "Gout"), ("Bob", "Asthma"), ("Cid", "Asthma"),
+         ("Cid", "Flu"), ("Dee", "Gout"), ("Dee", "Flu"), ("Dee", "Asthma")]
+
+
+def load(repository):
+    for i, disease in enumerate(["Asthma", "Flu", "Gout"]):
+        repository.create_disease(f"d{i}", disease, f"{disease} description")
+    for i, person in enumerate(["Ann", "Bob", "Cid", "Dee"]):
+        repository.create_person(f"p{i}", person, 30 + i)
+    for i, (person, disease) in enumerate(EDGES):
+        repository.create_relationship(f"r{i}", person, disease)
+    return repository
+
+
+def walk(repository, name, depth, limits):
+    graph = PersonGraph(name, depth, limits)
+    diseases = graph.add_diseases(repository.person_diseases(name))
+    if depth > 1:
+        patients = graph.add_patients(repository.graph_patients(diseases, [name], limits[1] + 1))
+        if depth > 2:
+            graph.add_patient_diseases(repository.graph_diseases(patients, limits[2] + 1))
+    return graph.to_dict()
+
+
+def test_graph_params():
+    assert graph_params() == (1, DEFAULT_HOP_LIMITS)
+    assert graph_params("3", "5,2") == (3, (5, 2, DEFAULT_HOP_LIMITS[2]))
+    assert graph_params(2, "100000,1,1") == (2, (MAX_HOP_LIMITS[0], 1, 1))
+    for depth, limits in ((0, None), (4, None), ("x", None), (1, "0"), (1, "1,2,3,4"), (1, "a")):
+        with pytest.raises(ValueError):
+            graph_params(depth, limits)
+
+
+def test_hops_are_bounded_and_match_across_backends(tmp_path):
+    memory = load(MemoryRepository())
+    sqlite = load(SQLiteRepository(str(tmp_path / "graph.sqlite3")))
+    assert memory.graph_patients(["Gout", "Asthma"], ["Ann"], 2) == \
+        sqlite.graph_patients(["Gout", "Asthma"], ["Ann"], 2) == [
+            {"disease": "Gout", "patient": "Dee", "age": 33},
+            {"disease": "Asthma", "patient": "Bob", "age": 31},
+            {"disease": "Asthma", "patient": "Cid", "age": 32}]
+    assert memory.graph_diseases(["Dee", "Bob"], 2) == sqlite.graph_diseases(["Dee", "Bob"], 2)
+
+    # Depth 1 has the same nodes and edges as the old networkx path
+    graph = walk(memory, "Ann", 1, DEFAULT_HOP_LIMITS)
+    assert graph["nodes"][0] == {"id": "Ann", "label": "Ann", "color": "blue"}
+    assert graph["edges"] == [{"from": "Ann", "to": "Asthma"}, {"from": "Ann", "to": "Gout"}]
+    assert graph["meta"]["truncated"] == [False]
+
+    graph = walk(memory, "Ann", 3, (10, 2, 1))
+    assert graph == walk(sqlite, "Ann", 3, (10, 2, 1))
+    assert [node["id"] for node in graph["nodes"]] == ["Ann", "Asthma", "Gout", "Bob", "Cid",
+                                                       "Dee"]
+    # Asthma has three other people, Dee and Cid two diseases each
+    assert graph["meta"]["truncated"] == [False, True, True]
+    assert {"from": "Dee", "to": "Gout"} in graph["edges"]
+    assert {"from": "Cid", "to": "Asthma"} in graph["edges"]
+    assert len(graph["edges"]) == len({(e["from"], e["to"]) for e in graph["edges"]})
+    sqlite.close()
+
+
+def test_etag_depends_on_the_body_only():
+    graph = walk(load(MemoryRepository()), "Bob", 2, DEFAULT_HOP_LIMITS)
+    timer = PhaseTimer()
+    body, etag, header = serialize_person_graph(graph, timer)
+    assert json.loads(body) == graph and "serialize;dur=" in header
+    assert serialize_person_graph(graph, PhaseTimer())[1] == etag
+
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"other"', etag)
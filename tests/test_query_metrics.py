@@ -0,0 +1,82 @@
+from types import SimpleNamespace
+import pytest
+from app.query_metrics import QueryMetrics, InstrumentedRunner, fingerprint, plan_summary
+
+QUERY = "MATCH (p:Person)\n  RETURN p.name AS name"
+
+
+class FakeResult:
+    def __init__(self, rows, server_ms=(3, 4)):
+        self.rows = rows
+        self.server_ms = server_ms
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def data(self):
+        return list(self.rows)
+
+    def single(self):
+        return self.rows[0] if self.rows else None
+
+    def consume(self):
+        return SimpleNamespace(result_available_after=self.server_ms[0],
+                               result_consumed_after=self.server_ms[1])
+
+
+class FakeSession:
+    def __init__(self, rows, fail=False):
+        self.rows = rows
+        self.fail = fail
+
+    def run(self, query, params):
+        if self.fail:
+            raise RuntimeError("syntax error")
+        return FakeResult(self.rows)
+
+
+def test_runner_records_latency_rows_and_server_time():
+    metrics = QueryMetrics(slow_ms=10_000)
+    session = InstrumentedRunner(FakeSession([{"name": "Ann"}, {"name": "Bob"}]), "READ", metrics=metrics)
+
+    assert [row["name"] for row in session.run(QUERY)] == ["Ann", "Bob"]
+    assert session.run(QUERY, name="Ann").single() == {"name": "Ann"}
+    session.run(QUERY).data()
+
+    query = metrics.to_dict()["queries"][0]
+    assert query["query_id"] == fingerprint(QUERY)[0]
+    assert query["query"] == "MATCH (p:Person) RETURN p.name AS name"
+    assert (query["count"], query["rows"], query["server_ms"]) == (3, 5, 21)
+
+    text = metrics.prometheus()
+    assert f'medgraph_query_duration_seconds_count{{query="{query["query_id"]}"}} 3' in text
+    assert f'medgraph_query_duration_seconds_bucket{{query="{query["query_id"]}",le="+Inf"}} 3' in text
+    assert f'medgraph_query_rows_total{{query="{query["query_id"]}"}} 5' in text
+
+
+def test_slow_and_failing_queries_are_logged_without_values():
+    metrics = QueryMetrics(slow_ms=0, profile_slow=True, profile_interval=60, clock=lambda: 0)
+
+    assert metrics.observe(QUERY, {"name": "Ann"}, 0.2, rows=1, mode="READ") is True
+    # Profiled at most once per interval, and never for writes
+    assert metrics.observe(QUERY, {"name": "Ann"}, 0.2, rows=1, mode="READ") is False
+    assert metrics.observe("CREATE (n)", {}, 0.2, mode="WRITE") is False
+
+    entry = metrics.slow_log[0]
+    assert entry["event"] == "slow_query" and entry["params"] == ["name"]
+    assert "Ann" not in str(entry)
+
+    session = InstrumentedRunner(FakeSession([], fail=True), "READ", metrics=metrics)
+    with pytest.raises(RuntimeError):
+        session.run("MATCH (n) RETURN m")
+    failed = [q for q in metrics.to_dict()["queries"] if q["errors"]]
+    assert [q["query"] for q in failed] == ["MATCH (n) RETURN m"]
+    assert f'medgraph_query_errors_total{{query="{fingerprint("MATCH (n) RETURN m")[0]}"}} 1' in (
+        metrics.prometheus())
+
+
+def test_plan_summary_flattens_profile():
+    plan = {"operatorType": "ProduceResults", "rows": 2, "dbHits": 0, "identifiers": ["name"],
+            "children": [{"operatorType": "NodeByLabelScan", "rows": 2, "dbHits": 3}]}
+    assert plan_summary(plan) == ["ProduceResults (name) rows=2 dbHits=0",
+                                  "  NodeByLabelScan rows=2 dbHits=3"]
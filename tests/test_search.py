@@ -0,0 +1,46 @@
+import threading
+import time
+import pytest
+from app.search import build_fulltext_query, escape_lucene, SingleFlight
+
+
+def test_build_fulltext_query_modes():
+    assert build_fulltext_query("Jo Smith", "prefix") == "jo* AND smith*"
+    assert build_fulltext_query("Jo Smith", "fuzzy") == "jo AND smith~1"
+    assert build_fulltext_query("smith", "ranked") == "(smith^4 OR smith*^2 OR smith~1)"
+    assert build_fulltext_query("   ") is None
+
+    with pytest.raises(ValueError):
+        build_fulltext_query("smith", "regex")
+
+
+def test_escape_lucene_special_characters():
+    assert escape_lucene("o'neil-(jr)") == "o'neil\\-\\(jr\\)"
+    assert build_fulltext_query("a+b", "prefix") == "a\\+b*"
+
+
+def test_single_flight_shares_concurrent_calls():
+    flight = SingleFlight()
+    calls = []
+    started = threading.Event()
+
+    def slow():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return ["Alice"]
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("alice", slow)))
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=lambda: results.append(flight.do("alice", slow)))
+                 for _ in range(5)]
+    for thread in followers:
+        thread.start()
+    for thread in [leader] + followers:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [["Alice"]] * 6
+    assert flight.shared == 5
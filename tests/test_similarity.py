@@ -0,0 +1,133 @@
+import math
+import pytest
+from app import events
+from app.similarity import PatientSimilarity, similarity, SEVERITY_WEIGHTS
+from app.memory_repository import MemoryRepository
+from app.sqlite_repository import SQLiteRepository
+from benchmarks.synthetic import Hospital, load_repository
+
+DIAGNOSES = [
+    {"patient": "Ann", "disease": "Asthma", "severity": "severe"},
+    {"patient": "Ann", "disease": "Gout", "severity": "mild"},
+    {"patient": "Bob", "disease": "Asthma", "severity": "mild"},
+    {"patient": "Bob", "disease": "Gout", "severity": "mild"},
+    {"patient": "Cid", "disease": "Asthma", "severity": "severe"},
+    {"patient": "Dee", "disease": "Flu", "severity": None},
+]
+PRESCRIPTIONS = [
+    {"patient": "Ann", "medication": "Salbutamol"},
+    {"patient": "Cid", "medication": "Salbutamol"},
+    {"patient": "Dee", "medication": "Oseltamivir"},
+]
+
+
+def brute_force(diagnoses, prescriptions, patient, metric, k):
+    """Top-k (patient, score) computed pair by pair from the rows."""
+    vectors = {}
+    for row in diagnoses:
+        vector = vectors.setdefault(row["patient"], {})
+        weight = SEVERITY_WEIGHTS.get(row["severity"], 2)
+        vector[("d", row["disease"])] = max(vector.get(("d", row["disease"]), 0), weight)
+    for row in prescriptions:
+        vectors.setdefault(row["patient"], {})[("m", row["medication"])] = 1
+    x = vectors[patient]
+    scores = []
+    for other, y in vectors.items():
+        shared = x.keys() & y.keys()
+        if other == patient or not shared:
+            continue
+        if metric == "cosine":
+            score = sum(x[f] * y[f] for f in shared) / math.sqrt(
+                sum(w * w for w in x.values()) * sum(w * w for w in y.values()))
+        else:
+            overlap = sum(min(x[f], y[f]) for f in shared)
+            score = overlap / (sum(x.values()) + sum(y.values()) - overlap)
+        scores.append((other, round(score, 4)))
+    return sorted(scores, key=lambda item: (-item[1], item[0]))[:k]
+
+
+def top(engine, patient, metric, k=10):
+    return [(row["patient"], row["score"])
+            for row in engine.similar_patients(patient, k=k, metric=metric)["similar"]]
+
+
+def test_scores_and_shared_features():
+    engine = PatientSimilarity()
+    engine.load(DIAGNOSES, PRESCRIPTIONS)
+
+    result = engine.similar_patients("Ann", metric="jaccard")
+    # Cid shares severe Asthma (3) and Salbutamol (1) out of Ann's 3 + 1 + 1
+    assert result["similar"][0] == {"patient": "Cid", "score": 0.8, "shared_diseases": ["Asthma"],
+                                    "shared_medications": ["Salbutamol"]}
+    assert [row["patient"] for row in result["similar"]] == ["Cid", "Bob"]
+    for metric in ("cosine", "jaccard"):
+        assert top(engine, "Bob", metric) == brute_force(DIAGNOSES, PRESCRIPTIONS, "Bob", metric, 10)
+    assert engine.similar_patients("Dee")["similar"] == []
+    assert engine.similar_patients("Zed") is None
+    with pytest.raises(ValueError):
+        engine.similar_patients("Ann", metric="euclidean")
+
+    network = engine.similarity_network("Bob", k=1, depth=2)
+    assert [node["id"] for node in network["nodes"]] == ["Bob", "Ann", "Cid"]
+    assert network["meta"]["edge_count"] == 2
+    with pytest.raises(ValueError):
+        engine.similarity_network("Bob", depth=3)
+
+
+def test_matches_brute_force_on_a_synthetic_hospital(tmp_path):
+    memory = MemoryRepository()
+    load_repository(Hospital(300, seed=7), memory)
+    diagnoses, prescriptions = memory.similarity_rows()
+    engine = PatientSimilarity()
+    engine.load(diagnoses, prescriptions)
+
+    patients = sorted({row["patient"] for row in diagnoses})
+    for patient in patients[:20]:
+        for metric in ("cosine", "jaccard"):
+            assert top(engine, patient, metric, k=5) == brute_force(
+                diagnoses, prescriptions, patient, metric, 5)
+
+    sqlite = SQLiteRepository(str(tmp_path / "similarity.sqlite3"))
+    load_repository(Hospital(50, seed=7), sqlite)
+    small = MemoryRepository()
+    load_repository(Hospital(50, seed=7), small)
+    key = lambda row: sorted(row.items(), key=lambda item: item[0])
+    for sqlite_rows, memory_rows in zip(sqlite.similarity_rows(), small.similarity_rows()):
+        assert sorted(map(key, sqlite_rows)) == sorted(map(key, memory_rows))
+    sqlite.close()
+
+
+def test_incremental_updates_match_rebuild():
+    engine = PatientSimilarity()
+    engine.load(DIAGNOSES[:3], PRESCRIPTIONS[:1])
+    for row in DIAGNOSES[3:]:
+        engine.add_diagnosis(row["patient"], row["disease"], row["severity"])
+    for row in PRESCRIPTIONS[1:]:
+        engine.add_prescription(row["patient"], row["medication"])
+    engine.add_diagnosis("Dee", "Gout", "critical")
+    engine.set_status("Dee", "Gout", "resolved",
+                      [{"severity": "critical", "previous_status": "active"}])
+    engine.add_diagnosis("Ann", "Flu", "mild")
+    assert engine.stats()["pending_patients"] == 4
+
+    rebuilt = PatientSimilarity()
+    rebuilt.load(DIAGNOSES + [{"patient": "Ann", "disease": "Flu", "severity": "mild"}],
+                 PRESCRIPTIONS)
+    for patient in ("Ann", "Bob", "Cid", "Dee"):
+        for metric in ("cosine", "jaccard"):
+            assert engine.similar_patients(patient, metric=metric) == \
+                rebuilt.similar_patients(patient, metric=metric)
+
+
+def test_events_update_global_index():
+    similarity.load(DIAGNOSES, PRESCRIPTIONS)
+    events.emit(events.PRESCRIPTION_ADDED, patient_name="Bob", medication="Salbutamol",
+                doctor_name="Dr. Who")
+    events.emit(events.DIAGNOSIS_CREATED, patient_name="Eve", disease_name="Flu",
+                doctor_name="Dr. Who", severity="mild")
+    assert top(similarity, "Eve", "jaccard") == [("Dee", round(1 / 3, 4))]
+
+    events.emit(events.DIAGNOSIS_UPDATED, patient_name="Eve", disease_name="Flu", status="resolved",
+                previous=[{"doctor": "Dr. Who", "severity": "mild", "previous_status": "active"}])
+    assert similarity.similar_patients("Eve") is None
+    assert similarity.similar_patients("Bob")["similar"][0]["shared_medications"] == ["Salbutamol"]
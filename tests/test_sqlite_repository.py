@@ -0,0 +1,165 @@
+import threading
+from datetime import datetime
+import pytest
+from benchmarks.synthetic import Hospital, load_repository
+from app.memory_repository import MemoryRepository
+from app.sqlite_repository import SQLiteRepository
+from app.repository import create_repository
+
+IDS = ("id", "patient_id", "key")
+PARAMS = {"prescriptions_offset": 1, "prescriptions_limit": 3, "history_offset": 0,
+          "history_limit": 5, "vitals_limit": 5}
+
+
+def strip(rows):
+    """Rows without their generated ids, which differ between the two loads."""
+    if isinstance(rows, dict):
+        return {key: strip(value) for key, value in rows.items() if key not in IDS}
+    if isinstance(rows, list):
+        return [strip(row) for row in rows]
+    return rows
+
+
+def unordered(rows):
+    return sorted(strip(rows), key=repr)
+
+
+@pytest.fixture(scope="module")
+def backends(tmp_path_factory):
+    hospital = Hospital(150, seed=7)
+    memory = MemoryRepository()
+    sqlite = SQLiteRepository(str(tmp_path_factory.mktemp("sqlite") / "medgraph.sqlite3"))
+    load_repository(hospital, memory)
+    load_repository(hospital, sqlite)
+    yield hospital, memory, sqlite
+    sqlite.close()
+
+
+def test_reads_match_the_memory_backend(backends):
+    hospital, memory, sqlite = backends
+    assert sqlite.counts() == memory.counts()
+    patients = [p["name"] for p in hospital.persons[:25]]
+    diseases = sorted({d["disease"] for d in hospital.diagnoses})[:15]
+
+    for name in patients:
+        assert unordered(sqlite.person_diseases(name)) == unordered(memory.person_diseases(name))
+        assert strip(sqlite.patient_details(name)) == strip(memory.patient_details(name))
+        record = strip(sqlite.medical_record(name, ["diagnoses", "prescriptions", "vitals"], PARAMS))
+        expected = strip(memory.medical_record(name, ["diagnoses", "prescriptions", "vitals"], PARAMS))
+        assert record == expected
+        for event_type in ("diagnosis", "prescription", "vitals"):
+            args = (name, event_type, None, None, 10, None, False, None)
+            assert strip(sqlite.timeline_rows(*args)) == strip(memory.timeline_rows(*args))
+
+    for disease in diseases:
+        assert strip(sqlite.active_patients_with(disease)) == \
+            strip(memory.active_patients_with(disease))
+        assert unordered(sqlite.disease_network(disease)) == unordered(memory.disease_network(disease))
+        assert strip(sqlite.cluster_patients(disease, None, "active", None, 20)) == \
+            strip(memory.cluster_patients(disease, None, "active", None, 20))
+
+    for status in ("active", None):
+        assert unordered(sqlite.overview_clusters(status)) == unordered(memory.overview_clusters(status))
+        assert sqlite.overview_links(diseases, status, 20) == memory.overview_links(diseases, status, 20)
+    assert [unordered(rows) for rows in sqlite.stats_rows()] == \
+        [unordered(rows) for rows in memory.stats_rows()]
+    assert unordered(sqlite.severity_distribution()) == unordered(memory.severity_distribution())
+    for doctor in hospital.doctors[:5]:
+        ours, theirs = sqlite.doctor_stats(doctor), memory.doctor_stats(doctor)
+        assert ours["patients"] == theirs["patients"]
+        assert unordered(ours["severity"]) == unordered(theirs["severity"])
+    assert list(sqlite.list_rows("Person", ["age"], after=patients[3], limit=5)) == \
+        list(memory.list_rows("Person", ["age"], after=patients[3], limit=5))
+
+    for term, mode in (("smith", "ranked"), ("joh", "prefix"), ("smyth", "fuzzy"),
+                       ("mar jones", "prefix"), ("heart", "ranked"), ("diabtes", "fuzzy")):
+        kind = "diseases" if term in ("heart", "diabtes") else "patients"
+        assert strip(sqlite.search(kind, term, None, mode, 20)) == \
+            strip(memory.search(kind, term, None, mode, 20))
+
+
+def test_writes_are_idempotent_and_persist(tmp_path):
+    path = str(tmp_path / "medgraph.sqlite3")
+    repo = create_repository(environ={"MEDGRAPH_BACKEND": "sqlite", "SQLITE_PATH": path})
+    assert repo.backend == "sqlite"
+    assert repo.create_person("p1", "Ann Lee", 40)
+    assert repo.create_person("p1", "Ann Lee", 40)
+    assert not repo.create_person("p2", "Ann Lee", 41)
+    assert repo.create_disease("d1", "Asthma", "Chronic airway inflammation")
+    assert not repo.create_relationship("r1", "Ann Lee", "Flu")["disease_found"]
+    assert repo.create_relationship("r1", "Ann Lee", "Asthma")["created"]
+    assert not repo.create_relationship("r2", "Ann Lee", "Asthma")["created"]
+    assert repo.create_diagnosis("x1", "Ann Lee", "Asthma", "Dr. Ito", None, "", "mild")
+    assert not repo.create_diagnosis("x2", "Bob", "Asthma", "Dr. Ito", None, "", "mild")
+    assert repo.add_history("h1", "Ann Lee", "Measles", "1990-01-01", True, "", None)
+    assert repo.update_diagnosis_status("Ann Lee", "Asthma", "resolved", "Better", None) == \
+        [{"doctor": "Dr. Ito", "severity": "mild", "previous_status": "active"}]
+    assert repo.delete_relationship("Ann Lee", "Asthma")
+    assert not repo.delete_relationship("Ann Lee", "Asthma")
+    repo.close()
+
+    reopened = SQLiteRepository(path)
+    ready, details = reopened.check_ready()
+    assert ready and details["diagnoses"] == 1 and details["relationships"] == 0
+    history = reopened.medical_record("Ann Lee", ["medical_history"], PARAMS)["medical_history"]
+    assert history == [{"condition": "Measles", "date_diagnosed": "1990-01-01", "resolved": True,
+                        "notes": ""}]
+    assert reopened.search("patients", "ann", None, "prefix", 5)[0]["id"] == "p1"
+
+    # Readers on other threads use their own connections alongside the writer
+    errors = []
+
+    def read():
+        try:
+            for _ in range(50):
+                assert reopened.person_exists("Ann Lee")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=read) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for i in range(50):
+        reopened.create_person(f"n{i}", f"Person {i}", i)
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert reopened.counts()["persons"] == 51
+    reopened.close()
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_bulk_writes(backend, tmp_path):
+    repo = create_repository(environ={"MEDGRAPH_BACKEND": backend,
+                                      "SQLITE_PATH": str(tmp_path / "bulk.sqlite3")})
+    repo.create_person("p0", "Ann Lee", 40)
+    assert repo.bulk_create_persons([
+        {"index": 0, "id": "p1", "name": "Ann Lee", "age": 41},
+        {"index": 1, "id": "p2", "name": "Bob Ray", "age": 50},
+    ]) == [{"index": 0, "created": False}, {"index": 1, "created": True}]
+    assert repo.bulk_create_diseases([
+        {"index": 0, "id": "d1", "name": "Asthma", "description": "Chronic airway inflammation"},
+    ]) == [{"index": 0, "created": True}]
+    assert repo.search("patients", "bob", None, "prefix", 5)[0]["id"] == "p2"
+    assert repo.existing_persons(["Ann Lee", "Bob Ray", "Cy Fox"]) == {"Ann Lee", "Bob Ray"}
+
+    rows = [{"index": 0, "id": "r1", "person_name": "Ann Lee", "disease_name": "Asthma"},
+            {"index": 1, "id": "r2", "person_name": "Cy Fox", "disease_name": "Asthma"},
+            {"index": 2, "id": "r3", "person_name": "Bob Ray", "disease_name": "Flu"}]
+    expected = [{"index": 0, "person_found": True, "disease_found": True, "created": True},
+                {"index": 1, "person_found": False, "disease_found": True, "created": False},
+                {"index": 2, "person_found": True, "disease_found": False, "created": False}]
+    by_index = lambda results: sorted(results, key=lambda result: result["index"])
+    assert by_index(repo.bulk_create_relationships(rows)) == expected
+    rows[0]["id"] = "r4"
+    expected[0]["created"] = False
+    assert by_index(repo.bulk_create_relationships(rows)) == expected
+    assert [d["name"] for d in repo.person_diseases("Ann Lee")] == ["Asthma"]
+
+    readings = [{"index": i, "id": f"v{i}", "patient": patient, "notes": "", "heart_rate": 70 + i,
+                 "recorded_at": datetime(2024, 1, 1, 8, i)}
+                for i, patient in enumerate(["Ann Lee", "Cy Fox", "Ann Lee"])]
+    assert repo.bulk_add_vitals(readings) == [{"index": 0}, {"index": 2}]
+    vitals = repo.medical_record("Ann Lee", ["vitals"], PARAMS)["vitals"]
+    assert sorted(v["heart_rate"] for v in vitals) == [70, 72]
+    repo.close()
@@ -0,0 +1,55 @@
+from app import events
+from app.stats import DashboardStats, dashboard_stats
+
+DIAGNOSES = [
+    {"disease": "Diabetes", "severity": "mild", "status": "active", "doctor": "Dr. Lee", "diagnoses": 3},
+    {"disease": "Asthma", "severity": "severe", "status": "active", "doctor": "Dr. Lee", "diagnoses": 1},
+    {"disease": "Asthma", "severity": "mild", "status": "resolved", "doctor": "Dr. Kay", "diagnoses": 2},
+]
+DOCTOR_PATIENTS = [
+    {"doctor": "Dr. Lee", "patient": "Alice", "diagnoses": 2},
+    {"doctor": "Dr. Lee", "patient": "Bob", "diagnoses": 2},
+    {"doctor": "Dr. Kay", "patient": "Carol", "diagnoses": 2},
+]
+PRESCRIPTIONS = [{"doctor": "Dr. Lee", "prescriptions": 4}]
+
+
+def load_rows():
+    return DIAGNOSES, DOCTOR_PATIENTS, PRESCRIPTIONS
+
+
+def test_counters_match_dashboard_queries():
+    stats = DashboardStats()
+    assert stats.reconcile(load_rows) == 0
+
+    assert stats.disease_rows() == [{"disease": "Diabetes", "patient_count": 3},
+                                    {"disease": "Asthma", "patient_count": 1}]
+    assert sorted(stats.severity_rows(), key=lambda row: row["severity"]) == [
+        {"severity": "mild", "count": 3}, {"severity": "severe", "count": 1}]
+    assert stats.status_counts() == {"active": 4, "resolved": 2}
+    assert stats.doctor_rows("Dr. Lee") == {
+        "patients": [{"total_patients": 2}],
+        "severity": [{"severity": "mild", "count": 3}, {"severity": "severe", "count": 1}],
+        "diseases": [{"disease": "Diabetes", "count": 3}, {"disease": "Asthma", "count": 1}],
+        "prescriptions": [{"total_prescriptions": 4}],
+    }
+    assert stats.doctors()["Dr. Kay"] == {"diagnoses": 2, "patients": 1, "prescriptions": 0}
+
+
+def test_events_update_counters_and_reconcile_reports_drift():
+    dashboard_stats.reconcile(load_rows)
+    events.emit(events.DIAGNOSIS_CREATED, patient_name="Dan", disease_name="Asthma",
+                doctor_name="Dr. Kay", severity="moderate")
+    events.emit(events.DIAGNOSIS_UPDATED, patient_name="Bob", disease_name="Asthma",
+                status="resolved",
+                previous=[{"doctor": "Dr. Lee", "severity": "severe", "previous_status": "active"}])
+    events.emit(events.PRESCRIPTION_ADDED, patient_name="Dan", medication="Salbutamol",
+                doctor_name="Dr. Kay")
+
+    assert dashboard_stats.status_counts() == {"active": 4, "resolved": 3}
+    assert dashboard_stats.disease_rows()[1] == {"disease": "Asthma", "patient_count": 1}
+    assert dashboard_stats.doctors()["Dr. Kay"] == {"diagnoses": 3, "patients": 2, "prescriptions": 1}
+
+    # A reconcile against the unchanged source rows undoes the three events
+    assert dashboard_stats.reconcile(load_rows) > 0
+    assert dashboard_stats.status_counts() == {"active": 4, "resolved": 2}
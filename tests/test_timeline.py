@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+import pytest
+from app.timeline import (TIMELINE_TYPES, timeline_params, stream_params, record_stream,
+                          store_vitals_stream, merge_streams, decode_cursor)
+from app.vitals_store import VitalsStore, to_millis
+
+START = datetime(2020, 1, 1, 9, 0, 0).astimezone()
+
+
+def history():
+    """Events per type, with some dates shared within and across types."""
+    rows = {event_type: [] for event_type in TIMELINE_TYPES}
+    for i in range(120):
+        event_type = TIMELINE_TYPES[i % 3]
+        date = START + timedelta(days=i // 4)
+        rows[event_type].append({"date": date.isoformat(), "type": event_type,
+                                 "ts": to_millis(date), "key": f"{i:04d}"})
+    return rows
+
+
+def run_stream(rows, event_type, since, until, limit, before, tie, before_key):
+    """What TIMELINE_STREAM_QUERIES return for one type."""
+    since = since and to_millis(since)
+    until = until and to_millis(until)
+    selected = [row for row in rows
+                if (since is None or row["ts"] >= since) and (until is None or row["ts"] < until)
+                and (before is None or row["ts"] < before
+                     or (row["ts"] == before and tie
+                         and (before_key is None or row["key"] < before_key)))]
+    selected.sort(key=lambda row: (row["ts"], row["key"]), reverse=True)
+    return [dict(row) for row in selected[:limit]]
+
+
+def page(rows, types=None, since=None, until=None, limit=None, cursor=None):
+    types, since, until, limit, position = timeline_params(types, since, until, limit, cursor)
+    streams = [record_stream(run_stream(rows[event_type], event_type, since, until, limit + 1,
+                                        **stream_params(event_type, position)))
+               for event_type in types]
+    return merge_streams(streams, limit)
+
+
+def test_cursor_pages_cover_history_once_in_order():
+    rows = history()
+    expected = sorted((row for stream in rows.values() for row in stream),
+                      key=lambda row: (row["ts"], row["type"], row["key"]), reverse=True)
+
+    seen = []
+    cursor = None
+    while True:
+        events, cursor = page(rows, limit=7, cursor=cursor)
+        seen.extend(events)
+        if cursor is None:
+            break
+    assert [(event["date"], event["type"]) for event in seen] == [
+        (row["date"], row["type"]) for row in expected]
+    assert len(seen) == 120
+
+
+def test_window_and_type_filters():
+    rows = history()
+    since = (START + timedelta(days=5)).isoformat()
+    until = (START + timedelta(days=10)).isoformat()
+    events, cursor = page(rows, types=["vitals", "diagnosis"], since=since, until=until, limit=100)
+    assert cursor is None
+    assert {event["type"] for event in events} == {"diagnosis", "vitals"}
+    assert all(since <= event["date"] < until for event in events)
+    assert page(rows, since=until, until=since)[0] == []
+    assert len(events) == 14
+
+    with pytest.raises(ValueError):
+        timeline_params(types=["lab"])
+    with pytest.raises(ValueError):
+        timeline_params(since="last week")
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_store_vitals_stream_pages_by_keyset():
+    store = VitalsStore(":memory:")
+    store.add_many([("Alice", {"heart_rate": 70, "recorded_at": START + timedelta(hours=i)})
+                    for i in range(50)])
+    # Two readings in the same millisecond are ordered by sequence number
+    store.add("Alice", {"heart_rate": 71, "recorded_at": START + timedelta(hours=49)})
+
+    stream = list(store_vitals_stream(store, "Alice", batch=8))
+    assert len(stream) == 51
+    assert [position for position, _ in stream] == sorted(
+        (position for position, _ in stream), reverse=True)
+
+    position = stream[1][0]
+    resumed = list(store_vitals_stream(store, "Alice", position=position, batch=8))
+    assert [p for p, _ in resumed] == [p for p, _ in stream[2:]]
+
+    _, since, until, _, _ = timeline_params(since=START.isoformat(),
+                                            until=(START + timedelta(hours=10)).isoformat())
+    windowed = list(store_vitals_stream(store, "Alice", since=since, until=until))
+    assert len(windowed) == 10
+    assert windowed[0][1]["date"] == (START + timedelta(hours=9)).isoformat()
+
+    # Newest first, vitals come before a diagnosis at the same instant, so they were already returned
+    cursor_ts = to_millis(START + timedelta(hours=5))
+    after_diagnosis = list(store_vitals_stream(store, "Alice", position=(cursor_ts, "diagnosis", "x")))
+    assert after_diagnosis[0][0][0] == cursor_ts - 3600 * 1000
@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta
+import pytest
+from app.vitals_store import VitalsStore, parse_blood_pressure, validate_readings
+
+START = datetime(2024, 3, 1, 8, 0, 0)
+
+
+def fill(store, minutes=90, per_minute=3):
+    for i in range(minutes * per_minute):
+        store.add("Alice", {"blood_pressure": f"{120 + i % 5}/80", "heart_rate": 60 + i % 3,
+                            "temperature": 36.5, "recorded_at": START + timedelta(seconds=60 * i / per_minute)})
+
+
+def test_latest_and_range_queries(tmp_path):
+    store = VitalsStore(str(tmp_path / "vitals.sqlite3"))
+    fill(store)
+    store.add("Bob", {"heart_rate": 80, "recorded_at": START})
+
+    latest = store.latest("Alice", 2)
+    assert [reading["date"] for reading in latest] == [
+        (START + timedelta(seconds=20 * 269)).isoformat(), (START + timedelta(seconds=20 * 268)).isoformat()]
+    assert latest[0]["systolic"] == 124 and latest[0]["diastolic"] == 80
+
+    window = store.range("Alice", START + timedelta(minutes=10), START + timedelta(minutes=20))
+    assert len(window) == 30
+    assert window[0]["date"] == (START + timedelta(minutes=10)).isoformat()
+    assert store.latest("Nobody") == []
+
+    # Reopening the file keeps readings and patient ids
+    store.close()
+    reopened = VitalsStore(str(tmp_path / "vitals.sqlite3"))
+    assert reopened.stats()["readings"] == 271
+    assert reopened.latest("Bob", 1)[0]["heart_rate"] == 80
+
+
+def test_rollups_match_raw_readings():
+    store = VitalsStore(":memory:")
+    fill(store)
+
+    minutes = store.rollup("Alice", "1m")
+    assert len(minutes) == 90
+    assert minutes[0]["count"] == 3
+    assert minutes[0]["heart_rate"] == {"min": 60.0, "max": 62.0, "mean": 61.0, "count": 3}
+    assert minutes[0]["weight"] is None
+
+    hours = store.rollup("Alice", "1h")
+    assert [bucket["count"] for bucket in hours] == [180, 90]
+    raw = [reading["systolic"] for reading in store.range("Alice", START, START + timedelta(hours=1))]
+    assert hours[0]["systolic"]["mean"] == pytest.approx(sum(raw) / len(raw), abs=1e-3)
+    assert hours[0]["systolic"]["max"] == 124
+
+    # A start inside a bucket still returns that bucket
+    assert store.rollup("Alice", "1h", start=START + timedelta(minutes=30))[0]["count"] == 180
+    assert store.rollup("Alice", "1m", start=START + timedelta(seconds=30))[0]["count"] == 3
+
+    with pytest.raises(ValueError):
+        store.rollup("Alice", "5m")
+
+
+def test_add_imported_skips_readings_imported_before():
+    store = VitalsStore(":memory:")
+    readings = [(f"4:abc:{i}", "Alice", {"heart_rate": 60 + i, "recorded_at": START})
+                for i in range(3)]
+    assert store.add_imported(readings[:2]) == 2
+    assert store.add_imported(readings) == 1
+    assert store.add_imported(readings) == 0
+    assert store.stats()["readings"] == 3
+    assert store.rollup("Alice", "1d")[0]["heart_rate"]["count"] == 3
+
+
+def test_handles_on_one_file_share_patients_and_seqs(tmp_path):
+    a = VitalsStore(str(tmp_path / "vitals.sqlite3"))
+    b = VitalsStore(str(tmp_path / "vitals.sqlite3"))
+    assert b.latest("Alice") == []
+    a.add("Alice", {"heart_rate": 70, "recorded_at": START})
+    assert b.latest("Alice")[0]["heart_rate"] == 70
+    b.add("Alice", {"heart_rate": 71, "recorded_at": START})
+    a.add("Alice", {"heart_rate": 72, "recorded_at": START})
+
+    # Readings at one timestamp get distinct seqs, so keyset pages neither skip nor repeat
+    keys = [key for key, _ in a.newest("Alice")]
+    assert len(set(keys)) == 3
+    assert [reading["heart_rate"] for _, reading in b.newest("Alice", before=keys[0])] == [71, 70]
+    assert a.stats()["patients"] == b.stats()["patients"] == 1
+
+
+def test_parse_blood_pressure():
+    assert parse_blood_pressure("120/80") == (120.0, 80.0)
+    assert parse_blood_pressure("high") == (None, None)
+    assert parse_blood_pressure(None) == (None, None)
+
+
+def test_validate_readings_rejects_per_row_and_computes_bmi():
+    results = validate_readings([
+        {"patient": "Alice", "blood_pressure": "120/80", "weight": 70, "height": 175},
+        {"patient": "Alice", "heart_rate": "fast"},
+        {"patient": "Alice", "temperature": 80},
+        {"patient": "Alice", "systolic": 70, "diastolic": 90},
+        {"patient": "Alice"},
+        {"heart_rate": 70},
+    ])
+
+    reading, error = results[0]
+    assert error is None
+    assert reading["bmi"] == 22.86 and reading["systolic"] == 120 and reading["heart_rate"] is None
+    assert [error for _, error in results[1:]] == [
+        "Invalid heart_rate; expected a number",
+        "temperature outside 25-45",
+        "systolic must be above diastolic",
+        "At least one measurement is required",
+        "Patient name is required",
+    ]